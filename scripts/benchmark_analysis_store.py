@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Compare analysis-image reads from the preview codec cache and the pixel store.
+
+Synthetic 1024 px analysis images are written to a ``PreviewCache`` (JPEG
+round trip, the former analysis tier) and to an ``AnalysisPixelStore``, then
+every image is read back ``--passes`` times as the analysis workers do.
+"array" reads return the memory-mapped view without building a PIL image.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from core.caching.analysis_pixel_store import AnalysisPixelStore  # noqa: E402
+from core.caching.preview_cache import PreviewCache  # noqa: E402
+
+
+def _images(count: int, size: tuple[int, int]) -> list[Image.Image]:
+    rng = np.random.default_rng(5)
+    width, height = size
+    y_axis, x_axis = np.mgrid[0:height, 0:width].astype(np.float32)
+    images = []
+    for index in range(count):
+        scene = 127 + 90 * np.sin(x_axis / (41 + index)) * np.cos(y_axis / 67)
+        noise = rng.normal(0, 4, size=(height, width, 3)).astype(np.float32)
+        pixels = np.clip(scene[..., None] + noise, 0, 255).astype(np.uint8)
+        images.append(Image.fromarray(pixels, "RGB"))
+    return images
+
+
+def _timed(function, keys: list[tuple], passes: int) -> list[float]:
+    samples = []
+    for _ in range(passes):
+        for key in keys:
+            started = time.perf_counter()
+            result = function(key)
+            samples.append(time.perf_counter() - started)
+            assert result is not None, key
+    return samples
+
+
+def _directory_mb(path: str) -> float:
+    total = 0
+    for root, _, names in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in names)
+    return total / 2**20
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=40)
+    parser.add_argument("--passes", type=int, default=5)
+    args = parser.parse_args()
+
+    images = _images(args.images, (1024, 768))
+    keys = [
+        (f"/photos/IMG_{index:04d}.jpg", "analysis", 2, 1, 1, (1024, 1024))
+        for index in range(args.images)
+    ]
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="photosort-analysis-") as directory:
+        codec_dir = os.path.join(directory, "codec")
+        pixel_dir = os.path.join(directory, "pixels")
+        codec = PreviewCache(cache_dir=codec_dir)
+        store = AnalysisPixelStore(cache_dir=pixel_dir)
+        for label, cache in (("codec", codec), ("pixels", store)):
+            started = time.perf_counter()
+            for key, image in zip(keys, images, strict=True):
+                cache.set(key, image)
+            write_ms = (time.perf_counter() - started) / len(keys) * 1e3
+            reads = _timed(cache.get, keys, args.passes)
+            results[label] = (write_ms, reads)
+        results["array"] = (None, _timed(store.get_array, keys, args.passes))
+        codec_mb = _directory_mb(codec_dir)
+        pixel_mb = _directory_mb(pixel_dir)
+        codec.close()
+
+    print(f"images={args.images} size=1024x768 passes={args.passes}")
+    print(f"disk codec={codec_mb:.1f}MB pixels={pixel_mb:.1f}MB")
+    for label, (write_ms, reads) in results.items():
+        write_text = f"write={write_ms:7.2f}ms " if write_ms is not None else " " * 17
+        print(
+            f"{label:6s} {write_text}read median={statistics.median(reads) * 1e3:7.3f}ms "
+            f"p95={sorted(reads)[int(len(reads) * 0.95) - 1] * 1e3:7.3f}ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Compare per-item latency of single-key and batched cache reads.
+
+A thumbnail cache and an EXIF cache are filled with ``--entries`` synthetic
+items, then read back in batches of 1, 25 and 250 keys, once with one ``get``
+per key and once with ``get_many`` (one read transaction per batch).
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.caching.exif_cache import ExifCache  # noqa: E402
+from core.caching.thumbnail_cache import ThumbnailCache  # noqa: E402
+
+BATCH_SIZES = (1, 25, 250)
+
+
+def _per_item_us(read_batch, keys: list, batch_size: int, rounds: int) -> float:
+    started = time.perf_counter()
+    items = 0
+    for _ in range(rounds):
+        start = random.randrange(0, len(keys) - batch_size + 1)
+        batch = keys[start : start + batch_size]
+        read_batch(batch)
+        items += len(batch)
+    return (time.perf_counter() - started) / items * 1e6
+
+
+def _report(label: str, cache, keys: list, rounds: int) -> None:
+    for batch_size in BATCH_SIZES:
+        batch_rounds = max(1, rounds // batch_size)
+        single = _per_item_us(
+            lambda batch: [cache.get(key) for key in batch],
+            keys,
+            batch_size,
+            batch_rounds,
+        )
+        batched = _per_item_us(cache.get_many, keys, batch_size, batch_rounds)
+        print(
+            f"{label:9s} batch={batch_size:3d} get={single:8.1f}us/item "
+            f"get_many={batched:8.1f}us/item"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=2000, help="Items per run")
+    args = parser.parse_args()
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory(prefix="photosort-batched-") as directory:
+        thumbnails = ThumbnailCache(cache_dir=os.path.join(directory, "thumb"))
+        exif = ExifCache(cache_dir=os.path.join(directory, "exif"))
+        thumbnail_keys = [
+            (f"/photos/IMG_{index:05d}.jpg", True, 4_000_000, index)
+            for index in range(args.entries)
+        ]
+        exif_keys = [key[0] for key in thumbnail_keys]
+        thumbnail = Image.effect_noise((256, 170), 48).convert("RGB")
+        thumbnails.set_many((key, thumbnail) for key in thumbnail_keys)
+        exif.set_many(
+            {
+                key: {"Exif.Image.Model": "Camera", "Xmp.xmp.Rating": "3"}
+                for key in exif_keys
+            }
+        )
+
+        print(f"entries={args.entries} items_per_run={args.rounds}")
+        _report("thumbnail", thumbnails, thumbnail_keys, args.rounds)
+        _report("exif", exif, exif_keys, args.rounds)
+        thumbnails.close()
+        exif.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Report encode time, decode time and bytes for every cache codec profile.
+
+Synthetic photo-like images are encoded at the thumbnail and preview tier
+sizes with each profile from ``core.caching.image_codec``. Pass ``--folder``
+to use real photos, which are first reduced to the tier size.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from core.app_settings import (  # noqa: E402
+    PRELOAD_MAX_RESOLUTION,
+    PREVIEW_CACHE_CODEC,
+    THUMBNAIL_CACHE_CODEC,
+    THUMBNAIL_MAX_SIZE,
+)
+from core.caching.image_codec import (  # noqa: E402
+    CACHE_CODEC_PROFILES,
+    decode_cached_image,
+    encode_cached_image,
+)
+
+SUPPORTED_SUFFIXES = {".jpg", ".jpeg", ".png", ".tif", ".tiff"}
+TIERS = (
+    ("thumbnail", THUMBNAIL_MAX_SIZE, 82, THUMBNAIL_CACHE_CODEC),
+    ("preview", PRELOAD_MAX_RESOLUTION, 88, PREVIEW_CACHE_CODEC),
+)
+
+
+def _synthetic_sources(count: int) -> list[Image.Image]:
+    rng = np.random.default_rng(9)
+    width, height = 3000, 2000
+    y_axis, x_axis = np.mgrid[0:height, 0:width].astype(np.float32)
+    sources = []
+    for index in range(count):
+        # Smooth structure plus mild sensor-like noise compresses like a photo.
+        scene = 127 + 90 * np.sin(x_axis / (71 + index * 9)) * np.cos(y_axis / 113)
+        noise = rng.normal(0, 4, size=(height, width, 3)).astype(np.float32)
+        pixels = np.clip(scene[..., None] + noise, 0, 255).astype(np.uint8)
+        sources.append(Image.fromarray(pixels, "RGB"))
+    return sources
+
+
+def _folder_sources(folder: Path, count: int) -> list[Image.Image]:
+    sources = []
+    for path in sorted(folder.iterdir()):
+        if path.suffix.lower() in SUPPORTED_SUFFIXES and len(sources) < count:
+            with Image.open(path) as image:
+                image.draft("RGB", PRELOAD_MAX_RESOLUTION)
+                sources.append(image.convert("RGB"))
+    return sources
+
+
+def _measure(images: list[Image.Image], quality: int, profile: str) -> dict:
+    encode_samples, decode_samples, sizes = [], [], []
+    for image in images:
+        started = time.perf_counter()
+        payload = encode_cached_image(image, quality=quality, profile=profile)
+        encode_samples.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        decoded = decode_cached_image(payload)
+        decode_samples.append(time.perf_counter() - started)
+        assert decoded is not None and decoded.size == image.size
+        sizes.append(len(payload))
+    return {
+        "encode_ms": statistics.median(encode_samples) * 1e3,
+        "decode_ms": statistics.median(decode_samples) * 1e3,
+        "kib": statistics.mean(sizes) / 1024,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--folder", type=Path, help="Use real photos")
+    parser.add_argument("--images", type=int, default=6)
+    args = parser.parse_args()
+
+    sources = (
+        _folder_sources(args.folder, args.images)
+        if args.folder
+        else _synthetic_sources(args.images)
+    )
+    if not sources:
+        parser.error("No supported images found")
+
+    for tier, max_size, quality, configured in TIERS:
+        images = []
+        for source in sources:
+            image = source.copy()
+            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+            images.append(image)
+        print(
+            f"{tier} {images[0].width}x{images[0].height} "
+            f"(quality {quality}, configured: {configured})"
+        )
+        for profile in CACHE_CODEC_PROFILES:
+            result = _measure(images, quality, profile)
+            print(
+                f"  {profile:15s} encode={result['encode_ms']:7.2f}ms "
+                f"decode={result['decode_ms']:7.2f}ms size={result['kib']:8.1f}KiB"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
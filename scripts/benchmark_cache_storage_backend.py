@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Compare cache storage backends under concurrent writers and random readers.
+
+Each backend is pre-filled with ``--prefill`` thumbnail-sized payloads. Then
+``--writers`` threads store new payloads (every ``--batch``-th write is a
+``transact()`` batch, like ``set_many``) while ``--readers`` threads read
+random existing keys, for ``--seconds``. Throughput and per-operation latency
+percentiles are reported per backend; a batch counts as one write operation
+and ``items`` is the number of entries stored.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.app_settings import CACHE_STORAGE_BACKENDS  # noqa: E402
+from core.caching.storage_backend import open_cache_store  # noqa: E402
+
+
+def _key(worker: int, index: int) -> tuple:
+    path = f"/photos/w{worker}/IMG_{index:06d}.jpg"
+    return (path, "thumbnail", 2, 4_000_000, index, True)
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1e3
+
+
+def _run(backend: str, args: argparse.Namespace, directory: str) -> None:
+    store = open_cache_store(
+        os.path.join(directory, backend),
+        backend=backend,
+        size_limit=4 * 2**30,
+        disk_min_file_size=1 << 20,
+    )
+    payload = os.urandom(args.payload_bytes)
+    for start in range(0, args.prefill, 500):
+        with store.transact():
+            for index in range(start, min(start + 500, args.prefill)):
+                store.set(_key(-1, index), payload)
+
+    stop = threading.Event()
+    write_latency: list[list[float]] = [[] for _ in range(args.writers)]
+    read_latency: list[list[float]] = [[] for _ in range(args.readers)]
+    written = [0] * args.writers
+
+    def write(worker: int) -> None:
+        index = 0
+        samples = write_latency[worker]
+        while not stop.is_set():
+            started = time.perf_counter()
+            if index % args.batch == 0:
+                with store.transact():
+                    for offset in range(args.batch):
+                        store.set(_key(worker, index + offset), payload)
+                index += args.batch
+            else:
+                store.set(_key(worker, index), payload)
+                index += 1
+            samples.append(time.perf_counter() - started)
+        written[worker] = index
+
+    def read(worker: int) -> None:
+        rng = random.Random(worker)
+        samples = read_latency[worker]
+        while not stop.is_set():
+            key = _key(-1, rng.randrange(args.prefill))
+            started = time.perf_counter()
+            store.get(key)
+            samples.append(time.perf_counter() - started)
+
+    threads = [
+        threading.Thread(target=write, args=(worker,)) for worker in range(args.writers)
+    ]
+    threads += [
+        threading.Thread(target=read, args=(worker,)) for worker in range(args.readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    writes = [sample for samples in write_latency for sample in samples]
+    reads = [sample for samples in read_latency for sample in samples]
+    print(
+        f"{backend:9s} items {sum(written) / args.seconds:6.0f}/s, "
+        f"writes {len(writes) / args.seconds:5.0f}/s "
+        f"p50 {_percentile(writes, 0.5):6.2f} p99 {_percentile(writes, 0.99):7.2f} "
+        f"max {_percentile(writes, 1.0):7.2f} ms | "
+        f"reads {len(reads) / args.seconds:8.0f}/s "
+        f"p50 {_percentile(reads, 0.5):6.3f} p99 {_percentile(reads, 0.99):7.3f} "
+        f"max {_percentile(reads, 1.0):7.2f} ms"
+    )
+    store.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--prefill", type=int, default=20_000)
+    parser.add_argument("--payload-bytes", type=int, default=24 * 1024)
+    parser.add_argument("--batch", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", default=list(CACHE_STORAGE_BACKENDS))
+    args = parser.parse_args()
+
+    print(
+        f"writers={args.writers} readers={args.readers} prefill={args.prefill} "
+        f"payload={args.payload_bytes}B batch={args.batch} seconds={args.seconds}"
+    )
+    with tempfile.TemporaryDirectory(prefix="photosort-store-") as directory:
+        for backend in args.backends:
+            _run(backend, args, directory)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Measure reopening a folder after its files were moved into group folders.
+
+Synthetic JPEGs are opened once so their thumbnail and preview tiers are
+cached, then every file is moved into a ``group_N`` sub-folder as
+``execute_grouping_plan`` does. A fresh pipeline reopens the moved files with
+path-keyed caches (every tier misses and is regenerated) and with
+content-addressed keys (the digest side index finds the existing entries).
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from core.caching.fingerprint_registry import fingerprint_registry  # noqa: E402
+from core.image_pipeline import ImagePipeline  # noqa: E402
+
+
+def _write_images(folder: str, count: int, size: tuple[int, int]) -> list[str]:
+    rng = np.random.default_rng(10)
+    width, height = size
+    y_axis, x_axis = np.mgrid[0:height, 0:width].astype(np.float32)
+    paths = []
+    for index in range(count):
+        scene = 127 + 90 * np.sin(x_axis / (37 + index)) * np.cos(y_axis / 53)
+        noise = rng.normal(0, 5, size=(height, width, 3)).astype(np.float32)
+        pixels = np.clip(scene[..., None] + noise, 0, 255).astype(np.uint8)
+        path = os.path.join(folder, f"IMG_{index:04d}.jpg")
+        Image.fromarray(pixels, "RGB").save(path, quality=92)
+        paths.append(path)
+    return paths
+
+
+def _move_into_groups(paths: list[str], root: str, group_size: int) -> list[str]:
+    moved = []
+    for index, path in enumerate(paths):
+        group_dir = os.path.join(root, f"group_{index // group_size + 1}")
+        os.makedirs(group_dir, exist_ok=True)
+        target = os.path.join(group_dir, os.path.basename(path))
+        shutil.move(path, target)
+        moved.append(target)
+    return moved
+
+
+def _open_folder(pipeline: ImagePipeline, paths: list[str]) -> float:
+    fingerprint_registry.clear()
+    started = time.perf_counter()
+    for path in paths:
+        assert pipeline.ensure_tiers_cached(path), path
+    return time.perf_counter() - started
+
+
+def _run(count: int, size: tuple[int, int], content_addressed: bool) -> dict:
+    with tempfile.TemporaryDirectory(prefix="photosort-move-") as directory:
+        photos = os.path.join(directory, "photos")
+        os.makedirs(photos)
+        paths = _write_images(photos, count, size)
+
+        def pipeline() -> ImagePipeline:
+            return ImagePipeline(
+                thumbnail_cache_dir=os.path.join(directory, "cache", "thumb"),
+                preview_cache_dir=os.path.join(directory, "cache", "preview"),
+                content_addressed_keys=content_addressed,
+            )
+
+        first = pipeline()
+        cold_s = _open_folder(first, paths)
+        first.thumbnail_cache.close()
+        first.preview_cache.close()
+
+        moved = _move_into_groups(paths, photos, group_size=8)
+        reopened = pipeline()
+        before = reopened.fanout_stats()["decodes"]
+        reopen_s = _open_folder(reopened, moved)
+        decodes = reopened.fanout_stats()["decodes"] - before
+        reopened.thumbnail_cache.close()
+        reopened.preview_cache.close()
+    return {"cold_s": cold_s, "reopen_s": reopen_s, "decodes": decodes}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=48)
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    args = parser.parse_args()
+
+    size = (args.width, args.height)
+    print(f"images={args.images} size={size[0]}x{size[1]} moved into groups of 8")
+    for label, content_addressed in (("path", False), ("content", True)):
+        result = _run(args.images, size, content_addressed)
+        print(
+            f"{label:8s} cold={result['cold_s']:7.2f}s "
+            f"reopen-after-move={result['reopen_s']:7.2f}s "
+            f"({result['reopen_s'] / args.images * 1e3:7.2f}ms/file, "
+            f"decodes={result['decodes']})"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
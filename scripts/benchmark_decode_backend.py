@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Compare thread and process decode backends as worker counts grow.
+
+Each worker count decodes the same synthetic camera-sized JPEGs into
+navigation previews, first on a thread pool and then through
+``ProcessDecodeBackend``. Process start-up is measured separately so the
+throughput columns reflect steady-state decoding. Pass ``--folder`` to
+measure real photos instead.
+"""
+
+import argparse
+import concurrent.futures
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.app_settings import (  # noqa: E402
+    PRELOAD_MAX_RESOLUTION,
+    calculate_high_memory_decode_workers,
+    calculate_thumbnail_workers,
+)
+from core.image_processing.process_decode_backend import (  # noqa: E402
+    ProcessDecodeBackend,
+)
+from core.image_processing.standard_image_processor import (  # noqa: E402
+    StandardImageProcessor,
+)
+
+SUPPORTED_SUFFIXES = {".jpg", ".jpeg", ".png", ".tif", ".tiff"}
+
+
+def _write_fixtures(directory: Path, count: int, size: tuple[int, int]) -> list[str]:
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(7)
+    width, height = size
+    y_axis, x_axis = np.mgrid[0:height, 0:width].astype(np.float32)
+    paths: list[str] = []
+    for index in range(count):
+        scene = 127 + 90 * np.sin(x_axis / (83 + index * 11)) * np.cos(y_axis / 149)
+        noise = rng.normal(0, 4, size=(height, width, 3)).astype(np.float32)
+        pixels = np.clip(scene[..., None] + noise, 0, 255).astype(np.uint8)
+        path = directory / f"photo-{index:03d}.jpg"
+        Image.fromarray(pixels, "RGB").save(path, quality=92)
+        paths.append(str(path))
+    return paths
+
+
+def _decode_all(submit, files: list[str]) -> float:
+    started = time.perf_counter()
+    futures = [submit(path) for path in files]
+    for future in futures:
+        assert future.result() is not None
+    return time.perf_counter() - started
+
+
+def _measure_threads(workers: int, files: list[str]) -> float:
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        return _decode_all(
+            lambda path: executor.submit(
+                StandardImageProcessor.process_for_preview,
+                path,
+                PRELOAD_MAX_RESOLUTION,
+            ),
+            files,
+        )
+
+
+def _measure_processes(
+    workers: int, high_memory_workers: int, files: list[str]
+) -> tuple[float, float]:
+    backend = ProcessDecodeBackend(workers, high_memory_workers)
+    # Callers are pipeline threads that block on the backend, one per worker.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as callers:
+        started = time.perf_counter()
+        warmups = [
+            callers.submit(
+                backend.run,
+                StandardImageProcessor.process_for_preview,
+                files[0],
+                (64, 64),
+            )
+            for _ in range(workers)
+        ]
+        for future in warmups:
+            future.result()
+        startup = time.perf_counter() - started
+        elapsed = _decode_all(
+            lambda path: callers.submit(
+                backend.run,
+                StandardImageProcessor.process_for_preview,
+                path,
+                PRELOAD_MAX_RESOLUTION,
+            ),
+            files,
+        )
+    backend.shutdown()
+    return startup, elapsed
+
+
+def _worker_counts(limit: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--folder", type=Path, help="Measure real photos")
+    parser.add_argument("--images", type=int, default=16)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        help="Largest worker count (default: calculate_thumbnail_workers())",
+    )
+    args = parser.parse_args()
+
+    max_workers = args.max_workers or calculate_thumbnail_workers()
+    high_memory_workers = calculate_high_memory_decode_workers()
+    with tempfile.TemporaryDirectory(prefix="photosort-decode-backend-") as directory:
+        if args.folder:
+            files = sorted(
+                str(path)
+                for path in args.folder.iterdir()
+                if path.suffix.lower() in SUPPORTED_SUFFIXES
+            )[: args.images]
+        else:
+            files = _write_fixtures(
+                Path(directory), args.images, (args.width, args.height)
+            )
+        if not files:
+            parser.error("No supported images found")
+        print(
+            f"images={len(files)} preview={PRELOAD_MAX_RESOLUTION[0]}x"
+            f"{PRELOAD_MAX_RESOLUTION[1]} max_workers={max_workers} "
+            f"high_memory_workers={high_memory_workers}"
+        )
+
+        for workers in _worker_counts(max_workers):
+            thread_seconds = _measure_threads(workers, files)
+            startup, process_seconds = _measure_processes(
+                workers, high_memory_workers, files
+            )
+            print(
+                f"workers={workers:2d} "
+                f"thread={len(files) / thread_seconds:6.2f} img/s | "
+                f"process={len(files) / process_seconds:6.2f} img/s "
+                f"(startup {startup:.2f}s) | "
+                f"speedup={thread_seconds / process_seconds:.2f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
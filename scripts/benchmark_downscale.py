@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Compare full-decode and reduced-decode thumbnail/preview generation.
+
+Each measurement runs in a fresh child process so peak RSS is attributable to
+one decode strategy. Synthetic camera-sized JPEG and PNG files are generated in
+a temporary directory; pass ``--folder`` to measure real photos instead.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.app_settings import PRELOAD_MAX_RESOLUTION, THUMBNAIL_MAX_SIZE  # noqa: E402
+
+SUPPORTED_SUFFIXES = {".jpg", ".jpeg", ".png", ".tif", ".tiff"}
+
+
+def _max_rss_mb() -> float:
+    value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return value / (1024 * 1024)
+    return value / 1024
+
+
+def _legacy_decode(path: str, max_size: tuple[int, int]):
+    """The pre-reduced-decode path: full decode, orient, then shrink."""
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.width > max_size[0] * 2 or img.height > max_size[1] * 2:
+            img.thumbnail((max_size[0] * 2, max_size[1] * 2), Image.Resampling.BILINEAR)
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        return img.convert("RGBA")
+
+
+def _reduced_decode(path: str, max_size: tuple[int, int]):
+    from core.image_processing.standard_image_processor import StandardImageProcessor
+
+    return StandardImageProcessor.process_for_thumbnail(path, max_size)
+
+
+def _run_worker(strategy: str, max_size: tuple[int, int], files: list[str]) -> None:
+    # Import Pillow and the processors before sampling the baseline.
+    from PIL import ImageOps  # noqa: F401
+    from core.image_processing.standard_image_processor import (  # noqa: F401
+        StandardImageProcessor,
+    )
+
+    decode = _legacy_decode if strategy == "legacy" else _reduced_decode
+    baseline_rss = _max_rss_mb()
+    started = time.perf_counter()
+    for path in files:
+        result = decode(path, max_size)
+        assert result is not None, path
+    elapsed = time.perf_counter() - started
+    print(
+        json.dumps(
+            {
+                "seconds": elapsed,
+                "images_per_second": len(files) / max(elapsed, 1e-9),
+                "peak_rss_mb": _max_rss_mb(),
+                "decode_rss_mb": max(0.0, _max_rss_mb() - baseline_rss),
+            }
+        )
+    )
+
+
+def _write_fixtures(directory: Path, count: int, size: tuple[int, int]) -> list[str]:
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(11)
+    height, width = size[1], size[0]
+    y_axis, x_axis = np.mgrid[0:height, 0:width].astype(np.float32)
+    paths: list[str] = []
+    for index in range(count):
+        # Smooth structure plus mild sensor-like noise compresses like a photo.
+        scene = 127 + 90 * np.sin(x_axis / (97 + index * 13)) * np.cos(y_axis / 151)
+        noise = rng.normal(0, 4, size=(height, width, 3)).astype(np.float32)
+        pixels = np.clip(scene[..., None] + noise, 0, 255).astype(np.uint8)
+        image = Image.fromarray(pixels, "RGB")
+        exif = Image.Exif()
+        # Alternate orientations so the rotated path is part of the measurement.
+        exif[274] = 6 if index % 2 else 1
+        jpeg_path = directory / f"photo-{index:03d}.jpg"
+        image.save(jpeg_path, quality=92, exif=exif.tobytes())
+        paths.append(str(jpeg_path))
+        if index == 0:
+            png_path = directory / "scan-000.png"
+            image.save(png_path, compress_level=1)
+            paths.append(str(png_path))
+    return paths
+
+
+def _run_child(*arguments: str) -> str:
+    # Linux keeps ru_maxrss across execve, so the parent must stay small too.
+    command = [sys.executable, str(Path(__file__).resolve()), *arguments]
+    completed = subprocess.run(command, check=True, capture_output=True, text=True)
+    return completed.stdout.strip().splitlines()[-1]
+
+
+def _measure(strategy: str, max_size: tuple[int, int], files: list[str]) -> dict:
+    return json.loads(
+        _run_child(
+            "--worker", strategy, "--size", str(max_size[0]), str(max_size[1]), *files
+        )
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--folder", type=Path, help="Measure real photos")
+    parser.add_argument("--images", type=int, default=6)
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument(
+        "--worker", choices=("legacy", "reduced"), help=argparse.SUPPRESS
+    )
+    parser.add_argument("--write-fixtures", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument("files", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _run_worker(args.worker, tuple(args.size), args.files)
+        return 0
+    if args.write_fixtures:
+        files = _write_fixtures(
+            args.write_fixtures, args.images, (args.width, args.height)
+        )
+        print(json.dumps(files))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="photosort-downscale-") as directory:
+        if args.folder:
+            files = sorted(
+                str(path)
+                for path in args.folder.iterdir()
+                if path.suffix.lower() in SUPPORTED_SUFFIXES
+            )[: args.images]
+        else:
+            files = json.loads(
+                _run_child(
+                    "--write-fixtures",
+                    directory,
+                    "--images",
+                    str(args.images),
+                    "--width",
+                    str(args.width),
+                    "--height",
+                    str(args.height),
+                )
+            )
+        if not files:
+            parser.error("No supported images found")
+        source_mb = sum(os.path.getsize(path) for path in files) / (1024 * 1024)
+        print(f"images={len(files)} source_mb={source_mb:.1f}")
+
+        for label, max_size in (
+            ("thumbnail", THUMBNAIL_MAX_SIZE),
+            ("preview", PRELOAD_MAX_RESOLUTION),
+        ):
+            legacy = _measure("legacy", max_size, files)
+            reduced = _measure("reduced", max_size, files)
+            speedup = legacy["seconds"] / max(reduced["seconds"], 1e-9)
+            print(
+                f"{label} {max_size[0]}x{max_size[1]}: "
+                f"legacy={legacy['images_per_second']:.2f} img/s "
+                f"peak_rss={legacy['peak_rss_mb']:.0f}MB "
+                f"(+{legacy['decode_rss_mb']:.0f}MB) | "
+                f"reduced={reduced['images_per_second']:.2f} img/s "
+                f"peak_rss={reduced['peak_rss_mb']:.0f}MB "
+                f"(+{reduced['decode_rss_mb']:.0f}MB) | "
+                f"speedup={speedup:.1f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
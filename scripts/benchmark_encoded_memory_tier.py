@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Time preview navigation over a folder larger than the decoded memory tier.
+
+``--images`` previews are generated once, then every strategy walks the folder
+forward ``--passes`` times on a fresh ``ImagePipeline``, the way a user pages
+through a shoot. The decoded LRU holds far fewer previews than the folder, so
+every step misses it. ``disk`` disables the encoded tier and reads each
+payload from SQLite; ``encoded`` serves the payload from memory after the
+first pass. The first pass is excluded from the timings.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageFilter
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.image_pipeline import ImagePipeline  # noqa: E402
+
+DISPLAY_SIZE = (1920, 1200)
+
+
+def _photo_like(index: int, size: tuple[int, int]) -> Image.Image:
+    """Smooth gradients with mild grain, so JPEG sizes resemble real photos."""
+    gradient = Image.linear_gradient("L").resize(size)
+    grain = Image.effect_noise(size, 12).filter(ImageFilter.GaussianBlur(1))
+    return Image.merge(
+        "RGB",
+        (
+            gradient,
+            gradient.rotate(90 + index % 180).resize(size),
+            Image.blend(
+                gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), grain, 0.3
+            ),
+        ),
+    )
+
+
+def _pipeline(directory: str) -> ImagePipeline:
+    return ImagePipeline(
+        thumbnail_cache_dir=os.path.join(directory, "thumb"),
+        preview_cache_dir=os.path.join(directory, "preview"),
+        analysis_cache_dir=os.path.join(directory, "analysis"),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=120)
+    parser.add_argument("--passes", type=int, default=3)
+    parser.add_argument("--source-size", type=int, nargs=2, default=(3000, 2000))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="photosort-encoded-tier-") as directory:
+        sources = []
+        for index in range(args.images):
+            source = os.path.join(directory, f"IMG_{index:04d}.jpg")
+            _photo_like(index, tuple(args.source_size)).save(source, quality=90)
+            sources.append(source)
+        builder = _pipeline(directory)
+        for source in sources:
+            builder.get_preview_image(source, DISPLAY_SIZE)
+        del builder
+
+        print(f"images={args.images} passes={args.passes} display={DISPLAY_SIZE}")
+        for label, encoded in (("disk", False), ("encoded", True)):
+            pipeline = _pipeline(directory)
+            if not encoded:
+                pipeline.encoded_memory_cache.set_limit(0)
+            steps: list[float] = []
+            for pass_index in range(args.passes):
+                for source in sources:
+                    started = time.perf_counter()
+                    pipeline.get_preview_image(source, DISPLAY_SIZE)
+                    if pass_index:
+                        steps.append(time.perf_counter() - started)
+            stats = pipeline.memory_cache_stats()
+            decoded, tier = stats["decoded"], stats["encoded"]
+            print(
+                f"{label:8s} median {statistics.median(steps) * 1e3:6.2f} ms | "
+                f"p95 {sorted(steps)[int(len(steps) * 0.95) - 1] * 1e3:6.2f} ms | "
+                f"decoded tier {decoded['entries']} images "
+                f"{decoded['bytes'] / 2**20:.0f} MB | "
+                f"encoded tier {tier['entries']} images {tier['bytes'] / 2**20:.0f} MB, "
+                f"{tier['hits']} hits / {tier['misses']} misses"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
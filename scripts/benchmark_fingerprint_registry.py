@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Count stat syscalls made by cached-image lookups during simulated grid scrolling.
+
+A folder of placeholder JPEG files is scanned, then every file's cached
+thumbnail, preview and analysis image is requested ``--passes`` times with
+``memory_only=True``, as repeated viewport refreshes do. Each lookup checks
+that the file exists and builds its cache key. The "unscanned" run stats the
+file for both; the "registry" run uses the fingerprints the scanner recorded.
+Pass ``--folder`` to measure a real (for example network-mounted) folder.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from core.app_settings import PRELOAD_MAX_RESOLUTION  # noqa: E402
+from core.caching import fingerprint_registry as registry_module  # noqa: E402
+from core.file_scanner import FileScanner  # noqa: E402
+from core.image_pipeline import ANALYSIS_CACHE_RESOLUTION, ImagePipeline  # noqa: E402
+
+
+class _CountingStat:
+    def __init__(self):
+        self.calls = 0
+        self._stat = os.stat
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self._stat(*args, **kwargs)
+
+
+def _scroll(pipeline: ImagePipeline, paths: list[str], passes: int) -> float:
+    started = time.perf_counter()
+    for _ in range(passes):
+        for path in paths:
+            pipeline.get_cached_thumbnail_qpixmap(path, memory_only=True)
+            pipeline.get_cached_preview_qpixmap(
+                path, PRELOAD_MAX_RESOLUTION, memory_only=True
+            )
+            pipeline.get_cached_analysis_qpixmap(
+                path, ANALYSIS_CACHE_RESOLUTION, memory_only=True
+            )
+    return time.perf_counter() - started
+
+
+def _measure(pipeline: ImagePipeline, paths: list[str], passes: int) -> dict:
+    counter = _CountingStat()
+    registry_module.os.stat = counter
+    try:
+        seconds = _scroll(pipeline, paths, passes)
+    finally:
+        registry_module.os.stat = counter._stat
+    lookups = len(paths) * passes * 3
+    return {
+        "stat_calls": counter.calls,
+        "lookups": lookups,
+        "us_per_lookup": seconds / max(lookups, 1) * 1e6,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--folder", type=Path, help="Measure a real folder")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--passes", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="photosort-fingerprints-") as directory:
+        folder = args.folder
+        if folder is None:
+            folder = Path(directory) / "photos"
+            folder.mkdir()
+            for index in range(args.files):
+                (folder / f"IMG_{index:05d}.jpg").write_bytes(b"\xff\xd8placeholder")
+        pipeline = ImagePipeline(
+            thumbnail_cache_dir=os.path.join(directory, "thumb"),
+            preview_cache_dir=os.path.join(directory, "preview"),
+        )
+        paths = sorted(
+            os.path.normpath(os.path.join(root, name))
+            for root, _, names in os.walk(folder)
+            for name in names
+        )
+
+        registry_module.fingerprint_registry.invalidate_tree(str(folder))
+        unscanned = _measure(pipeline, paths, args.passes)
+        FileScanner(image_pipeline=Mock()).scan_directory(str(folder))
+        scanned = _measure(pipeline, paths, args.passes)
+
+    print(f"files={len(paths)} passes={args.passes}")
+    for label, result in (("unscanned", unscanned), ("registry", scanned)):
+        print(
+            f"{label:9s} stat_calls={result['stat_calls']:7d} "
+            f"lookups={result['lookups']:7d} "
+            f"{result['us_per_lookup']:6.2f}us/lookup"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
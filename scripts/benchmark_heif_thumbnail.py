@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Compare HEIC grid thumbnails from a full HEVC decode and from thumbnail items.
+
+Synthetic phone-sized HEIC files carrying a 320 px thumbnail item, as phones
+write them, are generated in a temporary directory; pass ``--folder`` to
+measure real HEIC files instead. "decode" is the regular reduced decode,
+"item" reads the container's thumbnail item and is what the pipeline tries
+first.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from pillow_heif import register_heif_opener  # noqa: E402
+
+from core.app_settings import THUMBNAIL_MAX_SIZE  # noqa: E402
+from core.image_processing.standard_image_processor import (  # noqa: E402
+    StandardImageProcessor,
+)
+
+SUPPORTED_SUFFIXES = {".heic", ".heif"}
+
+
+def _write_fixtures(
+    directory: Path, count: int, size: tuple[int, int], thumbnail_edge: int
+) -> list[str]:
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(7)
+    width, height = size
+    y_axis, x_axis = np.mgrid[0:height, 0:width].astype(np.float32)
+    paths: list[str] = []
+    for index in range(count):
+        # Smooth structure plus mild sensor-like noise compresses like a photo.
+        scene = 127 + 90 * np.sin(x_axis / (89 + index * 11)) * np.cos(y_axis / 143)
+        noise = rng.normal(0, 4, size=(height, width, 3)).astype(np.float32)
+        pixels = np.clip(scene[..., None] + noise, 0, 255).astype(np.uint8)
+        path = directory / f"IMG_{index:04d}.heic"
+        Image.fromarray(pixels, "RGB").save(
+            path, quality=60, thumbnails=[thumbnail_edge]
+        )
+        paths.append(str(path))
+    return paths
+
+
+def _measure(decode, files: list[str], repeats: int) -> list[float]:
+    samples: list[float] = []
+    for _ in range(repeats):
+        for path in files:
+            started = time.perf_counter()
+            result = decode(path)
+            samples.append(time.perf_counter() - started)
+            assert result is not None, path
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--folder", type=Path, help="Measure real HEIC files")
+    parser.add_argument("--images", type=int, default=3)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--thumbnail-edge", type=int, default=320)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    register_heif_opener()
+    with tempfile.TemporaryDirectory(prefix="photosort-heif-") as directory:
+        if args.folder:
+            files = sorted(
+                str(path)
+                for path in args.folder.iterdir()
+                if path.suffix.lower() in SUPPORTED_SUFFIXES
+            )[: args.images]
+        else:
+            started = time.perf_counter()
+            files = _write_fixtures(
+                Path(directory),
+                args.images,
+                (args.width, args.height),
+                args.thumbnail_edge,
+            )
+            print(f"encoded fixtures in {time.perf_counter() - started:.1f}s")
+        if not files:
+            parser.error("No HEIC files found")
+
+        decode = _measure(
+            lambda path: StandardImageProcessor.process_for_thumbnail(
+                path, THUMBNAIL_MAX_SIZE
+            ),
+            files,
+            args.repeats,
+        )
+        item = _measure(
+            lambda path: StandardImageProcessor.extract_heif_thumbnail(
+                path, THUMBNAIL_MAX_SIZE
+            ),
+            files,
+            args.repeats,
+        )
+
+    print(
+        f"images={len(files)} repeats={args.repeats} "
+        f"thumbnail={THUMBNAIL_MAX_SIZE[0]}x{THUMBNAIL_MAX_SIZE[1]}"
+    )
+    for label, samples in (("decode", decode), ("item", item)):
+        print(
+            f"{label:6s} median={statistics.median(samples) * 1e3:8.2f}ms "
+            f"max={max(samples) * 1e3:8.2f}ms"
+        )
+    speedup = statistics.median(decode) / max(statistics.median(item), 1e-9)
+    print(f"speedup={speedup:.1f}x per thumbnail")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
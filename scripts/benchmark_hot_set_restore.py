@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Time the first previews after reopening PhotoSort on the same folder.
+
+A first session views ``--images`` JPEGs in order and saves the image hot set
+with the last one focused. Each reopen builds a fresh ``ImagePipeline`` on the
+same cache directories and times the focused image plus ``--navigate`` steps
+back through the previously viewed images. ``cold`` reads every preview from the disk cache; ``warm`` starts the
+hot-set restore at launch and gives it ``--idle-ms`` before the first request,
+like the time between the window appearing and the user's first key press.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.image_pipeline import ImagePipeline  # noqa: E402
+
+DISPLAY_SIZE = (1920, 1200)
+
+
+def _pipeline(directory: str) -> ImagePipeline:
+    return ImagePipeline(
+        thumbnail_cache_dir=os.path.join(directory, "thumb"),
+        preview_cache_dir=os.path.join(directory, "preview"),
+        analysis_cache_dir=os.path.join(directory, "analysis"),
+    )
+
+
+def _reopen(
+    directory: str, sources: list[str], navigate: int, warm: bool, idle_ms: float
+) -> tuple[float, float, float]:
+    """Returns (launch to first preview, first preview, mean next preview) in ms."""
+    launched = time.perf_counter()
+    pipeline = _pipeline(directory)
+    if warm:
+        pipeline.start_hot_set_restore()
+        time.sleep(idle_ms / 1000)
+    requested = time.perf_counter()
+    pipeline.get_preview_image(sources[0], DISPLAY_SIZE)
+    first_done = time.perf_counter()
+    steps = []
+    for source in sources[1 : navigate + 1]:
+        started = time.perf_counter()
+        pipeline.get_preview_image(source, DISPLAY_SIZE)
+        steps.append(time.perf_counter() - started)
+    pipeline.stop_hot_set_restore()
+    launch_to_first = first_done - launched - (idle_ms / 1000 if warm else 0.0)
+    return (
+        launch_to_first * 1e3,
+        (first_done - requested) * 1e3,
+        statistics.mean(steps) * 1e3 if steps else 0.0,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=40)
+    parser.add_argument("--navigate", type=int, default=10)
+    parser.add_argument("--idle-ms", type=float, default=500.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="photosort-hot-set-") as directory:
+        sources = []
+        for index in range(args.images):
+            source = os.path.join(directory, f"IMG_{index:04d}.jpg")
+            Image.effect_noise((4000, 3000), 40 + index % 30).convert("RGB").save(
+                source, quality=90
+            )
+            sources.append(source)
+
+        session = _pipeline(directory)
+        for source in sources:
+            session.get_preview_image(source, DISPLAY_SIZE)
+        saved = session.save_hot_set(folder=directory, focused_path=sources[-1])
+        sources.reverse()
+        print(f"images={args.images} hot_set_entries={saved} idle={args.idle_ms:.0f}ms")
+
+        restore_pipeline = _pipeline(directory)
+        started = time.perf_counter()
+        restored = restore_pipeline.restore_hot_set()
+        print(
+            f"full restore: {restored} images in "
+            f"{(time.perf_counter() - started) * 1e3:.1f} ms"
+        )
+
+        for label, warm in (("cold", False), ("warm", True)):
+            runs = [
+                _reopen(directory, sources, args.navigate, warm, args.idle_ms)
+                for _ in range(args.repeats)
+            ]
+            launch, first, step = (
+                statistics.median(column) for column in zip(*runs, strict=True)
+            )
+            print(
+                f"{label}: launch->first preview {launch:7.1f} ms | "
+                f"first preview {first:7.2f} ms | "
+                f"next {args.navigate} previews {step:6.2f} ms each"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
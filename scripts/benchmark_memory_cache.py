@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Measure ImagePipeline memory-cache hit latency and allocation per hit.
+
+The legacy strategy reproduces the former copy-on-every-hit LRU; the current
+strategy uses ``ImagePipeline._memory_get``. Each strategy keeps the most
+recent ``--held`` hits alive, as the viewer and its prefetch window do, so
+resident-memory growth shows how many bytes every hit allocates.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from PIL import Image  # noqa: E402
+
+from core.app_settings import PRELOAD_MAX_RESOLUTION  # noqa: E402
+
+
+def _current_rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError, ValueError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / 2**20
+
+
+def _legacy_get(cache: OrderedDict, key: tuple) -> Image.Image:
+    image = cache.pop(key)
+    cache[key] = image
+    return image.copy()
+
+
+def _measure(get_hit, hits: int, held: int) -> dict:
+    recent: deque = deque(maxlen=held)
+    samples: list[float] = []
+    rss_before = _current_rss_mb()
+    for _ in range(hits):
+        started = time.perf_counter()
+        image = get_hit()
+        samples.append(time.perf_counter() - started)
+        recent.append(image)
+    rss_after = _current_rss_mb()
+    held_mb = (
+        rss_after - rss_before
+        if rss_before is not None and rss_after is not None
+        else float("nan")
+    )
+    total_seconds = sum(samples)
+    per_hit_mb = held_mb / min(hits, held)
+    return {
+        "median_us": statistics.median(samples) * 1e6,
+        "p95_us": sorted(samples)[int(len(samples) * 0.95) - 1] * 1e6,
+        "held_mb": held_mb,
+        "alloc_mb_per_s": per_hit_mb * hits / max(total_seconds, 1e-9),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hits", type=int, default=400)
+    parser.add_argument("--held", type=int, default=16)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from core.image_pipeline import ImagePipeline
+
+    preview = Image.new("RGBA", PRELOAD_MAX_RESOLUTION, (40, 90, 120, 255))
+    key = ("/photos/preview.jpg", "preview", 0)
+    print(
+        f"image={preview.width}x{preview.height} {preview.mode} "
+        f"({preview.width * preview.height * 4 / 2**20:.1f}MB) hits={args.hits} "
+        f"held={args.held}"
+    )
+
+    legacy_cache: OrderedDict = OrderedDict({key: preview.copy()})
+    legacy = _measure(lambda: _legacy_get(legacy_cache, key), args.hits, args.held)
+    legacy_cache.clear()
+
+    with tempfile.TemporaryDirectory(prefix="photosort-memory-cache-") as directory:
+        pipeline = ImagePipeline(
+            thumbnail_cache_dir=os.path.join(directory, "thumb"),
+            preview_cache_dir=os.path.join(directory, "preview"),
+        )
+        pipeline._memory_set(key, preview)
+        current = _measure(lambda: pipeline._memory_get(key), args.hits, args.held)
+
+    for label, result in (("legacy copy", legacy), ("frozen view", current)):
+        print(
+            f"{label:12s} median={result['median_us']:9.1f}us "
+            f"p95={result['p95_us']:9.1f}us "
+            f"held={result['held_mb']:7.1f}MB "
+            f"alloc={result['alloc_mb_per_s']:9.1f}MB/s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Time deleting cached thumbnails for 1,000 files from a 100k-entry cache.
+
+The old ``delete_all_for_path`` walked every key of the cache for each file.
+That scan is timed for ``--scan-samples`` files and extrapolated, since running
+it for every file takes minutes. The indexed path is timed for real, once one
+file at a time and once as a single ``delete_all_for_paths`` batch.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.caching.thumbnail_cache import ThumbnailCache  # noqa: E402
+
+
+def _key(index: int) -> tuple:
+    return (f"/photos/IMG_{index:06d}.jpg", "thumbnail", 2, 4_000_000, index, True)
+
+
+def _scan_delete(cache: ThumbnailCache, file_path: str) -> None:
+    for key in list(cache._cache.iterkeys()):
+        if isinstance(key, tuple) and key[0] == file_path:
+            cache._cache.delete(key)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--deletes", type=int, default=1000)
+    parser.add_argument("--scan-samples", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="photosort-invalidate-") as directory:
+        cache = ThumbnailCache(
+            cache_dir=os.path.join(directory, "thumb"), size_limit=1 << 40
+        )
+        thumbnail = Image.new("RGB", (16, 16), "gray")
+        fill_started = time.perf_counter()
+        batch = 5000
+        for start in range(0, args.entries, batch):
+            stop = min(start + batch, args.entries)
+            cache.set_many((_key(index), thumbnail) for index in range(start, stop))
+        print(
+            f"entries={args.entries} filled in {time.perf_counter() - fill_started:.1f}s"
+        )
+
+        stride = args.entries // (2 * args.deletes + args.scan_samples)
+        victims = [_key(index * stride)[0] for index in range(2 * args.deletes)]
+        scan_victims = [
+            _key((2 * args.deletes + index) * stride)[0]
+            for index in range(args.scan_samples)
+        ]
+
+        started = time.perf_counter()
+        for file_path in scan_victims:
+            _scan_delete(cache, file_path)
+        scan_per_file = (time.perf_counter() - started) / len(scan_victims)
+
+        started = time.perf_counter()
+        for file_path in victims[: args.deletes]:
+            cache.delete_all_for_path(file_path)
+        indexed_single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        removed = cache.delete_all_for_paths(victims[args.deletes :])
+        indexed_batch = time.perf_counter() - started
+
+        print(
+            f"key scan       {scan_per_file * 1e3:9.1f} ms/file "
+            f"-> {scan_per_file * args.deletes:8.1f} s for {args.deletes} files (extrapolated)"
+        )
+        print(
+            f"index per-file {indexed_single / args.deletes * 1e3:9.3f} ms/file "
+            f"-> {indexed_single:8.3f} s for {args.deletes} files"
+        )
+        print(
+            f"index batch    {indexed_batch / args.deletes * 1e3:9.3f} ms/file "
+            f"-> {indexed_batch:8.3f} s for {removed} files"
+        )
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
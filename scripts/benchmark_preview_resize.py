@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Time preview requests while the viewer is resized and switches modes.
+
+Each of ``--images`` photo-like JPEGs is prefetched at the preload
+resolution, then requested at every display size of a resize sequence: a
+window dragged narrower in ``--steps`` steps plus the side-by-side and
+four-up viewer modes. ``display entries`` replays the former behaviour,
+which resampled the preload image with LANCZOS for each new size and
+encoded and stored the result under its own key. ``mip chain`` asks
+``get_preview_image``, which reads the nearest chain level and scales it
+with a cheap bilinear pass, as the view would when painting. Bytes are the
+encoded preview payloads left on disk after the sequence.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageFilter
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.image_pipeline import PRELOAD_MAX_RESOLUTION, ImagePipeline  # noqa: E402
+
+VIEWER_MODES = ((1280, 1400), (940, 700))
+
+
+def _photo_like(index: int, size: tuple[int, int]) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize(size)
+    grain = Image.effect_noise(size, 12).filter(ImageFilter.GaussianBlur(1))
+    return Image.merge(
+        "RGB",
+        (
+            gradient,
+            gradient.rotate(90 + index % 180).resize(size),
+            Image.blend(
+                gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), grain, 0.3
+            ),
+        ),
+    )
+
+
+def _pipeline(directory: str, name: str) -> ImagePipeline:
+    return ImagePipeline(
+        thumbnail_cache_dir=os.path.join(directory, name, "thumb"),
+        preview_cache_dir=os.path.join(directory, name, "preview"),
+        analysis_cache_dir=os.path.join(directory, name, "analysis"),
+    )
+
+
+def _display_entry(
+    pipeline: ImagePipeline, source: str, display_size: tuple[int, int]
+) -> Image.Image:
+    """The former path: one resampled, encoded and stored copy per size."""
+    display_key = pipeline.preview_cache_key(source, display_size)
+    image = pipeline._cache_get(pipeline.preview_cache, display_key)
+    if image is not None:
+        return image
+    preload_key = pipeline.preview_cache_key(source, PRELOAD_MAX_RESOLUTION)
+    image = pipeline._cache_get(pipeline.preview_cache, preload_key)
+    image.thumbnail(display_size, Image.Resampling.LANCZOS)
+    pipeline._cache_set(pipeline.preview_cache, display_key, image)
+    return image
+
+
+def _payload_bytes(pipeline: ImagePipeline) -> int:
+    store = pipeline.preview_cache._cache
+    return sum(len(store[key]) for key in store)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=12)
+    parser.add_argument("--source-size", type=int, nargs=2, default=(6000, 4000))
+    args = parser.parse_args()
+
+    width, height = 2400, 1500
+    sizes = [
+        (width - step * 150, height - step * 90) for step in range(args.steps)
+    ] + list(VIEWER_MODES)
+
+    with tempfile.TemporaryDirectory(prefix="photosort-preview-resize-") as directory:
+        sources = []
+        for index in range(args.images):
+            size = tuple(args.source_size)
+            if index % 3 == 2:
+                size = size[::-1]
+            source = os.path.join(directory, f"IMG_{index:04d}.jpg")
+            _photo_like(index, size).save(source, quality=90)
+            sources.append(source)
+
+        strategies = {
+            "display entries": _display_entry,
+            "mip chain": ImagePipeline.get_preview_image,
+        }
+        results = {}
+        for name, request in strategies.items():
+            pipeline = _pipeline(directory, name.replace(" ", "-"))
+            for source in sources:
+                pipeline.ensure_preview_cached(source)
+            prefetched = _payload_bytes(pipeline)
+            latencies = []
+            for display_size in sizes:
+                started = time.perf_counter()
+                for source in sources:
+                    request(pipeline, source, display_size)
+                latencies.append((time.perf_counter() - started) / len(sources))
+            results[name] = (
+                latencies,
+                len(pipeline.preview_cache._cache),
+                _payload_bytes(pipeline) - prefetched,
+                pipeline.preview_chain_stats(),
+            )
+
+    print(
+        f"images={args.images} source={tuple(args.source_size)} "
+        f"display sizes={len(sizes)} (resize steps + viewer modes)"
+    )
+    print(
+        f"{'strategy':>16s} {'median ms':>9s} {'max ms':>7s} "
+        f"{'entries':>7s} {'extra MB':>8s}"
+    )
+    for name, (latencies, entries, extra_bytes, _stats) in results.items():
+        print(
+            f"{name:>16s} {statistics.median(latencies) * 1e3:9.2f} "
+            f"{max(latencies) * 1e3:7.2f} {entries:7d} {extra_bytes / 2**20:8.1f}"
+        )
+    stats = results["mip chain"][3]
+    print(
+        f"chain accounting: {stats['display_entries_avoided']} display entries "
+        f"avoided, ~{stats['display_bytes_avoided'] / 2**20:.1f} MB not written, "
+        f"{stats['levels_derived']} levels derived"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
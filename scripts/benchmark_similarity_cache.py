@@ -1,10 +1,25 @@
-import pickle
-import random
+#!/usr/bin/env python3
+"""Compare the legacy similarity artifact pickle with the columnar store.
+
+The columnar store is filled with ``--artifacts`` artifacts (100k by
+default), then reopened, asked for one ``--folder``-sized folder and given
+``--delta`` new artifacts. The legacy pickle holds every vector as Python
+floats, so a 100k pickle needs several GB of RAM to build; it is measured at
+``--pickle-artifacts`` and scaled linearly (its load and save are
+O(library)). ``MB`` columns are the tracemalloc peak of a second, traced run
+of the step, which includes NumPy buffers but not the memory-mapped columns.
+"""
+
+import argparse
 import sys
 import tempfile
 import time
+import tracemalloc
+from functools import partial
 from pathlib import Path
 
+import numpy as np
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(PROJECT_ROOT / "src"))
 
@@ -13,42 +28,153 @@ from core.similarity_cache import (  # noqa: E402
     load_similarity_artifact_cache,
     save_similarity_artifact_cache,
 )
+from core.similarity_embedding_store import SimilarityEmbeddingStore  # noqa: E402
+
+CHUNK_SIZE = 2_000
 
 
-def main() -> None:
-    random_source = random.Random(42)
-    artifacts: dict[str, SimilarityArtifact] = {
-        f"photo-{index:05d}.jpg": {
-            "fingerprint": (20_000_000 + index, 1_700_000_000_000_000_000 + index),
-            "embedding": [random_source.uniform(-1.0, 1.0) for _ in range(384)],
-            "regional_embeddings": [
-                [random_source.uniform(-1.0, 1.0) for _ in range(384)] for _ in range(6)
-            ],
+def _artifacts(
+    start: int, count: int, dimension: int, regions: int
+) -> dict[str, SimilarityArtifact]:
+    rng = np.random.default_rng(start)
+    vectors = rng.uniform(-1.0, 1.0, size=(count, regions, dimension))
+    vectors = vectors.astype(np.float32)
+    return {
+        f"photo-{start + index:06d}.jpg": {
+            "fingerprint": (20_000_000 + start + index, 1_700_000_000 + start + index),
+            "embedding": vectors[index, 0].tolist(),
+            "regional_embeddings": vectors[index].tolist(),
             "orientation": "landscape",
         }
-        for index in range(1_000)
+        for index in range(count)
     }
-    raw = pickle.dumps(artifacts, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _fingerprints(start: int, count: int) -> dict[str, tuple[int, int]]:
+    return {
+        f"photo-{index:06d}.jpg": (20_000_000 + index, 1_700_000_000 + index)
+        for index in range(start, start + count)
+    }
+
+
+def _timed(step):
+    started = time.perf_counter()
+    result = step()
+    return result, time.perf_counter() - started
+
+
+def _measure(step):
+    """Time ``step``, then run it again under tracemalloc for its peak."""
+    result, seconds = _timed(step)
+    del result
+    tracemalloc.start()
+    result = step()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 2**20
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--artifacts", type=int, default=100_000)
+    parser.add_argument("--pickle-artifacts", type=int, default=5_000)
+    parser.add_argument("--folder", type=int, default=2_000)
+    parser.add_argument("--delta", type=int, default=50)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--regions", type=int, default=6)
+    args = parser.parse_args()
+    shape = (args.dimension, args.regions)
+    scale = args.artifacts / args.pickle_artifacts
+    rows = []
 
     with tempfile.TemporaryDirectory() as directory:
         cache_path = Path(directory) / "similarity-artifacts.pkl.zst"
-        save_started = time.perf_counter()
-        save_similarity_artifact_cache(cache_path, artifacts)
-        save_seconds = time.perf_counter() - save_started
+        legacy = _artifacts(0, args.pickle_artifacts, *shape)
+        # partial() instead of closures, so ``del`` really frees the dicts.
+        _, save_seconds = _timed(
+            partial(save_similarity_artifact_cache, cache_path, legacy)
+        )
+        del legacy
+        restored, load_seconds, load_peak = _measure(
+            lambda: load_similarity_artifact_cache(cache_path)
+        )
+        delta = _artifacts(args.pickle_artifacts, args.delta, *shape)
+
+        def append_legacy(artifacts):
+            artifacts.update(delta)
+            save_similarity_artifact_cache(cache_path, artifacts)
+
+        _, append_seconds = _timed(partial(append_legacy, restored))
+        legacy_bytes = cache_path.stat().st_size
+        del restored
+        rows.append(
+            (
+                f"pickle x{scale:g}",
+                load_seconds * scale,
+                load_peak * scale,
+                load_seconds * scale,
+                load_peak * scale,
+                append_seconds * scale,
+                legacy_bytes * scale,
+            )
+        )
+
+        store_dir = Path(directory) / "store"
+        store = SimilarityEmbeddingStore(store_dir)
+        fill_started = time.perf_counter()
+        for start in range(0, args.artifacts, CHUNK_SIZE):
+            count = min(CHUNK_SIZE, args.artifacts - start)
+            store.put_many(_artifacts(start, count, *shape))
+        fill_seconds = time.perf_counter() - fill_started
+        store.close()
 
-        load_started = time.perf_counter()
-        restored = load_similarity_artifact_cache(cache_path)
-        load_seconds = time.perf_counter() - load_started
+        reopened, open_seconds, open_peak = _measure(
+            lambda: SimilarityEmbeddingStore(store_dir)
+        )
+        reopened.close()
+        store = SimilarityEmbeddingStore(store_dir)
+        folder_start = args.artifacts // 2
+        found, lookup_seconds, lookup_peak = _measure(
+            lambda: store.get_many(_fingerprints(folder_start, args.folder))
+        )
+        assert len(found) == args.folder
+        del found
+        delta = _artifacts(args.artifacts, args.delta, *shape)
+        _, append_seconds = _timed(lambda: store.put_many(delta))
+        rows.append(
+            (
+                "columnar store",
+                open_seconds,
+                open_peak,
+                lookup_seconds,
+                lookup_peak,
+                append_seconds,
+                store.stats()["bytes"],
+            )
+        )
+        store.close()
 
-        assert restored == artifacts
-        compressed_size = cache_path.stat().st_size
-        print(f"artifacts: {len(artifacts)}")
-        print(f"pickle bytes: {len(raw)}")
-        print(f"zstd bytes: {compressed_size}")
-        print(f"size reduction: {(1 - compressed_size / len(raw)) * 100:.1f}%")
-        print(f"save seconds: {save_seconds:.4f}")
-        print(f"load seconds: {load_seconds:.4f}")
+    print(
+        f"artifacts={args.artifacts} dimension={args.dimension} "
+        f"regions={args.regions} folder={args.folder} delta={args.delta}"
+    )
+    print(
+        f"pickle measured at {args.pickle_artifacts} artifacts "
+        f"(save {save_seconds:.2f}s) and scaled x{scale:g}"
+    )
+    print(f"store filled in {fill_seconds:.1f}s in chunks of {CHUNK_SIZE}")
+    print(
+        f"{'format':>16s} {'open s':>8s} {'open MB':>8s} {'folder s':>9s} "
+        f"{'folder MB':>9s} {'append s':>9s} {'disk MB':>8s}"
+    )
+    for name, *values in rows:
+        open_s, open_mb, folder_s, folder_mb, append_s, disk = values
+        print(
+            f"{name:>16s} {open_s:8.3f} {open_mb:8.0f} {folder_s:9.3f} "
+            f"{folder_mb:9.0f} {append_s:9.3f} {disk / 2**20:8.0f}"
+        )
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Compare torch and INT8 ONNX similarity embeddings on the CPU.
+
+Encodes ``--images`` photo-like analysis-size images with
+``encode_with_regions`` (six regions per image) on each backend. The first
+``onnx-int8`` load exports and quantizes the installed model; that time is
+reported separately, and later loads reuse the cached export. Cosine
+agreement compares each image's global and regional embeddings with torch's,
+which is what the clustering distances are built from. Needs the selected
+model installed locally plus torch, transformers and onnxruntime.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+os.environ.setdefault("PHOTOSORT_TORCH_DEVICE", "cpu")
+
+from core.app_settings import DEFAULT_SIMILARITY_BATCH_SIZE  # noqa: E402
+from core.similarity_embedding_model import (  # noqa: E402
+    SimilarityEmbeddingModel,
+    resolve_similarity_model_snapshot,
+    similarity_onnx_export_path,
+)
+
+
+def _photo_like(index: int, size: tuple[int, int]) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize(size)
+    grain = Image.effect_noise(size, 12 + index % 20).filter(
+        ImageFilter.GaussianBlur(1 + index % 3)
+    )
+    return Image.merge(
+        "RGB",
+        (
+            gradient.rotate(index * 7 % 360).resize(size),
+            gradient.rotate(90 + index % 180).resize(size),
+            Image.blend(
+                gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), grain, 0.3
+            ),
+        ),
+    )
+
+
+def _encode_all(model, images):
+    global_rows, regional_rows = [], []
+    started = time.perf_counter()
+    for start in range(0, len(images), DEFAULT_SIMILARITY_BATCH_SIZE):
+        batch_global, batch_regions = model.encode_with_regions(
+            images[start : start + DEFAULT_SIMILARITY_BATCH_SIZE]
+        )
+        global_rows.append(batch_global)
+        regional_rows.extend(batch_regions)
+    return np.vstack(global_rows), regional_rows, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=48)
+    parser.add_argument("--model", default=None, help="Hugging Face model id")
+    parser.add_argument("--size", type=int, nargs=2, default=(1024, 683))
+    parser.add_argument(
+        "--reexport", action="store_true", help="Delete the cached export first"
+    )
+    args = parser.parse_args()
+    images = [
+        _photo_like(index, tuple(args.size) if index % 3 else tuple(args.size[::-1]))
+        for index in range(args.images)
+    ]
+
+    results = {}
+    for backend in ("torch", "onnx-int8"):
+        model = SimilarityEmbeddingModel(args.model, backend=backend)
+        if backend == "onnx-int8" and args.reexport:
+            snapshot = resolve_similarity_model_snapshot(model.model_name)
+            similarity_onnx_export_path(model.model_name, snapshot).unlink(
+                missing_ok=True
+            )
+        started = time.perf_counter()
+        model.load()
+        load_seconds = time.perf_counter() - started
+        # Warm-up outside the timed run (allocators, kernel selection).
+        model.encode_with_regions(images[:2])
+        global_rows, regional_rows, seconds = _encode_all(model, images)
+        results[backend] = (load_seconds, seconds, global_rows, regional_rows)
+        if backend == "onnx-int8":
+            export = similarity_onnx_export_path(model.model_name, model.snapshot_path)
+            export_mb = export.stat().st_size / 2**20
+
+    reference_global, reference_regions = results["torch"][2:]
+    print(
+        f"model={model.model_name} images={args.images} size={tuple(args.size)} "
+        f"regions/image=6 cpus={os.cpu_count()} onnx export={export_mb:.1f} MB"
+    )
+    print(
+        f"{'backend':>10s} {'load s':>7s} {'encode s':>8s} {'img/s':>6s} "
+        f"{'regions/s':>9s} {'cos mean':>8s} {'cos min':>8s} {'region min':>10s}"
+    )
+    for backend, (load_seconds, seconds, global_rows, regional_rows) in results.items():
+        cosine = np.sum(global_rows * reference_global, axis=1)
+        region_cosine = [
+            float(np.min(np.sum(rows * reference, axis=1)))
+            for rows, reference in zip(regional_rows, reference_regions, strict=True)
+        ]
+        region_count = sum(len(rows) for rows in regional_rows)
+        print(
+            f"{backend:>10s} {load_seconds:7.2f} {seconds:8.2f} "
+            f"{args.images / seconds:6.2f} {region_count / seconds:9.1f} "
+            f"{statistics.fmean(cosine):8.4f} {cosine.min():8.4f} "
+            f"{min(region_cosine):10.4f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
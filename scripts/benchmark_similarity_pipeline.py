@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Compare serial and pipelined embedding generation on the CPU.
+
+``--images`` photo-like JPEGs are written at ``--source-size``. Each mode
+starts from an empty analysis cache, so every image is decoded from its
+source. ``serial`` replays the former loop, which loaded a batch of
+``DEFAULT_SIMILARITY_BATCH_SIZE`` images and then encoded it.
+``pipelined`` runs ``iter_prepared_batches`` with the engine's queue bounds,
+so decoding continues while a batch is encoded.
+
+``--model dinov2`` uses the installed DINOv2 model through
+``SimilarityEmbeddingModel.encode_with_regions``. The default ``synthetic``
+model needs neither torch nor weights. It builds the same six regions,
+resizes and normalises them as the image processor does, and runs
+``--gflops`` of float32 matrix products per region. The default is about
+DINOv2-small's cost for one 224x224 crop. Utilisation is each stage's busy
+time over the wall time (decode is averaged over its workers).
+``--read-latency-ms`` adds a sleep before each decode. It stands in for a
+network or USB drive, where a load mostly waits rather than computes.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from itertools import pairwise
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.app_settings import (  # noqa: E402
+    DEFAULT_SIMILARITY_BATCH_SIZE,
+    SIMILARITY_DECODE_WORKERS_MAX,
+    SIMILARITY_PREFETCH_BATCHES,
+    SIMILARITY_PREFETCH_MAX_BYTES,
+    calculate_max_workers,
+)
+from core.image_pipeline import ANALYSIS_CACHE_RESOLUTION, ImagePipeline  # noqa: E402
+from core.similarity_embedding_model import (  # noqa: E402
+    SimilarityEmbeddingModel,
+    build_similarity_image_regions,
+)
+from core.similarity_prefetch import PrefetchStats, iter_prepared_batches  # noqa: E402
+from core.similarity_utils import l2_normalize_rows  # noqa: E402
+
+PATCH = 14
+CROP = 224
+TOKENS = (CROP // PATCH) ** 2 + 1
+IMAGE_MEAN = np.asarray([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGE_STD = np.asarray([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+class SyntheticRegionModel:
+    """ViT-shaped CPU workload with the real model's region structure."""
+
+    def __init__(self, gflops_per_region: float, hidden: int = 384):
+        rng = np.random.default_rng(0)
+        self.projection = rng.standard_normal((PATCH * PATCH * 3, hidden)).astype(
+            np.float32
+        )
+        self.up = rng.standard_normal((hidden, 4 * hidden)).astype(np.float32) * 0.01
+        self.down = rng.standard_normal((4 * hidden, hidden)).astype(np.float32) * 0.01
+        flops_per_layer = 2 * 2 * TOKENS * hidden * 4 * hidden
+        self.layers = max(1, round(gflops_per_region * 1e9 / flops_per_layer))
+
+    def _pixels(self, region: Image.Image) -> np.ndarray:
+        resized = region.convert("RGB").resize((CROP, CROP), Image.Resampling.BICUBIC)
+        return (np.asarray(resized, dtype=np.float32) / 255.0 - IMAGE_MEAN) / IMAGE_STD
+
+    def encode_with_regions(self, images):
+        regions, counts = [], []
+        for image in images:
+            image_regions = build_similarity_image_regions(image)
+            regions.extend(image_regions)
+            counts.append(len(image_regions))
+        pixels = np.stack([self._pixels(region) for region in regions])
+        grid = CROP // PATCH
+        patches = (
+            pixels.reshape(len(regions), grid, PATCH, grid, PATCH, 3)
+            .transpose(0, 1, 3, 2, 4, 5)
+            .reshape(len(regions), grid * grid, -1)
+        )
+        tokens = patches @ self.projection
+        tokens = np.concatenate([tokens.mean(axis=1, keepdims=True), tokens], axis=1)
+        for _layer in range(self.layers):
+            tokens += np.maximum(tokens @ self.up, 0.0) @ self.down
+        encoded = l2_normalize_rows(tokens[:, 0, :])
+        bounds = np.cumsum([0, *counts])
+        regional = [encoded[start:end] for start, end in pairwise(bounds)]
+        return np.asarray([rows[0] for rows in regional]), regional
+
+
+def _photo_like(index: int, size: tuple[int, int]) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize(size)
+    grain = Image.effect_noise(size, 12).filter(ImageFilter.GaussianBlur(1))
+    return Image.merge(
+        "RGB",
+        (
+            gradient,
+            gradient.rotate(90 + index % 180).resize(size),
+            Image.blend(
+                gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), grain, 0.3
+            ),
+        ),
+    )
+
+
+def _pipeline(directory: str, name: str) -> ImagePipeline:
+    return ImagePipeline(
+        thumbnail_cache_dir=os.path.join(directory, name, "thumb"),
+        preview_cache_dir=os.path.join(directory, name, "preview"),
+        analysis_cache_dir=os.path.join(directory, name, "analysis"),
+    )
+
+
+def _run_serial(paths, load, model, batch_size):
+    decode = encode = 0.0
+    images = 0
+    started = time.perf_counter()
+    for start in range(0, len(paths), batch_size):
+        decode_started = time.perf_counter()
+        batch = [load(path) for path in paths[start : start + batch_size]]
+        batch = [image for image in batch if image is not None]
+        encode_started = time.perf_counter()
+        decode += encode_started - decode_started
+        model.encode_with_regions(batch)
+        encode += time.perf_counter() - encode_started
+        images += len(batch)
+    wall = time.perf_counter() - started
+    return wall, images, decode / wall, encode / wall, 0.0, 0
+
+
+def _run_pipelined(paths, load, model, batch_size, workers):
+    stats = PrefetchStats(workers=workers)
+    for batch in iter_prepared_batches(
+        paths,
+        load,
+        batch_size=batch_size,
+        workers=workers,
+        max_batches=SIMILARITY_PREFETCH_BATCHES,
+        max_bytes=SIMILARITY_PREFETCH_MAX_BYTES,
+        stats=stats,
+    ):
+        model.encode_with_regions(batch.images)
+    utilisation = stats.utilisation()
+    return (
+        stats.wall_seconds,
+        stats.images,
+        utilisation["decode"],
+        utilisation["encode"],
+        utilisation["starved"],
+        stats.peak_queued_bytes,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--source-size", type=int, nargs=2, default=(4000, 3000))
+    parser.add_argument("--model", choices=("synthetic", "dinov2"), default="synthetic")
+    parser.add_argument("--gflops", type=float, default=4.6)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--read-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    workers = args.workers or calculate_max_workers(
+        max_workers=SIMILARITY_DECODE_WORKERS_MAX
+    )
+    if args.model == "dinov2":
+        model = SimilarityEmbeddingModel()
+        model.load()
+    else:
+        model = SyntheticRegionModel(args.gflops)
+    batch_size = DEFAULT_SIMILARITY_BATCH_SIZE
+
+    with tempfile.TemporaryDirectory(prefix="photosort-similarity-") as directory:
+        paths = []
+        for index in range(args.images):
+            size = tuple(args.source_size)
+            if index % 3 == 2:
+                size = size[::-1]
+            path = os.path.join(directory, f"IMG_{index:04d}.jpg")
+            _photo_like(index, size).save(path, quality=90)
+            paths.append(path)
+
+        # Warm the model (and BLAS) up outside the timed runs.
+        model.encode_with_regions([Image.new("RGB", (640, 480))])
+        results = {}
+        for name in ("serial", "pipelined"):
+            pipeline = _pipeline(directory, name)
+
+            def load(path, pipeline=pipeline):
+                if args.read_latency_ms:
+                    time.sleep(args.read_latency_ms / 1000)
+                return pipeline.get_analysis_image(
+                    path, target_size=ANALYSIS_CACHE_RESOLUTION
+                )
+
+            if name == "serial":
+                results[name] = _run_serial(paths, load, model, batch_size)
+            else:
+                results[name] = _run_pipelined(paths, load, model, batch_size, workers)
+
+    print(
+        f"images={args.images} source={tuple(args.source_size)} model={args.model}"
+        + (f" ({args.gflops:g} GFLOP/region)" if args.model == "synthetic" else "")
+        + f" batch={batch_size} decode workers={workers} cpus={os.cpu_count()}"
+        + f" read latency={args.read_latency_ms:g}ms"
+    )
+    print(
+        f"{'mode':>10s} {'wall s':>7s} {'img/s':>6s} {'decode':>7s} "
+        f"{'encode':>7s} {'starved':>7s} {'queue MB':>8s}"
+    )
+    for name, (wall, images, decode, encode, starved, queued) in results.items():
+        print(
+            f"{name:>10s} {wall:7.2f} {images / wall:6.2f} {decode:7.0%} "
+            f"{encode:7.0%} {starved:7.0%} {queued / 2**20:8.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
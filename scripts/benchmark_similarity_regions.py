@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""Compare crop-based and patch-token regional embeddings.
+
+Both modes run through ``SimilarityEmbeddingModel.encode_with_regions``.
+``crops`` encodes the full frame and five region crops, so it makes six
+forward passes per image. ``patch-tokens`` makes one forward pass and pools
+the patch tokens under each region box. Throughput is images and forward
+passes per second after a warm-up batch.
+
+Agreement clusters both modes as the engine does: a regional distance matrix
+and DBSCAN with ``metric="precomputed"``, where noise images are
+singletons. The output reports the adjusted Rand index between the
+labelings. It also reports how many of the image pairs grouped by crops are
+grouped by patch tokens, and the reverse. Pooled tokens sit at different
+distances than encoded crops, so each ``--eps`` is compared at the same eps
+and at the patch-token eps that agrees best. The images come from
+``--folder`` or from ``--groups`` synthetic scenes with ``--variants``
+shifted, re-exposed and occluded shots each. Synthetic scenes also report
+agreement with the true groups.
+
+``--model dinov2`` uses the installed model with the configured backend
+(``--backend`` overrides it). The default ``synthetic`` model needs neither
+torch nor weights. It is a NumPy ViT-shaped session with ``--gflops`` per
+224x224 forward pass (about DINOv2-small's cost) behind the ONNX session
+interface, so the timing is meaningful but the agreement is not.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageEnhance
+from sklearn.cluster import DBSCAN
+from sklearn.metrics import adjusted_rand_score
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.app_settings import (  # noqa: E402
+    DBSCAN_MIN_SAMPLES,
+    DEFAULT_SIMILARITY_BATCH_SIZE,
+    DEFAULT_SIMILARITY_CLUSTERING_EPS,
+)
+from core.image_pipeline import ANALYSIS_CACHE_RESOLUTION  # noqa: E402
+from core.similarity_embedding_model import SimilarityEmbeddingModel  # noqa: E402
+from core.similarity_utils import build_regional_distance_matrix  # noqa: E402
+
+MODES = ("crops", "patch-tokens")
+PATCH = 14
+CROP = 224
+IMAGE_MEAN = np.asarray([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGE_STD = np.asarray([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+class SyntheticProcessor:
+    """Shortest-edge resize and centre crop, as DINOv2's image processor."""
+
+    do_resize = True
+    do_center_crop = True
+    size = {"shortest_edge": 256}
+    crop_size = {"height": CROP, "width": CROP}
+
+    def __call__(self, images, return_tensors):
+        pixels = []
+        for image in images:
+            width, height = image.size
+            scale = 256 / min(width, height)
+            resized = image.convert("RGB").resize(
+                (int(width * scale), int(height * scale)), Image.Resampling.BICUBIC
+            )
+            left = (resized.width - CROP) // 2
+            top = (resized.height - CROP) // 2
+            cropped = resized.crop((left, top, left + CROP, top + CROP))
+            scaled = np.asarray(cropped, np.float32) / 255
+            pixels.append(((scaled - IMAGE_MEAN) / IMAGE_STD).transpose(2, 0, 1))
+        return {"pixel_values": np.stack(pixels)}
+
+
+class SyntheticSession:
+    """NumPy stand-in for the exported model, returning ``last_hidden_state``."""
+
+    def __init__(self, gflops: float, hidden: int = 384):
+        rng = np.random.default_rng(0)
+        self.projection = rng.standard_normal((PATCH * PATCH * 3, hidden)).astype(
+            np.float32
+        ) / np.sqrt(PATCH * PATCH * 3)
+        self.up = rng.standard_normal((hidden, 4 * hidden)).astype(np.float32) * 0.01
+        self.down = rng.standard_normal((4 * hidden, hidden)).astype(np.float32) * 0.01
+        tokens = (CROP // PATCH) ** 2 + 1
+        flops_per_layer = 2 * 2 * tokens * hidden * 4 * hidden
+        self.layers = max(1, round(gflops * 1e9 / flops_per_layer))
+        self.forward_passes = 0
+
+    def get_inputs(self):
+        return [argparse.Namespace(name="pixel_values")]
+
+    def run(self, _outputs, feeds):
+        pixels = feeds["pixel_values"]
+        count, _channels, height, width = pixels.shape
+        self.forward_passes += count
+        grid_height, grid_width = height // PATCH, width // PATCH
+        patches = (
+            pixels.transpose(0, 2, 3, 1)
+            .reshape(count, grid_height, PATCH, grid_width, PATCH, 3)
+            .transpose(0, 1, 3, 2, 4, 5)
+            .reshape(count, grid_height * grid_width, -1)
+        )
+        tokens = patches @ self.projection
+        tokens = np.concatenate([tokens.mean(axis=1, keepdims=True), tokens], axis=1)
+        for _layer in range(self.layers):
+            tokens += np.maximum(tokens @ self.up, 0.0) @ self.down
+        return [tokens]
+
+
+def _scene(rng: np.random.Generator, size: tuple[int, int]) -> Image.Image:
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    tint = Image.new("RGB", size, tuple(int(c) for c in rng.integers(0, 255, 3)))
+    image = Image.blend(image, tint, 0.6)
+    draw = ImageDraw.Draw(image)
+    width, height = size
+    for _shape in range(int(rng.integers(4, 9))):
+        left, top = rng.uniform(0, 0.8) * width, rng.uniform(0, 0.8) * height
+        box = (
+            left,
+            top,
+            left + rng.uniform(0.1, 0.5) * width,
+            top + rng.uniform(0.1, 0.5) * height,
+        )
+        colour = tuple(int(c) for c in rng.integers(0, 255, 3))
+        if rng.random() < 0.5:
+            draw.ellipse(box, fill=colour)
+        else:
+            draw.rectangle(box, fill=colour)
+    return image
+
+
+def _variant(
+    scene: Image.Image, rng: np.random.Generator, size: tuple[int, int]
+) -> Image.Image:
+    width, height = scene.size
+    keep = rng.uniform(0.8, 0.95)
+    left = rng.uniform(0, 1 - keep) * width
+    top = rng.uniform(0, 1 - keep) * height
+    shot = scene.crop(
+        (int(left), int(top), int(left + keep * width), int(top + keep * height))
+    ).resize(size)
+    shot = ImageEnhance.Brightness(shot).enhance(rng.uniform(0.8, 1.2))
+    if rng.random() < 0.5:
+        # Someone walking through part of the frame.
+        draw = ImageDraw.Draw(shot)
+        x = rng.uniform(0, 0.8) * size[0]
+        draw.rectangle(
+            (x, size[1] * 0.3, x + size[0] * 0.18, size[1]), fill=(40, 40, 40)
+        )
+    return shot
+
+
+def _synthetic_images(groups: int, variants: int) -> tuple[list, list[int]]:
+    rng = np.random.default_rng(0)
+    images, truth = [], []
+    for group in range(groups):
+        size = (1024, 683) if group % 3 else (683, 1024)
+        scene = _scene(rng, (int(size[0] * 1.15), int(size[1] * 1.15)))
+        for _shot in range(variants):
+            images.append(_variant(scene, rng, size))
+            truth.append(group)
+    return images, truth
+
+
+def _folder_images(folder: str, limit: int) -> list:
+    images = []
+    for name in sorted(os.listdir(folder)):
+        if len(images) >= limit:
+            break
+        try:
+            with Image.open(os.path.join(folder, name)) as image:
+                image.draft("RGB", ANALYSIS_CACHE_RESOLUTION)
+                image = image.convert("RGB")
+                image.thumbnail(ANALYSIS_CACHE_RESOLUTION)
+                images.append(image)
+        except OSError:
+            continue
+    return images
+
+
+def _cluster(distances: np.ndarray, eps: float) -> np.ndarray:
+    labels = DBSCAN(
+        eps=eps, min_samples=DBSCAN_MIN_SAMPLES, metric="precomputed"
+    ).fit_predict(distances)
+    # Noise images are their own groups, as in the engine.
+    noise = labels == -1
+    labels[noise] = labels.max() + 1 + np.arange(int(noise.sum()))
+    return labels
+
+
+def _pairs(labels: np.ndarray) -> np.ndarray:
+    same = labels[:, None] == labels[None, :]
+    return same[np.triu_indices(len(labels), k=1)]
+
+
+def _kept(reference: np.ndarray, other: np.ndarray) -> float:
+    """Fraction of the pairs grouped by ``reference`` that ``other`` groups too."""
+    grouped = _pairs(reference)
+    return float(_pairs(other)[grouped].mean()) if grouped.any() else 1.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", choices=("synthetic", "dinov2"), default="synthetic")
+    parser.add_argument("--backend", default=None, help="torch or onnx-int8")
+    parser.add_argument("--gflops", type=float, default=4.6)
+    parser.add_argument("--folder", default=None, help="Photos to evaluate")
+    parser.add_argument("--images", type=int, default=200, help="Limit for --folder")
+    parser.add_argument("--groups", type=int, default=12)
+    parser.add_argument("--variants", type=int, default=4)
+    parser.add_argument(
+        "--eps", type=float, nargs="+", default=[DEFAULT_SIMILARITY_CLUSTERING_EPS]
+    )
+    args = parser.parse_args()
+
+    truth = None
+    if args.folder:
+        images = _folder_images(args.folder, args.images)
+    else:
+        images, truth = _synthetic_images(args.groups, args.variants)
+    paths = [f"image-{index:05d}" for index in range(len(images))]
+
+    encoded = {}
+    for mode in MODES:
+        if args.model == "dinov2":
+            model = SimilarityEmbeddingModel(backend=args.backend, region_mode=mode)
+            model.load()
+            passes = None
+        else:
+            model = SimilarityEmbeddingModel(backend="onnx-int8", region_mode=mode)
+            model.processor = SyntheticProcessor()
+            model.session = SyntheticSession(args.gflops)
+        model.encode_with_regions(images[:2])
+        if args.model == "synthetic":
+            model.session.forward_passes = 0
+        global_rows, regional_rows = [], []
+        started = time.perf_counter()
+        for start in range(0, len(images), DEFAULT_SIMILARITY_BATCH_SIZE):
+            batch_global, batch_regions = model.encode_with_regions(
+                images[start : start + DEFAULT_SIMILARITY_BATCH_SIZE]
+            )
+            global_rows.extend(batch_global.tolist())
+            regional_rows.extend(rows.tolist() for rows in batch_regions)
+        seconds = time.perf_counter() - started
+        if args.model == "synthetic":
+            passes = model.session.forward_passes
+        distances = build_regional_distance_matrix(
+            dict(zip(paths, global_rows, strict=True)),
+            dict(zip(paths, regional_rows, strict=True)),
+            paths,
+        )
+        encoded[mode] = (seconds, passes, distances)
+
+    print(
+        f"model={args.model}"
+        + (f" ({args.gflops:g} GFLOP/pass)" if args.model == "synthetic" else "")
+        + f" images={len(images)} batch={DEFAULT_SIMILARITY_BATCH_SIZE}"
+        + f" cpus={os.cpu_count()}"
+        + (f" folder={args.folder}" if args.folder else " synthetic groups")
+    )
+    print(f"{'mode':>13s} {'encode s':>8s} {'img/s':>6s} {'passes/img':>10s}")
+    for mode, (seconds, passes, _distances) in encoded.items():
+        per_image = f"{passes / len(images):10.1f}" if passes else f"{'-':>10s}"
+        print(f"{mode:>13s} {seconds:8.2f} {len(images) / seconds:6.2f} {per_image}")
+
+    crop_distances = encoded["crops"][2]
+    patch_distances = encoded["patch-tokens"][2]
+    upper = np.triu_indices(len(images), k=1)
+    correlation = np.corrcoef(crop_distances[upper], patch_distances[upper])[0, 1]
+    print(f"pairwise distance correlation: {correlation:.3f}")
+    candidate_eps = np.round(np.arange(0.02, 0.401, 0.01), 2)
+    header = f"{'eps':>5s} {'patch eps':>9s} {'ARI':>5s} {'kept':>5s} {'added':>5s}"
+    if truth is not None:
+        header += f" {'crops ARI':>9s} {'patch ARI':>9s}"
+    print(header)
+    for eps in args.eps:
+        crop_labels = _cluster(crop_distances, eps)
+        best_eps = max(
+            candidate_eps,
+            key=lambda value: adjusted_rand_score(
+                crop_labels, _cluster(patch_distances, float(value))
+            ),
+        )
+        for patch_eps in dict.fromkeys((eps, float(best_eps))):
+            patch_labels = _cluster(patch_distances, patch_eps)
+            row = (
+                f"{eps:5.2f} {patch_eps:9.2f} "
+                f"{adjusted_rand_score(crop_labels, patch_labels):5.2f} "
+                f"{_kept(crop_labels, patch_labels):5.0%} "
+                f"{1 - _kept(patch_labels, crop_labels):5.0%}"
+            )
+            if truth is not None:
+                row += (
+                    f" {adjusted_rand_score(truth, crop_labels):9.2f}"
+                    f" {adjusted_rand_score(truth, patch_labels):9.2f}"
+                )
+            print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
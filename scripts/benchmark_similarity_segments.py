@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Time similarity artifact saves against the size of the delta.
+
+A segmented store is filled with ``--artifacts`` artifacts and merged into
+one base segment. Each ``--deltas`` size is then saved ``--saves`` times,
+half of every delta replacing existing artifacts and half adding new ones,
+as a rescan of an edited folder would. ``save ms`` is the median
+``put_many`` call, which writes one fresh segment. ``merge ms`` is the
+median background merge the saves triggered, waited for outside the timed
+save. The full rewrite line is a merge of the whole store, which is what
+every save cost while the cache was rewritten as one file. ``folder ms`` is a ``--folder``-sized
+lookup while the saves' segments are still unmerged.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.similarity_cache import SimilarityArtifact  # noqa: E402
+from core.similarity_embedding_store import SimilarityEmbeddingStore  # noqa: E402
+
+CHUNK_SIZE = 2_000
+
+
+def _artifacts(
+    indices: range | list[int], version: int, dimension: int, regions: int
+) -> dict[str, SimilarityArtifact]:
+    indices = list(indices)
+    rng = np.random.default_rng(version * 1_000_003 + (indices[0] if indices else 0))
+    vectors = rng.uniform(-1.0, 1.0, size=(len(indices), regions, dimension))
+    vectors = vectors.astype(np.float32)
+    return {
+        f"photo-{index:07d}.jpg": {
+            "fingerprint": (20_000_000 + index, 1_700_000_000 + version),
+            "embedding": vectors[offset, 0].tolist(),
+            "regional_embeddings": vectors[offset].tolist(),
+            "orientation": "landscape",
+        }
+        for offset, index in enumerate(indices)
+    }
+
+
+def _folder_fingerprints(start: int, count: int) -> dict[str, tuple[int, int]]:
+    return {
+        f"photo-{index:07d}.jpg": (20_000_000 + index, 1_700_000_000)
+        for index in range(start, start + count)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--artifacts", type=int, default=50_000)
+    parser.add_argument(
+        "--deltas", type=int, nargs="+", default=[1, 10, 100, 1_000, 10_000]
+    )
+    parser.add_argument("--saves", type=int, default=12)
+    parser.add_argument("--folder", type=int, default=2_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--regions", type=int, default=6)
+    args = parser.parse_args()
+    shape = (args.dimension, args.regions)
+    rng = np.random.default_rng(0)
+    rows = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SimilarityEmbeddingStore(Path(directory) / "store")
+        fill_started = time.perf_counter()
+        for start in range(0, args.artifacts, CHUNK_SIZE):
+            count = min(CHUNK_SIZE, args.artifacts - start)
+            store.put_many(_artifacts(range(start, start + count), 0, *shape))
+        store.wait_for_compaction()
+        store.compact()
+        fill_seconds = time.perf_counter() - fill_started
+        rewrite_started = time.perf_counter()
+        store.compact()
+        rewrite_seconds = time.perf_counter() - rewrite_started
+
+        next_index = args.artifacts
+        version = 1
+        for delta in args.deltas:
+            save_seconds = []
+            merge_seconds = []
+            lookup_seconds = []
+            for _save in range(args.saves):
+                replaced = rng.choice(
+                    next_index, size=delta - delta // 2, replace=False
+                ).tolist()
+                added = list(range(next_index, next_index + delta // 2))
+                next_index += len(added)
+                batch = _artifacts(replaced + added, version, *shape)
+                version += 1
+                previous_merge = store._compaction_thread
+                started = time.perf_counter()
+                store.put_many(batch)
+                save_seconds.append(time.perf_counter() - started)
+                if store._compaction_thread is not previous_merge:
+                    started = time.perf_counter()
+                    store.wait_for_compaction()
+                    merge_seconds.append(time.perf_counter() - started)
+                elif store.stats()["segments"] > 1:
+                    started = time.perf_counter()
+                    found = store.get_many(
+                        _folder_fingerprints(args.artifacts // 2, args.folder)
+                    )
+                    lookup_seconds.append(time.perf_counter() - started)
+                    del found
+            stats = store.stats()
+            rows.append(
+                (
+                    delta,
+                    statistics.median(save_seconds) * 1e3,
+                    statistics.median(merge_seconds) * 1e3 if merge_seconds else 0.0,
+                    len(merge_seconds),
+                    statistics.median(lookup_seconds) * 1e3 if lookup_seconds else 0.0,
+                    stats["segments"],
+                    stats["dead_rows"],
+                )
+            )
+            store.compact()
+        store.close()
+
+    print(
+        f"artifacts={args.artifacts} dimension={args.dimension} "
+        f"regions={args.regions} saves per delta={args.saves}"
+    )
+    print(f"store filled in {fill_seconds:.1f}s in chunks of {CHUNK_SIZE}")
+    print(f"full rewrite of the store: {rewrite_seconds:.2f}s")
+    print(
+        f"{'delta':>7s} {'save ms':>9s} {'merge ms':>9s} {'merges':>6s} "
+        f"{'folder ms':>9s} {'segments':>8s} {'dead rows':>9s}"
+    )
+    for delta, save_ms, merge_ms, merges, lookup_ms, segments, dead in rows:
+        print(
+            f"{delta:7d} {save_ms:9.1f} {merge_ms:9.1f} {merges:6d} "
+            f"{lookup_ms:9.1f} {segments:8d} {dead:9d}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Estimate grid thumbnail memory for a large folder at each zoom level.
+
+``--samples`` photo-like JPEGs in landscape and portrait orientation are
+thumbnailed once per level by a fresh ``ImagePipeline``. The measured
+per-image averages are scaled to ``--folder-size`` images: the decoded
+memory-tier image, its encoded payload (disk cache and encoded memory tier)
+and the QPixmap the grid paints (32-bit). Each zoom row shows the level the
+grid picks for that icon size and device pixel ratio; ``before`` is the
+single 256 px thumbnail every zoom used to get.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageFilter
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from core.app_settings import THUMBNAIL_CACHE_CODEC  # noqa: E402
+from core.caching.image_codec import encode_cached_image  # noqa: E402
+from core.image_pipeline import (  # noqa: E402
+    THUMBNAIL_LEVELS,
+    THUMBNAIL_MAX_SIZE,
+    ImagePipeline,
+    thumbnail_level_for,
+)
+
+ZOOMS = ((16, 1.0), (64, 1.0), (96, 1.0), (96, 2.0), (128, 2.0), (192, 2.0))
+
+
+def _photo_like(index: int, size: tuple[int, int]) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize(size)
+    grain = Image.effect_noise(size, 12).filter(ImageFilter.GaussianBlur(1))
+    return Image.merge(
+        "RGB",
+        (
+            gradient,
+            gradient.rotate(90 + index % 180).resize(size),
+            Image.blend(
+                gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), grain, 0.3
+            ),
+        ),
+    )
+
+
+def _measure(sources: list[str], level: int, directory: str) -> dict[str, float]:
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=os.path.join(directory, f"thumb-{level}"),
+        preview_cache_dir=os.path.join(directory, f"preview-{level}"),
+        analysis_cache_dir=os.path.join(directory, f"analysis-{level}"),
+    )
+    pipeline.set_thumbnail_level(level)
+    decoded = payload = pixmap = 0
+    started = time.perf_counter()
+    for source in sources:
+        image = pipeline._get_pil_thumbnail(source)
+        decoded += pipeline._image_memory_size(image)
+        payload += len(
+            encode_cached_image(image, quality=82, profile=THUMBNAIL_CACHE_CODEC)
+        )
+        pixmap += image.width * image.height * 4
+    elapsed = time.perf_counter() - started
+    count = len(sources)
+    return {
+        "decoded": decoded / count,
+        "payload": payload / count,
+        "pixmap": pixmap / count,
+        "disk": pipeline.thumbnail_cache.volume() / count,
+        "ms": elapsed / count * 1e3,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=40)
+    parser.add_argument("--folder-size", type=int, default=20_000)
+    parser.add_argument("--source-size", type=int, nargs=2, default=(6000, 4000))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="photosort-thumb-levels-") as directory:
+        sources = []
+        for index in range(args.samples):
+            size = tuple(args.source_size)
+            if index % 3 == 2:
+                size = size[::-1]
+            source = os.path.join(directory, f"IMG_{index:04d}.jpg")
+            _photo_like(index, size).save(source, quality=90)
+            sources.append(source)
+        per_level = {
+            level: _measure(sources, level, directory) for level in THUMBNAIL_LEVELS
+        }
+
+    scale = args.folder_size / 2**20
+    print(
+        f"samples={args.samples} source={tuple(args.source_size)} "
+        f"folder={args.folder_size} images (MB for the whole folder)"
+    )
+    for level, stats in per_level.items():
+        print(
+            f"level {level:3d}: first build {stats['ms']:6.1f} ms/image, "
+            f"disk for all cached levels {stats['disk'] * scale:7.0f} MB"
+        )
+    print(
+        f"{'zoom':>14s} {'level':>5s} {'decoded':>8s} {'pixmaps':>8s} "
+        f"{'encoded':>8s}   (before: 256 px for every zoom)"
+    )
+    before = per_level[THUMBNAIL_MAX_SIZE[0]]
+    for icon_size, ratio in ZOOMS:
+        level = thumbnail_level_for(icon_size, ratio)
+        stats = per_level[level]
+        print(
+            f"{icon_size:4d} px @ {ratio:.0f}x dpr {level:5d} "
+            f"{stats['decoded'] * scale:8.0f} {stats['pixmap'] * scale:8.0f} "
+            f"{stats['payload'] * scale:8.0f}   "
+            f"({before['decoded'] * scale:.0f} / {before['pixmap'] * scale:.0f} / "
+            f"{before['payload'] * scale:.0f})"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
-"""Run a repeatable PhotoSort startup/folder-load smoke test and emit JSON."""
+"""Run a repeatable PhotoSort startup/folder-load smoke test and emit JSON.
+
+``--reopen`` runs the test twice in fresh processes sharing one cache root,
+reporting a first open and a warm reopen of the same folder side by side.
+"""
 
 import argparse
 import json
 import os
 import resource
+import subprocess
 import sys
 import tempfile
 import time
@@ -23,6 +28,35 @@ def _max_rss_mb() -> float:
     return value / 1024
 
 
+def _run_reopen(args: argparse.Namespace) -> int:
+    """Open the folder twice in child processes that share one cache root."""
+    env = dict(os.environ)
+    temporary_cache = None
+    if args.cold_cache:
+        temporary_cache = tempfile.TemporaryDirectory(prefix="photosort-perf-")
+        env["PHOTOSORT_CACHE_ROOT"] = temporary_cache.name
+    command = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--folder",
+        str(args.folder),
+        "--duration",
+        str(args.duration),
+    ]
+    results = {}
+    try:
+        for label in ("first_open", "warm_reopen"):
+            completed = subprocess.run(
+                command, env=env, check=True, capture_output=True, text=True
+            )
+            results[label] = json.loads(completed.stdout[completed.stdout.index("{") :])
+    finally:
+        if temporary_cache is not None:
+            temporary_cache.cleanup()
+    print(json.dumps(results, indent=2, sort_keys=True))
+    return 0
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--folder", type=Path, help="Optional media folder to scan")
@@ -37,9 +71,18 @@ def main() -> int:
         action="store_true",
         help="Use a temporary empty cache for a reproducible cold run",
     )
+    parser.add_argument(
+        "--reopen",
+        action="store_true",
+        help="Measure a first open and a warm reopen of --folder",
+    )
     args = parser.parse_args()
     if args.folder and not args.folder.is_dir():
         parser.error(f"Folder does not exist: {args.folder}")
+    if args.reopen:
+        if not args.folder:
+            parser.error("--reopen requires --folder")
+        return _run_reopen(args)
 
     temporary_cache = None
     if args.cold_cache:
@@ -67,6 +110,19 @@ def main() -> int:
     window.worker_manager.file_scan_finished.connect(
         lambda: scan_finished_at.append(time.perf_counter())
     )
+    grid_painted_at: list[float] = []
+
+    def check_grid_painted() -> None:
+        media = window.app_state.image_files_data
+        if grid_painted_at or not scan_finished_at or not media:
+            return
+        if all(window.get_cached_thumbnail_icon(item["path"]) for item in media):
+            grid_painted_at.append(time.perf_counter())
+
+    paint_timer = QTimer()
+    paint_timer.setInterval(10)
+    paint_timer.timeout.connect(check_grid_painted)
+    paint_timer.start()
     window.show()
 
     QTimer.singleShot(max(1, int(args.duration * 1000)), app.quit)
@@ -83,11 +139,18 @@ def main() -> int:
             if scan_finished_at
             else None
         ),
+        # Every media item has a grid icon (None if not reached in --duration).
+        "grid_painted_seconds": (
+            round(grid_painted_at[0] - process_started, 4) if grid_painted_at else None
+        ),
         "media_count": len(window.app_state.image_files_data),
         "max_rss_mb": round(_max_rss_mb(), 1),
         "thumbnail_cache_mb": round(
             window.image_pipeline.thumbnail_cache.volume() / (1024 * 1024), 1
         ),
+        "thumbnail_pack_mb": round(
+            window.image_pipeline.thumbnail_packs.volume() / (1024 * 1024), 1
+        ),
         "preview_cache_mb": round(
             window.image_pipeline.preview_cache.volume() / (1024 * 1024), 1
         ),
@@ -43,6 +43,8 @@ SETTINGS_APPLICATION = "PhotoSort"
 # Settings keys
 PREVIEW_CACHE_SIZE_GB_KEY = "Cache/PreviewCacheSizeGB"
 EXIF_CACHE_SIZE_MB_KEY = "Cache/ExifCacheSizeMB"  # For EXIF metadata cache
+CACHE_DISK_BUDGET_GB_KEY = "Cache/DiskBudgetGB"  # Global budget across disk caches
+CACHE_STORAGE_BACKEND_KEY = "Cache/StorageBackend"  # Group: backend per cache name
 ROTATION_CONFIRM_LOSSY_KEY = "UI/RotationConfirmLossy"  # Ask before lossy rotation
 SHOW_WORKFLOW_SHORTCUTS_KEY = "UI/ShowWorkflowShortcuts"
 WORKFLOW_STEP_VISIBILITY_KEYS = {
@@ -67,6 +69,18 @@ PERFORMANCE_MODE_KEY = (
 CUSTOM_THREAD_COUNT_KEY = (
     "Performance/CustomThreadCount"  # User-defined thread count for custom mode
 )
+IMAGE_DECODE_BACKEND_KEY = (
+    "Performance/ImageDecodeBackend"  # Image decode backend (thread/process)
+)
+CONTENT_ADDRESSED_CACHE_KEYS_KEY = (
+    "Performance/ContentAddressedCacheKeys"  # Key image caches by file content
+)
+SIMILARITY_INFERENCE_BACKEND_KEY = (
+    "Performance/SimilarityInferenceBackend"  # Embedding backend (torch/onnx-int8)
+)
+SIMILARITY_REGION_MODE_KEY = (
+    "Performance/SimilarityRegionMode"  # Regional embeddings (crops/patch-tokens)
+)
 OPENAI_API_KEY_KEY = "AI/OpenAIKey"
 OPENAI_MODEL_KEY = "AI/OpenAIModel"
 OPENAI_BASE_URL_KEY = "AI/OpenAIBaseUrl"
@@ -95,6 +109,9 @@ def get_huggingface_cache_dir() -> str:
 DEFAULT_PREVIEW_CACHE_SIZE_GB = 2.0  # Default to 2 GB for preview cache
 DEFAULT_EXIF_CACHE_SIZE_MB = 2048  # Default to 2 GB for EXIF cache
 MAX_EXIF_CACHE_SIZE_MB = 5120  # Largest selectable EXIF cache limit (5 GB)
+DEFAULT_CACHE_DISK_BUDGET_GB = 0.0  # 0 = the sum of the per-cache limits
+CACHE_STORAGE_BACKENDS = ("diskcache", "lmdb")
+DEFAULT_CACHE_STORAGE_BACKEND = "diskcache"  # LMDB is opt-in per cache
 DEFAULT_ROTATION_CONFIRM_LOSSY = True  # Default to asking before lossy rotation
 DEFAULT_SHOW_WORKFLOW_SHORTCUTS = True
 DEFAULT_WORKFLOW_STEP_VISIBILITY = dict.fromkeys(WORKFLOW_STEP_VISIBILITY_KEYS, True)
@@ -106,6 +123,13 @@ ROTATION_MODEL_DOWNLOAD_URL = (
 DEFAULT_UPDATE_CHECK_ENABLED = True  # Default to enable automatic update checks
 DEFAULT_PERFORMANCE_MODE = PerformanceMode.BALANCED  # Default to balanced mode
 DEFAULT_CUSTOM_THREAD_COUNT = 4  # Default custom thread count
+IMAGE_DECODE_BACKENDS = ("thread", "process")
+DEFAULT_IMAGE_DECODE_BACKEND = "thread"  # Process pool is opt-in
+DEFAULT_CONTENT_ADDRESSED_CACHE_KEYS = False  # Path-keyed caches unless opted in
+SIMILARITY_INFERENCE_BACKENDS = ("torch", "onnx-int8")
+DEFAULT_SIMILARITY_INFERENCE_BACKEND = "torch"  # Quantized ONNX export is opt-in
+SIMILARITY_REGION_MODES = ("crops", "patch-tokens")
+DEFAULT_SIMILARITY_REGION_MODE = "crops"  # Single-pass patch pooling is opt-in
 DEFAULT_OPENAI_API_KEY = ""
 DEFAULT_OPENAI_MODEL = "Qwen3-VL-30B-A3B-Instruct-MLX-4bit"
 DEFAULT_OPENAI_BASE_URL = "http://127.0.0.1:8000/v1"
@@ -182,10 +206,13 @@ GROUPING_DROP_HIGHLIGHT_COLOR = (98, 196, 160, 80)  # RGBA teal with alpha
 # Thumbnail Lazy Loading Settings
 THUMBNAIL_PRELOAD_ENABLED = True  # Enable background thumbnail preloading
 THUMBNAIL_PRELOAD_BATCH_SIZE = 20  # Number of thumbnails to generate per batch
+THUMBNAIL_CACHE_READ_BATCH_SIZE = 250  # Queued paths checked per disk-cache read
 THUMBNAIL_PRELOAD_VISIBLE_MARGIN = (
     10  # Number of items above/below visible area to preload
 )
 IMAGE_MEMORY_CACHE_SIZE_BYTES = 256 * 1024 * 1024  # Shared hot-image budget
+ENCODED_MEMORY_CACHE_SIZE_BYTES = 256 * 1024 * 1024  # Encoded payloads behind it
+HOT_SET_RESTORE_BATCH_SIZE = 8  # Disk-cache keys read per hot-set warm-up step
 NAVIGATION_PREVIEW_LOOKAHEAD = 4  # Selected image plus a small directional buffer
 
 # Preview size estimation
@@ -200,6 +227,9 @@ DBSCAN_EPS = (
 )
 DBSCAN_MIN_SAMPLES = 2  # Minimum number of images to form a dense region (cluster)
 DEFAULT_SIMILARITY_BATCH_SIZE = 16  # Default batch size for similarity processing
+SIMILARITY_DECODE_WORKERS_MAX = 4  # Analysis-image loaders feeding the model
+SIMILARITY_PREFETCH_BATCHES = 3  # Batches decoded ahead of the one being encoded
+SIMILARITY_PREFETCH_MAX_BYTES = 192 * 1024 * 1024  # Decoded pixels queued ahead
 MIN_SIMILARITY_CLUSTERING_EPS = 0.02
 MAX_SIMILARITY_CLUSTERING_EPS = 0.20
 DEFAULT_SIMILARITY_CLUSTERING_EPS = DBSCAN_EPS
@@ -226,9 +256,30 @@ DEFAULT_THUMBNAIL_CACHE_SIZE_BYTES = (
     2**30
 )  # 1 GiB (1,073,741,824 bytes) default for thumbnail cache
 THUMBNAIL_MIN_FILE_SIZE = 1024 * 1024  # 1 MB minimum file size for disk caching
+# Cache codec profile per tier (see core.caching.image_codec.CACHE_CODEC_PROFILES)
+THUMBNAIL_CACHE_CODEC = "jpeg_fast"
 
 # Preview cache
 PREVIEW_CACHE_MIN_FILE_SIZE = 256 * 1024  # 256 KB minimum file size for disk caching
+PREVIEW_CACHE_CODEC = "jpeg_fast"
+
+# Analysis pixel store (uncompressed 1024 px analysis images, ~3 MB each)
+ANALYSIS_PIXEL_CACHE_SIZE_BYTES = 4 * 2**30  # 4 GiB
+
+# Per-folder thumbnail packs (raw grid thumbnails read in bulk on folder open)
+THUMBNAIL_PACK_CACHE_SIZE_BYTES = 2 * 2**30  # 2 GiB across all folders
+THUMBNAIL_PACK_LOAD_BYTES = 128 * 1024 * 1024  # Share of the hot-image budget
+
+# Content-addressed cache keys: bytes hashed from each end of a file, and the
+# budget of the persistent path -> digest side index
+CONTENT_DIGEST_CHUNK_BYTES = 64 * 1024
+CONTENT_DIGEST_INDEX_SIZE_BYTES = 64 * 1024 * 1024
+
+# Negative cache of files that failed to decode, keyed by path, tier and
+# (size, mtime_ns); a changed file is retried
+DECODE_FAILURE_CACHE_SIZE_BYTES = 16 * 1024 * 1024
+DECODE_FAILURE_SKIP_ATTEMPTS = 2  # Failures of one file version before it is skipped
+DECODE_FAILURE_RETRY_SECONDS = 7 * 24 * 3600  # Recorded failures expire after this
 
 # EXIF cache
 EXIF_CACHE_MIN_FILE_SIZE = 4096  # 4 KB minimum file size for disk caching
@@ -236,6 +287,13 @@ EXIF_CACHE_MIN_FILE_SIZE = 4096  # 4 KB minimum file size for disk caching
 # Rating cache
 DEFAULT_RATING_CACHE_SIZE_LIMIT_MB = 256  # Default 256MB limit for rating cache
 
+# Global disk budget (core.caching.cache_budget). Each cache's own limit is its
+# share; the hard cap gets headroom so space freed in one cache can go to another.
+CACHE_BUDGET_HEADROOM_FACTOR = 2.0  # Hard per-cache cap as a multiple of its share
+CACHE_BUDGET_LOW_WATERMARK = 0.9  # Evict down to this fraction of the budget
+CACHE_BUDGET_PROTECTED_FOLDERS = 3  # Most recently opened folders are never evicted
+FOLDER_RECENCY_HALF_LIFE_SECONDS = 14 * 24 * 3600  # Decay of folder open counts
+
 # --- File Operation Constants ---
 
 # --- Image Processing Constants ---
@@ -244,6 +302,10 @@ THUMBNAIL_MAX_SIZE = (256, 256)  # Maximum size for thumbnails
 PRELOAD_MAX_RESOLUTION = (1920, 1200)  # Fixed high resolution for preloading
 DISPLAY_MAX_RESOLUTION = (2560, 2560)  # Enough for a sharp screen preview/zoom
 BLUR_DETECTION_PREVIEW_SIZE = (640, 480)  # Size for image used in blur detection
+# Reduced decodes keep this multiple of the final size before the LANCZOS pass
+DOWNSCALE_REDUCING_GAP = 2.0
+# Embedded JPEG/TIFF previews paint the grid first when their long edge is this big
+EMBEDDED_THUMBNAIL_MIN_SIZE = 160
 
 # --- Update Check Constants ---
 UPDATE_CHECK_INTERVAL_HOURS = 24  # Check for updates every 24 hours
@@ -295,6 +357,47 @@ def get_exif_cache_size_bytes() -> int:
     return get_exif_cache_size_mb() * 1024 * 1024
 
 
+# --- Global Cache Disk Budget ---
+def get_cache_disk_budget_gb() -> float:
+    """Gets the global cache disk budget in GB (0 = sum of per-cache limits)."""
+    settings = _get_settings()
+    return settings.value(
+        CACHE_DISK_BUDGET_GB_KEY, DEFAULT_CACHE_DISK_BUDGET_GB, type=float
+    )
+
+
+def set_cache_disk_budget_gb(size_gb: float):
+    """Sets the global cache disk budget in GB (0 = sum of per-cache limits)."""
+    settings = _get_settings()
+    settings.setValue(CACHE_DISK_BUDGET_GB_KEY, max(0.0, float(size_gb)))
+
+
+def get_cache_disk_budget_bytes() -> int:
+    """Gets the global cache disk budget in bytes (0 = sum of per-cache limits)."""
+    return int(get_cache_disk_budget_gb() * 1024 * 1024 * 1024)
+
+
+def get_cache_storage_backend(cache_name: str) -> str:
+    """Gets the storage backend of one persistent cache (e.g. "previews")."""
+    settings = _get_settings()
+    backend = settings.value(
+        f"{CACHE_STORAGE_BACKEND_KEY}/{cache_name}",
+        DEFAULT_CACHE_STORAGE_BACKEND,
+        type=str,
+    )
+    return (
+        backend if backend in CACHE_STORAGE_BACKENDS else DEFAULT_CACHE_STORAGE_BACKEND
+    )
+
+
+def set_cache_storage_backend(cache_name: str, backend: str):
+    """Sets the storage backend of one cache; it applies on the next launch."""
+    if backend not in CACHE_STORAGE_BACKENDS:
+        raise ValueError(f"Unknown cache storage backend: {backend}")
+    settings = _get_settings()
+    settings.setValue(f"{CACHE_STORAGE_BACKEND_KEY}/{cache_name}", backend)
+
+
 # --- PyTorch/CUDA Information ---
 # --- Rotation Settings ---
 def get_rotation_confirm_lossy() -> bool:
@@ -654,6 +757,77 @@ def set_custom_thread_count(count: int):
     settings.setValue(CUSTOM_THREAD_COUNT_KEY, count)
 
 
+def get_image_decode_backend() -> str:
+    """Gets the image decode backend, falling back to threads for unknown values."""
+    settings = _get_settings()
+    backend = settings.value(
+        IMAGE_DECODE_BACKEND_KEY, DEFAULT_IMAGE_DECODE_BACKEND, type=str
+    )
+    return backend if backend in IMAGE_DECODE_BACKENDS else DEFAULT_IMAGE_DECODE_BACKEND
+
+
+def set_image_decode_backend(backend: str):
+    """Sets the image decode backend ("thread" or "process")."""
+    if backend not in IMAGE_DECODE_BACKENDS:
+        raise ValueError(f"Unknown image decode backend: {backend}")
+    settings = _get_settings()
+    settings.setValue(IMAGE_DECODE_BACKEND_KEY, backend)
+
+
+def get_similarity_inference_backend() -> str:
+    """Gets the similarity embedding backend, falling back to torch for unknown values."""
+    settings = _get_settings()
+    backend = settings.value(
+        SIMILARITY_INFERENCE_BACKEND_KEY, DEFAULT_SIMILARITY_INFERENCE_BACKEND, type=str
+    )
+    return (
+        backend
+        if backend in SIMILARITY_INFERENCE_BACKENDS
+        else DEFAULT_SIMILARITY_INFERENCE_BACKEND
+    )
+
+
+def set_similarity_inference_backend(backend: str):
+    """Sets the similarity embedding backend ("torch" or "onnx-int8")."""
+    if backend not in SIMILARITY_INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown similarity inference backend: {backend}")
+    settings = _get_settings()
+    settings.setValue(SIMILARITY_INFERENCE_BACKEND_KEY, backend)
+
+
+def get_similarity_region_mode() -> str:
+    """Gets how regional embeddings are built, falling back to crops for unknown values."""
+    settings = _get_settings()
+    mode = settings.value(
+        SIMILARITY_REGION_MODE_KEY, DEFAULT_SIMILARITY_REGION_MODE, type=str
+    )
+    return mode if mode in SIMILARITY_REGION_MODES else DEFAULT_SIMILARITY_REGION_MODE
+
+
+def set_similarity_region_mode(mode: str):
+    """Sets how regional embeddings are built ("crops" or "patch-tokens")."""
+    if mode not in SIMILARITY_REGION_MODES:
+        raise ValueError(f"Unknown similarity region mode: {mode}")
+    settings = _get_settings()
+    settings.setValue(SIMILARITY_REGION_MODE_KEY, mode)
+
+
+def get_content_addressed_cache_keys() -> bool:
+    """Gets whether image caches are keyed by file content instead of path."""
+    settings = _get_settings()
+    return settings.value(
+        CONTENT_ADDRESSED_CACHE_KEYS_KEY,
+        DEFAULT_CONTENT_ADDRESSED_CACHE_KEYS,
+        type=bool,
+    )
+
+
+def set_content_addressed_cache_keys(enabled: bool):
+    """Sets whether image caches are keyed by file content instead of path."""
+    settings = _get_settings()
+    settings.setValue(CONTENT_ADDRESSED_CACHE_KEYS_KEY, bool(enabled))
+
+
 def calculate_max_workers(min_workers: int = 1, max_workers: int | None = None) -> int:
     """
     Calculate the optimal number of worker threads based on the current performance mode.
@@ -3,7 +3,7 @@ import logging
 import os
 import time
 
-import diskcache
+from core.caching.storage_backend import open_cache_store
 from core.runtime_paths import resolve_user_cache_dir
 
 
@@ -25,7 +25,9 @@ class AnalysisCache:
         if cache_dir is None:
             cache_dir = resolve_user_cache_dir("analysis")
         os.makedirs(cache_dir, exist_ok=True)
-        self._cache = diskcache.Cache(directory=cache_dir, disk_min_file_size=0)
+        self._cache = open_cache_store(
+            cache_dir, cache_name="analysis", disk_min_file_size=0
+        )
 
     def close(self) -> None:
         try:
@@ -0,0 +1,332 @@
+"""Raw-pixel disk store for analysis-resolution images.
+
+Analysis workers (Easy Delete, Pick Best, similarity, rotation) read the same
+1024 px images many times. Storing them as uncompressed ``.npy`` arrays lets a
+read memory-map the file instead of decoding a JPEG, and keeps the pixels
+bit-exact. Entries are grouped in one directory per source path so a file's
+variants can be dropped together, and the least recently used entries are
+evicted once the store exceeds its byte budget. Keys are also recorded in the
+shared ``CacheKeyIndex`` so renamed files can carry their entries along; entry
+file names are digests, so entries written before the index cannot be moved
+and are left to eviction.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Iterable
+
+import numpy as np
+from PIL import Image
+
+from core.app_settings import ANALYSIS_PIXEL_CACHE_SIZE_BYTES
+from core.caching.cache_key_index import CacheKeyIndex, normalize_identity
+from core.runtime_paths import resolve_user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+_ENTRY_SUFFIX = ".npy"
+KEY_INDEX_TIER = "analysis"
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:24]
+
+
+class AnalysisPixelStore:
+    """
+    Byte-budgeted, memory-mapped store for analysis images.
+    Keys follow ``ImagePipeline.analysis_cache_key``: the normalized source
+    path comes first and the remaining fields carry the file fingerprint.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        size_limit: int = ANALYSIS_PIXEL_CACHE_SIZE_BYTES,
+        key_index: CacheKeyIndex | None = None,
+    ):
+        if cache_dir is None:
+            cache_dir = resolve_user_cache_dir("analysis_pixels")
+        init_start_time = time.perf_counter()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache_dir = cache_dir
+        self._size_limit_bytes = size_limit
+        self._configured_size_limit_bytes = size_limit
+        self._lock = threading.Lock()
+        # Entry file path -> size in bytes, least recently used first.
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._volume = 0
+        self._load_index()
+        self._owns_key_index = key_index is None
+        # Kept in a hidden directory so _load_index skips it.
+        self._key_index = key_index or CacheKeyIndex(
+            cache_dir=os.path.join(cache_dir, ".key_index")
+        )
+        self._key_index_checked = False
+        logger.info(
+            f"Analysis pixel store initialized at {cache_dir} with {len(self._entries)} entries "
+            f"({self._volume / (1024 * 1024):.2f} MB, size limit {size_limit / (1024 * 1024):.2f} MB)"
+        )
+        logger.debug(
+            f"Initialization complete in {time.perf_counter() - init_start_time:.4f}s"
+        )
+
+    def _load_index(self) -> None:
+        found: list[tuple[float, str, int]] = []
+        with os.scandir(self._cache_dir) as path_dirs:
+            for path_dir in path_dirs:
+                if not path_dir.is_dir() or path_dir.name.startswith("."):
+                    continue
+                with os.scandir(path_dir.path) as entries:
+                    for entry in entries:
+                        if not entry.name.endswith(_ENTRY_SUFFIX):
+                            # Leftover temporary file from an interrupted write.
+                            self._remove_file(entry.path)
+                            continue
+                        stat_result = entry.stat()
+                        found.append(
+                            (stat_result.st_mtime, entry.path, stat_result.st_size)
+                        )
+        for _mtime, entry_path, size in sorted(found):
+            self._entries[entry_path] = size
+            self._volume += size
+
+    def _path_dir(self, file_path: str) -> str:
+        normalized_path = unicodedata.normalize("NFC", os.path.normpath(file_path))
+        return os.path.join(self._cache_dir, _digest(normalized_path))
+
+    def _entry_path(self, key: tuple) -> str:
+        return os.path.join(
+            self._path_dir(key[0]), _digest(repr(key[1:])) + _ENTRY_SUFFIX
+        )
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Windows refuses to delete files that are still memory-mapped.
+            logger.debug(f"Could not remove analysis pixel entry {path}", exc_info=True)
+
+    def get_array(self, key: tuple) -> np.ndarray | None:
+        """Return a read-only, memory-mapped ``uint8`` view of a cached image."""
+        entry_path = self._entry_path(key)
+        with self._lock:
+            if entry_path not in self._entries:
+                return None
+            self._entries.move_to_end(entry_path)
+        try:
+            pixels = np.load(entry_path, mmap_mode="r", allow_pickle=False)
+            # Persist recency so eviction order survives restarts.
+            os.utime(entry_path)
+            return pixels
+        except FileNotFoundError:
+            self._forget(entry_path)
+            return None
+        except Exception as e:
+            logger.error(
+                f"Error reading analysis pixel entry for '{os.path.basename(key[0])}': {e}",
+                exc_info=True,
+            )
+            self._forget(entry_path)
+            self._remove_file(entry_path)
+            return None
+
+    def get(self, key: tuple) -> Image.Image | None:
+        """
+        Retrieves an image from the store.
+        The pixels are copied once from the mapping; nothing is decoded.
+        """
+        pixels = self.get_array(key)
+        if pixels is None:
+            return None
+        image = Image.fromarray(pixels)
+        if image.readonly:
+            # Zero-copy modes would keep the file mapped; detach them.
+            image = image.copy()
+        return image
+
+    def set(self, key: tuple, value: Image.Image) -> None:
+        """Stores an image's pixels and evicts old entries beyond the budget."""
+        if not isinstance(value, Image.Image):
+            logger.error(
+                f"Attempted to cache non-Image object for key '{key}'. Type: {type(value)}"
+            )
+            return
+        entry_path = self._entry_path(key)
+        temp_path = f"{entry_path}.{threading.get_ident()}.tmp"
+        try:
+            pixels = np.asarray(value)
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            with open(temp_path, "wb") as handle:
+                np.save(handle, pixels, allow_pickle=False)
+            os.replace(temp_path, entry_path)
+            size = os.path.getsize(entry_path)
+        except Exception as e:
+            logger.error(
+                f"Error writing analysis pixel entry for '{os.path.basename(key[0])}': {e}",
+                exc_info=True,
+            )
+            self._remove_file(temp_path)
+            return
+
+        self._key_index.add(KEY_INDEX_TIER, [key])
+        evicted: list[str] = []
+        with self._lock:
+            self._volume -= self._entries.pop(entry_path, 0)
+            self._entries[entry_path] = size
+            self._volume += size
+            while self._volume > self._size_limit_bytes and len(self._entries) > 1:
+                oldest_path, oldest_size = self._entries.popitem(last=False)
+                self._volume -= oldest_size
+                evicted.append(oldest_path)
+        for oldest_path in evicted:
+            self._remove_file(oldest_path)
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} analysis pixel entries")
+
+    def _forget(self, entry_path: str) -> None:
+        with self._lock:
+            self._volume -= self._entries.pop(entry_path, 0)
+
+    def _ensure_key_index(self) -> None:
+        """Drop index rows of evicted entries once they pile up."""
+        if self._key_index_checked:
+            return
+        self._key_index_checked = True
+        with self._lock:
+            live_entries = len(self._entries)
+        if self._key_index.needs_rebuild(KEY_INDEX_TIER, live_entries):
+
+            def live_keys() -> list[tuple]:
+                keys = self._key_index.tier_keys(KEY_INDEX_TIER)
+                with self._lock:
+                    return [
+                        key for key in keys if self._entry_path(key) in self._entries
+                    ]
+
+            self._key_index.rebuild(KEY_INDEX_TIER, live_keys)
+
+    def delete_all_for_path(self, file_path: str) -> None:
+        """Deletes every stored variant of one source file."""
+        self.delete_all_for_paths([file_path])
+
+    def delete_all_for_paths(self, file_paths: Iterable[str]) -> int:
+        """Deletes every stored variant of several source files."""
+        file_paths = list(dict.fromkeys(file_paths))
+        self._key_index.remove_paths(KEY_INDEX_TIER, file_paths)
+        path_dirs = {self._path_dir(file_path) for file_path in file_paths}
+        with self._lock:
+            stale = [
+                path for path in self._entries if os.path.dirname(path) in path_dirs
+            ]
+            for entry_path in stale:
+                self._volume -= self._entries.pop(entry_path)
+        for path_dir in path_dirs:
+            shutil.rmtree(path_dir, ignore_errors=True)
+        if stale:
+            logger.debug(f"Deleted {len(stale)} analysis pixel entries.")
+        return len(stale)
+
+    def migrate_paths(self, path_updates: Iterable[tuple[str, str]]) -> int:
+        """Moves indexed entries of renamed files to keys for their new paths."""
+        self._ensure_key_index()
+        moved = 0
+        for old_path, new_path in path_updates:
+            new_keys = []
+            for key in self._key_index.remove_paths(KEY_INDEX_TIER, [old_path]):
+                new_key = (new_path, *key[1:])
+                entry_path = self._entry_path(key)
+                new_entry_path = self._entry_path(new_key)
+                with self._lock:
+                    size = self._entries.pop(entry_path, None)
+                    if size is None:
+                        continue
+                    self._volume -= size
+                try:
+                    os.makedirs(os.path.dirname(new_entry_path), exist_ok=True)
+                    os.replace(entry_path, new_entry_path)
+                except OSError:
+                    logger.debug(
+                        f"Could not move analysis pixel entry {entry_path}",
+                        exc_info=True,
+                    )
+                    self._remove_file(entry_path)
+                    continue
+                with self._lock:
+                    self._volume -= self._entries.pop(new_entry_path, 0)
+                    self._entries[new_entry_path] = size
+                    self._volume += size
+                new_keys.append(new_key)
+            self._key_index.add(KEY_INDEX_TIER, new_keys)
+            moved += len(new_keys)
+        return moved
+
+    def cached_folders(self) -> set[str]:
+        """Returns the folders of indexed entries, content-keyed ones included."""
+        self._ensure_key_index()
+        return self._key_index.folders(KEY_INDEX_TIER)
+
+    def evict_folders(self, folders: Iterable[str]) -> int:
+        """Deletes every stored variant of the files directly inside folders."""
+        self._ensure_key_index()
+        return self.delete_all_for_paths(
+            self._key_index.identities_in_folders(KEY_INDEX_TIER, folders)
+        )
+
+    def dataset_residency(self, keys: Iterable[str]) -> tuple[int, int]:
+        """Return how many unique source paths still have a stored entry."""
+        canonical_paths = {normalize_identity(key) for key in keys if key}
+        resident_count = sum(
+            any(
+                stored_key in self
+                for stored_key in self._key_index.keys_for_paths(KEY_INDEX_TIER, [path])
+            )
+            for path in canonical_paths
+        )
+        return resident_count, len(canonical_paths)
+
+    def get_current_size_limit_bytes(self) -> int:
+        """Return the configured byte budget (its share of the disk budget)."""
+        return self._configured_size_limit_bytes
+
+    def set_size_limit(self, size_limit: int) -> None:
+        """Sets the hard byte limit enforced on the next write."""
+        with self._lock:
+            self._size_limit_bytes = int(size_limit)
+
+    def clear(self) -> None:
+        """Clears all items from the store."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._volume = 0
+        with os.scandir(self._cache_dir) as path_dirs:
+            for path_dir in path_dirs:
+                if path_dir.is_dir() and not path_dir.name.startswith("."):
+                    shutil.rmtree(path_dir.path, ignore_errors=True)
+        self._key_index.clear(KEY_INDEX_TIER)
+        logger.info(f"Cleared {count} items from Analysis pixel store.")
+
+    def volume(self) -> int:
+        """Returns the current disk usage of the store in bytes."""
+        with self._lock:
+            return self._volume
+
+    def close(self) -> None:
+        """Entries are complete files once written; only a private index closes."""
+        if self._owns_key_index:
+            self._key_index.close()
+
+    def __contains__(self, key: tuple) -> bool:
+        entry_path = self._entry_path(key)
+        with self._lock:
+            return entry_path in self._entries
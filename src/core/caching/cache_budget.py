@@ -0,0 +1,278 @@
+"""One disk budget shared by all PhotoSort caches.
+
+Each cache keeps its configured size limit as its *share* of a global budget
+(by default the sum of all shares). The hard limit each cache enforces on its
+own is raised to ``CACHE_BUDGET_HEADROOM_FACTOR`` times its share, so a
+preview-heavy session can grow the preview tier past its share while EXIF
+data of folders nobody opens any more is evicted instead.
+
+Eviction works per folder and across caches: every folder is scored by how
+often it was opened, decayed by how long ago (``FOLDER_RECENCY_HALF_LIFE_SECONDS``),
+and the coldest folders lose their entries in every cache until the total is
+back under ``CACHE_BUDGET_LOW_WATERMARK`` of the budget. The most recently
+opened folders are never evicted.
+
+A registered cache must provide ``volume()`` and ``evict_folders(folders)``.
+``cached_folders()``, ``dataset_residency(paths)``,
+``get_current_size_limit_bytes()`` and ``set_size_limit(bytes)`` are used
+when present.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from core.app_settings import (
+    CACHE_BUDGET_HEADROOM_FACTOR,
+    CACHE_BUDGET_LOW_WATERMARK,
+    CACHE_BUDGET_PROTECTED_FOLDERS,
+    FOLDER_RECENCY_HALF_LIFE_SECONDS,
+    get_cache_disk_budget_bytes,
+)
+from core.caching.cache_key_index import normalize_identity
+from core.runtime_paths import resolve_user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+_FOLDER_STATS_FILE_NAME = "folders.json"
+_MAX_TRACKED_FOLDERS = 5000
+
+
+@dataclass(slots=True)
+class CacheResidency:
+    """Usage and eviction counters of one cache under the global budget."""
+
+    name: str
+    volume_bytes: int
+    share_bytes: int
+    resident_entries: int | None = None
+    dataset_entries: int | None = None
+    evicted_entries: int = 0
+    evicted_bytes: int = 0
+
+
+class CacheBudgetManager:
+    """Enforces one disk budget across registered caches by folder eviction."""
+
+    def __init__(
+        self,
+        state_dir: str | None = None,
+        budget_bytes: int | None = None,
+        headroom_factor: float = CACHE_BUDGET_HEADROOM_FACTOR,
+    ):
+        if state_dir is None:
+            state_dir = resolve_user_cache_dir("cache_budget")
+        os.makedirs(state_dir, exist_ok=True)
+        self._stats_path = os.path.join(state_dir, _FOLDER_STATS_FILE_NAME)
+        self._budget_bytes = budget_bytes
+        self._headroom_factor = headroom_factor
+        self._members: dict[str, object] = {}
+        self._evicted: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+        self._enforce_lock = threading.Lock()
+        # Folder -> [last opened (epoch seconds), decayed open count].
+        self._folders: dict[str, list[float]] = self._load_folder_stats()
+
+    def _load_folder_stats(self) -> dict[str, list[float]]:
+        try:
+            with open(self._stats_path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            return {
+                folder: [float(entry[0]), float(entry[1])]
+                for folder, entry in data.items()
+            }
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            logger.warning("Ignoring unreadable folder access stats.", exc_info=True)
+            return {}
+
+    def _save_folder_stats(self) -> None:
+        temp_path = f"{self._stats_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump(self._folders, handle)
+            os.replace(temp_path, self._stats_path)
+        except OSError:
+            logger.warning("Could not save folder access stats.", exc_info=True)
+
+    def register(self, name: str, cache) -> None:
+        """Adds a cache to the budget and gives its hard limit headroom."""
+        with self._lock:
+            self._members[name] = cache
+            self._evicted.setdefault(name, [0, 0])
+        self._apply_limit(cache)
+
+    def apply_limits(self) -> None:
+        """Re-applies hard limits, e.g. after a cache reloaded its settings."""
+        with self._lock:
+            members = list(self._members.values())
+        for cache in members:
+            self._apply_limit(cache)
+
+    def _apply_limit(self, cache) -> None:
+        get_share = getattr(cache, "get_current_size_limit_bytes", None)
+        set_limit = getattr(cache, "set_size_limit", None)
+        if get_share is None or set_limit is None:
+            return
+        share = get_share()
+        if isinstance(share, int) and share > 0:
+            set_limit(int(share * self._headroom_factor))
+
+    def budget_bytes(self) -> int:
+        """The global budget: explicit, from settings, or the sum of shares."""
+        if self._budget_bytes:
+            return self._budget_bytes
+        configured = get_cache_disk_budget_bytes()
+        if configured > 0:
+            return configured
+        with self._lock:
+            members = list(self._members.values())
+        return sum(
+            cache.get_current_size_limit_bytes()
+            for cache in members
+            if hasattr(cache, "get_current_size_limit_bytes")
+        )
+
+    def note_folder_opened(self, folder: str, now: float | None = None) -> None:
+        """Records a folder open; frequent and recent folders are evicted last."""
+        if not folder:
+            return
+        now = time.time() if now is None else now
+        folder = normalize_identity(folder)
+        with self._lock:
+            last_opened, count = self._folders.get(folder, (now, 0.0))
+            self._folders[folder] = [now, self._decay(count, now - last_opened) + 1]
+            if len(self._folders) > _MAX_TRACKED_FOLDERS:
+                ranked = sorted(
+                    self._folders, key=lambda f: self._score(f, now), reverse=True
+                )
+                self._folders = {
+                    kept: self._folders[kept] for kept in ranked[:_MAX_TRACKED_FOLDERS]
+                }
+            self._save_folder_stats()
+
+    @staticmethod
+    def _decay(count: float, age_seconds: float) -> float:
+        return count * 0.5 ** (max(0.0, age_seconds) / FOLDER_RECENCY_HALF_LIFE_SECONDS)
+
+    def _score(self, folder: str, now: float) -> float:
+        """Decayed open count; folders never opened since tracking began score 0."""
+        entry = self._folders.get(folder)
+        if entry is None:
+            return 0.0
+        return self._decay(entry[1], now - entry[0])
+
+    def _protected_folders(self, protect: Iterable[str]) -> set[str]:
+        recent = sorted(self._folders, key=lambda f: self._folders[f][0], reverse=True)
+        return {normalize_identity(folder) for folder in protect if folder}.union(
+            recent[:CACHE_BUDGET_PROTECTED_FOLDERS]
+        )
+
+    def enforce(self, protect: Iterable[str] = (), now: float | None = None) -> int:
+        """
+        Evicts the coldest folders from every cache until the total volume is
+        under the low watermark of the budget.
+
+        Args:
+            protect: Folders that must keep their entries, e.g. the open one.
+            now: Reference time for folder recency (defaults to the clock).
+
+        Returns:
+            int: The number of bytes freed.
+        """
+        now = time.time() if now is None else now
+        with self._enforce_lock:
+            with self._lock:
+                members = dict(self._members)
+                protected = self._protected_folders(protect)
+            volumes = {name: cache.volume() for name, cache in members.items()}
+            total = sum(volumes.values())
+            budget = self.budget_bytes()
+            if total <= budget:
+                return 0
+            target = int(budget * CACHE_BUDGET_LOW_WATERMARK)
+            start_time = time.perf_counter()
+
+            candidates: set[str] = set()
+            for cache in members.values():
+                list_folders = getattr(cache, "cached_folders", None)
+                if list_folders is not None:
+                    candidates.update(normalize_identity(f) for f in list_folders())
+            with self._lock:
+                ordered = sorted(
+                    candidates - protected, key=lambda f: (self._score(f, now), f)
+                )
+
+            freed = 0
+            evicted_folders = 0
+            batch_size = 1
+            # Folder scans cost a pass over some caches, so batches double in size.
+            while ordered and total > target:
+                batch, ordered = ordered[:batch_size], ordered[batch_size:]
+                batch_size *= 2
+                evicted_folders += len(batch)
+                for name, cache in members.items():
+                    removed = cache.evict_folders(batch)
+                    if not removed:
+                        continue
+                    volume = cache.volume()
+                    released = max(0, volumes[name] - volume)
+                    volumes[name] = volume
+                    total -= released
+                    freed += released
+                    with self._lock:
+                        self._evicted[name][0] += removed
+                        self._evicted[name][1] += released
+            logger.info(
+                f"Cache budget: evicted {evicted_folders} cold folders, freed "
+                f"{freed / (1024 * 1024):.1f} MB in {time.perf_counter() - start_time:.2f}s "
+                f"({total / (1024 * 1024):.1f} MB of {budget / (1024 * 1024):.1f} MB used)"
+            )
+            return freed
+
+    def enforce_async(self, protect: Iterable[str] = ()) -> None:
+        """Runs ``enforce`` on a daemon thread unless a pass is already running."""
+        if self._enforce_lock.locked():
+            return
+        protect = list(protect)
+
+        def run() -> None:
+            try:
+                self.enforce(protect)
+            except Exception:
+                logger.error("Cache budget enforcement failed.", exc_info=True)
+
+        threading.Thread(target=run, name="CacheBudget", daemon=True).start()
+
+    def stats(self, dataset_paths: Iterable[str] | None = None) -> list[CacheResidency]:
+        """
+        Returns usage and eviction counters per cache. With ``dataset_paths``
+        (e.g. the open folder's files), caches that can tell also report how
+        many of those paths they still hold.
+        """
+        paths = list(dataset_paths) if dataset_paths is not None else None
+        with self._lock:
+            members = dict(self._members)
+            evicted = {name: list(counts) for name, counts in self._evicted.items()}
+        result = []
+        for name, cache in members.items():
+            get_share = getattr(cache, "get_current_size_limit_bytes", None)
+            residency = CacheResidency(
+                name=name,
+                volume_bytes=cache.volume(),
+                share_bytes=get_share() if get_share is not None else 0,
+                evicted_entries=evicted[name][0],
+                evicted_bytes=evicted[name][1],
+            )
+            dataset_residency = getattr(cache, "dataset_residency", None)
+            if paths is not None and dataset_residency is not None:
+                residency.resident_entries, residency.dataset_entries = (
+                    dataset_residency(paths)
+                )
+            result.append(residency)
+        return result
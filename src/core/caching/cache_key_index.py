@@ -0,0 +1,315 @@
+"""Path -> cache key secondary index shared by the image cache tiers.
+
+Thumbnail, preview and analysis keys start with the source identity (the
+normalized path, or ``content:<digest>``). Finding every variant of one file
+used to mean scanning all keys of a tier. This index keeps one SQLite row per
+``(identity, tier, key)`` so invalidating or migrating N files costs N indexed
+lookups, independent of the cache size.
+
+Rows are advisory: a key evicted by its cache stays indexed until its path is
+invalidated or the tier is rebuilt, and deleting a missing key is a no-op.
+Content identities carry no folder; an optional resolver (see
+``set_identity_folder_resolver``) maps them to the folder they were last seen
+in, so folder-based eviction reaches them too.
+Tiers whose entries predate the index are backfilled once from the cache's own
+key listing (see ``needs_rebuild`` and ``rebuild``).
+"""
+
+import contextlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections.abc import Callable, Iterable
+
+from core.runtime_paths import resolve_user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+_INDEX_FILE_NAME = "index.sqlite3"
+# Rebuild a tier once it holds this many rows more than twice its live entries.
+_STALE_ROW_ALLOWANCE = 1000
+
+
+def normalize_identity(identity: str) -> str:
+    """Return the form used to compare cache key identities."""
+    return unicodedata.normalize("NFC", os.path.normpath(identity))
+
+
+def _encode_key(key: tuple) -> bytes:
+    return pickle.dumps(key, protocol=4)
+
+
+class CacheKeyIndex:
+    """Thread-safe ``(identity, tier) -> keys`` index stored in SQLite."""
+
+    def __init__(self, cache_dir: str | None = None):
+        if cache_dir is None:
+            cache_dir = resolve_user_cache_dir("cache_key_index")
+        init_start_time = time.perf_counter()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            os.path.join(cache_dir, _INDEX_FILE_NAME),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_keys ("
+            "identity TEXT NOT NULL, tier TEXT NOT NULL, key BLOB NOT NULL, "
+            "PRIMARY KEY (identity, tier, key)) WITHOUT ROWID"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS indexed_tiers (tier TEXT PRIMARY KEY)"
+        )
+        # Keys written this session; repeated sets skip the INSERT.
+        self._known: set[tuple[str, bytes]] = set()
+        self._identity_folder_resolver: Callable[[], dict[str, str]] | None = None
+        logger.debug(
+            f"Cache key index opened at {cache_dir} in {time.perf_counter() - init_start_time:.4f}s"
+        )
+
+    def add(self, tier: str, keys: Iterable[tuple]) -> None:
+        """Record cache keys; the identity is each key's first field."""
+        rows = []
+        with self._lock:
+            for key in keys:
+                encoded = _encode_key(key)
+                if (tier, encoded) in self._known:
+                    continue
+                self._known.add((tier, encoded))
+                rows.append((normalize_identity(key[0]), tier, encoded))
+            if not rows:
+                return
+            try:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO cache_keys VALUES (?, ?, ?)", rows
+                )
+            except sqlite3.Error:
+                logger.error("Cache key index write failed", exc_info=True)
+                for _identity, _tier, encoded in rows:
+                    self._known.discard((tier, encoded))
+
+    def keys_for_paths(self, tier: str, identities: Iterable[str]) -> list[tuple]:
+        """Return the indexed keys of one tier for several identities."""
+        normalized = list(dict.fromkeys(normalize_identity(i) for i in identities))
+        keys: list[tuple] = []
+        with self._lock:
+            try:
+                for identity in normalized:
+                    rows = self._connection.execute(
+                        "SELECT key FROM cache_keys WHERE identity = ? AND tier = ?",
+                        (identity, tier),
+                    ).fetchall()
+                    keys.extend(pickle.loads(row[0]) for row in rows)
+            except sqlite3.Error:
+                logger.error("Cache key index read failed", exc_info=True)
+        return keys
+
+    def remove_paths(self, tier: str, identities: Iterable[str]) -> list[tuple]:
+        """Drop and return the indexed keys of one tier for several identities."""
+        normalized = list(dict.fromkeys(normalize_identity(i) for i in identities))
+        keys: list[tuple] = []
+        with self._lock:
+            try:
+                self._connection.execute("BEGIN")
+                for identity in normalized:
+                    rows = self._connection.execute(
+                        "SELECT key FROM cache_keys WHERE identity = ? AND tier = ?",
+                        (identity, tier),
+                    ).fetchall()
+                    self._connection.execute(
+                        "DELETE FROM cache_keys WHERE identity = ? AND tier = ?",
+                        (identity, tier),
+                    )
+                    for (encoded,) in rows:
+                        self._known.discard((tier, encoded))
+                        keys.append(pickle.loads(encoded))
+                self._connection.execute("COMMIT")
+            except sqlite3.Error:
+                logger.error("Cache key index delete failed", exc_info=True)
+                self._rollback()
+        return keys
+
+    def remove_keys(self, tier: str, keys: Iterable[tuple]) -> None:
+        """Drop individual keys from one tier."""
+        rows = [(tier, _encode_key(key)) for key in keys]
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                self._known.discard(row)
+            try:
+                self._connection.executemany(
+                    "DELETE FROM cache_keys WHERE tier = ? AND key = ?", rows
+                )
+            except sqlite3.Error:
+                logger.error("Cache key index delete failed", exc_info=True)
+
+    def tier_keys(self, tier: str) -> list[tuple]:
+        """Return every indexed key of one tier."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key FROM cache_keys WHERE tier = ?", (tier,)
+            ).fetchall()
+        return [pickle.loads(row[0]) for row in rows]
+
+    def identities(self, tier: str) -> list[str]:
+        """Return every identity with indexed keys in one tier."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT identity FROM cache_keys WHERE tier = ?", (tier,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_identity_folder_resolver(
+        self, resolver: Callable[[], dict[str, str]] | None
+    ) -> None:
+        """Set the callable mapping non-path identities to their folder."""
+        self._identity_folder_resolver = resolver
+
+    def _resolved_folders(self) -> dict[str, str]:
+        if self._identity_folder_resolver is None:
+            return {}
+        try:
+            resolved = self._identity_folder_resolver()
+        except Exception:
+            logger.warning("Could not resolve cache identity folders", exc_info=True)
+            return {}
+        return {
+            normalize_identity(identity): normalize_identity(folder)
+            for identity, folder in resolved.items()
+        }
+
+    def folders(self, tier: str) -> set[str]:
+        """Return the folders holding entries of one tier."""
+        resolved = self._resolved_folders()
+        return {
+            folder
+            for identity in self.identities(tier)
+            if (folder := resolved.get(identity) or os.path.dirname(identity))
+        }
+
+    def identities_in_folders(self, tier: str, folders: Iterable[str]) -> list[str]:
+        """Return the indexed identities of one tier directly inside folders."""
+        wanted = dict.fromkeys(normalize_identity(f) for f in folders)
+        resolved = [
+            identity
+            for identity, folder in self._resolved_folders().items()
+            if folder in wanted
+        ]
+        with self._lock:
+            identities = [
+                identity
+                for identity in resolved
+                if self._connection.execute(
+                    "SELECT 1 FROM cache_keys WHERE identity = ? AND tier = ? LIMIT 1",
+                    (identity, tier),
+                ).fetchone()
+            ]
+            for folder in wanted:
+                # Children of a folder sort between "<folder>/" and "<folder>0".
+                prefix = os.path.join(folder, "")
+                rows = self._connection.execute(
+                    "SELECT DISTINCT identity FROM cache_keys "
+                    "WHERE identity >= ? AND identity < ? AND tier = ?",
+                    (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1), tier),
+                ).fetchall()
+                identities.extend(
+                    row[0] for row in rows if os.path.dirname(row[0]) == folder
+                )
+        return identities
+
+    def needs_rebuild(self, tier: str, live_entries: int) -> bool:
+        """
+        Whether a tier was never indexed or has collected many stale rows.
+        ``live_entries`` is the number of entries the cache currently holds.
+        """
+        with self._lock:
+            indexed = self._connection.execute(
+                "SELECT 1 FROM indexed_tiers WHERE tier = ?", (tier,)
+            ).fetchone()
+            if indexed is None:
+                return True
+            (rows,) = self._connection.execute(
+                "SELECT COUNT(*) FROM cache_keys WHERE tier = ?", (tier,)
+            ).fetchone()
+        return rows > 2 * live_entries + _STALE_ROW_ALLOWANCE
+
+    def rebuild(self, tier: str, list_live_keys: Callable[[], Iterable[tuple]]) -> None:
+        """
+        Index every live key of a tier and drop rows for keys it no longer has.
+        Rows are snapshotted before ``list_live_keys`` runs, so keys added by a
+        concurrent ``set`` are never mistaken for stale ones.
+        """
+        with self._lock:
+            snapshot = {
+                row[0]
+                for row in self._connection.execute(
+                    "SELECT key FROM cache_keys WHERE tier = ?", (tier,)
+                )
+            }
+        live = {_encode_key(key): key for key in list_live_keys()}
+        stale = snapshot.difference(live)
+        with self._lock:
+            try:
+                self._connection.execute("BEGIN")
+                self._connection.executemany(
+                    "DELETE FROM cache_keys WHERE tier = ? AND key = ?",
+                    [(tier, encoded) for encoded in stale],
+                )
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO cache_keys VALUES (?, ?, ?)",
+                    [
+                        (normalize_identity(key[0]), tier, encoded)
+                        for encoded, key in live.items()
+                    ],
+                )
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO indexed_tiers VALUES (?)", (tier,)
+                )
+                self._connection.execute("COMMIT")
+            except sqlite3.Error:
+                logger.error("Cache key index rebuild failed", exc_info=True)
+                self._rollback()
+                return
+            self._known.difference_update((tier, encoded) for encoded in stale)
+            self._known.update((tier, encoded) for encoded in live)
+        logger.info(
+            f"Indexed {len(live)} {tier} cache keys ({len(stale)} stale rows dropped)"
+        )
+
+    def clear(self, tier: str) -> None:
+        """Drop every row of one tier; an emptied cache needs no backfill."""
+        with self._lock:
+            try:
+                self._connection.execute("BEGIN")
+                self._connection.execute(
+                    "DELETE FROM cache_keys WHERE tier = ?", (tier,)
+                )
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO indexed_tiers VALUES (?)", (tier,)
+                )
+                self._connection.execute("COMMIT")
+            except sqlite3.Error:
+                logger.error("Cache key index clear failed", exc_info=True)
+                self._rollback()
+                return
+            self._known = {known for known in self._known if known[0] != tier}
+
+    def _rollback(self) -> None:
+        with contextlib.suppress(sqlite3.Error):
+            self._connection.execute("ROLLBACK")
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._connection.close()
+            except Exception:
+                logger.error("Error closing cache key index.", exc_info=True)
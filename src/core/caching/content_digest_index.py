@@ -0,0 +1,143 @@
+"""Persistent path -> content digest index for content-addressed cache keys.
+
+A digest covers the file size plus the first and last
+``CONTENT_DIGEST_CHUNK_BYTES`` of the file, which is enough to tell camera
+files apart: their headers carry capture metadata and any re-encode rewrites
+them. The digest of a path is remembered together with the ``(size,
+mtime_ns)`` it was computed for, so it is only recomputed after the file
+changes. A moved or renamed file costs two small reads before its existing
+thumbnails and previews are found again.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+import unicodedata
+
+from core.app_settings import (
+    CONTENT_DIGEST_CHUNK_BYTES,
+    CONTENT_DIGEST_INDEX_SIZE_BYTES,
+)
+from core.caching.storage_backend import open_cache_store
+from core.runtime_paths import resolve_user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+CONTENT_KEY_PREFIX = "content:"
+
+
+def compute_content_digest(
+    path: str, file_size: int, chunk_bytes: int = CONTENT_DIGEST_CHUNK_BYTES
+) -> str:
+    """Hash the size and both ends of a file (the whole file when it is small)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(int(file_size).to_bytes(8, "little"))
+    with open(path, "rb") as handle:
+        digest.update(handle.read(chunk_bytes))
+        if file_size > chunk_bytes:
+            handle.seek(max(chunk_bytes, file_size - chunk_bytes))
+            digest.update(handle.read(chunk_bytes))
+    return digest.hexdigest()
+
+
+class ContentDigestIndex:
+    """Thread-safe path -> digest map backed by a small persistent cache store."""
+
+    def __init__(self, cache_dir: str | None = None):
+        if cache_dir is None:
+            cache_dir = resolve_user_cache_dir("content_digests")
+        init_start_time = time.perf_counter()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache = open_cache_store(
+            cache_dir,
+            cache_name="content_digests",
+            size_limit=CONTENT_DIGEST_INDEX_SIZE_BYTES,
+        )
+        self._lock = threading.Lock()
+        self._memory: dict[str, tuple[int, int, str]] = {}
+        self._stats = {"hits": 0, "computed": 0}
+        logger.debug(
+            f"Content digest index opened at {cache_dir} in {time.perf_counter() - init_start_time:.4f}s"
+        )
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        return unicodedata.normalize("NFC", os.path.normpath(path))
+
+    def digest(self, path: str, file_size: int, mtime_ns: int) -> str | None:
+        """Return the content digest of ``path`` as of the given fingerprint."""
+        normalized_path = self._normalize(path)
+        fingerprint = (int(file_size), int(mtime_ns))
+        with self._lock:
+            entry = self._memory.get(normalized_path)
+        if entry is None:
+            try:
+                entry = self._cache.get(normalized_path)
+            except Exception:
+                logger.debug("Content digest index read failed", exc_info=True)
+                entry = None
+        if entry is not None and tuple(entry[:2]) == fingerprint:
+            with self._lock:
+                self._memory[normalized_path] = entry
+                self._stats["hits"] += 1
+            return entry[2]
+
+        try:
+            content_digest = compute_content_digest(normalized_path, fingerprint[0])
+        except OSError:
+            return None
+        entry = (*fingerprint, content_digest)
+        with self._lock:
+            self._memory[normalized_path] = entry
+            self._stats["computed"] += 1
+        try:
+            self._cache.set(normalized_path, entry)
+        except Exception:
+            logger.debug("Content digest index write failed", exc_info=True)
+        return content_digest
+
+    def forget(self, path: str) -> str | None:
+        """Drop a path's digest and return it, if one was known."""
+        normalized_path = self._normalize(path)
+        with self._lock:
+            entry = self._memory.pop(normalized_path, None)
+        try:
+            stored = self._cache.pop(normalized_path, default=None)
+        except Exception:
+            stored = None
+        entry = entry or stored
+        return entry[2] if entry else None
+
+    def identity_folders(self) -> dict[str, str]:
+        """Map each ``content:<digest>`` identity to the folder it was last seen in."""
+        folders: dict[str, str] = {}
+        try:
+            for path in list(self._cache):
+                entry = self._cache.get(path)
+                if entry is not None:
+                    folders[f"{CONTENT_KEY_PREFIX}{entry[2]}"] = os.path.dirname(path)
+        except Exception:
+            logger.debug("Content digest index scan failed", exc_info=True)
+        with self._lock:
+            # Digests computed this session win over older persisted ones.
+            for path, entry in self._memory.items():
+                folders[f"{CONTENT_KEY_PREFIX}{entry[2]}"] = os.path.dirname(path)
+        return folders
+
+    def stats(self) -> dict[str, int]:
+        """Return lookup counters: remembered ``hits`` and ``computed`` digests."""
+        with self._lock:
+            return dict(self._stats)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        self._cache.clear()
+
+    def close(self) -> None:
+        try:
+            self._cache.close()
+        except Exception:
+            logger.error("Error closing content digest index.", exc_info=True)
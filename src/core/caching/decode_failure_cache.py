@@ -0,0 +1,170 @@
+"""Persistent negative cache of files that failed to decode.
+
+Processors log a decode error and return None, so without a record every grid
+scroll, preload pass and analysis run would retry the same truncated JPEG or
+unsupported RAW variant, often through the slow rawpy fallback. A failure is
+stored per ``(path, tier)`` together with the ``(size, mtime_ns)`` fingerprint
+of the file it was observed on and a short reason. Lookups with a different
+fingerprint miss, so rewriting, repairing or replacing the file retries it.
+
+Processors also return None for transient trouble such as a dropped network
+share or a short-lived memory shortage, so a file is only skipped once it has
+failed ``DECODE_FAILURE_SKIP_ATTEMPTS`` times in a row, and every failure
+expires after ``DECODE_FAILURE_RETRY_SECONDS``.
+"""
+
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from core.app_settings import (
+    DECODE_FAILURE_CACHE_SIZE_BYTES,
+    DECODE_FAILURE_RETRY_SECONDS,
+    DECODE_FAILURE_SKIP_ATTEMPTS,
+)
+from core.caching.storage_backend import open_cache_store
+from core.runtime_paths import resolve_user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DecodeFailure:
+    """One failed decode of a file at a given fingerprint."""
+
+    path: str
+    tier: str
+    file_size: int
+    mtime_ns: int
+    reason: str
+    failed_at: float
+    attempts: int = 1
+
+
+class DecodeFailureCache:
+    """Thread-safe ``(path, tier) -> DecodeFailure`` map backed by a cache store."""
+
+    def __init__(self, cache_dir: str | None = None):
+        if cache_dir is None:
+            cache_dir = resolve_user_cache_dir("decode_failures")
+        init_start_time = time.perf_counter()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache = open_cache_store(
+            cache_dir,
+            cache_name="decode_failures",
+            size_limit=DECODE_FAILURE_CACHE_SIZE_BYTES,
+        )
+        self._lock = threading.Lock()
+        self._failures: dict[tuple[str, str], DecodeFailure] = {}
+        self._stats = {"skipped": 0, "recorded": 0}
+        try:
+            for key in list(self._cache):
+                failure = self._cache.get(key)
+                if isinstance(failure, DecodeFailure):
+                    self._failures[key] = failure
+        except Exception:
+            logger.warning("Could not load the decode failure cache.", exc_info=True)
+        logger.debug(
+            f"Decode failure cache opened at {cache_dir} with {len(self._failures)} "
+            f"entries in {time.perf_counter() - init_start_time:.4f}s"
+        )
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        return unicodedata.normalize("NFC", os.path.normpath(path))
+
+    @staticmethod
+    def _is_current(failure: DecodeFailure, fingerprint: tuple[int, int]) -> bool:
+        """True when ``failure`` was seen on this file version and has not expired."""
+        return (
+            (failure.file_size, failure.mtime_ns) == fingerprint
+            and time.time() - failure.failed_at < DECODE_FAILURE_RETRY_SECONDS
+        )
+
+    def is_failed(self, path: str, tier: str, file_size: int, mtime_ns: int) -> bool:
+        """Return True when ``path`` failed ``tier`` repeatedly at this fingerprint."""
+        key = (self._normalize(path), tier)
+        with self._lock:
+            failure = self._failures.get(key)
+            if failure is None or failure.attempts < DECODE_FAILURE_SKIP_ATTEMPTS:
+                return False
+            if not self._is_current(failure, (int(file_size), int(mtime_ns))):
+                return False
+            self._stats["skipped"] += 1
+            return True
+
+    def record(
+        self, path: str, tier: str, file_size: int, mtime_ns: int, reason: str
+    ) -> DecodeFailure:
+        """Remember that decoding ``path`` for ``tier`` failed, and why."""
+        key = (self._normalize(path), tier)
+        fingerprint = (int(file_size), int(mtime_ns))
+        with self._lock:
+            previous = self._failures.get(key)
+            attempts = 1
+            if previous is not None and self._is_current(previous, fingerprint):
+                attempts = previous.attempts + 1
+            failure = DecodeFailure(
+                key[0], tier, *fingerprint, reason, time.time(), attempts
+            )
+            self._failures[key] = failure
+            self._stats["recorded"] += 1
+        try:
+            self._cache.set(key, failure)
+        except Exception:
+            logger.debug("Decode failure cache write failed", exc_info=True)
+        return failure
+
+    def forget(self, paths: Iterable[str]) -> int:
+        """Drop every tier's failure for ``paths``; returns the number removed."""
+        normalized = {self._normalize(path) for path in paths}
+        with self._lock:
+            stale = [key for key in self._failures if key[0] in normalized]
+            for key in stale:
+                del self._failures[key]
+        for key in stale:
+            try:
+                self._cache.pop(key, default=None)
+            except Exception:
+                logger.debug("Decode failure cache delete failed", exc_info=True)
+        return len(stale)
+
+    def broken_files(self, folder: str | None = None) -> list[DecodeFailure]:
+        """
+        Report recorded failures, optionally limited to one folder tree.
+
+        Args:
+            folder: Only report files below this directory.
+
+        Returns:
+            Failures sorted by path and tier. Entries recorded against an
+            older version of a file are still listed until it is retried.
+        """
+        with self._lock:
+            failures = list(self._failures.values())
+        if folder is not None:
+            prefix = os.path.join(self._normalize(folder), "")
+            failures = [
+                failure for failure in failures if failure.path.startswith(prefix)
+            ]
+        return sorted(failures, key=lambda failure: (failure.path, failure.tier))
+
+    def stats(self) -> dict[str, int]:
+        """Return counters: decodes ``skipped``, failures ``recorded``, ``entries``."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._failures)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._failures.clear()
+        self._cache.clear()
+
+    def close(self) -> None:
+        try:
+            self._cache.close()
+        except Exception:
+            logger.error("Error closing decode failure cache.", exc_info=True)
@@ -0,0 +1,123 @@
+"""In-memory LRU of encoded image cache payloads.
+
+The decoded image LRU in ``ImagePipeline`` holds only a few dozen previews,
+because each costs its full pixel size. Behind it, this tier keeps the
+encoded payloads exactly as the thumbnail and preview caches store them in
+SQLite (JPEG/WEBP/zstd with a codec marker), which are 10-20x smaller. A miss
+in the decoded LRU that hits here costs a decode but no disk read.
+
+One instance is shared by the disk tiers of an ``ImagePipeline``; each tier
+reads through it in ``get``/``get_many``, fills it on ``set``, and drops keys
+it deletes, migrates or clears. Keys are the tiers' own cache keys, whose
+second field names the tier.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from core.app_settings import ENCODED_MEMORY_CACHE_SIZE_BYTES
+
+
+class EncodedMemoryCache:
+    """Thread-safe, byte-budgeted LRU of encoded payloads."""
+
+    def __init__(self, limit_bytes: int = ENCODED_MEMORY_CACHE_SIZE_BYTES):
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self._bytes = 0
+        self._limit_bytes = limit_bytes
+        self._lock = threading.Lock()
+        self._stats: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: tuple) -> bytes | None:
+        """Return the payload for a key and mark it most recently used."""
+        with self._lock:
+            payload = self._entries.pop(key, None)
+            if payload is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries[key] = payload
+            self._stats["hits"] += 1
+            return payload
+
+    def get_many(self, keys: Iterable[tuple]) -> dict[tuple, bytes]:
+        """Return the payloads held for several keys; misses are left out."""
+        found: dict[tuple, bytes] = {}
+        with self._lock:
+            for key in keys:
+                payload = self._entries.pop(key, None)
+                if payload is None:
+                    self._stats["misses"] += 1
+                    continue
+                self._entries[key] = payload
+                self._stats["hits"] += 1
+                found[key] = payload
+        return found
+
+    def payload_size(self, key: tuple) -> int | None:
+        """Return a held payload's length without touching LRU order or counters."""
+        with self._lock:
+            payload = self._entries.get(key)
+            return None if payload is None else len(payload)
+
+    def put(self, key: tuple, payload: bytes) -> None:
+        """Store a payload, evicting least recently used ones over the budget."""
+        if not isinstance(payload, bytes) or len(payload) > self._limit_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = payload
+            self._bytes += len(payload)
+            self._evict_over_limit()
+
+    def _evict_over_limit(self) -> None:
+        while self._bytes > self._limit_bytes and self._entries:
+            _key, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._stats["evictions"] += 1
+
+    def discard(self, keys: Iterable[tuple]) -> None:
+        """Drop payloads for keys the disk tier deleted or moved."""
+        with self._lock:
+            for key in keys:
+                payload = self._entries.pop(key, None)
+                if payload is not None:
+                    self._bytes -= len(payload)
+
+    def discard_tier(self, tier: str) -> None:
+        """Drop every payload of one tier, e.g. after the tier was cleared."""
+        with self._lock:
+            stale = [key for key in self._entries if key[1] == tier]
+            for key in stale:
+                self._bytes -= len(self._entries.pop(key))
+
+    def set_limit(self, limit_bytes: int) -> None:
+        """Change the byte budget, evicting down to it at once."""
+        with self._lock:
+            self._limit_bytes = limit_bytes
+            self._evict_over_limit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Entry count, bytes held, byte limit and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "limit_bytes": self._limit_bytes,
+                **self._stats,
+            }
+
+    def __contains__(self, key: tuple) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
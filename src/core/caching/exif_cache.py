@@ -1,4 +1,3 @@
-import diskcache
 import os
 import logging
 import time
@@ -7,6 +6,7 @@ import unicodedata
 from collections.abc import Iterable
 from typing import Any
 from core.runtime_paths import resolve_user_cache_dir
+from core.caching.storage_backend import open_cache_store
 
 # Import the settings functions to get the cache size limit
 from core.app_settings import (
@@ -52,8 +52,9 @@ class ExifCache:
 
         # disk_min_file_size=0 means all entries go to disk files immediately.
         # For potentially larger dicts, this might be reasonable.
-        self._cache = diskcache.Cache(
-            directory=cache_dir,
+        self._cache = open_cache_store(
+            cache_dir,
+            cache_name="exif",
             size_limit=self._size_limit_bytes,
             disk_min_file_size=EXIF_CACHE_MIN_FILE_SIZE,
         )  # Store larger items on disk
@@ -124,6 +125,58 @@ class ExifCache:
                 exc_info=True,
             )
 
+    def get_many(self, keys: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """
+        Retrieves several metadata dictionaries in one read transaction.
+
+        Args:
+            keys: The cache keys (file paths).
+
+        Returns:
+            Dict of key to cached metadata. Misses and invalid entries are left out.
+        """
+        try:
+            with self._cache.transact():
+                cached_items = [
+                    (key, self._cache.get(key)) for key in dict.fromkeys(keys)
+                ]
+        except Exception as e:
+            logger.error(f"Error batch reading from EXIF cache: {e}", exc_info=True)
+            return {}
+        results: dict[str, dict[str, Any]] = {}
+        for key, cached_item in cached_items:
+            if isinstance(cached_item, dict):
+                results[key] = cached_item
+            elif cached_item is not None:
+                logger.warning(
+                    f"Invalid item type in EXIF cache for key '{key}': {type(cached_item)}"
+                )
+        return results
+
+    def set_many(self, items: dict[str, dict[str, Any]]) -> None:
+        """
+        Adds or updates several metadata dictionaries in one write transaction.
+
+        Args:
+            items: Mapping of cache key (file path) to metadata dictionary.
+        """
+        valid_items = {}
+        for key, value in items.items():
+            if not isinstance(value, dict):
+                logger.error(
+                    f"Attempted to cache non-dictionary object for key '{os.path.basename(key)}'. Type: {type(value)}"
+                )
+                continue
+            valid_items[key] = value
+        if not valid_items:
+            return
+        try:
+            with self._cache.transact():
+                for key, value in valid_items.items():
+                    self._cache.set(key, value)
+        except Exception as e:
+            logger.error(f"Error batch writing to EXIF cache: {e}", exc_info=True)
+
     def delete(self, key: str) -> None:
         """
         Deletes an item from the cache.
@@ -159,6 +212,52 @@ class ExifCache:
             logger.error(f"Error getting EXIF cache volume: {e}", exc_info=True)
             return 0
 
+    def cached_folders(self) -> set[str]:
+        """Returns the folders of cached paths; walks every key once."""
+        try:
+            return {
+                os.path.dirname(key)
+                for key in self._cache.iterkeys()
+                if isinstance(key, str)
+            }
+        except Exception as e:
+            logger.error(f"Error listing EXIF cache folders: {e}", exc_info=True)
+            return set()
+
+    def evict_folders(self, folders: Iterable[str]) -> int:
+        """
+        Deletes the entries of every path directly inside the given folders.
+        Keys carry no folder index, so this walks every key once per call.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        wanted = {
+            unicodedata.normalize("NFC", os.path.normpath(folder)) for folder in folders
+        }
+        try:
+            stale = [
+                key
+                for key in self._cache.iterkeys()
+                if isinstance(key, str)
+                and unicodedata.normalize("NFC", os.path.dirname(key)) in wanted
+            ]
+            if stale:
+                with self._cache.transact():
+                    for key in stale:
+                        self._cache.pop(key, default=None)
+            return len(stale)
+        except Exception as e:
+            logger.error(f"Error evicting EXIF cache folders: {e}", exc_info=True)
+            return 0
+
+    def set_size_limit(self, size_limit: int) -> None:
+        """Sets the hard limit enforced by the cache itself, in bytes."""
+        try:
+            self._cache.reset("size_limit", int(size_limit))
+        except Exception as e:
+            logger.error(f"Error setting EXIF cache size limit: {e}", exc_info=True)
+
     def dataset_residency(self, keys: Iterable[str]) -> tuple[int, int]:
         """Return how many unique dataset keys are still present in the cache."""
         canonical_keys = {
@@ -195,8 +294,9 @@ class ExifCache:
 
         self._size_limit_mb = get_exif_cache_size_mb()
         self._size_limit_bytes = get_exif_cache_size_bytes()
-        self._cache = diskcache.Cache(
-            directory=self._cache_dir,
+        self._cache = open_cache_store(
+            self._cache_dir,
+            cache_name="exif",
             size_limit=self._size_limit_bytes,
             disk_min_file_size=EXIF_CACHE_MIN_FILE_SIZE,
         )
@@ -0,0 +1,91 @@
+"""Process-wide ``(size, mtime_ns)`` fingerprints for scanned media files.
+
+The folder scanner already stats every file it discovers. Recording those
+results here lets cache-key builders and the cached-image getters' existence
+checks skip another ``os.stat`` per lookup, which matters on network shares
+and while the grid scrolls. Entries are invalidated by the file operations that move, replace
+or rewrite files. Paths the scanner has not seen are statted on every lookup,
+exactly as before, so files outside the open folder are never served stale.
+"""
+
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+FileFingerprint = tuple[int, int]
+
+
+class FingerprintRegistry:
+    """Thread-safe map from normalized path to its last known fingerprint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprints: dict[str, FileFingerprint] = {}
+        self._stats = {"hits": 0, "stats": 0}
+
+    def record(self, path: str, file_size: int, mtime_ns: int) -> None:
+        """Remember a fingerprint the scanner or a file operation just observed."""
+        with self._lock:
+            self._fingerprints[os.path.normpath(path)] = (
+                int(file_size),
+                int(mtime_ns),
+            )
+
+    def get(self, path: str) -> FileFingerprint | None:
+        """Return the recorded fingerprint, or stat paths that were never recorded."""
+        normalized_path = os.path.normpath(path)
+        with self._lock:
+            fingerprint = self._fingerprints.get(normalized_path)
+            if fingerprint is not None:
+                self._stats["hits"] += 1
+                return fingerprint
+            self._stats["stats"] += 1
+        try:
+            stat_result = os.stat(normalized_path)
+        except OSError:
+            return None
+        return int(stat_result.st_size), int(stat_result.st_mtime_ns)
+
+    def is_recorded(self, path: str) -> bool:
+        """Return True when ``path`` has a recorded fingerprint, without a stat."""
+        normalized_path = os.path.normpath(path)
+        with self._lock:
+            if normalized_path not in self._fingerprints:
+                return False
+            self._stats["hits"] += 1
+            return True
+
+    def invalidate(self, *paths: str) -> None:
+        """Forget paths whose content or location changed."""
+        with self._lock:
+            for path in paths:
+                if path:
+                    self._fingerprints.pop(os.path.normpath(path), None)
+
+    def invalidate_tree(self, directory: str) -> None:
+        """Forget every path below ``directory`` (for rescans and folder moves)."""
+        prefix = os.path.join(os.path.normpath(directory), "")
+        with self._lock:
+            stale = [path for path in self._fingerprints if path.startswith(prefix)]
+            for path in stale:
+                del self._fingerprints[path]
+        if stale:
+            logger.debug(
+                "Dropped %d fingerprints under %s",
+                len(stale),
+                os.path.basename(directory),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fingerprints.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return lookup counters: registry ``hits`` and fallback ``stats``."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._fingerprints)}
+
+
+fingerprint_registry = FingerprintRegistry()
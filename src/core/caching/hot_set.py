@@ -0,0 +1,97 @@
+"""Snapshot of the in-memory image tier for warm restarts.
+
+At shutdown ``ImagePipeline.save_hot_set`` records every cache key held in
+the memory LRU, most recent first, with the decoded size of its image, plus
+the folder and image the user was looking at. On the next launch
+``ImagePipeline.start_hot_set_restore`` reads those keys back from the disk
+tiers on a low-priority thread, so the first previews of a reopened session
+are memory hits instead of disk decodes. Keys carry the file fingerprint;
+entries for files changed since the snapshot miss on disk and are skipped.
+"""
+
+import contextlib
+import logging
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+HOT_SET_FILE_NAME = "hot_set.pickle"
+_HOT_SET_VERSION = 1
+
+
+@dataclass(slots=True)
+class HotSet:
+    """Memory-tier keys (most recent first) and the last navigation position."""
+
+    entries: list[tuple[tuple, int]] = field(default_factory=list)
+    folder: str | None = None
+    focused_path: str | None = None
+    saved_at: float = 0.0
+
+    def restore_batches(self, batch_size: int) -> list[list[tuple]]:
+        """
+        Keys to restore in read batches: the focused image's keys alone first,
+        so it is ready before the rest decode, then the others most recent first.
+        """
+        keys = [key for key, _size in self.entries]
+        focused = os.path.normpath(self.focused_path) if self.focused_path else None
+        head = [key for key in keys if key[0] == focused]
+        rest = [key for key in keys if key[0] != focused]
+        batches = [head] if head else []
+        batches.extend(
+            rest[start : start + batch_size]
+            for start in range(0, len(rest), batch_size)
+        )
+        return batches
+
+
+def save_hot_set(path: str, hot_set: HotSet) -> bool:
+    """Atomically writes a hot-set snapshot; returns whether it was written."""
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    payload = {
+        "version": _HOT_SET_VERSION,
+        "entries": hot_set.entries,
+        "folder": hot_set.folder,
+        "focused_path": hot_set.focused_path,
+        "saved_at": hot_set.saved_at or time.time(),
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, "wb") as handle:
+            pickle.dump(payload, handle, protocol=4)
+        os.replace(temp_path, path)
+        return True
+    except Exception as e:
+        logger.error(f"Error writing image hot set {path}: {e}", exc_info=True)
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        return False
+
+
+def load_hot_set(path: str) -> HotSet | None:
+    """Reads a hot-set snapshot, or returns None if missing or unreadable."""
+    try:
+        with open(path, "rb") as handle:
+            payload = pickle.load(handle)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning(f"Ignoring unreadable image hot set {path}", exc_info=True)
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != _HOT_SET_VERSION:
+        return None
+    entries = [
+        (tuple(key), int(size))
+        for key, size in payload.get("entries", [])
+        if isinstance(key, tuple) and len(key) > 1
+    ]
+    return HotSet(
+        entries=entries,
+        folder=payload.get("folder"),
+        focused_path=payload.get("focused_path"),
+        saved_at=float(payload.get("saved_at", 0.0)),
+    )
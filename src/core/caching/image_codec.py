@@ -1,11 +1,40 @@
-"""Compact serialization for disk-cached images."""
+"""Compact serialization for disk-cached images.
 
+Every payload starts with a 4-byte marker naming its format, so entries
+written with any profile (or by an older version) decode the same way.
+Profiles trade encode time against bytes on disk:
+
+- ``jpeg_optimized``: optimized progressive JPEG, the smallest lossy output.
+- ``jpeg_fast``: baseline JPEG without the optimization pass.
+- ``webp_fast``: lossy WEBP at the lowest encoder effort.
+- ``raw_zstd``: lossless raw pixels compressed with a fast zstd level
+  (zlib when the interpreter has no ``compression.zstd``).
+
+Images with meaningful transparency always use a lossless format.
+"""
+
+import struct
+import zlib
 from io import BytesIO
 from PIL import Image
 
+try:  # Standard library from Python 3.14
+    from compression import zstd
+except ImportError:
+    zstd = None
+
 JPEG_MARKER = b"PSJ1"
 WEBP_MARKER = b"PSW1"
 PNG_MARKER = b"PSP1"
+ZSTD_RAW_MARKER = b"PSZ1"
+ZLIB_RAW_MARKER = b"PSD1"
+
+CACHE_CODEC_PROFILES = ("jpeg_optimized", "jpeg_fast", "webp_fast", "raw_zstd")
+
+_RAW_HEADER = struct.Struct("<4sII")
+_RAW_MODES = {"RGB", "RGBA", "L", "LA"}
+_ZSTD_LEVEL = 1
+_ZLIB_LEVEL = 1
 
 
 def _has_transparency(image: Image.Image) -> bool:
@@ -15,10 +44,43 @@ def _has_transparency(image: Image.Image) -> bool:
     return alpha.getextrema()[0] < 255
 
 
-def encode_cached_image(image: Image.Image, *, quality: int) -> bytes:
+def _encode_raw(image: Image.Image, transparent: bool) -> bytes:
+    if image.mode not in _RAW_MODES or (
+        image.mode in {"RGBA", "LA"} and not transparent
+    ):
+        image = image.convert("RGBA" if transparent else "RGB")
+    header = _RAW_HEADER.pack(image.mode.encode("ascii"), image.width, image.height)
+    pixels = image.tobytes()
+    if zstd is not None:
+        return ZSTD_RAW_MARKER + header + zstd.compress(pixels, level=_ZSTD_LEVEL)
+    return ZLIB_RAW_MARKER + header + zlib.compress(pixels, _ZLIB_LEVEL)
+
+
+def _decode_raw(value: bytes) -> Image.Image | None:
+    if value[:4] == ZSTD_RAW_MARKER and zstd is None:
+        return None
+    mode, width, height = _RAW_HEADER.unpack_from(value, 4)
+    payload = value[4 + _RAW_HEADER.size :]
+    pixels = (
+        zstd.decompress(payload)
+        if value[:4] == ZSTD_RAW_MARKER
+        else zlib.decompress(payload)
+    )
+    return Image.frombytes(mode.rstrip(b"\0").decode("ascii"), (width, height), pixels)
+
+
+def encode_cached_image(
+    image: Image.Image, *, quality: int, profile: str = "jpeg_optimized"
+) -> bytes:
     """Encode a PIL image compactly while preserving meaningful transparency."""
+    if profile not in CACHE_CODEC_PROFILES:
+        raise ValueError(f"Unknown cache codec profile: {profile}")
+    transparent = _has_transparency(image)
+    if profile == "raw_zstd":
+        return _encode_raw(image, transparent)
+
     output = BytesIO()
-    if _has_transparency(image):
+    if transparent:
         try:
             image.save(output, format="WEBP", lossless=True, method=4)
             return WEBP_MARKER + output.getvalue()
@@ -27,12 +89,17 @@ def encode_cached_image(image: Image.Image, *, quality: int) -> bytes:
             image.save(output, format="PNG", optimize=True)
             return PNG_MARKER + output.getvalue()
 
+    if profile == "webp_fast":
+        image.convert("RGB").save(output, format="WEBP", quality=quality, method=0)
+        return WEBP_MARKER + output.getvalue()
+
+    optimized = profile == "jpeg_optimized"
     image.convert("RGB").save(
         output,
         format="JPEG",
         quality=quality,
-        optimize=True,
-        progressive=True,
+        optimize=optimized,
+        progressive=optimized,
     )
     return JPEG_MARKER + output.getvalue()
 
@@ -41,9 +108,12 @@ def decode_cached_image(value: object) -> Image.Image | None:
     """Decode a current, explicitly versioned image payload."""
     if not isinstance(value, bytes) or len(value) <= 4:
         return None
+    if value[:4] in {ZSTD_RAW_MARKER, ZLIB_RAW_MARKER}:
+        return _decode_raw(value)
     if value[:4] not in {JPEG_MARKER, WEBP_MARKER, PNG_MARKER}:
         return None
 
-    with Image.open(BytesIO(value[4:])) as image:
-        image.load()
-        return image.copy()
+    # The buffer is in memory, so the loaded image needs no detaching copy.
+    image = Image.open(BytesIO(value[4:]))
+    image.load()
+    return image
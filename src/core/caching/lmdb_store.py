@@ -0,0 +1,334 @@
+"""Memory-mapped LMDB implementation of ``storage_backend.CacheStore``.
+
+Entries live in one LMDB environment in ``<cache_dir>/lmdb``. Keys are hashed
+(pickled key -> 16-byte BLAKE2b digest) because LMDB keys are limited to 511
+bytes; each record carries the pickled key so the store can be iterated.
+Values that are ``bytes`` are stored as is, anything else is pickled, so
+reads return the same objects diskcache would.
+
+Like diskcache's default policy, the store evicts least recently *stored*
+entries once their total size exceeds ``size_limit``. A second table maps a
+monotonic sequence number to each entry's digest for that purpose, and the
+running volume is kept in a third one, updated in the same transaction.
+
+Readers run on MVCC snapshots and never wait for writers. ``transact()``
+starts as a read snapshot and upgrades to the single write transaction at its
+first write, so batched reads do not serialize behind one another the way
+SQLite ``BEGIN IMMEDIATE`` does. Commits skip fsync (the data is a
+rebuildable cache); a corrupt environment is recreated empty. LMDB allows one
+open handle per environment and process, so stores on the same directory
+share it.
+
+The memory map is sized once at open to ``4 * size_limit`` plus headroom
+(sparse on Linux and macOS), because it can only be resized while no thread
+has a transaction open. ``reset("size_limit")`` beyond half the map takes
+full effect on the next open; a full map evicts old entries and retries.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import struct
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, suppress
+from typing import Any
+
+import lmdb
+
+logger = logging.getLogger(__name__)
+
+LMDB_SUBDIR = "lmdb"
+_MAP_HEADROOM_BYTES = 64 * 1024 * 1024
+_MAX_READERS = 512
+_RECORD_HEADER = struct.Struct("<QI")  # store sequence, pickled key length
+_SEQUENCE = struct.Struct(">Q")  # big-endian so LMDB orders it numerically
+_COUNTER = struct.Struct("<Q")
+_RAW_TAG = b"B"
+_PICKLE_TAG = b"P"
+_MISSING = object()
+_RECREATE_ERRORS = (
+    lmdb.CorruptedError,
+    lmdb.InvalidError,
+    lmdb.PageNotFoundError,
+    lmdb.VersionMismatchError,
+)
+
+# path -> [environment, reference count]
+_environments: dict[str, list] = {}
+_environments_lock = threading.Lock()
+
+
+def _open_environment(path: str, map_size: int) -> lmdb.Environment:
+    with _environments_lock:
+        shared = _environments.get(path)
+        if shared is not None:
+            shared[1] += 1
+            return shared[0]
+        os.makedirs(path, exist_ok=True)
+        options = dict(
+            map_size=map_size,
+            max_dbs=3,
+            max_readers=_MAX_READERS,
+            sync=False,
+            metasync=False,
+            readahead=False,
+        )
+        try:
+            environment = lmdb.open(path, **options)
+        except _RECREATE_ERRORS:
+            logger.warning(f"Recreating corrupt LMDB cache store {path}", exc_info=True)
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path, exist_ok=True)
+            environment = lmdb.open(path, **options)
+        _environments[path] = [environment, 1]
+        return environment
+
+
+def _release_environment(path: str) -> None:
+    with _environments_lock:
+        shared = _environments.get(path)
+        if shared is None:
+            return
+        shared[1] -= 1
+        if shared[1] > 0:
+            return
+        del _environments[path]
+    with suppress(lmdb.Error):
+        shared[0].sync(True)
+    shared[0].close()
+
+
+def _digest(key_blob: bytes) -> bytes:
+    return hashlib.blake2b(key_blob, digest_size=16).digest()
+
+
+def _key_blob(key: Any) -> bytes:
+    return pickle.dumps(key, protocol=4)
+
+
+def _decode_value(record: bytes) -> Any:
+    _sequence, key_length = _RECORD_HEADER.unpack_from(record)
+    offset = _RECORD_HEADER.size + key_length
+    if record[offset : offset + 1] == _RAW_TAG:
+        return bytes(record[offset + 1 :])
+    return pickle.loads(record[offset + 1 :])
+
+
+def _decode_key(record: bytes) -> Any:
+    _sequence, key_length = _RECORD_HEADER.unpack_from(record)
+    return pickle.loads(record[_RECORD_HEADER.size : _RECORD_HEADER.size + key_length])
+
+
+class LmdbCacheStore:
+    """Size-limited, least-recently-stored evicting key-value store on LMDB."""
+
+    def __init__(self, cache_dir: str, size_limit: int):
+        self._path = os.path.realpath(os.path.join(cache_dir, LMDB_SUBDIR))
+        self._size_limit = int(size_limit)
+        self._local = threading.local()
+        self._closed = False
+        self._env = _open_environment(
+            self._path, 4 * self._size_limit + _MAP_HEADROOM_BYTES
+        )
+        # A shared environment keeps the map size it was first opened with.
+        self._map_size = self._env.info()["map_size"]
+        self._entries = self._env.open_db(b"entries")
+        self._order = self._env.open_db(b"order")
+        self._meta = self._env.open_db(b"meta")
+
+    # --- Transactions ---
+
+    @contextmanager
+    def transact(self):
+        """Makes the enclosed reads and writes of this thread one transaction."""
+        if getattr(self._local, "state", None) is not None:
+            yield
+            return
+        state = self._local.state = {"txn": None, "write": False}
+        try:
+            yield
+        except BaseException:
+            if state["txn"] is not None:
+                state["txn"].abort()
+            raise
+        else:
+            if state["txn"] is not None:
+                if state["write"]:
+                    state["txn"].commit()
+                else:
+                    state["txn"].abort()
+        finally:
+            self._local.state = None
+
+    def _read(self, operation: Callable[[lmdb.Transaction], Any]) -> Any:
+        state = getattr(self._local, "state", None)
+        if state is None:
+            with self._env.begin(buffers=False) as txn:
+                return operation(txn)
+        if state["txn"] is None:
+            state["txn"] = self._env.begin(buffers=False)
+        return operation(state["txn"])
+
+    def _write(self, operation: Callable[[lmdb.Transaction], Any]) -> Any:
+        state = getattr(self._local, "state", None)
+        if state is not None:
+            if not state["write"]:
+                # Upgrade: later reads of this batch must see its own writes.
+                if state["txn"] is not None:
+                    state["txn"].abort()
+                state["txn"] = self._env.begin(write=True, buffers=False)
+                state["write"] = True
+            return operation(state["txn"])
+        try:
+            with self._env.begin(write=True, buffers=False) as txn:
+                return operation(txn)
+        except lmdb.MapFullError:
+            logger.warning(f"LMDB cache store {self._path} is full; evicting.")
+            with self._env.begin(write=True, buffers=False) as txn:
+                self._cull(txn, self._counter(txn, b"volume"), self._limit() // 2)
+            with self._env.begin(write=True, buffers=False) as txn:
+                return operation(txn)
+
+    def _limit(self) -> int:
+        # Copy-on-write pages and the free list need room beyond the live data.
+        return min(self._size_limit, (self._map_size - _MAP_HEADROOM_BYTES) // 2)
+
+    # --- Counters ---
+
+    def _counter(self, txn: lmdb.Transaction, name: bytes) -> int:
+        value = txn.get(name, db=self._meta)
+        return _COUNTER.unpack(value)[0] if value is not None else 0
+
+    def _set_counter(self, txn: lmdb.Transaction, name: bytes, value: int) -> None:
+        txn.put(name, _COUNTER.pack(max(0, value)), db=self._meta)
+
+    # --- Record helpers (run inside a transaction) ---
+
+    def _remove(self, txn: lmdb.Transaction, digest: bytes) -> bytes | None:
+        record = txn.pop(digest, db=self._entries)
+        if record is None:
+            return None
+        sequence, _key_length = _RECORD_HEADER.unpack_from(record)
+        txn.delete(_SEQUENCE.pack(sequence), db=self._order)
+        self._set_counter(txn, b"volume", self._counter(txn, b"volume") - len(record))
+        return record
+
+    def _put(self, txn: lmdb.Transaction, key: Any, value: Any) -> None:
+        key_blob = _key_blob(key)
+        digest = _digest(key_blob)
+        self._remove(txn, digest)
+        if isinstance(value, bytes):
+            payload = _RAW_TAG + value
+        else:
+            payload = _PICKLE_TAG + pickle.dumps(
+                value, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        sequence = self._counter(txn, b"sequence") + 1
+        record = _RECORD_HEADER.pack(sequence, len(key_blob)) + key_blob + payload
+        txn.put(digest, record, db=self._entries)
+        txn.put(_SEQUENCE.pack(sequence), digest, db=self._order)
+        self._set_counter(txn, b"sequence", sequence)
+        volume = self._counter(txn, b"volume") + len(record)
+        self._set_counter(txn, b"volume", volume)
+        if volume > self._limit():
+            self._cull(txn, volume, self._limit())
+
+    def _cull(self, txn: lmdb.Transaction, volume: int, target: int) -> None:
+        """Evicts the oldest stored entries until the volume fits ``target``."""
+        stale: list[bytes] = []
+        with txn.cursor(db=self._order) as cursor:
+            for _sequence, digest in cursor:
+                if volume <= target:
+                    break
+                record = txn.get(digest, db=self._entries)
+                if record is not None:
+                    volume -= len(record)
+                stale.append(digest)
+        for digest in stale:
+            self._remove(txn, digest)
+
+    # --- Mapping API ---
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        record = self._read(
+            lambda txn: txn.get(_digest(_key_blob(key)), db=self._entries)
+        )
+        return default if record is None else _decode_value(record)
+
+    def set(self, key: Any, value: Any) -> bool:
+        self._write(lambda txn: self._put(txn, key, value))
+        return True
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        record = self._write(lambda txn: self._remove(txn, _digest(_key_blob(key))))
+        return default if record is None else _decode_value(record)
+
+    def __contains__(self, key: Any) -> bool:
+        return self._read(
+            lambda txn: txn.get(_digest(_key_blob(key)), db=self._entries) is not None
+        )
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        if self.pop(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterates over a snapshot of the keys, safe against concurrent writes."""
+
+        def keys(txn: lmdb.Transaction) -> list[Any]:
+            with txn.cursor(db=self._entries) as cursor:
+                return [_decode_key(record) for record in cursor.iternext(keys=False)]
+
+        return iter(self._read(keys))
+
+    def iterkeys(self) -> Iterator[Any]:
+        return iter(self)
+
+    def __len__(self) -> int:
+        return self._read(lambda txn: txn.stat(self._entries)["entries"])
+
+    def volume(self) -> int:
+        """Bytes of stored records; the basis for eviction, like diskcache's."""
+        return self._read(lambda txn: self._counter(txn, b"volume"))
+
+    def clear(self) -> int:
+        def drop(txn: lmdb.Transaction) -> int:
+            count = txn.stat(self._entries)["entries"]
+            txn.drop(self._entries, delete=False)
+            txn.drop(self._order, delete=False)
+            self._set_counter(txn, b"volume", 0)
+            return count
+
+        return self._write(drop)
+
+    def reset(self, key: str, value: Any) -> Any:
+        """Supports ``size_limit``; a lower limit evicts at once."""
+        if key != "size_limit":
+            raise ValueError(f"Unsupported LMDB cache store setting: {key}")
+        self._size_limit = int(value)
+
+        def shrink(txn: lmdb.Transaction) -> None:
+            volume = self._counter(txn, b"volume")
+            if volume > self._limit():
+                self._cull(txn, volume, self._limit())
+
+        self._write(shrink)
+        return self._size_limit
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        _release_environment(self._path)
@@ -9,10 +9,18 @@ def delete_cached_paths(
     *,
     rating_cache=None,
     exif_cache=None,
+    image_pipeline=None,
 ) -> None:
-    """Invalidate path-keyed disk caches from a filesystem worker."""
+    """Invalidate path-keyed disk caches from a filesystem worker.
 
-    for path in dict.fromkeys(path for path in paths if path):
+    Image tiers are invalidated in one batch through ``image_pipeline``, which
+    finds their keys via the shared path index instead of scanning each cache.
+    """
+
+    unique_paths = list(dict.fromkeys(path for path in paths if path))
+    if image_pipeline is not None and unique_paths:
+        image_pipeline.invalidate_paths(unique_paths)
+    for path in unique_paths:
         if rating_cache is not None:
             rating_cache.delete(path)
         if exif_cache is not None:
@@ -24,10 +32,19 @@ def migrate_cached_paths(
     *,
     rating_cache=None,
     exif_cache=None,
+    image_pipeline=None,
 ) -> None:
-    """Move disk-cache values to renamed path keys outside the UI thread."""
+    """Move disk-cache values to renamed path keys outside the UI thread.
+
+    Cached thumbnails, previews and analysis images move in one batch through
+    ``image_pipeline`` so renamed files keep their decoded artwork.
+    """
 
-    pairs = path_updates.items() if isinstance(path_updates, dict) else path_updates
+    pairs = list(
+        path_updates.items() if isinstance(path_updates, dict) else path_updates
+    )
+    if image_pipeline is not None and pairs:
+        image_pipeline.migrate_paths(pairs)
     for old_path, new_path in pairs:
         if not old_path or not new_path or old_path == new_path:
             continue
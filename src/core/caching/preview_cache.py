@@ -1,18 +1,25 @@
-import diskcache
 import os
 import logging
 import time
+from collections.abc import Iterable
 from PIL import Image
 from core.runtime_paths import resolve_user_cache_dir
+from core.caching.cache_key_index import CacheKeyIndex, normalize_identity
+from core.caching.encoded_memory_cache import EncodedMemoryCache
 from core.caching.image_codec import decode_cached_image, encode_cached_image
+from core.caching.storage_backend import open_cache_store
 
 # Import the settings function to get the cache size limit
 from core.app_settings import (
     get_preview_cache_size_bytes,
+    PREVIEW_CACHE_CODEC,
     PREVIEW_CACHE_MIN_FILE_SIZE,
 )
 
 logger = logging.getLogger(__name__)
+KEY_INDEX_TIER = "preview"
+# Per-path key lists kept in the cache itself before the shared key index.
+_LEGACY_INDEX_PREFIX = "index_"
 
 
 class PreviewCache:
@@ -21,7 +28,12 @@ class PreviewCache:
     The cache size is configurable via app_settings.
     """
 
-    def __init__(self, cache_dir: str | None = None):
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        key_index: CacheKeyIndex | None = None,
+        memory_tier: EncodedMemoryCache | None = None,
+    ):
         if cache_dir is None:
             cache_dir = resolve_user_cache_dir("previews")
         init_start_time = time.perf_counter()
@@ -33,23 +45,48 @@ class PreviewCache:
 
         Args:
             cache_dir (str): The directory where the cache will be stored.
+            key_index: Path -> key index shared with the other image tiers.
+                A private index inside ``cache_dir`` is used when omitted.
+            memory_tier: In-memory LRU of encoded payloads read through
+                before the disk; none when omitted.
         """
         os.makedirs(cache_dir, exist_ok=True)
         self._cache_dir = cache_dir
         self._size_limit_bytes = get_preview_cache_size_bytes()
         # Settings for general PIL images, can be adjusted.
         # Using a relatively small disk_min_file_size to ensure even smaller previews are disk-backed if desired.
-        self._cache = diskcache.Cache(
-            directory=cache_dir,
+        self._cache = open_cache_store(
+            cache_dir,
+            cache_name="previews",
             size_limit=self._size_limit_bytes,
             disk_min_file_size=PREVIEW_CACHE_MIN_FILE_SIZE,
         )  # 256KB
+        self._owns_key_index = key_index is None
+        self._key_index = key_index or CacheKeyIndex(
+            cache_dir=os.path.join(cache_dir, "key_index")
+        )
+        self._memory_tier = memory_tier
+        self._key_index_checked = False
+        if len(self._cache) == 0:
+            # A fresh cache has nothing to backfill; mark its tier indexed now.
+            self._ensure_key_index()
         log_msg = f"Preview cache initialized at {cache_dir} with size limit {self._size_limit_bytes / (1024 * 1024 * 1024):.2f} GB"
         logger.info(log_msg)
         logger.debug(
             f"Initialization complete in {time.perf_counter() - init_start_time:.4f}s"
         )
 
+    def _read_payload(self, key: tuple) -> object:
+        """Read a stored payload from the in-memory tier, else from disk."""
+        if self._memory_tier is not None:
+            payload = self._memory_tier.get(key)
+            if payload is not None:
+                return payload
+        payload = self._cache.get(key)
+        if self._memory_tier is not None and isinstance(payload, bytes):
+            self._memory_tier.put(key, payload)
+        return payload
+
     def get(self, key: tuple[str, tuple[int, int], bool]) -> Image.Image | None:
         """
         Retrieves an item from the cache.
@@ -62,7 +99,7 @@ class PreviewCache:
             Optional[Image.Image]: The cached PIL Image, or None if not found or not an Image.
         """
         try:
-            cached_item = self._cache.get(key)
+            cached_item = self._read_payload(key)
             decoded = decode_cached_image(cached_item)
             if decoded is not None:
                 return decoded
@@ -80,7 +117,7 @@ class PreviewCache:
 
     def set(self, key: tuple[str, tuple[int, int], bool], value: Image.Image) -> None:
         """
-        Adds or updates an item in the cache and updates the path index.
+        Adds or updates an item in the cache and records it in the key index.
         Key is typically (normalized_path, resolution_tuple, apply_auto_edits_bool).
 
         Args:
@@ -93,94 +130,285 @@ class PreviewCache:
             )
             return
         try:
-            file_path = key[0]
-            index_key = f"index_{file_path}"
-
-            with self._cache.transact():
-                # Get current index list or create new one
-                key_list = self._cache.get(index_key, default=[])
-                if key not in key_list:
-                    key_list.append(key)
-                    self._cache.set(index_key, key_list)
-                # Set the actual data
-                self._cache.set(key, encode_cached_image(value, quality=88))
+            payload = encode_cached_image(
+                value, quality=88, profile=PREVIEW_CACHE_CODEC
+            )
+            self._cache.set(key, payload)
+            self._key_index.add(KEY_INDEX_TIER, [key])
+            if self._memory_tier is not None:
+                self._memory_tier.put(key, payload)
         except Exception as e:
             logger.error(
                 f"Error writing to Preview cache for key '{key}': {e}", exc_info=True
             )
 
-    def delete(self, key: tuple[str, tuple[int, int], bool]) -> None:
+    def get_many(
+        self, keys: Iterable[tuple[str, tuple[int, int], bool]]
+    ) -> dict[tuple[str, tuple[int, int], bool], Image.Image]:
         """
-        Deletes an item from the cache and updates the path index.
+        Retrieves several items in one read transaction.
+        Payloads are decoded after the transaction ends.
 
         Args:
-            key: The cache key to delete.
+            keys: The cache keys.
+
+        Returns:
+            Dict of key to cached PIL Image. Misses and invalid entries are left out.
         """
-        try:
-            file_path = key[0]
-            index_key = f"index_{file_path}"
+        unique_keys = list(dict.fromkeys(keys))
+        held = (
+            self._memory_tier.get_many(unique_keys)
+            if self._memory_tier is not None
+            else {}
+        )
+        missing = [key for key in unique_keys if key not in held]
+        read: dict = {}
+        if missing:
+            try:
+                with self._cache.transact():
+                    read = {key: self._cache.get(key) for key in missing}
+            except Exception as e:
+                logger.error(
+                    f"Error batch reading from Preview cache: {e}", exc_info=True
+                )
+                return {}
+        if self._memory_tier is not None:
+            for key, cached_item in read.items():
+                if isinstance(cached_item, bytes):
+                    self._memory_tier.put(key, cached_item)
+        payloads = [(key, held.get(key, read.get(key))) for key in unique_keys]
+        images: dict[tuple[str, tuple[int, int], bool], Image.Image] = {}
+        for key, cached_item in payloads:
+            if cached_item is None:
+                continue
+            try:
+                decoded = decode_cached_image(cached_item)
+            except Exception:
+                logger.error(
+                    f"Error decoding Preview cache entry for key '{key}'",
+                    exc_info=True,
+                )
+                continue
+            if decoded is not None:
+                images[key] = decoded
+            else:
+                logger.warning(
+                    f"Invalid item type in Preview cache for key '{key}': {type(cached_item)}"
+                )
+        return images
+
+    def set_many(
+        self,
+        items: Iterable[tuple[tuple[str, tuple[int, int], bool], Image.Image]],
+    ) -> None:
+        """
+        Adds or updates several items in one transaction.
+        Images are encoded before the transaction starts.
 
+        Args:
+            items: (key, PIL Image) pairs to cache.
+        """
+        payloads = []
+        for key, value in items:
+            if not isinstance(value, Image.Image):
+                logger.error(
+                    f"Attempted to cache non-Image object for key '{key}'. Type: {type(value)}"
+                )
+                continue
+            payloads.append(
+                (
+                    key,
+                    encode_cached_image(value, quality=88, profile=PREVIEW_CACHE_CODEC),
+                )
+            )
+        if not payloads:
+            return
+        try:
             with self._cache.transact():
-                # Update the index first
-                key_list = self._cache.get(index_key)
-                if key_list and key in key_list:
-                    key_list.remove(key)
-                    if key_list:
-                        self._cache.set(index_key, key_list)
-                    else:
-                        # If list is empty, remove the index key
-                        self._cache.delete(index_key)
-
-                # Now delete the actual data. Use pop for safety.
-                self._cache.pop(key, default=None)
+                for key, payload in payloads:
+                    self._cache.set(key, payload)
+            self._key_index.add(KEY_INDEX_TIER, [key for key, _payload in payloads])
+            if self._memory_tier is not None:
+                for key, payload in payloads:
+                    self._memory_tier.put(key, payload)
+        except Exception as e:
+            logger.error(f"Error batch writing to Preview cache: {e}", exc_info=True)
+
+    def delete(self, key: tuple[str, tuple[int, int], bool]) -> None:
+        """
+        Deletes an item from the cache and the key index.
 
+        Args:
+            key: The cache key to delete.
+        """
+        try:
+            self._cache.pop(key, default=None)
+            self._key_index.remove_keys(KEY_INDEX_TIER, [key])
+            if self._memory_tier is not None:
+                self._memory_tier.discard([key])
         except Exception as e:
             logger.error(
                 f"Error deleting item from Preview cache for key '{key}': {e}",
                 exc_info=True,
             )
 
+    def _ensure_key_index(self) -> None:
+        """
+        Backfill or prune the key index once per session when it is off.
+        Legacy per-path ``index_`` lists are dropped during the backfill.
+        """
+        if self._key_index_checked:
+            return
+        self._key_index_checked = True
+        if not self._key_index.needs_rebuild(KEY_INDEX_TIER, len(self._cache)):
+            return
+        legacy_keys: list[str] = []
+
+        def live_keys() -> list[tuple]:
+            keys = []
+            for key in self._cache:
+                if isinstance(key, tuple):
+                    keys.append(key)
+                elif isinstance(key, str) and key.startswith(_LEGACY_INDEX_PREFIX):
+                    legacy_keys.append(key)
+            return keys
+
+        self._key_index.rebuild(KEY_INDEX_TIER, live_keys)
+        if legacy_keys:
+            with self._cache.transact():
+                for key in legacy_keys:
+                    self._cache.pop(key, default=None)
+            logger.info(f"Dropped {len(legacy_keys)} legacy preview path indexes")
+
     def delete_all_for_path(self, file_path: str) -> None:
         """
-        Deletes all cache entries for a specific file path using its index.
+        Deletes all cache entries for a specific file path using the key index.
 
         Args:
             file_path: The file path to clear from cache.
         """
-        try:
-            import unicodedata
-            import os
+        self.delete_all_for_paths([file_path])
 
-            normalized_path = unicodedata.normalize("NFC", os.path.normpath(file_path))
-            index_key = f"index_{normalized_path}"
+    def delete_all_for_paths(self, file_paths: Iterable[str]) -> int:
+        """
+        Deletes all cache entries for several file paths using the key index.
 
-            # Try the fast, indexed deletion first
-            key_list = self._cache.get(index_key)
+        Args:
+            file_paths: The file paths (or content identities) to clear.
 
-            if key_list is not None:
+        Returns:
+            int: The number of index entries removed.
+        """
+        try:
+            self._ensure_key_index()
+            keys = self._key_index.remove_paths(KEY_INDEX_TIER, file_paths)
+            if self._memory_tier is not None:
+                self._memory_tier.discard(keys)
+            if keys:
                 with self._cache.transact():
-                    # The index exists, use it to delete entries
-                    for key in key_list:
+                    for key in keys:
                         self._cache.pop(key, default=None)
-                    self._cache.pop(index_key, default=None)
+                logger.info(f"Deleted {len(keys)} indexed preview cache entries")
+            return len(keys)
+        except Exception as e:
+            logger.error(
+                f"Error deleting preview cache entries for paths: {e}",
+                exc_info=True,
+            )
+            return 0
 
-                if key_list:
-                    logger.info(
-                        f"Deleted {len(key_list)} indexed preview cache entries for {os.path.basename(file_path)}."
-                    )
-                return
+    def migrate_paths(self, path_updates: Iterable[tuple[str, str]]) -> int:
+        """
+        Moves the entries of renamed files to keys for their new paths.
+        Payloads are copied as stored, without decoding.
+
+        Args:
+            path_updates: (old_path, new_path) pairs of normalized paths.
 
+        Returns:
+            int: The number of entries moved.
+        """
+        moved = 0
+        try:
+            self._ensure_key_index()
+            for old_path, new_path in path_updates:
+                keys = self._key_index.remove_paths(KEY_INDEX_TIER, [old_path])
+                if self._memory_tier is not None:
+                    self._memory_tier.discard(keys)
+                new_keys = []
+                with self._cache.transact():
+                    for key in keys:
+                        payload = self._cache.pop(key, default=None)
+                        if payload is None:
+                            continue
+                        new_key = (new_path, *key[1:])
+                        self._cache.set(new_key, payload)
+                        new_keys.append(new_key)
+                self._key_index.add(KEY_INDEX_TIER, new_keys)
+                moved += len(new_keys)
         except Exception as e:
+            logger.error(f"Error migrating preview cache entries: {e}", exc_info=True)
+        return moved
+
+    def cached_folders(self) -> set[str]:
+        """
+        Returns the folders of cached entries, read from the key index.
+        Content-keyed entries count for the folder they were last seen in.
+        """
+        self._ensure_key_index()
+        return self._key_index.folders(KEY_INDEX_TIER)
+
+    def evict_folders(self, folders: Iterable[str]) -> int:
+        """
+        Deletes every entry of the files directly inside the given folders.
+
+        Returns:
+            int: The number of index entries removed.
+        """
+        self._ensure_key_index()
+        return self.delete_all_for_paths(
+            self._key_index.identities_in_folders(KEY_INDEX_TIER, folders)
+        )
+
+    def dataset_residency(self, keys: Iterable[str]) -> tuple[int, int]:
+        """Return how many unique source paths still have a cached entry."""
+        canonical_paths = {normalize_identity(key) for key in keys if key}
+        try:
+            resident_count = sum(
+                any(
+                    cached_key in self._cache
+                    for cached_key in self._key_index.keys_for_paths(
+                        KEY_INDEX_TIER, [path]
+                    )
+                )
+                for path in canonical_paths
+            )
+            return resident_count, len(canonical_paths)
+        except Exception:
             logger.error(
-                f"Error deleting preview cache entries for path '{file_path}': {e}",
-                exc_info=True,
+                "Error checking Preview cache dataset residency.", exc_info=True
             )
+            return len(canonical_paths), len(canonical_paths)
+
+    def get_current_size_limit_bytes(self) -> int:
+        """Return the configured cache limit (its share of the disk budget)."""
+        return self._size_limit_bytes
+
+    def set_size_limit(self, size_limit: int) -> None:
+        """Sets the hard limit enforced by the cache itself, in bytes."""
+        try:
+            self._cache.reset("size_limit", int(size_limit))
+        except Exception as e:
+            logger.error(f"Error setting Preview cache size limit: {e}", exc_info=True)
 
     def clear(self) -> None:
         """Clears all items from the cache."""
         try:
             count = len(self._cache)
             self._cache.clear()
+            self._key_index.clear(KEY_INDEX_TIER)
+            if self._memory_tier is not None:
+                self._memory_tier.discard_tier(KEY_INDEX_TIER)
             logger.info(f"Cleared {count} items from Preview cache.")
         except Exception as e:
             logger.error(f"Error clearing Preview cache: {e}", exc_info=True)
@@ -204,11 +432,12 @@ class PreviewCache:
         Closes and reinitializes the cache with the current size limit from app_settings.
         """
         logger.info("Reinitializing Preview cache with new settings...")
-        self.close()  # Close the existing cache
+        self._cache.close()  # The key index stays open across reinitialization
 
         self._size_limit_bytes = get_preview_cache_size_bytes()
-        self._cache = diskcache.Cache(
-            directory=self._cache_dir,
+        self._cache = open_cache_store(
+            self._cache_dir,
+            cache_name="previews",
             size_limit=self._size_limit_bytes,
             disk_min_file_size=PREVIEW_CACHE_MIN_FILE_SIZE,
         )
@@ -221,6 +450,8 @@ class PreviewCache:
         try:
             if self._cache is not None:
                 self._cache.close()
+            if getattr(self, "_owns_key_index", False):
+                self._key_index.close()
             logger.debug("Preview cache closed.")
         except Exception:
             logger.error("Error closing Preview cache.", exc_info=True)
@@ -1,9 +1,11 @@
-import diskcache
 import os
 import logging
 import time
+import unicodedata
+from collections.abc import Iterable
 from core.app_settings import DEFAULT_RATING_CACHE_SIZE_LIMIT_MB
 from core.runtime_paths import resolve_user_cache_dir
+from core.caching.storage_backend import open_cache_store
 
 logger = logging.getLogger(__name__)
 
@@ -35,10 +37,13 @@ class RatingCache:
         os.makedirs(cache_dir, exist_ok=True)
         self._cache_dir = cache_dir
         size_limit_bytes = size_limit_mb * 1024 * 1024
+        self._size_limit_bytes = size_limit_bytes
         # Ratings are very small, so disk_min_file_size can be small or default.
-        # For integers, diskcache might store them efficiently in memory before flushing.
-        self._cache = diskcache.Cache(
-            directory=cache_dir, size_limit=size_limit_bytes, disk_min_file_size=0
+        self._cache = open_cache_store(
+            cache_dir,
+            cache_name="ratings",
+            size_limit=size_limit_bytes,
+            disk_min_file_size=0,
         )  # Store even small entries on disk
         log_msg = f"Rating cache initialized at {cache_dir} with size limit {size_limit_mb:.2f} MB"
         logger.info(log_msg)
@@ -129,6 +134,70 @@ class RatingCache:
             logger.error(f"Error getting Rating cache volume: {e}", exc_info=True)
             return 0
 
+    def cached_folders(self) -> set[str]:
+        """Returns the folders of cached paths; walks every key once."""
+        try:
+            return {
+                os.path.dirname(key)
+                for key in self._cache.iterkeys()
+                if isinstance(key, str)
+            }
+        except Exception as e:
+            logger.error(f"Error listing Rating cache folders: {e}", exc_info=True)
+            return set()
+
+    def evict_folders(self, folders: Iterable[str]) -> int:
+        """
+        Deletes the entries of every path directly inside the given folders.
+        Keys carry no folder index, so this walks every key once per call.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        wanted = {
+            unicodedata.normalize("NFC", os.path.normpath(folder)) for folder in folders
+        }
+        try:
+            stale = [
+                key
+                for key in self._cache.iterkeys()
+                if isinstance(key, str)
+                and unicodedata.normalize("NFC", os.path.dirname(key)) in wanted
+            ]
+            if stale:
+                with self._cache.transact():
+                    for key in stale:
+                        self._cache.pop(key, default=None)
+            return len(stale)
+        except Exception as e:
+            logger.error(f"Error evicting Rating cache folders: {e}", exc_info=True)
+            return 0
+
+    def dataset_residency(self, keys: Iterable[str]) -> tuple[int, int]:
+        """Return how many unique dataset keys are still present in the cache."""
+        canonical_keys = {
+            unicodedata.normalize("NFC", os.path.normpath(key)) for key in keys if key
+        }
+        try:
+            resident_count = sum(key in self._cache for key in canonical_keys)
+            return resident_count, len(canonical_keys)
+        except Exception:
+            logger.error(
+                "Error checking Rating dataset cache residency.", exc_info=True
+            )
+            return len(canonical_keys), len(canonical_keys)
+
+    def get_current_size_limit_bytes(self) -> int:
+        """Return the configured cache limit in bytes."""
+        return self._size_limit_bytes
+
+    def set_size_limit(self, size_limit: int) -> None:
+        """Sets the hard limit enforced by the cache itself, in bytes."""
+        try:
+            self._cache.reset("size_limit", int(size_limit))
+        except Exception as e:
+            logger.error(f"Error setting Rating cache size limit: {e}", exc_info=True)
+
     def close(self) -> None:
         """Closes the cache."""
         try:
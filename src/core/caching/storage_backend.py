@@ -0,0 +1,113 @@
+"""Key-value storage backends for the persistent caches.
+
+Every persistent cache talks to its store through the small mapping API of
+``diskcache.Cache`` that the caches already use: ``get``/``set``/``pop``,
+``in``/``[]``/``del``/``len``/iteration, ``transact()`` for atomic batches,
+``volume()``, ``clear()``, ``reset("size_limit", n)`` and ``close()``.
+``CacheStore`` spells that contract out.
+
+``diskcache`` (SQLite) stays the default. ``lmdb`` stores entries in a
+memory-mapped LMDB environment (see ``lmdb_store.py``): readers never block
+and never take a lock, which helps when thumbnail preload, preview warm-up
+and the metadata loader write concurrently. The backend is chosen per cache
+(``Cache/StorageBackend/<name>``). Each backend keeps its own files in the
+cache directory, so switching starts that cache cold instead of migrating it.
+"""
+
+import logging
+from collections.abc import Iterator
+from contextlib import AbstractContextManager
+from typing import Any, Protocol
+
+import diskcache
+
+from core.app_settings import (
+    CACHE_STORAGE_BACKENDS,
+    DEFAULT_CACHE_STORAGE_BACKEND,
+    get_cache_storage_backend,
+)
+
+logger = logging.getLogger(__name__)
+
+_DISKCACHE_DEFAULT_SIZE_LIMIT = 2**30  # diskcache's own default
+
+
+class CacheStore(Protocol):
+    """The subset of ``diskcache.Cache`` the persistent caches rely on."""
+
+    def get(self, key: Any, default: Any = None) -> Any: ...
+
+    def set(self, key: Any, value: Any) -> bool: ...
+
+    def pop(self, key: Any, default: Any = None) -> Any: ...
+
+    def __contains__(self, key: Any) -> bool: ...
+
+    def __getitem__(self, key: Any) -> Any: ...
+
+    def __delitem__(self, key: Any) -> None: ...
+
+    def __iter__(self) -> Iterator[Any]: ...
+
+    def __len__(self) -> int: ...
+
+    def transact(self) -> AbstractContextManager: ...
+
+    def volume(self) -> int: ...
+
+    def clear(self) -> int: ...
+
+    def reset(self, key: str, value: Any) -> Any: ...
+
+    def close(self) -> None: ...
+
+
+def open_cache_store(
+    directory: str,
+    *,
+    cache_name: str | None = None,
+    backend: str | None = None,
+    size_limit: int | None = None,
+    disk_min_file_size: int | None = None,
+) -> CacheStore:
+    """
+    Opens the key-value store of one cache.
+
+    Args:
+        directory: The cache directory.
+        cache_name: Name used to look up the configured backend.
+        backend: Explicit backend; overrides the setting.
+        size_limit: Bytes after which the oldest entries are evicted.
+        disk_min_file_size: diskcache only; values at least this large are
+            written to separate files.
+
+    Returns:
+        A store implementing ``CacheStore``. An LMDB store is replaced by
+        diskcache when the ``lmdb`` package is missing.
+    """
+    if backend is None:
+        backend = (
+            get_cache_storage_backend(cache_name)
+            if cache_name
+            else DEFAULT_CACHE_STORAGE_BACKEND
+        )
+    if backend not in CACHE_STORAGE_BACKENDS:
+        raise ValueError(f"Unknown cache storage backend: {backend}")
+    if backend == "lmdb":
+        try:
+            from core.caching.lmdb_store import LmdbCacheStore
+        except ImportError:
+            logger.warning(
+                f"lmdb is not installed; {cache_name or directory} uses diskcache."
+            )
+        else:
+            return LmdbCacheStore(
+                directory,
+                size_limit=size_limit or _DISKCACHE_DEFAULT_SIZE_LIMIT,
+            )
+    settings: dict[str, int] = {}
+    if size_limit is not None:
+        settings["size_limit"] = size_limit
+    if disk_min_file_size is not None:
+        settings["disk_min_file_size"] = disk_min_file_size
+    return diskcache.Cache(directory=directory, **settings)
@@ -1,16 +1,21 @@
-import diskcache
 import os
 import logging
 import time
+from collections.abc import Iterable
 from PIL import Image
 from core.app_settings import (
     DEFAULT_THUMBNAIL_CACHE_SIZE_BYTES,
+    THUMBNAIL_CACHE_CODEC,
     THUMBNAIL_MIN_FILE_SIZE,
 )
 from core.runtime_paths import resolve_user_cache_dir
+from core.caching.cache_key_index import CacheKeyIndex, normalize_identity
+from core.caching.encoded_memory_cache import EncodedMemoryCache
 from core.caching.image_codec import decode_cached_image, encode_cached_image
+from core.caching.storage_backend import open_cache_store
 
 logger = logging.getLogger(__name__)
+KEY_INDEX_TIER = "thumbnail"
 
 
 class ThumbnailCache:
@@ -22,6 +27,8 @@ class ThumbnailCache:
         self,
         cache_dir: str | None = None,
         size_limit: int = DEFAULT_THUMBNAIL_CACHE_SIZE_BYTES,
+        key_index: CacheKeyIndex | None = None,
+        memory_tier: EncodedMemoryCache | None = None,
     ):
         if cache_dir is None:
             cache_dir = resolve_user_cache_dir("thumbnails")  # Default 1GB limit
@@ -36,21 +43,47 @@ class ThumbnailCache:
         Args:
             cache_dir (str): The directory where the cache will be stored.
             size_limit (int): The maximum size of the cache in bytes.
+            key_index: Path -> key index shared with the other image tiers.
+                A private index inside ``cache_dir`` is used when omitted.
+            memory_tier: In-memory LRU of encoded payloads read through
+                before the disk; none when omitted.
         """
         os.makedirs(cache_dir, exist_ok=True)
         self._cache_dir = cache_dir
+        self._size_limit_bytes = size_limit
         # Settings for general PIL images, can be adjusted
-        self._cache = diskcache.Cache(
-            directory=cache_dir,
+        self._cache = open_cache_store(
+            cache_dir,
+            cache_name="thumbnails",
             size_limit=size_limit,
             disk_min_file_size=THUMBNAIL_MIN_FILE_SIZE,
         )
+        self._owns_key_index = key_index is None
+        self._key_index = key_index or CacheKeyIndex(
+            cache_dir=os.path.join(cache_dir, "key_index")
+        )
+        self._memory_tier = memory_tier
+        self._key_index_checked = False
+        if len(self._cache) == 0:
+            # A fresh cache has nothing to backfill; mark its tier indexed now.
+            self._ensure_key_index()
         log_msg = f"Thumbnail cache initialized at {cache_dir} with size limit {size_limit / (1024 * 1024):.2f} MB"
         logger.info(log_msg)
         logger.debug(
             f"Initialization complete in {time.perf_counter() - init_start_time:.4f}s"
         )
 
+    def _read_payload(self, key: tuple) -> object:
+        """Read a stored payload from the in-memory tier, else from disk."""
+        if self._memory_tier is not None:
+            payload = self._memory_tier.get(key)
+            if payload is not None:
+                return payload
+        payload = self._cache.get(key)
+        if self._memory_tier is not None and isinstance(payload, bytes):
+            self._memory_tier.put(key, payload)
+        return payload
+
     def get(self, key: tuple[str, bool]) -> Image.Image | None:
         """
         Retrieves an item from the cache.
@@ -63,7 +96,7 @@ class ThumbnailCache:
             Optional[Image.Image]: The cached PIL Image, or None if not found or not an Image.
         """
         try:
-            cached_item = self._cache.get(key)
+            cached_item = self._read_payload(key)
             decoded = decode_cached_image(cached_item)
             if decoded is not None:
                 return decoded
@@ -97,12 +130,120 @@ class ThumbnailCache:
             )
             return
         try:
-            self._cache.set(key, encode_cached_image(value, quality=82))
+            payload = encode_cached_image(
+                value, quality=82, profile=THUMBNAIL_CACHE_CODEC
+            )
+            self._cache.set(key, payload)
+            self._key_index.add(KEY_INDEX_TIER, [key])
+            if self._memory_tier is not None:
+                self._memory_tier.put(key, payload)
         except Exception as e:
             logger.error(
                 f"Error writing to Thumbnail cache for key '{key}': {e}", exc_info=True
             )
 
+    def get_many(
+        self, keys: Iterable[tuple[str, bool]]
+    ) -> dict[tuple[str, bool], Image.Image]:
+        """
+        Retrieves several items in one read transaction.
+        Payloads are decoded after the transaction ends.
+
+        Args:
+            keys: The cache keys.
+
+        Returns:
+            Dict of key to cached PIL Image. Misses and invalid entries are left out.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        held = (
+            self._memory_tier.get_many(unique_keys)
+            if self._memory_tier is not None
+            else {}
+        )
+        missing = [key for key in unique_keys if key not in held]
+        read: dict = {}
+        if missing:
+            try:
+                with self._cache.transact():
+                    read = {key: self._cache.get(key) for key in missing}
+            except Exception as e:
+                logger.error(
+                    f"Error batch reading from Thumbnail cache: {e}", exc_info=True
+                )
+                return {}
+        if self._memory_tier is not None:
+            for key, cached_item in read.items():
+                if isinstance(cached_item, bytes):
+                    self._memory_tier.put(key, cached_item)
+        payloads = [(key, held.get(key, read.get(key))) for key in unique_keys]
+        images: dict[tuple[str, bool], Image.Image] = {}
+        for key, cached_item in payloads:
+            if cached_item is None:
+                continue
+            try:
+                decoded = decode_cached_image(cached_item)
+            except Exception:
+                logger.error(
+                    f"Error decoding Thumbnail cache entry for key '{key}'",
+                    exc_info=True,
+                )
+                continue
+            if decoded is not None:
+                images[key] = decoded
+            else:
+                logger.warning(
+                    f"Invalid item type in Thumbnail cache for key '{key}': {type(cached_item)}"
+                )
+        return images
+
+    def contains_many(self, keys: Iterable[tuple[str, bool]]) -> set[tuple[str, bool]]:
+        """Returns the keys present in the cache, checked in one read transaction."""
+        try:
+            with self._cache.transact():
+                return {key for key in dict.fromkeys(keys) if key in self._cache}
+        except Exception as e:
+            logger.error(
+                f"Error batch checking Thumbnail cache membership: {e}", exc_info=True
+            )
+            return set()
+
+    def set_many(self, items: Iterable[tuple[tuple[str, bool], Image.Image]]) -> None:
+        """
+        Adds or updates several items in one write transaction.
+        Images are encoded before the transaction starts.
+
+        Args:
+            items: (key, PIL Image) pairs to cache.
+        """
+        payloads = []
+        for key, value in items:
+            if not isinstance(value, Image.Image):
+                logger.error(
+                    f"Attempted to cache non-Image object for key '{key}'. Type: {type(value)}"
+                )
+                continue
+            payloads.append(
+                (
+                    key,
+                    encode_cached_image(
+                        value, quality=82, profile=THUMBNAIL_CACHE_CODEC
+                    ),
+                )
+            )
+        if not payloads:
+            return
+        try:
+            with self._cache.transact():
+                for key, payload in payloads:
+                    self._cache.set(key, payload)
+            self._key_index.add(KEY_INDEX_TIER, [key for key, _payload in payloads])
+            if self._memory_tier is not None:
+                for key, payload in payloads:
+                    self._memory_tier.put(key, payload)
+        except Exception as e:
+            logger.error(f"Error batch writing to Thumbnail cache: {e}", exc_info=True)
+
     def delete(self, key: tuple[str, bool]) -> None:
         """
         Deletes an item from the cache.
@@ -113,12 +254,26 @@ class ThumbnailCache:
         try:
             if key in self._cache:
                 del self._cache[key]
+            self._key_index.remove_keys(KEY_INDEX_TIER, [key])
+            if self._memory_tier is not None:
+                self._memory_tier.discard([key])
         except Exception as e:
             logger.error(
                 f"Error deleting item from Thumbnail cache for key '{key}': {e}",
                 exc_info=True,
             )
 
+    def _ensure_key_index(self) -> None:
+        """Backfill or prune the key index once per session when it is off."""
+        if self._key_index_checked:
+            return
+        self._key_index_checked = True
+        if self._key_index.needs_rebuild(KEY_INDEX_TIER, len(self._cache)):
+            self._key_index.rebuild(
+                KEY_INDEX_TIER,
+                lambda: [key for key in self._cache if isinstance(key, tuple)],
+            )
+
     def delete_all_for_path(self, file_path: str) -> None:
         """
         Deletes all cache entries for a specific file path.
@@ -126,34 +281,120 @@ class ThumbnailCache:
         Args:
             file_path: The file path to clear from cache.
         """
+        self.delete_all_for_paths([file_path])
+
+    def delete_all_for_paths(self, file_paths: Iterable[str]) -> int:
+        """
+        Deletes all cache entries for several file paths using the key index.
+
+        Args:
+            file_paths: The file paths (or content identities) to clear.
+
+        Returns:
+            int: The number of index entries removed.
+        """
         try:
-            import unicodedata
-            import os
-
-            normalized_path = unicodedata.normalize("NFC", os.path.normpath(file_path))
-
-            # Find all keys that match this file path
-            keys_to_delete = []
-            for key in self._cache:
-                if isinstance(key, tuple) and len(key) >= 1:
-                    # Normalize both paths for comparison to handle Unicode differences
-                    key_path = unicodedata.normalize("NFC", os.path.normpath(key[0]))
-                    if key_path == normalized_path:
-                        keys_to_delete.append(key)
-
-            # Delete the matching keys
-            for key in keys_to_delete:
-                del self._cache[key]
+            self._ensure_key_index()
+            keys = self._key_index.remove_paths(KEY_INDEX_TIER, file_paths)
+            if self._memory_tier is not None:
+                self._memory_tier.discard(keys)
+            if keys:
+                with self._cache.transact():
+                    for key in keys:
+                        self._cache.pop(key, default=None)
+                logger.info(f"Deleted {len(keys)} thumbnail cache entries")
+            return len(keys)
+        except Exception as e:
+            logger.error(
+                f"Error deleting thumbnail cache entries for paths: {e}",
+                exc_info=True,
+            )
+            return 0
+
+    def migrate_paths(self, path_updates: Iterable[tuple[str, str]]) -> int:
+        """
+        Moves the entries of renamed files to keys for their new paths.
+        Payloads are copied as stored, without decoding.
+
+        Args:
+            path_updates: (old_path, new_path) pairs of normalized paths.
 
-            if keys_to_delete:
-                logger.info(
-                    f"Deleted {len(keys_to_delete)} thumbnail cache entries for {os.path.basename(file_path)}"
+        Returns:
+            int: The number of entries moved.
+        """
+        moved = 0
+        try:
+            self._ensure_key_index()
+            for old_path, new_path in path_updates:
+                keys = self._key_index.remove_paths(KEY_INDEX_TIER, [old_path])
+                if self._memory_tier is not None:
+                    self._memory_tier.discard(keys)
+                new_keys = []
+                with self._cache.transact():
+                    for key in keys:
+                        payload = self._cache.pop(key, default=None)
+                        if payload is None:
+                            continue
+                        new_key = (new_path, *key[1:])
+                        self._cache.set(new_key, payload)
+                        new_keys.append(new_key)
+                self._key_index.add(KEY_INDEX_TIER, new_keys)
+                moved += len(new_keys)
+        except Exception as e:
+            logger.error(f"Error migrating thumbnail cache entries: {e}", exc_info=True)
+        return moved
+
+    def cached_folders(self) -> set[str]:
+        """
+        Returns the folders of cached entries, read from the key index.
+        Content-keyed entries count for the folder they were last seen in.
+        """
+        self._ensure_key_index()
+        return self._key_index.folders(KEY_INDEX_TIER)
+
+    def evict_folders(self, folders: Iterable[str]) -> int:
+        """
+        Deletes every entry of the files directly inside the given folders.
+
+        Returns:
+            int: The number of index entries removed.
+        """
+        self._ensure_key_index()
+        return self.delete_all_for_paths(
+            self._key_index.identities_in_folders(KEY_INDEX_TIER, folders)
+        )
+
+    def dataset_residency(self, keys: Iterable[str]) -> tuple[int, int]:
+        """Return how many unique source paths still have a cached entry."""
+        canonical_paths = {normalize_identity(key) for key in keys if key}
+        try:
+            resident_count = sum(
+                any(
+                    cached_key in self._cache
+                    for cached_key in self._key_index.keys_for_paths(
+                        KEY_INDEX_TIER, [path]
+                    )
                 )
+                for path in canonical_paths
+            )
+            return resident_count, len(canonical_paths)
+        except Exception:
+            logger.error(
+                "Error checking Thumbnail cache dataset residency.", exc_info=True
+            )
+            return len(canonical_paths), len(canonical_paths)
+
+    def get_current_size_limit_bytes(self) -> int:
+        """Return the configured cache limit (its share of the disk budget)."""
+        return self._size_limit_bytes
 
+    def set_size_limit(self, size_limit: int) -> None:
+        """Sets the hard limit enforced by the cache itself, in bytes."""
+        try:
+            self._cache.reset("size_limit", int(size_limit))
         except Exception as e:
             logger.error(
-                f"Error deleting thumbnail cache entries for path '{file_path}': {e}",
-                exc_info=True,
+                f"Error setting Thumbnail cache size limit: {e}", exc_info=True
             )
 
     def clear(self) -> None:
@@ -161,6 +402,9 @@ class ThumbnailCache:
         try:
             count = len(self._cache)
             self._cache.clear()
+            self._key_index.clear(KEY_INDEX_TIER)
+            if self._memory_tier is not None:
+                self._memory_tier.discard_tier(KEY_INDEX_TIER)
             logger.info(f"Cleared {count} items from Thumbnail cache.")
         except Exception as e:
             logger.error(f"Error clearing Thumbnail cache: {e}", exc_info=True)
@@ -180,6 +424,8 @@ class ThumbnailCache:
         try:
             if self._cache is not None:
                 self._cache.close()
+            if getattr(self, "_owns_key_index", False):
+                self._key_index.close()
             logger.debug("Thumbnail cache closed.")
         except Exception:
             logger.error("Error closing Thumbnail cache.", exc_info=True)
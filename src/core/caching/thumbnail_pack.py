@@ -0,0 +1,243 @@
+"""Per-folder thumbnail pack files for instant folder reopen.
+
+A pack holds every grid thumbnail of one folder as raw pixels in a single
+file: a small header, the pixel data, then a JSON index naming each thumbnail
+cache key with its mode, size and byte offset. Reopening the folder maps
+the file once and copies the thumbnails it needs straight into memory, with
+no per-thumbnail diskcache lookup or codec decode. Keys carry the file
+fingerprint, so entries for changed files simply stop matching until the
+pack is rewritten. Packs are replaced whole and the least recently used
+ones are removed once the directory exceeds its byte budget.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import unicodedata
+from collections.abc import Callable, Iterable
+
+from PIL import Image
+
+from core.app_settings import THUMBNAIL_PACK_CACHE_SIZE_BYTES
+from core.runtime_paths import resolve_user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+PACK_MAGIC = b"PSTPACK1"
+_PACK_SUFFIX = ".pack"
+_HEADER = struct.Struct("<8sIQQ")  # magic, entry count, index offset, length
+
+
+def pack_key(key: tuple) -> str:
+    """Return the index string for a thumbnail cache key."""
+    return repr(key)
+
+
+class ThumbnailPackStore:
+    """Directory of per-folder thumbnail packs under one byte budget."""
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        size_limit: int = THUMBNAIL_PACK_CACHE_SIZE_BYTES,
+    ):
+        if cache_dir is None:
+            cache_dir = resolve_user_cache_dir("thumbnail_packs")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache_dir = cache_dir
+        self._size_limit_bytes = size_limit
+        self._configured_size_limit_bytes = size_limit
+        self._lock = threading.Lock()
+
+    def pack_path(self, folder: str) -> str:
+        normalized = unicodedata.normalize("NFC", os.path.normpath(folder))
+        name = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self._cache_dir, name + _PACK_SUFFIX)
+
+    def read(
+        self, folder: str, keys: Iterable[tuple], max_bytes: int | None = None
+    ) -> tuple[dict[tuple, Image.Image], int]:
+        """
+        Return the packed thumbnails for ``keys`` and how many keys are absent.
+        Thumbnails are copied in ``keys`` order until ``max_bytes`` of pixels
+        have been read; keys past the budget still count as present.
+        """
+        path = self.pack_path(folder)
+        keys = list(keys)
+        found: dict[tuple, Image.Image] = {}
+        missing = 0
+        copied = 0
+        try:
+            with open(path, "rb") as handle:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    magic, _count, index_offset, index_length = _HEADER.unpack_from(
+                        view, 0
+                    )
+                    if magic != PACK_MAGIC:
+                        raise ValueError("not a thumbnail pack")
+                    index = {
+                        entry[0]: entry[1:]
+                        for entry in json.loads(
+                            view[index_offset : index_offset + index_length]
+                        )
+                    }
+                    for key in keys:
+                        entry = index.get(pack_key(key))
+                        if entry is None:
+                            missing += 1
+                            continue
+                        mode, width, height, offset, length = entry
+                        if max_bytes is not None and copied + length > max_bytes:
+                            continue
+                        start = _HEADER.size + offset
+                        found[key] = Image.frombytes(
+                            mode, (width, height), view[start : start + length]
+                        )
+                        copied += length
+            # Persist recency so the budget keeps the folders in use.
+            os.utime(path)
+        except FileNotFoundError:
+            return {}, len(keys)
+        except Exception as e:
+            logger.error(f"Error reading thumbnail pack {path}: {e}", exc_info=True)
+            self._remove_file(path)
+            return {}, len(keys)
+        return found, missing
+
+    def write(
+        self,
+        folder: str,
+        entries: Iterable[tuple[tuple, Image.Image]],
+        should_cancel: Callable[[], bool] | None = None,
+    ) -> int:
+        """
+        Replace a folder's pack with ``entries`` and return how many were stored.
+        Entries are streamed to a temporary file; the previous pack stays in
+        place if writing fails or ``should_cancel`` returns True.
+        """
+        path = self.pack_path(folder)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        index = []
+        offset = 0
+        try:
+            with open(temp_path, "wb") as handle:
+                handle.write(_HEADER.pack(PACK_MAGIC, 0, 0, 0))
+                for key, image in entries:
+                    if should_cancel is not None and should_cancel():
+                        raise InterruptedError
+                    if image.mode not in {"RGB", "RGBA", "L", "LA"}:
+                        image = image.convert("RGB")
+                    pixels = image.tobytes()
+                    handle.write(pixels)
+                    index.append(
+                        [
+                            pack_key(key),
+                            image.mode,
+                            image.width,
+                            image.height,
+                            offset,
+                            len(pixels),
+                        ]
+                    )
+                    offset += len(pixels)
+                index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+                handle.write(index_bytes)
+                handle.seek(0)
+                handle.write(
+                    _HEADER.pack(
+                        PACK_MAGIC, len(index), _HEADER.size + offset, len(index_bytes)
+                    )
+                )
+            if not index:
+                self._remove_file(temp_path)
+                return 0
+            os.replace(temp_path, path)
+        except InterruptedError:
+            self._remove_file(temp_path)
+            return 0
+        except Exception as e:
+            logger.error(f"Error writing thumbnail pack {path}: {e}", exc_info=True)
+            self._remove_file(temp_path)
+            return 0
+        self._enforce_budget(keep=path)
+        return len(index)
+
+    def _pack_files(self) -> list[tuple[float, str, int]]:
+        packs = []
+        with os.scandir(self._cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(_PACK_SUFFIX):
+                    stat_result = entry.stat()
+                    packs.append(
+                        (stat_result.st_mtime, entry.path, stat_result.st_size)
+                    )
+        return packs
+
+    def _enforce_budget(self, keep: str) -> None:
+        with self._lock:
+            packs = sorted(self._pack_files())
+            total = sum(size for _mtime, _path, size in packs)
+            removed = 0
+            for _mtime, path, size in packs:
+                if total <= self._size_limit_bytes:
+                    break
+                if path == keep:
+                    continue
+                self._remove_file(path)
+                total -= size
+                removed += 1
+        if removed:
+            logger.debug(f"Evicted {removed} thumbnail packs")
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.debug(f"Could not remove thumbnail pack {path}", exc_info=True)
+
+    def delete_folder(self, folder: str) -> None:
+        """Removes the pack of one folder."""
+        self._remove_file(self.pack_path(folder))
+
+    def evict_folders(self, folders: Iterable[str]) -> int:
+        """Removes the packs of several folders and returns how many existed."""
+        removed = 0
+        for folder in folders:
+            path = self.pack_path(folder)
+            if os.path.exists(path):
+                self._remove_file(path)
+                removed += 1
+        return removed
+
+    def get_current_size_limit_bytes(self) -> int:
+        """Return the configured byte budget (its share of the disk budget)."""
+        return self._configured_size_limit_bytes
+
+    def set_size_limit(self, size_limit: int) -> None:
+        """Sets the hard byte limit enforced after the next pack write."""
+        self._size_limit_bytes = int(size_limit)
+
+    def clear(self) -> None:
+        """Removes every pack."""
+        start_time = time.perf_counter()
+        packs = self._pack_files()
+        for _mtime, path, _size in packs:
+            self._remove_file(path)
+        logger.info(
+            f"Cleared {len(packs)} thumbnail packs in {time.perf_counter() - start_time:.4f}s."
+        )
+
+    def volume(self) -> int:
+        """Returns the current disk usage of all packs in bytes."""
+        return sum(size for _mtime, _path, size in self._pack_files())
+
+    def close(self) -> None:
+        """Nothing to flush; packs are complete files once written."""
@@ -9,6 +9,7 @@ from .media_utils import (
     is_video_extension,
 )
 from .app_settings import FILE_SCAN_EMIT_BATCH_SIZE
+from .caching.fingerprint_registry import fingerprint_registry
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +60,8 @@ class FileScanner(QObject):
         try:
             # Phase 1: Fast file discovery
             logger.info(f"Starting file scan in: {directory_path}")
+            # Files that vanished since the last scan must not keep old entries.
+            fingerprint_registry.invalidate_tree(directory_path)
             for root, _, files in os.walk(directory_path):
                 if not self._is_running:
                     self.error.emit("Scan cancelled during file discovery.")
@@ -80,6 +83,9 @@ class FileScanner(QObject):
                             )
                             continue
 
+                        fingerprint_registry.record(
+                            full_path, stat_result.st_size, stat_result.st_mtime_ns
+                        )
                         media_type = "video" if is_video_extension(ext) else "image"
                         file_info = {
                             "path": full_path,
@@ -4,6 +4,8 @@ import logging
 from pathlib import Path
 import send2trash
 
+from core.caching.fingerprint_registry import fingerprint_registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +27,8 @@ class ImageFileOperations:
         try:
             destination.parent.mkdir(parents=True, exist_ok=True)
             moved_path = source.move(destination)
+            fingerprint_registry.invalidate_tree(source_path)
+            fingerprint_registry.invalidate(source_path, str(moved_path))
             logger.info(
                 "Moved '%s' to '%s'.",
                 source.name,
@@ -107,6 +111,7 @@ class ImageFileOperations:
 
         try:
             moved_path = source.move(destination)
+            fingerprint_registry.invalidate(source_path, str(moved_path))
             logger.info("Moved '%s' to '%s'.", source.name, destination.name)
             return True, str(moved_path)
         except Exception as e:
@@ -130,6 +135,7 @@ class ImageFileOperations:
             return False, "File does not exist."
         try:
             send2trash.send2trash(file_path)
+            fingerprint_registry.invalidate(file_path)
             logger.info("Moved to trash: %s.", os.path.basename(file_path))
             return True, "File moved to trash."
         except Exception as e:
@@ -155,6 +161,7 @@ class ImageFileOperations:
             return False, "Original file does not exist."
         try:
             os.rename(old_path, new_path)
+            fingerprint_registry.invalidate(old_path, new_path)
             logger.info(
                 "Renamed '%s' to '%s'",
                 os.path.basename(old_path),
@@ -184,6 +191,7 @@ class ImageFileOperations:
             return False, f"Source file not found: {source_path}"
         try:
             source.move(destination)
+            fingerprint_registry.invalidate(source_path, destination_path)
             logger.info("Replaced '%s' with '%s'.", destination.name, source.name)
             return True, "File replaced successfully."
         except Exception as e:
@@ -1,8 +1,10 @@
+import contextlib
 import os
+import sys
 import time
 import logging
 import threading
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from PIL import Image, ImageDraw
 
 try:  # Optional; some minimal Pillow builds may omit ImageQt
@@ -16,15 +18,32 @@ from collections import OrderedDict
 from .image_processing.raw_image_processor import RawImageProcessor, is_raw_extension
 from .image_processing.standard_image_processor import (
     StandardImageProcessor,
+    EMBEDDED_THUMBNAIL_EXTENSIONS,
+    HEIF_EXTENSIONS,
     SUPPORTED_STANDARD_EXTENSIONS,
 )
 from .image_processing.image_orientation_handler import ImageOrientationHandler
+from .image_processing.process_decode_backend import (
+    DecodeWorkerCrashed,
+    ProcessDecodeBackend,
+)
 from .caching.thumbnail_cache import ThumbnailCache
 from .caching.preview_cache import PreviewCache
+from .caching.analysis_pixel_store import AnalysisPixelStore
+from .caching.cache_key_index import CacheKeyIndex
+from .caching.encoded_memory_cache import EncodedMemoryCache
+from .caching.content_digest_index import CONTENT_KEY_PREFIX, ContentDigestIndex
+from .caching.decode_failure_cache import DecodeFailure, DecodeFailureCache
+from .caching.thumbnail_pack import ThumbnailPackStore
+from .caching.fingerprint_registry import fingerprint_registry
+from .caching.hot_set import HOT_SET_FILE_NAME, HotSet, load_hot_set, save_hot_set
+from .runtime_paths import resolve_user_cache_dir
 from .media_utils import is_video_extension
 
 logger = logging.getLogger(__name__)
 PREVIEW_GENERATION_LOG_INTERVAL = 250
+# Distinct (preview level, display size) pairs remembered for accounting.
+PREVIEW_DISPLAY_SIZES_TRACKED = 50_000
 _preview_generation_log_lock = threading.Lock()
 _preview_generation_count = 0
 
@@ -45,12 +64,44 @@ def _record_preview_generation_log(duration: float, basename: str) -> None:
 
 # Default sizes and resolutions (can be made configurable or passed in)
 THUMBNAIL_MAX_SIZE: tuple[int, int] = (256, 256)
+# Grid thumbnail levels (long edge, px). One decode fills its own level and
+# every smaller one; THUMBNAIL_MAX_SIZE is the default level.
+THUMBNAIL_LEVELS: tuple[int, ...] = (128, 256, 512)
 PRELOAD_MAX_RESOLUTION: tuple[int, int] = (1920, 1200)
+# Preview mip chain, largest first: the preload box and its halvings. Each
+# display size is served from the smallest level covering it; the view does
+# the final scale when painting, so no display-sized copies are cached.
+PREVIEW_LEVELS: tuple[tuple[int, int], ...] = tuple(
+    (PRELOAD_MAX_RESOLUTION[0] >> shift, PRELOAD_MAX_RESOLUTION[1] >> shift)
+    for shift in range(3)
+)
 ANALYSIS_CACHE_RESOLUTION: tuple[int, int] = (1024, 1024)
 CACHE_SCHEMA_VERSION = 2
+# Tiers filled together by ensure_tiers_cached, largest first.
+FANOUT_TIERS: tuple[str, ...] = ("preview", "analysis", "thumbnail")
 # DISPLAY_MAX_RESOLUTION might be different, e.g., based on UI element size
 
 
+def thumbnail_level_for(icon_size: int, device_pixel_ratio: float = 1.0) -> int:
+    """Return the smallest thumbnail level covering an icon in device pixels."""
+    needed = icon_size * max(1.0, device_pixel_ratio)
+    for level in THUMBNAIL_LEVELS:
+        if level >= needed:
+            return level
+    return THUMBNAIL_LEVELS[-1]
+
+
+def preview_level_for(display_max_size: tuple[int, int] | None) -> tuple[int, int]:
+    """Return the smallest preview level whose box contains ``display_max_size``."""
+    if display_max_size is None:
+        return PREVIEW_LEVELS[0]
+    width, height = display_max_size
+    for level in reversed(PREVIEW_LEVELS):
+        if level[0] >= width and level[1] >= height:
+            return level
+    return PREVIEW_LEVELS[0]
+
+
 class ImagePipeline:
     """
     Orchestrates image processing, caching, and retrieval.
@@ -61,30 +112,115 @@ class ImagePipeline:
         self,
         thumbnail_cache_dir: str | None = None,
         preview_cache_dir: str | None = None,
+        decode_backend: str | None = None,
+        analysis_cache_dir: str | None = None,
+        content_addressed_keys: bool | None = None,
+        thumbnail_pack_dir: str | None = None,
     ):
         init_start_time = time.perf_counter()
         logger.info("Initializing ImagePipeline...")
 
+        # One path -> key index serves the thumbnail, preview and analysis tiers.
+        self.cache_key_index = CacheKeyIndex(
+            cache_dir=os.path.join(
+                os.path.dirname(os.path.normpath(thumbnail_cache_dir)),
+                "cache_key_index",
+            )
+            if thumbnail_cache_dir
+            else None
+        )
+        # Encoded payloads of the thumbnail and preview tiers, behind the
+        # decoded LRU: a miss there costs a decode but no disk read.
+        self.encoded_memory_cache = EncodedMemoryCache()
+
         tc_start_time = time.perf_counter()
         self.thumbnail_cache = (
-            ThumbnailCache(cache_dir=thumbnail_cache_dir)
+            ThumbnailCache(
+                cache_dir=thumbnail_cache_dir,
+                key_index=self.cache_key_index,
+                memory_tier=self.encoded_memory_cache,
+            )
             if thumbnail_cache_dir
-            else ThumbnailCache()
+            else ThumbnailCache(
+                key_index=self.cache_key_index, memory_tier=self.encoded_memory_cache
+            )
         )
         logger.debug(
             f"ThumbnailCache instantiated in {time.perf_counter() - tc_start_time:.4f}s"
         )
 
+        if thumbnail_pack_dir is None and thumbnail_cache_dir:
+            thumbnail_pack_dir = os.path.join(
+                os.path.dirname(os.path.normpath(thumbnail_cache_dir)),
+                "thumbnail_packs",
+            )
+        self.thumbnail_packs = ThumbnailPackStore(cache_dir=thumbnail_pack_dir)
+        self._hot_set_path = os.path.join(
+            os.path.join(
+                os.path.dirname(os.path.normpath(thumbnail_cache_dir)), "hot_set"
+            )
+            if thumbnail_cache_dir
+            else resolve_user_cache_dir("hot_set"),
+            HOT_SET_FILE_NAME,
+        )
+        self._hot_set_stop = threading.Event()
+        self._hot_set_thread: threading.Thread | None = None
+        # Files that failed to decode, per tier, until they change on disk.
+        self.decode_failures = DecodeFailureCache(
+            cache_dir=os.path.join(
+                os.path.dirname(os.path.normpath(thumbnail_cache_dir)),
+                "decode_failures",
+            )
+            if thumbnail_cache_dir
+            else None
+        )
+
         pc_start_time = time.perf_counter()
         self.preview_cache = (
-            PreviewCache(cache_dir=preview_cache_dir)
+            PreviewCache(
+                cache_dir=preview_cache_dir,
+                key_index=self.cache_key_index,
+                memory_tier=self.encoded_memory_cache,
+            )
             if preview_cache_dir
-            else PreviewCache()
+            else PreviewCache(
+                key_index=self.cache_key_index, memory_tier=self.encoded_memory_cache
+            )
         )
         logger.debug(
             f"PreviewCache instantiated in {time.perf_counter() - pc_start_time:.4f}s"
         )
 
+        if analysis_cache_dir is None and preview_cache_dir:
+            # Keep analysis pixels beside an explicitly placed preview cache.
+            analysis_cache_dir = os.path.join(
+                os.path.dirname(os.path.normpath(preview_cache_dir)),
+                "analysis_pixels",
+            )
+        self.analysis_cache = AnalysisPixelStore(
+            cache_dir=analysis_cache_dir, key_index=self.cache_key_index
+        )
+
+        if content_addressed_keys is None:
+            from core.app_settings import get_content_addressed_cache_keys
+
+            content_addressed_keys = get_content_addressed_cache_keys()
+        # Path -> content digest map; only kept when caches are content-keyed.
+        self.content_digests: ContentDigestIndex | None = None
+        if content_addressed_keys:
+            self.content_digests = ContentDigestIndex(
+                cache_dir=os.path.join(
+                    os.path.dirname(os.path.normpath(preview_cache_dir)),
+                    "content_digests",
+                )
+                if preview_cache_dir
+                else None
+            )
+            # Lets the cache budget evict content-keyed entries by folder.
+            self.cache_key_index.set_identity_folder_resolver(
+                self.content_digests.identity_folders
+            )
+
         self.image_orientation_handler = (
             ImageOrientationHandler()
         )  # Instantiate if it has non-static methods or state
@@ -94,27 +230,57 @@ class ImagePipeline:
             IMAGE_MEMORY_CACHE_SIZE_BYTES,
             calculate_high_memory_decode_workers,
             calculate_thumbnail_workers,
+            get_image_decode_backend,
         )
 
         self._memory_cache: OrderedDict[tuple, Image.Image] = OrderedDict()
         self._memory_cache_bytes = 0
         self._memory_cache_limit_bytes = IMAGE_MEMORY_CACHE_SIZE_BYTES
         self._memory_cache_lock = threading.RLock()
+        # Memory-only thumbnails taken from embedded EXIF/MPF/TIFF previews.
+        self._provisional_thumbnail_keys: set[tuple] = set()
+        self._thumbnail_level = THUMBNAIL_MAX_SIZE[0]
         self._generation_locks = [threading.Lock() for _ in range(64)]
         self._high_memory_decode_workers = calculate_high_memory_decode_workers()
         self._high_memory_decode_gate = threading.BoundedSemaphore(
             self._high_memory_decode_workers
         )
+        self._fanout_stats_lock = threading.Lock()
+        self._fanout_stats: dict[str, int] = {
+            "calls": 0,
+            "tier_hits": 0,
+            "tier_misses": 0,
+            "decodes": 0,
+            "decodes_saved": 0,
+        }
+        self._preview_chain_stats_lock = threading.Lock()
+        self._preview_chain_stats: dict[str, int] = {
+            "level_hits": 0,
+            "levels_derived": 0,
+            "display_entries_avoided": 0,
+            "display_bytes_avoided": 0,
+        }
+        # (level key, display size) pairs already counted as avoided entries.
+        self._preview_display_sizes_seen: set[tuple] = set()
 
         # Image decoding is memory-heavy. More threads reduce responsiveness and can
         # multiply full-resolution buffers without improving useful throughput.
         self._num_workers = calculate_thumbnail_workers()
+        self._decode_backend_name = decode_backend or get_image_decode_backend()
+        self._process_decoder: ProcessDecodeBackend | None = None
+        # Per decode thread: whether its last backend decode lost its worker.
+        self._decode_crash_state = threading.local()
+        if self._decode_backend_name == "process":
+            self._process_decoder = ProcessDecodeBackend(
+                self._num_workers, self._high_memory_decode_workers
+            )
         logger.info(
             "ImagePipeline initialized in %.4fs (thumbnail workers: %d, "
-            "full-decode workers: %d)",
+            "full-decode workers: %d, decode backend: %s)",
             time.perf_counter() - init_start_time,
             self._num_workers,
             self._high_memory_decode_workers,
+            self._decode_backend_name,
         )
 
     @property
@@ -122,13 +288,67 @@ class ImagePipeline:
         """Return the current shared thumbnail concurrency budget."""
         return self._num_workers
 
+    def _run_decode(self, function: Callable, *args, **kwargs):
+        """Run a processor function on the configured decode backend.
+
+        A crashed worker yields None like any failed decode, but is flagged so
+        ``_record_decode_failure`` does not blame the file.
+        """
+        self._decode_crash_state.crashed = False
+        if self._process_decoder is not None:
+            try:
+                return self._process_decoder.run(function, *args, **kwargs)
+            except DecodeWorkerCrashed:
+                self._decode_crash_state.crashed = True
+                return None
+        return function(*args, **kwargs)
+
+    def shutdown_decode_backend(self) -> None:
+        """Stop decode worker processes; they restart lazily on the next decode."""
+        if self._process_decoder is not None:
+            self._process_decoder.shutdown()
+
+    @staticmethod
+    def _source_exists(image_path: str) -> bool:
+        """Whether the source file exists; files the scanner recorded need no stat."""
+        return fingerprint_registry.is_recorded(image_path) or os.path.isfile(
+            image_path
+        )
+
     @staticmethod
     def _file_fingerprint(image_path: str) -> tuple[int, int]:
-        try:
-            stat_result = os.stat(image_path)
-            return stat_result.st_size, stat_result.st_mtime_ns
-        except OSError:
-            return 0, 0
+        return fingerprint_registry.get(image_path) or (0, 0)
+
+    def _cache_identity(
+        self, normalized_path: str, file_size: int, mtime_ns: int
+    ) -> tuple[str, int, int]:
+        """
+        Return the leading ``(identity, size, mtime_ns)`` fields of a cache key.
+        With content-addressed keys the identity is the file's content digest
+        and the mtime is dropped, so moved or renamed files keep their entries.
+        Files whose digest cannot be read fall back to path keys.
+        """
+        if self.content_digests is None or not file_size:
+            return normalized_path, int(file_size), int(mtime_ns)
+        content_digest = self.content_digests.digest(
+            normalized_path, file_size, mtime_ns
+        )
+        if content_digest is None:
+            return normalized_path, int(file_size), int(mtime_ns)
+        return f"{CONTENT_KEY_PREFIX}{content_digest}", int(file_size), 0
+
+    @property
+    def thumbnail_level(self) -> int:
+        """Long edge of the grid thumbnails served when no level is given."""
+        return self._thumbnail_level
+
+    def set_thumbnail_level(self, level: int) -> bool:
+        """Select the default grid thumbnail level; returns True if it changed."""
+        if level not in THUMBNAIL_LEVELS:
+            raise ValueError(f"Unknown thumbnail level: {level}")
+        changed = level != self._thumbnail_level
+        self._thumbnail_level = level
+        return changed
 
     def thumbnail_cache_key(
         self,
@@ -137,31 +357,41 @@ class ImagePipeline:
         *,
         file_size: int | None = None,
         mtime_ns: int | None = None,
+        level: int | None = None,
     ) -> tuple:
         normalized_path = os.path.normpath(image_path)
         if file_size is None or mtime_ns is None:
             file_size, mtime_ns = self._file_fingerprint(normalized_path)
+        identity, file_size, mtime_ns = self._cache_identity(
+            normalized_path, file_size, mtime_ns
+        )
         apply_auto_edits = is_raw_extension(
             os.path.splitext(normalized_path)[1].lower()
         )
-        return (
-            normalized_path,
+        key = (
+            identity,
             "thumbnail",
             CACHE_SCHEMA_VERSION,
-            int(file_size),
-            int(mtime_ns),
+            file_size,
+            mtime_ns,
             apply_auto_edits,
             apply_orientation,
         )
+        level = level or self._thumbnail_level
+        # The default level keeps the original key, so existing caches and
+        # thumbnail packs stay valid.
+        return key if level == THUMBNAIL_MAX_SIZE[0] else (*key, level)
 
     def preview_cache_key(self, image_path: str, resolution: tuple[int, int]) -> tuple:
         normalized_path = os.path.normpath(image_path)
-        file_size, mtime_ns = self._file_fingerprint(normalized_path)
+        identity, file_size, mtime_ns = self._cache_identity(
+            normalized_path, *self._file_fingerprint(normalized_path)
+        )
         apply_auto_edits = is_raw_extension(
             os.path.splitext(normalized_path)[1].lower()
         )
         return (
-            normalized_path,
+            identity,
             "preview",
             CACHE_SCHEMA_VERSION,
             file_size,
@@ -177,13 +407,15 @@ class ImagePipeline:
     ) -> tuple:
         """Return a fingerprinted key for neutral, model-sized image inputs."""
         normalized_path = os.path.normpath(image_path)
-        file_size, mtime_ns = self._file_fingerprint(normalized_path)
+        identity, file_size, mtime_ns = self._cache_identity(
+            normalized_path, *self._file_fingerprint(normalized_path)
+        )
         return (
-            normalized_path,
+            identity,
             "analysis",
             CACHE_SCHEMA_VERSION,
-            int(file_size),
-            int(mtime_ns),
+            file_size,
+            mtime_ns,
             tuple(target_size),
         )
 
@@ -273,16 +505,35 @@ class ImagePipeline:
             image.thumbnail(target_size, Image.Resampling.LANCZOS)
         return image
 
-    def _memory_get(self, key: tuple) -> Image.Image | None:
+    @staticmethod
+    def _frozen_view(image: Image.Image) -> Image.Image:
+        """Return a new handle that shares ``image``'s pixels copy-on-write.
+
+        Both handles are marked read-only, so Pillow copies the pixel buffer
+        before any in-place edit (paste, putpixel, ImageDraw). Operations that
+        rebind the buffer, such as ``thumbnail()`` or ``convert()``, only touch
+        the handle they are called on.
+        """
+        image.load()
+        image.readonly = 1
+        view = image._new(image.im)
+        view.readonly = 1
+        return view
+
+    def _memory_get(
+        self, key: tuple, *, include_provisional: bool = True
+    ) -> Image.Image | None:
         with self._memory_cache_lock:
+            if not include_provisional and key in self._provisional_thumbnail_keys:
+                return None
             image = self._memory_cache.pop(key, None)
             if image is None:
                 return None
             self._memory_cache[key] = image
-            return image.copy()
+        return self._frozen_view(image)
 
     def _memory_set(self, key: tuple, image: Image.Image) -> None:
-        stored = image.copy()
+        stored = self._frozen_view(image)
         stored_size = self._image_memory_size(stored)
         if stored_size > self._memory_cache_limit_bytes:
             return
@@ -290,14 +541,36 @@ class ImagePipeline:
             previous = self._memory_cache.pop(key, None)
             if previous is not None:
                 self._memory_cache_bytes -= self._image_memory_size(previous)
+            self._provisional_thumbnail_keys.discard(key)
             self._memory_cache[key] = stored
             self._memory_cache_bytes += stored_size
             while self._memory_cache_bytes > self._memory_cache_limit_bytes:
-                _, evicted = self._memory_cache.popitem(last=False)
+                evicted_key, evicted = self._memory_cache.popitem(last=False)
                 self._memory_cache_bytes -= self._image_memory_size(evicted)
+                self._provisional_thumbnail_keys.discard(evicted_key)
 
-    def _cache_get(self, cache: object, key: tuple) -> Image.Image | None:
-        memory_image = self._memory_get(key)
+    def _memory_restore(self, key: tuple, image: Image.Image) -> bool:
+        """
+        Add a warm-up image at the cold end of the LRU if it fits in the free
+        budget, so restoring never evicts images the session has used.
+        Returns False once the budget is full.
+        """
+        stored = self._frozen_view(image)
+        stored_size = self._image_memory_size(stored)
+        with self._memory_cache_lock:
+            if key in self._memory_cache:
+                return True
+            if self._memory_cache_bytes + stored_size > self._memory_cache_limit_bytes:
+                return False
+            self._memory_cache[key] = stored
+            self._memory_cache.move_to_end(key, last=False)
+            self._memory_cache_bytes += stored_size
+        return True
+
+    def _cache_get(
+        self, cache: object, key: tuple, *, include_provisional: bool = True
+    ) -> Image.Image | None:
+        memory_image = self._memory_get(key, include_provisional=include_provisional)
         if memory_image is not None:
             return memory_image
         image = cache.get(key)
@@ -312,17 +585,67 @@ class ImagePipeline:
     def _generation_lock(self, key: tuple) -> threading.Lock:
         return self._generation_locks[hash(key) % len(self._generation_locks)]
 
+    def _decode_failed(self, normalized_path: str, tier: str) -> bool:
+        """True when this version of the file already failed to decode for ``tier``."""
+        file_size, mtime_ns = self._file_fingerprint(normalized_path)
+        return self.decode_failures.is_failed(
+            normalized_path, tier, file_size, mtime_ns
+        )
+
+    def _record_decode_failure(
+        self, normalized_path: str, tier: str, decoder: Callable
+    ) -> None:
+        """Remember a decode that produced no image so it is not retried.
+
+        The file is stat-ed afresh: the registry may still hold the
+        fingerprint of a file that has since been deleted or is being
+        written, and such a transient failure must not be persisted. Nor is
+        a decode whose worker process crashed, taking other files with it.
+        """
+        if getattr(self._decode_crash_state, "crashed", False):
+            return
+        try:
+            stat_result = os.stat(normalized_path)
+        except OSError:
+            return  # The file vanished; there is nothing to remember.
+        file_size, mtime_ns = int(stat_result.st_size), int(stat_result.st_mtime_ns)
+        if self._file_fingerprint(normalized_path) not in {
+            (0, 0),
+            (file_size, mtime_ns),
+        }:
+            return  # Changed while it was decoded; the next request retries it.
+        failure = self.decode_failures.record(
+            normalized_path,
+            tier,
+            file_size,
+            mtime_ns,
+            f"{getattr(decoder, '__qualname__', decoder)} returned no image",
+        )
+        logger.warning(
+            "Could not decode %s for the %s tier (attempt %d); repeated failures "
+            "are skipped until the file changes",
+            os.path.basename(normalized_path),
+            tier,
+            failure.attempts,
+        )
+
+    def broken_files(self, folder: str | None = None) -> list[DecodeFailure]:
+        """Return the files that failed to decode, optionally below ``folder``."""
+        return self.decode_failures.broken_files(folder)
+
     def _get_pil_thumbnail(
         self,
         image_path: str,
         apply_orientation: bool = True,
         *,
         promote_to_memory: bool = True,
+        level: int | None = None,
     ) -> Image.Image | None:
         """
         Internal method to get/generate a PIL thumbnail.
         Checks cache first, then generates and caches.
         Automatically applies auto-edits for RAW files.
+        ``level`` defaults to the grid's current thumbnail level.
         """
         normalized_path = os.path.normpath(image_path)
         ext = os.path.splitext(normalized_path)[1].lower()
@@ -330,43 +653,87 @@ class ImagePipeline:
         # Automatically determine if auto-edits should be applied based on file type
         apply_auto_edits = is_raw_extension(ext)
 
-        cache_key = self.thumbnail_cache_key(normalized_path, apply_orientation)
+        level = level or self._thumbnail_level
+        cache_key = self.thumbnail_cache_key(
+            normalized_path, apply_orientation, level=level
+        )
 
-        cached_img = self._memory_get(cache_key)
+        # Embedded previews only stand in for the grid; always produce the real one.
+        cached_img = self._memory_get(cache_key, include_provisional=False)
         if cached_img is None and promote_to_memory:
-            cached_img = self._cache_get(self.thumbnail_cache, cache_key)
+            cached_img = self._cache_get(
+                self.thumbnail_cache, cache_key, include_provisional=False
+            )
         # If cache hit, return immediately
         if cached_img is not None:
             return cached_img
 
         with self._generation_lock(cache_key):
-            cached_img = self._memory_get(cache_key)
+            cached_img = self._memory_get(cache_key, include_provisional=False)
             if cached_img is None and promote_to_memory:
-                cached_img = self._cache_get(self.thumbnail_cache, cache_key)
+                cached_img = self._cache_get(
+                    self.thumbnail_cache, cache_key, include_provisional=False
+                )
             if cached_img is not None:
                 return cached_img
+            if self._decode_failed(normalized_path, "thumbnail"):
+                return None
+            reduced = self._thumbnail_from_larger_level(
+                normalized_path, apply_orientation, level
+            )
+            if reduced is not None:
+                return self._store_thumbnail_levels(
+                    normalized_path,
+                    apply_orientation,
+                    {level: reduced},
+                    level,
+                    promote_to_memory,
+                )
 
             pil_img: Image.Image | None = None
+            decoder: Callable | None = None
+            # Decode at least the default level so zooming in later is a hit.
+            top_level = max(level, THUMBNAIL_MAX_SIZE[0])
+            decode_size = (top_level, top_level)
             raw_format = is_raw_extension(ext)
-            high_memory_format = ext in {".heic", ".heif"}
-            decode_gate = self._high_memory_decode_gate if high_memory_format else None
+            high_memory_format = ext in HEIF_EXTENSIONS
+            if high_memory_format:
+                # Thumbnail items skip the HEVC decode and its memory gate.
+                pil_img = self._run_decode(
+                    StandardImageProcessor.extract_heif_thumbnail,
+                    normalized_path,
+                    decode_size,
+                    apply_orientation,
+                )
+            decode_gate = (
+                self._high_memory_decode_gate
+                if high_memory_format and pil_img is None
+                else None
+            )
             if decode_gate:
                 decode_gate.acquire()
             try:
-                if raw_format:
-                    pil_img = RawImageProcessor.process_raw_for_thumbnail(
+                if pil_img is not None:
+                    pass
+                elif raw_format:
+                    decoder = RawImageProcessor.process_raw_for_thumbnail
+                    pil_img = self._run_decode(
+                        decoder,
                         normalized_path,
                         apply_auto_edits,
-                        THUMBNAIL_MAX_SIZE,
+                        decode_size,
                         full_decode_gate=self._high_memory_decode_gate,
                     )
                 elif is_video_extension(ext):
-                    pil_img = self._extract_video_thumbnail_with_overlay(
-                        normalized_path
-                    )
+                    decoder = self._extract_video_thumbnail_with_overlay
+                    pil_img = decoder(normalized_path, decode_size)
                 elif ext in SUPPORTED_STANDARD_EXTENSIONS:
-                    pil_img = StandardImageProcessor.process_for_thumbnail(
-                        normalized_path, THUMBNAIL_MAX_SIZE, apply_orientation
+                    decoder = StandardImageProcessor.process_for_thumbnail
+                    pil_img = self._run_decode(
+                        decoder,
+                        normalized_path,
+                        decode_size,
+                        apply_orientation,
                     )
                 else:
                     logger.warning(
@@ -380,27 +747,107 @@ class ImagePipeline:
             if pil_img:
                 if apply_orientation and ext not in SUPPORTED_STANDARD_EXTENSIONS:
                     pil_img = self.image_orientation_handler.exif_transpose(pil_img)
-                if promote_to_memory:
-                    self._cache_set(self.thumbnail_cache, cache_key, pil_img)
-                else:
-                    self.thumbnail_cache.set(cache_key, pil_img)
+                pil_img = self._store_thumbnail_levels(
+                    normalized_path,
+                    apply_orientation,
+                    self._thumbnail_levels(pil_img, top_level),
+                    level,
+                    promote_to_memory,
+                )
+            elif decoder is not None:
+                self._record_decode_failure(normalized_path, "thumbnail", decoder)
             return pil_img
 
+    @staticmethod
+    def _thumbnail_key_level(key: tuple) -> int:
+        """Return the level of a thumbnail cache key."""
+        return key[7] if len(key) > 7 else THUMBNAIL_MAX_SIZE[0]
+
+    @staticmethod
+    def _thumbnail_levels(image: Image.Image, top_level: int) -> dict[int, Image.Image]:
+        """Derive every level up to ``top_level``, each reduced from the next larger."""
+        levels: dict[int, Image.Image] = {}
+        current = image
+        for level in sorted(
+            (level for level in THUMBNAIL_LEVELS if level <= top_level), reverse=True
+        ):
+            if max(current.size) > level:
+                current = current.copy()
+                current.thumbnail((level, level), Image.Resampling.LANCZOS)
+            levels[level] = current
+        return levels
+
+    def _thumbnail_from_larger_level(
+        self, normalized_path: str, apply_orientation: bool, level: int
+    ) -> Image.Image | None:
+        """Reduce an already cached larger level instead of decoding the file."""
+        for larger in THUMBNAIL_LEVELS:
+            if larger <= level:
+                continue
+            key = self.thumbnail_cache_key(
+                normalized_path, apply_orientation, level=larger
+            )
+            image = self._memory_get(key, include_provisional=False)
+            if image is None:
+                image = self.thumbnail_cache.get(key)
+            if image is not None:
+                return self._thumbnail_levels(image, level)[level]
+        return None
+
+    def _store_thumbnail_levels(
+        self,
+        normalized_path: str,
+        apply_orientation: bool,
+        levels: dict[int, Image.Image],
+        level: int,
+        promote_to_memory: bool,
+    ) -> Image.Image:
+        """
+        Write thumbnail levels to the disk cache and return the one for
+        ``level``. Only that level may enter the memory cache; the others wait
+        on disk until the grid zooms to them.
+        """
+        image = levels[level]
+        key = self.thumbnail_cache_key(normalized_path, apply_orientation, level=level)
+        if promote_to_memory:
+            self._cache_set(self.thumbnail_cache, key, image)
+        else:
+            self.thumbnail_cache.set(key, image)
+        other_levels = [
+            (
+                self.thumbnail_cache_key(
+                    normalized_path, apply_orientation, level=other_level
+                ),
+                other_image,
+            )
+            for other_level, other_image in levels.items()
+            if other_level != level
+        ]
+        if other_levels:
+            self.thumbnail_cache.set_many(other_levels)
+        return image
+
     def ensure_thumbnail_cached(
         self,
         image_path: str,
         *,
         promote_to_memory: bool = True,
+        allow_embedded: bool = False,
     ) -> bool:
         """Ensure one thumbnail exists without requiring a UI-thread cache read.
 
         ``promote_to_memory=False`` is intended for low-priority folder warming:
         it checks and fills the disk cache without displacing hot viewport images.
+        ``allow_embedded=True`` lets an uncached JPEG or TIFF paint from its
+        embedded preview first; see ``is_provisional_thumbnail``.
         """
+        if allow_embedded and promote_to_memory:
+            if self._ensure_embedded_thumbnail(image_path):
+                return True
         if not promote_to_memory:
             normalized_path = os.path.normpath(image_path)
             cache_key = self.thumbnail_cache_key(normalized_path, True)
-            if self._memory_get(cache_key) is not None:
+            if self._memory_get(cache_key, include_provisional=False) is not None:
                 return True
             # Membership avoids decoding a disk hit into the shared memory LRU.
             if cache_key in self.thumbnail_cache:
@@ -413,6 +860,242 @@ class ImagePipeline:
             is not None
         )
 
+    def load_cached_thumbnails(
+        self, image_paths: list[str], *, promote_to_memory: bool = True
+    ) -> list[str]:
+        """
+        Return the paths whose real thumbnail is already cached.
+        Disk lookups for the batch share one cache read transaction; with
+        ``promote_to_memory`` the hits are also copied into the memory cache,
+        otherwise only their presence is checked.
+        """
+        keys: dict[tuple, str] = {}
+        for path in image_paths:
+            keys.setdefault(
+                self.thumbnail_cache_key(os.path.normpath(path), True), path
+            )
+        with self._memory_cache_lock:
+            cached = [
+                key
+                for key in keys
+                if key in self._memory_cache
+                and key not in self._provisional_thumbnail_keys
+            ]
+        memory_hits = set(cached)
+        remaining = [key for key in keys if key not in memory_hits]
+        if remaining and promote_to_memory:
+            images = self.thumbnail_cache.get_many(remaining)
+            for key, image in images.items():
+                self._memory_set(key, image)
+            cached.extend(images)
+        elif remaining:
+            cached.extend(self.thumbnail_cache.contains_many(remaining))
+        return [keys[key] for key in cached]
+
+    def _ensure_embedded_thumbnail(self, image_path: str) -> bool:
+        """Serve an uncached JPEG/TIFF from its embedded preview, memory only.
+
+        Returns False when the caller still has to load a thumbnail: no usable
+        embedded preview, or a real one on disk that is not in memory yet.
+        """
+        normalized_path = os.path.normpath(image_path)
+        if (
+            os.path.splitext(normalized_path)[1].lower()
+            not in EMBEDDED_THUMBNAIL_EXTENSIONS
+        ):
+            return False
+        cache_key = self.thumbnail_cache_key(normalized_path, True)
+        with self._generation_lock(cache_key):
+            if self._memory_get(cache_key) is not None:
+                return True
+            if cache_key in self.thumbnail_cache:
+                # The real thumbnail beats the embedded one; the caller
+                # promotes it, since memory-only readers cannot see the disk.
+                return False
+            embedded = self._run_decode(
+                StandardImageProcessor.extract_embedded_thumbnail,
+                normalized_path,
+                (self._thumbnail_level, self._thumbnail_level),
+            )
+            if embedded is None:
+                return False
+            # Never written to disk, so a restart or upgrade replaces it.
+            self._memory_set(cache_key, embedded)
+            with self._memory_cache_lock:
+                if cache_key in self._memory_cache:
+                    self._provisional_thumbnail_keys.add(cache_key)
+        return True
+
+    def is_provisional_thumbnail(self, image_path: str) -> bool:
+        """Return whether the cached thumbnail is an embedded stand-in."""
+        cache_key = self.thumbnail_cache_key(os.path.normpath(image_path), True)
+        with self._memory_cache_lock:
+            return cache_key in self._provisional_thumbnail_keys
+
+    def load_thumbnail_pack(
+        self, folder: str, image_paths: list[str]
+    ) -> tuple[list[str], int]:
+        """
+        Copy a folder's packed thumbnails into the memory cache in one read.
+        Paths are loaded in the given order until ``THUMBNAIL_PACK_LOAD_BYTES``
+        is used. Returns the loaded paths and how many paths have no current
+        thumbnail in the pack.
+        """
+        from core.app_settings import THUMBNAIL_PACK_LOAD_BYTES
+
+        keys: dict[tuple, str] = {}
+        for path in image_paths:
+            keys.setdefault(
+                self.thumbnail_cache_key(os.path.normpath(path), True), path
+            )
+        started = time.perf_counter()
+        packed, missing = self.thumbnail_packs.read(
+            folder, keys, max_bytes=THUMBNAIL_PACK_LOAD_BYTES
+        )
+        for key, image in packed.items():
+            if self._memory_get(key, include_provisional=False) is None:
+                self._memory_set(key, image)
+        if packed:
+            logger.debug(
+                "Loaded %d/%d packed thumbnails for %s in %.3fs",
+                len(packed),
+                len(keys),
+                os.path.basename(os.path.normpath(folder)),
+                time.perf_counter() - started,
+            )
+        return [keys[key] for key in packed], missing
+
+    def write_thumbnail_pack(
+        self,
+        folder: str,
+        image_paths: list[str],
+        should_cancel: Callable[[], bool] | None = None,
+    ) -> int:
+        """
+        Rewrite a folder's thumbnail pack from the memory and disk caches.
+        Paths without a cached, non-provisional thumbnail are left out.
+        """
+
+        def cached_thumbnails():
+            for path in image_paths:
+                key = self.thumbnail_cache_key(os.path.normpath(path), True)
+                image = self._memory_get(key, include_provisional=False)
+                if image is None:
+                    # Read past the memory LRU so packing does not evict hot images.
+                    image = self.thumbnail_cache.get(key)
+                if image is not None:
+                    yield key, image
+
+        return self.thumbnail_packs.write(folder, cached_thumbnails(), should_cancel)
+
+    def save_hot_set(
+        self, *, folder: str | None = None, focused_path: str | None = None
+    ) -> int:
+        """
+        Record the memory LRU's disk-backed keys and the navigation position so
+        the next launch can restore them. Returns the number of keys saved.
+        """
+        with self._memory_cache_lock:
+            entries = [
+                (key, self._image_memory_size(image))
+                for key, image in reversed(self._memory_cache.items())
+                if key not in self._provisional_thumbnail_keys
+                and key[1] in self._hot_set_caches()
+            ]
+        hot_set = HotSet(entries=entries, folder=folder, focused_path=focused_path)
+        if not save_hot_set(self._hot_set_path, hot_set):
+            return 0
+        logger.info(
+            "Saved image hot set: %d entries (%.1f MB)",
+            len(entries),
+            sum(size for _key, size in entries) / (1024 * 1024),
+        )
+        return len(entries)
+
+    def _hot_set_caches(self) -> dict[str, object]:
+        return {
+            "thumbnail": self.thumbnail_cache,
+            "preview": self.preview_cache,
+            "analysis": self.analysis_cache,
+        }
+
+    def restore_hot_set(self, should_stop: Callable[[], bool] | None = None) -> int:
+        """
+        Read the saved hot set back from the disk tiers into the memory LRU,
+        focused image first. Stops when the memory budget is full or
+        ``should_stop`` returns True. Returns the number of images restored.
+        """
+        from core.app_settings import HOT_SET_RESTORE_BATCH_SIZE
+
+        hot_set = load_hot_set(self._hot_set_path)
+        if hot_set is None or not hot_set.entries:
+            return 0
+        started = time.perf_counter()
+        caches = self._hot_set_caches()
+        restored = 0
+        for batch in hot_set.restore_batches(HOT_SET_RESTORE_BATCH_SIZE):
+            if should_stop is not None and should_stop():
+                break
+            with self._memory_cache_lock:
+                batch = [key for key in batch if key not in self._memory_cache]
+            images: dict[tuple, Image.Image] = {}
+            for tier, cache in caches.items():
+                tier_keys = [key for key in batch if key[1] == tier]
+                if not tier_keys:
+                    continue
+                get_many = getattr(cache, "get_many", None)
+                if get_many is not None:
+                    images.update(get_many(tier_keys))
+                else:
+                    for key in tier_keys:
+                        image = cache.get(key)
+                        if image is not None:
+                            images[key] = image
+            budget_full = False
+            for key in batch:
+                image = images.get(key)
+                if image is None:
+                    continue
+                if not self._memory_restore(key, image):
+                    budget_full = True
+                    break
+                restored += 1
+            if budget_full:
+                break
+            time.sleep(0)  # Let foreground decode threads take the GIL.
+        logger.info(
+            "Restored %d/%d hot-set images in %.3fs",
+            restored,
+            len(hot_set.entries),
+            time.perf_counter() - started,
+        )
+        return restored
+
+    def start_hot_set_restore(self) -> None:
+        """Restore the saved hot set on a low-priority background thread."""
+        if self._hot_set_thread is not None and self._hot_set_thread.is_alive():
+            return
+        self._hot_set_stop.clear()
+
+        def run() -> None:
+            if sys.platform.startswith("linux"):
+                # Linux applies nice values per thread.
+                with contextlib.suppress(AttributeError, OSError):
+                    os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+            try:
+                self.restore_hot_set(self._hot_set_stop.is_set)
+            except Exception:
+                logger.error("Image hot-set restore failed.", exc_info=True)
+
+        self._hot_set_thread = threading.Thread(
+            target=run, name="HotSetRestore", daemon=True
+        )
+        self._hot_set_thread.start()
+
+    def stop_hot_set_restore(self) -> None:
+        """Ask a running hot-set restore to stop after its current batch."""
+        self._hot_set_stop.set()
+
     def get_cached_thumbnail_qpixmap(
         self,
         image_path: str,
@@ -428,7 +1111,7 @@ class ImagePipeline:
         ``memory_only`` also prevents disk-cache reads for latency-sensitive UI calls.
         """
         normalized_path = os.path.normpath(image_path)
-        if not os.path.isfile(normalized_path):
+        if not self._source_exists(normalized_path):
             logger.error(f"File does not exist: {normalized_path}")
             return None
 
@@ -459,6 +1142,7 @@ class ImagePipeline:
     def _extract_video_thumbnail_with_overlay(
         self,
         video_path: str,
+        max_size: tuple[int, int] = THUMBNAIL_MAX_SIZE,
     ) -> Image.Image | None:
         """Extract first decodable frame and apply a play badge overlay."""
         import cv2
@@ -493,7 +1177,7 @@ class ImagePipeline:
         try:
             frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             pil_img = Image.fromarray(frame_rgb)
-            pil_img.thumbnail(THUMBNAIL_MAX_SIZE, Image.Resampling.LANCZOS)
+            pil_img.thumbnail(max_size, Image.Resampling.LANCZOS)
             return self._add_video_play_overlay(pil_img)
         except Exception as exc:
             logger.debug(
@@ -558,7 +1242,7 @@ class ImagePipeline:
             image_path: The path to the image.
             apply_orientation: Whether to apply EXIF orientation to the thumbnail.
         """
-        if not os.path.isfile(image_path):
+        if not self._source_exists(image_path):
             logger.error(f"File does not exist: {image_path}")
             return None
 
@@ -598,12 +1282,15 @@ class ImagePipeline:
         target_resolution = (
             display_max_size if display_max_size else PRELOAD_MAX_RESOLUTION
         )
+        if self._decode_failed(normalized_path, "preview"):
+            return None
 
         if is_raw_extension(ext):
             # Use the same bounded preview path as background prefetch. It
             # prefers the camera's embedded JPEG and falls back to half-size
             # demosaicing, avoiding a full-resolution RAW decode for display.
-            pil_img = RawImageProcessor.process_raw_for_preview(
+            decoder = RawImageProcessor.process_raw_for_preview
+            pil_img = decoder(
                 normalized_path,
                 apply_auto_edits,
                 target_resolution,
@@ -611,7 +1298,8 @@ class ImagePipeline:
             )
 
         elif ext in SUPPORTED_STANDARD_EXTENSIONS:
-            pil_img = StandardImageProcessor.process_for_preview(
+            decoder = StandardImageProcessor.process_for_preview
+            pil_img = decoder(
                 normalized_path,
                 target_resolution,
             )
@@ -621,9 +1309,133 @@ class ImagePipeline:
             )
             return None
 
+        if pil_img is None:
+            self._record_decode_failure(normalized_path, "preview", decoder)
         # Orientation should be handled by the processors.
         return pil_img
 
+    def _store_preview_level(
+        self,
+        normalized_path: str,
+        level: tuple[int, int],
+        image: Image.Image,
+        *,
+        memory_only: bool = False,
+    ) -> Image.Image:
+        """Reduce a larger chain level to ``level`` and cache it under its key."""
+        image.thumbnail(level, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        key = self.preview_cache_key(normalized_path, level)
+        if memory_only:
+            self._memory_set(key, image)
+        else:
+            self._cache_set(self.preview_cache, key, image)
+        with self._preview_chain_stats_lock:
+            self._preview_chain_stats["levels_derived"] += 1
+        return image
+
+    def _get_preview_level(
+        self,
+        normalized_path: str,
+        level: tuple[int, int],
+        *,
+        memory_only: bool = False,
+    ) -> Image.Image | None:
+        """
+        Return the cached preview at ``level``. When only a larger level is
+        cached, ``level`` is reduced from the nearest one and added to the
+        chain, so later requests for it read it directly. Larger levels read
+        from disk for that are not promoted to the memory cache.
+        """
+        key = self.preview_cache_key(normalized_path, level)
+        image = (
+            self._memory_get(key)
+            if memory_only
+            else self._cache_get(self.preview_cache, key)
+        )
+        if image is not None:
+            with self._preview_chain_stats_lock:
+                self._preview_chain_stats["level_hits"] += 1
+            return image
+        for larger in reversed(PREVIEW_LEVELS[: PREVIEW_LEVELS.index(level)]):
+            key = self.preview_cache_key(normalized_path, larger)
+            image = self._memory_get(key)
+            if image is None and not memory_only:
+                image = self.preview_cache.get(key)
+            if image is not None:
+                return self._store_preview_level(
+                    normalized_path, level, image, memory_only=memory_only
+                )
+        return None
+
+    def _generate_preview_level(
+        self,
+        normalized_path: str,
+        level: tuple[int, int],
+        force_regenerate: bool,
+        force_default_brightness: bool,
+    ) -> Image.Image | None:
+        """Decode the top chain level on a cache miss and derive ``level`` from it."""
+        top_key = self.preview_cache_key(normalized_path, PREVIEW_LEVELS[0])
+        logger.debug(
+            f"Preview cache MISS for {os.path.basename(normalized_path)}. Generating PIL preview on-demand..."
+        )
+        with self._generation_lock(top_key):
+            if not force_regenerate:
+                cached = self._get_preview_level(normalized_path, level)
+                if cached is not None:
+                    return cached
+            generated = self._generate_pil_preview_for_display(
+                normalized_path,
+                PREVIEW_LEVELS[0],
+                force_default_brightness,
+            )
+            if generated is None:
+                return None
+            if level == PREVIEW_LEVELS[0]:
+                self._cache_set(self.preview_cache, top_key, generated)
+                return generated
+            # Only the requested level enters the memory cache.
+            self.preview_cache.set(top_key, generated)
+        return self._store_preview_level(normalized_path, level, generated)
+
+    def _record_preview_display(
+        self,
+        normalized_path: str,
+        image: Image.Image,
+        level: tuple[int, int],
+        display_max_size: tuple[int, int] | None,
+    ) -> None:
+        """
+        Account for the display-sized entry the chain did not write. Before
+        the chain, every new display size of a file was resampled, encoded and
+        stored; its size is estimated from the level's encoded payload.
+        """
+        if display_max_size is None or tuple(display_max_size) == level:
+            return
+        level_key = self.preview_cache_key(normalized_path, level)
+        payload_size = self.encoded_memory_cache.payload_size(level_key) or 0
+        scale = min(
+            1.0,
+            display_max_size[0] / max(1, image.width),
+            display_max_size[1] / max(1, image.height),
+        )
+        seen_key = (level_key, tuple(display_max_size))
+        with self._preview_chain_stats_lock:
+            if seen_key in self._preview_display_sizes_seen:
+                return
+            if len(self._preview_display_sizes_seen) >= PREVIEW_DISPLAY_SIZES_TRACKED:
+                self._preview_display_sizes_seen.clear()
+            self._preview_display_sizes_seen.add(seen_key)
+            self._preview_chain_stats["display_entries_avoided"] += 1
+            self._preview_chain_stats["display_bytes_avoided"] += int(
+                payload_size * scale * scale
+            )
+
+    def preview_chain_stats(self) -> dict[str, int]:
+        """Return preview chain hits, derived levels and display entries avoided."""
+        with self._preview_chain_stats_lock:
+            return dict(self._preview_chain_stats)
+
     def get_preview_image(
         self,
         image_path: str,
@@ -631,77 +1443,43 @@ class ImagePipeline:
         force_regenerate: bool = False,
         force_default_brightness: bool = False,
     ) -> Image.Image | None:
-        """Return a PIL image suitable for analysis/display, leveraging preview cache."""
+        """
+        Return a PIL image suitable for analysis/display, leveraging the
+        preview chain. The nearest level is scaled down to
+        ``display_max_size`` with a cheap bilinear pass that is not cached.
+        """
         normalized_path = os.path.normpath(image_path)
-        if not os.path.isfile(normalized_path):
+        if not self._source_exists(normalized_path):
             logger.error(f"File does not exist: {normalized_path}")
             return None
 
-        key_display_size = (
-            display_max_size if display_max_size is not None else PRELOAD_MAX_RESOLUTION
-        )
-        display_cache_key = self.preview_cache_key(normalized_path, key_display_size)
-
+        level = preview_level_for(display_max_size)
+        preview = None
         if not force_regenerate:
-            cached_display_pil = self._cache_get(self.preview_cache, display_cache_key)
-            if cached_display_pil:
-                result_image = cached_display_pil.copy()
-                if result_image.mode != "RGB":
-                    result_image = result_image.convert("RGB")
-                result_image.info.setdefault("source_path", normalized_path)
-                result_image.info.setdefault("region", "full")
-                return result_image
-
-        preload_cache_key = self.preview_cache_key(
-            normalized_path, PRELOAD_MAX_RESOLUTION
-        )
-        cached_high_res_pil = self._cache_get(self.preview_cache, preload_cache_key)
-        if cached_high_res_pil:
-            logger.debug(
-                f"Preview cache HIT (High-Res PIL): {os.path.basename(normalized_path)}. Resizing for display."
+            preview = self._get_preview_level(normalized_path, level)
+        if preview is None:
+            preview = self._generate_preview_level(
+                normalized_path, level, force_regenerate, force_default_brightness
             )
-            display_pil_img = cached_high_res_pil.copy()
-            if display_max_size:
-                display_pil_img.thumbnail(display_max_size, Image.Resampling.LANCZOS)
-            self._cache_set(
-                self.preview_cache, display_cache_key, display_pil_img.copy()
+        if preview is None:
+            logger.error(
+                f"Failed to generate or retrieve preview PIL for {os.path.basename(normalized_path)}",
+                exc_info=True,
             )
-            if display_pil_img.mode != "RGB":
-                display_pil_img = display_pil_img.convert("RGB")
-            display_pil_img.info.setdefault("source_path", normalized_path)
-            display_pil_img.info.setdefault("region", "full")
-            return display_pil_img
+            return None
 
-        logger.debug(
-            f"Preview cache MISS for {os.path.basename(normalized_path)}. Generating PIL preview on-demand..."
-        )
-        with self._generation_lock(display_cache_key):
-            generated_display_pil = None
-            if not force_regenerate:
-                generated_display_pil = self._cache_get(
-                    self.preview_cache, display_cache_key
-                )
-            if generated_display_pil is None:
-                generated_display_pil = self._generate_pil_preview_for_display(
-                    normalized_path,
-                    display_max_size,
-                    force_default_brightness,
-                )
-        if generated_display_pil:
-            self._cache_set(
-                self.preview_cache, display_cache_key, generated_display_pil.copy()
+        self._record_preview_display(normalized_path, preview, level, display_max_size)
+        if display_max_size and (
+            preview.width > display_max_size[0] or preview.height > display_max_size[1]
+        ):
+            preview.thumbnail(
+                display_max_size, Image.Resampling.BILINEAR, reducing_gap=2.0
             )
-            if generated_display_pil.mode != "RGB":
-                generated_display_pil = generated_display_pil.convert("RGB")
-            generated_display_pil.info.setdefault("source_path", normalized_path)
-            generated_display_pil.info.setdefault("region", "full")
-            return generated_display_pil
-
-        logger.error(
-            f"Failed to generate or retrieve preview PIL for {os.path.basename(normalized_path)}",
-            exc_info=True,
-        )
-        return None
+        if preview.mode != "RGB":
+            preview = preview.convert("RGB")
+        preview.info.setdefault("source_path", normalized_path)
+        preview.info.setdefault("region", "full")
+        return preview
 
     def get_cached_preview_qpixmap(
         self,
@@ -714,63 +1492,28 @@ class ImagePipeline:
         Returns a preview QPixmap only if a suitable preview already exists in cache.
         Never generates a new preview on cache miss.
 
+        The pixmap is the nearest preview level covering ``display_max_size``;
+        views scale it to their viewport when painting.
         Brightness is baked in when previews are generated and stored in the cache.
         ``memory_only`` also prevents disk-cache reads for latency-sensitive UI calls.
         """
         normalized_path = os.path.normpath(image_path)
-        if not os.path.isfile(normalized_path):
+        if not self._source_exists(normalized_path):
             logger.error(f"File does not exist: {normalized_path}")
             return None
 
-        key_display_size = (
-            display_max_size if display_max_size is not None else PRELOAD_MAX_RESOLUTION
+        level = preview_level_for(display_max_size)
+        preview = self._get_preview_level(
+            normalized_path, level, memory_only=memory_only
         )
-        display_cache_key = self.preview_cache_key(normalized_path, key_display_size)
-
-        cached_display_pil = (
-            self._memory_get(display_cache_key)
-            if memory_only
-            else self._cache_get(self.preview_cache, display_cache_key)
-        )
-        if cached_display_pil is not None:
-            try:
-                return self._qpixmap_from_pil(cached_display_pil)
-            except Exception:
-                logger.error(
-                    "Error converting cached display preview to QPixmap for %s",
-                    os.path.basename(normalized_path),
-                    exc_info=True,
-                )
-                return None
-
-        preload_cache_key = self.preview_cache_key(
-            normalized_path, PRELOAD_MAX_RESOLUTION
-        )
-        cached_high_res_pil = (
-            self._memory_get(preload_cache_key)
-            if memory_only
-            else self._cache_get(self.preview_cache, preload_cache_key)
-        )
-        if cached_high_res_pil is None:
+        if preview is None:
             return None
-
-        display_pil_img = cached_high_res_pil.copy()
-        if display_max_size:
-            display_pil_img.thumbnail(display_max_size, Image.Resampling.LANCZOS)
-
-        if memory_only:
-            self._memory_set(display_cache_key, display_pil_img)
-        else:
-            self._cache_set(
-                self.preview_cache,
-                display_cache_key,
-                display_pil_img.copy(),
-            )
+        self._record_preview_display(normalized_path, preview, level, display_max_size)
         try:
-            return self._qpixmap_from_pil(display_pil_img)
+            return self._qpixmap_from_pil(preview)
         except Exception:
             logger.error(
-                "Error converting cached high-res preview to QPixmap for %s",
+                "Error converting cached preview to QPixmap for %s",
                 os.path.basename(normalized_path),
                 exc_info=True,
             )
@@ -785,74 +1528,31 @@ class ImagePipeline:
         force_default_brightness: bool = False,
     ) -> QPixmap | None:
         """
-        Gets a QPixmap preview for the image path, scaled to display_max_size.
+        Gets a QPixmap preview for the image path at the nearest preview level
+        covering display_max_size; the view does the final scale when painting.
         Automatically applies auto-edits for RAW files.
-        1. Checks cache for display-sized PIL image.
-        2. Checks cache for high-resolution preloaded PIL image, then resizes.
-        3. Generates fresh PIL image for display size, caches it, then converts.
+        1. Checks the chain for that level.
+        2. Reduces it from a larger cached level and stores it in the chain.
+        3. Generates the top level fresh, caches it and derives the level.
         """
         normalized_path = os.path.normpath(image_path)
-        if not os.path.isfile(normalized_path):
+        if not self._source_exists(normalized_path):
             logger.error(f"File does not exist: {normalized_path}")
             return None
 
-        # Automatically determine if auto-edits should be applied based on file type
-        # Cache key for the final display-sized PIL image
-        # Ensure display_max_size is a tuple for the cache key, even if None was passed
-        key_display_size = (
-            display_max_size if display_max_size is not None else PRELOAD_MAX_RESOLUTION
-        )
-        display_cache_key = self.preview_cache_key(normalized_path, key_display_size)
-
-        # 1. Check if display-sized version is already cached
+        level = preview_level_for(display_max_size)
+        preview = None
         if not force_regenerate:
-            cached_display_pil = self._cache_get(self.preview_cache, display_cache_key)
-            if cached_display_pil:
-                return self._qpixmap_from_pil(cached_display_pil)
-            else:
-                logger.debug(
-                    f"Display cache MISS: {os.path.basename(normalized_path)} (Size: {key_display_size})"
-                )
-
-        # 2. Check if a high-resolution PRELOADED version is cached
-        # Key for preloaded high-res version (uses PRELOAD_MAX_RESOLUTION)
-        preload_cache_key = self.preview_cache_key(
-            normalized_path, PRELOAD_MAX_RESOLUTION
-        )
-        cached_high_res_pil = self._cache_get(self.preview_cache, preload_cache_key)
-
-        if cached_high_res_pil:
-            logger.debug(
-                f"Preview cache HIT (High-Res): {os.path.basename(normalized_path)}. Resizing for display."
+            preview = self._get_preview_level(normalized_path, level)
+        if preview is None:
+            preview = self._generate_preview_level(
+                normalized_path, level, force_regenerate, force_default_brightness
             )
-            display_pil_img = cached_high_res_pil.copy()
-            if display_max_size:
-                display_pil_img.thumbnail(display_max_size, Image.Resampling.LANCZOS)
-
-            self._cache_set(self.preview_cache, display_cache_key, display_pil_img)
-            return self._qpixmap_from_pil(display_pil_img)
-
-        # 3. Generate fresh for display size, then cache
-        logger.debug(
-            f"Preview cache MISS for {os.path.basename(normalized_path)}. Generating on-demand..."
-        )
-        with self._generation_lock(display_cache_key):
-            generated_display_pil = None
-            if not force_regenerate:
-                generated_display_pil = self._cache_get(
-                    self.preview_cache, display_cache_key
-                )
-            if generated_display_pil is None:
-                generated_display_pil = self._generate_pil_preview_for_display(
-                    normalized_path,
-                    display_max_size,
-                    force_default_brightness,
-                )
-        if generated_display_pil:
-            self._cache_set(
-                self.preview_cache, display_cache_key, generated_display_pil
+        if preview is not None:
+            self._record_preview_display(
+                normalized_path, preview, level, display_max_size
             )
-            return self._qpixmap_from_pil(generated_display_pil)
+            return self._qpixmap_from_pil(preview)
 
         logger.error(
             f"Failed to generate or retrieve preview for {os.path.basename(normalized_path)}",
@@ -901,6 +1601,8 @@ class ImagePipeline:
                 and self._cache_get(self.preview_cache, preload_cache_key) is not None
             ):
                 return True
+            if self._decode_failed(normalized_path, "preview"):
+                return False
 
             pil_img: Image.Image | None = None
             ext = os.path.splitext(normalized_path)[1].lower()
@@ -911,15 +1613,20 @@ class ImagePipeline:
                 decode_gate.acquire()
             try:
                 if is_raw_extension(ext):
-                    pil_img = RawImageProcessor.process_raw_for_preview(
+                    decoder = RawImageProcessor.process_raw_for_preview
+                    pil_img = self._run_decode(
+                        decoder,
                         normalized_path,
                         apply_auto_edits,
                         PRELOAD_MAX_RESOLUTION,
                         force_default_brightness=force_default_brightness,
                     )
                 elif ext in SUPPORTED_STANDARD_EXTENSIONS:
-                    pil_img = StandardImageProcessor.process_for_preview(
-                        normalized_path, PRELOAD_MAX_RESOLUTION
+                    decoder = StandardImageProcessor.process_for_preview
+                    pil_img = self._run_decode(
+                        decoder,
+                        normalized_path,
+                        PRELOAD_MAX_RESOLUTION,
                     )
                 else:
                     logger.warning(
@@ -938,11 +1645,231 @@ class ImagePipeline:
                 )
                 return True
 
-            logger.error(
-                f"Failed to generate preview for {os.path.basename(normalized_path)}",
-                exc_info=True,
+            self._record_decode_failure(normalized_path, "preview", decoder)
+            return False
+
+    def _tier_cache_target(
+        self, normalized_path: str, tier: str
+    ) -> tuple[object, tuple, tuple[int, int]]:
+        if tier == "thumbnail":
+            level = self._thumbnail_level
+            top_level = max(level, THUMBNAIL_MAX_SIZE[0])
+            return (
+                self.thumbnail_cache,
+                self.thumbnail_cache_key(normalized_path, True, level=level),
+                (top_level, top_level),
+            )
+        if tier == "preview":
+            return (
+                self.preview_cache,
+                self.preview_cache_key(normalized_path, PRELOAD_MAX_RESOLUTION),
+                PRELOAD_MAX_RESOLUTION,
+            )
+        if tier == "analysis":
+            return (
+                self.analysis_cache,
+                self.analysis_cache_key(normalized_path, ANALYSIS_CACHE_RESOLUTION),
+                ANALYSIS_CACHE_RESOLUTION,
+            )
+        raise ValueError(f"Unknown image tier: {tier}")
+
+    def _missing_tiers(
+        self, targets: dict[str, tuple[object, tuple, tuple[int, int]]]
+    ) -> dict[str, tuple[object, tuple, tuple[int, int]]]:
+        missing = {}
+        for tier, (cache, key, size) in targets.items():
+            with self._memory_cache_lock:
+                if key in self._memory_cache:
+                    continue
+            # Membership avoids decoding cached payloads just to prove they exist.
+            if key not in cache:
+                missing[tier] = (cache, key, size)
+        return missing
+
+    @contextlib.contextmanager
+    def _generation_locks_for(self, keys: list[tuple]):
+        # Ascending stripe order keeps multi-key acquisition deadlock free.
+        stripes = sorted({hash(key) % len(self._generation_locks) for key in keys})
+        with contextlib.ExitStack() as stack:
+            for stripe in stripes:
+                stack.enter_context(self._generation_locks[stripe])
+            yield
+
+    def _record_fanout_stats(self, hits: int, misses: int, basename: str) -> None:
+        with self._fanout_stats_lock:
+            self._fanout_stats["calls"] += 1
+            self._fanout_stats["tier_hits"] += hits
+            self._fanout_stats["tier_misses"] += misses
+            if misses:
+                self._fanout_stats["decodes"] += 1
+                self._fanout_stats["decodes_saved"] += misses - 1
+            total_calls = self._fanout_stats["calls"]
+            stats_snapshot = dict(self._fanout_stats)
+
+        if total_calls == 1 or total_calls % PREVIEW_GENERATION_LOG_INTERVAL == 0:
+            logger.debug(
+                "Tier fan-out summary after %d files: hits=%d, misses=%d, decodes=%d, decodes_saved=%d (latest: %s)",
+                total_calls,
+                stats_snapshot["tier_hits"],
+                stats_snapshot["tier_misses"],
+                stats_snapshot["decodes"],
+                stats_snapshot["decodes_saved"],
+                basename,
             )
+
+    def memory_cache_stats(self) -> dict[str, dict[str, int]]:
+        """Occupancy of the decoded LRU and counters of the encoded tier."""
+        with self._memory_cache_lock:
+            decoded = {
+                "entries": len(self._memory_cache),
+                "bytes": self._memory_cache_bytes,
+                "limit_bytes": self._memory_cache_limit_bytes,
+            }
+        return {"decoded": decoded, "encoded": self.encoded_memory_cache.stats()}
+
+    def fanout_stats(self) -> dict[str, int]:
+        """Return a snapshot of tier fan-out hit, miss and decode counters."""
+        with self._fanout_stats_lock:
+            return dict(self._fanout_stats)
+
+    def ensure_tiers_cached(
+        self,
+        image_path: str,
+        tiers: tuple[str, ...] = FANOUT_TIERS,
+        *,
+        promote_to_memory: bool = True,
+    ) -> bool:
+        """
+        Fill several cache tiers for one file from a single source decode.
+
+        Tiers already cached in memory or on disk are left alone. The missing
+        ones are derived from one reduced decode at the largest box they need
+        and written to their caches in the same pass. RAW and other non-standard
+        files keep their per-tier paths because each tier applies different
+        tone edits. Returns True when every requested tier is cached.
+        """
+        normalized_path = os.path.normpath(image_path)
+        ext = os.path.splitext(normalized_path)[1].lower()
+        if ext not in SUPPORTED_STANDARD_EXTENSIONS:
+            return self._ensure_tiers_individually(
+                normalized_path, tiers, promote_to_memory=promote_to_memory
+            )
+
+        targets = {
+            tier: self._tier_cache_target(normalized_path, tier) for tier in tiers
+        }
+        missing = self._missing_tiers(targets)
+        if missing and all(
+            self._decode_failed(normalized_path, tier) for tier in missing
+        ):
             return False
+        if missing:
+            with self._generation_locks_for([key for _, key, _ in missing.values()]):
+                missing = self._missing_tiers(missing)
+                if missing and not self._generate_tiers(
+                    normalized_path, ext, missing, promote_to_memory
+                ):
+                    return False
+        self._record_fanout_stats(
+            len(targets) - len(missing),
+            len(missing),
+            os.path.basename(normalized_path),
+        )
+        return True
+
+    def _generate_tiers(
+        self,
+        normalized_path: str,
+        ext: str,
+        missing: dict[str, tuple[object, tuple, tuple[int, int]]],
+        promote_to_memory: bool,
+    ) -> bool:
+        start_time = time.time()
+        images: dict[str, Image.Image] = {}
+        decode_sizes = {tier: size for tier, (_, _, size) in missing.items()}
+        decode_gate = None
+        if ext in HEIF_EXTENSIONS:
+            # Tiers a thumbnail item covers skip the HEVC decode and its gate.
+            for tier, size in list(decode_sizes.items()):
+                image = self._run_decode(
+                    StandardImageProcessor.extract_heif_thumbnail,
+                    normalized_path,
+                    size,
+                )
+                if image is not None:
+                    images[tier] = image
+                    del decode_sizes[tier]
+            decode_gate = self._high_memory_decode_gate if decode_sizes else None
+        if decode_gate:
+            decode_gate.acquire()
+        try:
+            decoded = (
+                self._run_decode(
+                    StandardImageProcessor.process_for_tiers,
+                    normalized_path,
+                    decode_sizes,
+                )
+                if decode_sizes
+                else {}
+            )
+        finally:
+            if decode_gate:
+                decode_gate.release()
+        if decoded is None:
+            for tier in decode_sizes:
+                self._record_decode_failure(
+                    normalized_path, tier, StandardImageProcessor.process_for_tiers
+                )
+            return False
+        images.update(decoded)
+
+        for tier, (cache, key, size) in missing.items():
+            image = images[tier]
+            if tier == "thumbnail":
+                self._store_thumbnail_levels(
+                    normalized_path,
+                    True,
+                    self._thumbnail_levels(image, size[0]),
+                    self._thumbnail_key_level(key),
+                    promote_to_memory,
+                )
+                continue
+            if tier == "analysis" and image.mode != "RGB":
+                image = image.convert("RGB")
+            if promote_to_memory:
+                self._cache_set(cache, key, image)
+            else:
+                cache.set(key, image)
+        if "preview" in missing:
+            _record_preview_generation_log(
+                time.time() - start_time, os.path.basename(normalized_path)
+            )
+        return True
+
+    def _ensure_tiers_individually(
+        self,
+        normalized_path: str,
+        tiers: tuple[str, ...],
+        *,
+        promote_to_memory: bool,
+    ) -> bool:
+        success = True
+        for tier in tiers:
+            if tier == "thumbnail":
+                ready = self.ensure_thumbnail_cached(
+                    normalized_path, promote_to_memory=promote_to_memory
+                )
+            elif tier == "preview":
+                ready = self.ensure_preview_cached(normalized_path)
+            elif tier == "analysis":
+                ready = (
+                    self.get_analysis_image(normalized_path, ANALYSIS_CACHE_RESOLUTION)
+                    is not None
+                )
+            else:
+                raise ValueError(f"Unknown image tier: {tier}")
+            success = success and ready
+        return success
 
     def preload_previews(
         self,
@@ -951,6 +1878,7 @@ class ImagePipeline:
         should_continue_callback: Callable[[], bool] | None = None,
     ) -> None:
         """Preloads preview PIL images (at PRELOAD_MAX_RESOLUTION) in parallel.
+        The same decode also fills the analysis and thumbnail tiers.
         Automatically applies auto-edits for RAW files."""
         total_files = len(image_paths)
         processed_count = 0
@@ -973,7 +1901,7 @@ class ImagePipeline:
                         image_path = next(path_iterator)
                     except StopIteration:
                         return
-                    future = executor.submit(self.ensure_preview_cached, image_path)
+                    future = executor.submit(self.ensure_tiers_cached, image_path)
                     futures_map[future] = image_path
 
             submit_until_full()
@@ -1091,19 +2019,32 @@ class ImagePipeline:
         post-processing. Cached results are invalidated when the source changes.
         """
         normalized_path = os.path.normpath(image_path)
-        if not os.path.isfile(normalized_path):
+        if not self._source_exists(normalized_path):
             logger.error("File does not exist: %s", normalized_path)
             return None
 
         cache_key = self.analysis_cache_key(normalized_path, ANALYSIS_CACHE_RESOLUTION)
-        cached_image = self._cache_get(self.preview_cache, cache_key)
+        cached_image = self._cache_get(self.analysis_cache, cache_key)
         if cached_image is not None:
             return self._prepare_analysis_result(cached_image, target_size, target_mode)
 
+        ext = os.path.splitext(normalized_path)[1].lower()
+        if ext in SUPPORTED_STANDARD_EXTENSIONS:
+            # The analysis decode also fills a missing grid thumbnail.
+            if not self.ensure_tiers_cached(normalized_path, ("analysis", "thumbnail")):
+                return None
+            cached_image = self._cache_get(self.analysis_cache, cache_key)
+            if cached_image is not None:
+                return self._prepare_analysis_result(
+                    cached_image, target_size, target_mode
+                )
+
         with self._generation_lock(cache_key):
-            cached_image = self._cache_get(self.preview_cache, cache_key)
-            if cached_image is None:
-                ext = os.path.splitext(normalized_path)[1].lower()
+            cached_image = self._cache_get(self.analysis_cache, cache_key)
+            if cached_image is None and not self._decode_failed(
+                normalized_path, "analysis"
+            ):
+                decoder: Callable | None = None
                 high_memory_format = is_raw_extension(ext) or ext in {
                     ".heic",
                     ".heif",
@@ -1115,13 +2056,17 @@ class ImagePipeline:
                     decode_gate.acquire()
                 try:
                     if is_raw_extension(ext):
-                        cached_image = RawImageProcessor.load_raw_for_blur_detection(
+                        decoder = RawImageProcessor.load_raw_for_blur_detection
+                        cached_image = self._run_decode(
+                            decoder,
                             normalized_path,
                             target_size=ANALYSIS_CACHE_RESOLUTION,
                             apply_auto_edits=False,
                         )
                     elif ext in SUPPORTED_STANDARD_EXTENSIONS:
-                        cached_image = StandardImageProcessor.load_for_blur_detection(
+                        decoder = StandardImageProcessor.load_for_blur_detection
+                        cached_image = self._run_decode(
+                            decoder,
                             normalized_path,
                             target_size=ANALYSIS_CACHE_RESOLUTION,
                         )
@@ -1139,10 +2084,12 @@ class ImagePipeline:
                     if cached_image.mode != "RGB":
                         cached_image = cached_image.convert("RGB")
                     self._cache_set(
-                        self.preview_cache,
+                        self.analysis_cache,
                         cache_key,
-                        cached_image.copy(),
+                        cached_image,
                     )
+                elif decoder is not None:
+                    self._record_decode_failure(normalized_path, "analysis", decoder)
 
         if cached_image is None:
             return None
@@ -1154,11 +2101,11 @@ class ImagePipeline:
         target_size: tuple[int, int],
         target_mode: str,
     ) -> Image.Image:
-        result = image.copy()
-        result.thumbnail(target_size, Image.Resampling.LANCZOS)
-        if result.mode != target_mode:
-            result = result.convert(target_mode)
-        return result
+        # Cached images are copy-on-write views; thumbnail() rebinds this handle.
+        image.thumbnail(target_size, Image.Resampling.LANCZOS)
+        if image.mode != target_mode:
+            image = image.convert(target_mode)
+        return image
 
     def get_cached_analysis_qpixmap(
         self,
@@ -1169,13 +2116,13 @@ class ImagePipeline:
     ) -> QPixmap | None:
         """Return an existing shared analysis image without generating work."""
         normalized_path = os.path.normpath(image_path)
-        if not os.path.isfile(normalized_path):
+        if not self._source_exists(normalized_path):
             return None
         cache_key = self.analysis_cache_key(normalized_path, ANALYSIS_CACHE_RESOLUTION)
         cached_image = (
             self._memory_get(cache_key)
             if memory_only
-            else self._cache_get(self.preview_cache, cache_key)
+            else self._cache_get(self.analysis_cache, cache_key)
         )
         if cached_image is None:
             return None
@@ -1271,20 +2218,92 @@ class ImagePipeline:
         with self._memory_cache_lock:
             self._memory_cache.clear()
             self._memory_cache_bytes = 0
+            self._provisional_thumbnail_keys.clear()
         self.thumbnail_cache.clear()
         self.preview_cache.clear()
+        self.analysis_cache.clear()
+        self.thumbnail_packs.clear()
+        self.decode_failures.clear()
+        if self.content_digests is not None:
+            self.content_digests.clear()
         logger.info("All image caches have been cleared.")
 
     def invalidate_path(self, file_path: str) -> None:
         """Remove all memory and disk cache variants for one source file."""
-        normalized_path = os.path.normpath(file_path)
+        self.invalidate_paths([file_path])
+
+    def invalidate_paths(self, file_paths: Iterable[str]) -> None:
+        """
+        Remove all memory and disk cache variants for several source files.
+        Disk tiers find their keys through the shared key index, so the cost
+        does not grow with the cache size.
+        """
+        identities: set[str] = set()
+        for file_path in file_paths:
+            normalized_path = os.path.normpath(file_path)
+            fingerprint_registry.invalidate(normalized_path)
+            identities.add(normalized_path)
+            if self.content_digests is not None:
+                content_digest = self.content_digests.forget(normalized_path)
+                if content_digest is not None:
+                    identities.add(f"{CONTENT_KEY_PREFIX}{content_digest}")
+        if not identities:
+            return
         with self._memory_cache_lock:
-            keys = [key for key in self._memory_cache if key[0] == normalized_path]
+            keys = [key for key in self._memory_cache if key[0] in identities]
             for key in keys:
                 image = self._memory_cache.pop(key)
                 self._memory_cache_bytes -= self._image_memory_size(image)
-        self.thumbnail_cache.delete_all_for_path(normalized_path)
-        self.preview_cache.delete_all_for_path(normalized_path)
+                self._provisional_thumbnail_keys.discard(key)
+        self.thumbnail_cache.delete_all_for_paths(identities)
+        self.preview_cache.delete_all_for_paths(identities)
+        self.analysis_cache.delete_all_for_paths(identities)
+        self.decode_failures.forget(identities)
+
+    def migrate_paths(
+        self, path_updates: dict[str, str] | Iterable[tuple[str, str]]
+    ) -> None:
+        """
+        Carry cached images of moved or renamed files over to their new paths.
+        Moves keep size and mtime, so only the path field of each key changes.
+        Content-addressed entries need no migration and are left alone.
+        """
+        pairs = path_updates.items() if isinstance(path_updates, dict) else path_updates
+        updates = {
+            os.path.normpath(old_path): os.path.normpath(new_path)
+            for old_path, new_path in pairs
+            if old_path and new_path and old_path != new_path
+        }
+        if not updates:
+            return
+        for old_path in updates:
+            fingerprint_registry.invalidate(old_path)
+            if self.content_digests is not None:
+                self.content_digests.forget(old_path)
+        with self._memory_cache_lock:
+            # Take every moved entry out first, so chained renames in one batch
+            # (a -> b, b -> c) do not move an entry twice.
+            moved = []
+            for key in [key for key in self._memory_cache if key[0] in updates]:
+                provisional = key in self._provisional_thumbnail_keys
+                self._provisional_thumbnail_keys.discard(key)
+                moved.append((key, self._memory_cache.pop(key), provisional))
+            for key, image, provisional in moved:
+                new_key = (updates[key[0]], *key[1:])
+                # A moved file can replace one with the same size and mtime.
+                replaced = self._memory_cache.pop(new_key, None)
+                if replaced is not None:
+                    self._memory_cache_bytes -= self._image_memory_size(replaced)
+                self._memory_cache[new_key] = image
+                if provisional:
+                    self._provisional_thumbnail_keys.add(new_key)
+                else:
+                    self._provisional_thumbnail_keys.discard(new_key)
+        self.decode_failures.forget(updates)
+        pairs = list(updates.items())
+        self.thumbnail_cache.migrate_paths(pairs)
+        self.preview_cache.migrate_paths(pairs)
+        self.analysis_cache.migrate_paths(pairs)
 
     def reinitialize_preview_cache_from_settings(self):
         """Reinitializes the preview cache using current application settings."""
@@ -0,0 +1,106 @@
+"""Reduced-resolution decoding for bounded thumbnails and previews.
+
+Large camera JPEGs are mostly thrown away when a 256 px thumbnail or a screen
+preview is produced. Decoding them through ``draft()`` lets libjpeg scale the
+DCT blocks by 1/2, 1/4 or 1/8 while decoding, and ``reduce()`` gives formats
+without DCT scaling (PNG, TIFF, HEIF) a cheap integer box pre-shrink. Only the
+final, already small resample uses LANCZOS, and EXIF orientation is applied to
+that small result instead of to the full-resolution buffer.
+"""
+
+import contextlib
+import math
+
+from PIL import ExifTags, Image
+
+from core.app_settings import DOWNSCALE_REDUCING_GAP
+
+_ORIENTATION_TRANSPOSE: dict[int, Image.Transpose] = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+# Box reduction is undefined for palette and bilevel data.
+_UNREDUCIBLE_MODES = {"P", "PA", "1"}
+
+
+def read_orientation(image: Image.Image) -> int:
+    """Return the EXIF orientation (1-8) of an opened image, defaulting to 1."""
+    try:
+        orientation = int(image.getexif().get(ExifTags.Base.Orientation, 1))
+    except Exception:
+        return 1
+    return orientation if orientation in _ORIENTATION_TRANSPOSE else 1
+
+
+def fit_size(size: tuple[int, int], max_size: tuple[int, int]) -> tuple[int, int]:
+    """Return the size ``Image.thumbnail`` would produce for ``max_size``."""
+    width, height = size
+    scale = min(max_size[0] / width, max_size[1] / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _source_box(max_size: tuple[int, int], orientation: int) -> tuple[int, int]:
+    # Orientations 5-8 swap axes, so the display box is transposed in source space.
+    return max_size if orientation < 5 else (max_size[1], max_size[0])
+
+
+def apply_orientation(image: Image.Image, orientation: int) -> Image.Image:
+    """Transpose pixels upright and drop the now-stale EXIF orientation."""
+    method = _ORIENTATION_TRANSPOSE.get(orientation)
+    if method is None:
+        return image
+    transposed = image.transpose(method)
+    # The pixels are upright now; a later exif_transpose must be a no-op.
+    transposed.info.pop("exif", None)
+    return transposed
+
+
+def decode_downscaled(
+    image: Image.Image,
+    max_size: tuple[int, int],
+    *,
+    apply_exif_orientation: bool = True,
+    reducing_gap: float = DOWNSCALE_REDUCING_GAP,
+) -> Image.Image:
+    """Decode an opened, not yet loaded image so that it fits ``max_size``.
+
+    ``max_size`` is expressed in display orientation. The decoder keeps at least
+    ``reducing_gap`` times the final resolution before the LANCZOS pass so the
+    output matches a full decode followed by ``thumbnail()`` visually.
+    """
+    orientation = read_orientation(image) if apply_exif_orientation else 1
+    final_width, final_height = fit_size(image.size, _source_box(max_size, orientation))
+    image.draft(
+        None,
+        (
+            math.ceil(final_width * reducing_gap),
+            math.ceil(final_height * reducing_gap),
+        ),
+    )
+    image.load()
+    if apply_exif_orientation:
+        # The TIFF decoder applies and removes the orientation while loading.
+        orientation = read_orientation(image)
+    source_box = _source_box(max_size, orientation)
+    final_width, final_height = fit_size(image.size, source_box)
+
+    current = image
+    factor = int(
+        min(current.width / final_width, current.height / final_height) / reducing_gap
+    )
+    if factor >= 2:
+        if current.mode in _UNREDUCIBLE_MODES:
+            current = current.convert("RGBA")
+        # Exotic modes fall back to the LANCZOS pass alone.
+        with contextlib.suppress(ValueError):
+            current = current.reduce(factor)
+
+    if current.width > final_width or current.height > final_height:
+        current.thumbnail(source_box, Image.Resampling.LANCZOS)
+
+    return apply_orientation(current, orientation)
@@ -0,0 +1,151 @@
+"""Locate small previews that cameras and scanners embed in image files.
+
+Three sources are checked for JPEG and TIFF, cheapest first: the EXIF IFD1
+JPEG thumbnail (usually 160x120), the MPF "large thumbnail" image many cameras
+append to their JPEGs, and reduced-resolution subfiles of a TIFF. Embedded
+previews are stored in sensor orientation like the main image, so callers
+apply the main image's EXIF orientation to JPEG previews. Pillow orients TIFF
+subfiles itself when they are loaded.
+
+HEIF/HEIC containers store thumbnail items next to the primary image.
+libheif decodes them with the same rotation and mirroring as the primary
+image, so they are handled like a reduced decode of it.
+"""
+
+import io
+
+import pillow_heif
+from PIL import ExifTags, Image
+
+_EXIF_HEADER = b"Exif\x00\x00"
+_JPEG_INTERCHANGE_FORMAT = 0x0201
+_JPEG_INTERCHANGE_FORMAT_LENGTH = 0x0202
+_MP_ENTRY = 0xB002
+_NEW_SUBFILE_TYPE = 254
+_REDUCED_RESOLUTION = 0x1
+
+
+def _long_edge(image: Image.Image) -> int:
+    return max(image.size)
+
+
+def _matches_aspect(size: tuple[int, int], primary_size: tuple[int, int]) -> bool:
+    """Whether a preview has the primary image's aspect ratio, up to rounding.
+
+    Cameras often store 4:3 thumbnails (letterboxed or cropped) for 3:2
+    frames; those would paint bars or a different crop into the grid.
+    """
+    width, height = primary_size
+    return abs(size[0] * height - size[1] * width) <= 2 * max(width, height)
+
+
+def exif_thumbnail_bytes(image: Image.Image) -> bytes | None:
+    """Return the IFD1 JPEG thumbnail stored in an opened image's EXIF block."""
+    exif_bytes = image.info.get("exif")
+    if not exif_bytes:
+        return None
+    ifd1 = image.getexif().get_ifd(ExifTags.IFD.IFD1)
+    offset = ifd1.get(_JPEG_INTERCHANGE_FORMAT)
+    length = ifd1.get(_JPEG_INTERCHANGE_FORMAT_LENGTH)
+    if not offset or not length:
+        return None
+    # IFD offsets are relative to the TIFF header that follows "Exif\0\0".
+    start = offset + (len(_EXIF_HEADER) if exif_bytes.startswith(_EXIF_HEADER) else 0)
+    data = exif_bytes[start : start + length]
+    return data if len(data) == length and data.startswith(b"\xff\xd8") else None
+
+
+def _exif_thumbnail(image: Image.Image, min_size: int) -> Image.Image | None:
+    data = exif_thumbnail_bytes(image)
+    if data is None:
+        return None
+    thumbnail = Image.open(io.BytesIO(data))
+    if _long_edge(thumbnail) < min_size or not _matches_aspect(
+        thumbnail.size, image.size
+    ):
+        return None
+    thumbnail.load()
+    return thumbnail
+
+
+def _mpf_large_thumbnail(
+    image: Image.Image, min_size: int, max_size: tuple[int, int]
+) -> Image.Image | None:
+    entries = (getattr(image, "mpinfo", None) or {}).get(_MP_ENTRY) or []
+    primary_size = image.size
+    for frame, entry in enumerate(entries):
+        mp_type = str(entry.get("Attribute", {}).get("MPType", ""))
+        if frame == 0 or not mp_type.startswith("Large Thumbnail"):
+            continue
+        image.seek(frame)
+        if _long_edge(image) < min_size or not _matches_aspect(
+            image.size, primary_size
+        ):
+            continue
+        image.draft(None, (max_size[0] * 2, max_size[1] * 2))
+        image.load()
+        return image.copy()
+    return None
+
+
+def _tiff_reduced_subfile(image: Image.Image, min_size: int) -> Image.Image | None:
+    best_frame: int | None = None
+    best_edge = 0
+    for frame in range(1, getattr(image, "n_frames", 1)):
+        image.seek(frame)
+        if not image.tag_v2.get(_NEW_SUBFILE_TYPE, 0) & _REDUCED_RESOLUTION:
+            continue
+        edge = _long_edge(image)
+        if edge >= min_size and (best_frame is None or edge < best_edge):
+            best_frame, best_edge = frame, edge
+    if best_frame is None:
+        return None
+    image.seek(best_frame)
+    image.load()
+    return image.copy()
+
+
+def open_embedded_thumbnail(
+    image: Image.Image, min_size: int, max_size: tuple[int, int]
+) -> tuple[Image.Image, str, bool] | None:
+    """Return a suitable embedded preview, its source label and whether it is upright.
+
+    ``image`` must be an opened, not yet loaded JPEG, MPO or TIFF. Previews
+    whose long edge is below ``min_size`` are ignored.
+    """
+    if image.format in {"JPEG", "MPO"}:
+        thumbnail = _exif_thumbnail(image, min_size)
+        if thumbnail is not None:
+            return thumbnail, "exif", False
+        thumbnail = _mpf_large_thumbnail(image, min_size, max_size)
+        if thumbnail is not None:
+            return thumbnail, "mpf", False
+    elif image.format == "TIFF":
+        thumbnail = _tiff_reduced_subfile(image, min_size)
+        if thumbnail is not None:
+            return thumbnail, "tiff", True
+    return None
+
+
+def open_heif_thumbnail(image: Image.Image, min_long_edge: int) -> Image.Image | None:
+    """Decode the smallest HEIF thumbnail item whose long edge reaches ``min_long_edge``.
+
+    ``image`` must be an opened HEIF image backed by a file. The HEVC-coded
+    primary image is not decoded. Returns None when no thumbnail is big enough.
+    """
+    if image.format != "HEIF" or not getattr(image, "filename", None):
+        return None
+    heif_file = pillow_heif.open_heif(image.filename, convert_hdr_to_8bit=True)
+    primary = heif_file[heif_file.primary_index]
+    # info["thumbnails"] lists the long edge of each thumbnail item.
+    boxes = primary.info.get("thumbnails", [])
+    for index in sorted(range(len(boxes)), key=boxes.__getitem__):
+        if boxes[index] < min_long_edge:
+            continue
+        thumbnail = primary.get_thumbnail(index).to_pillow()
+        # Skip items cropped to another aspect ratio than the primary image.
+        if not _matches_aspect(thumbnail.size, image.size):
+            continue
+        if _long_edge(thumbnail) >= min_long_edge:
+            return thumbnail
+    return None
@@ -0,0 +1,189 @@
+"""Optional process-pool backend for CPU-bound image decodes.
+
+Pillow resampling, RAW tone edits and rawpy post-processing hold the GIL for
+long stretches, so thread pools stop scaling well below the core count. This
+backend runs the existing processor functions in spawned worker processes.
+Workers hand decoded pixels back through ``multiprocessing.shared_memory``
+rather than pickling them through the pool's pipe, together with the image's
+``info`` (EXIF, ICC profile). The parent rebuilds PIL images from them before
+the usual generation-lock and cache-write paths store them, and unlinks every
+block of a result whether or not rebuilding it succeeds.
+"""
+
+import concurrent.futures
+import logging
+import multiprocessing
+import pickle
+import threading
+from collections.abc import Callable
+from multiprocessing import shared_memory
+from typing import Any
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Shared with every worker so full RAW decodes obey the high-memory budget
+# across processes, mirroring ImagePipeline's in-process decode gate.
+_worker_decode_gate = None
+
+
+class DecodeWorkerCrashed(RuntimeError):
+    """A worker process died, failing every decode queued on its pool."""
+
+
+def _initialize_worker(decode_gate) -> None:
+    global _worker_decode_gate
+    _worker_decode_gate = decode_gate
+
+
+def _pack(result: Any, blocks: list[str]) -> Any:
+    """Move images in ``result`` to shared memory, appending block names."""
+    if isinstance(result, Image.Image):
+        pixels = result.tobytes()
+        block = shared_memory.SharedMemory(
+            create=True, size=max(1, len(pixels)), track=False
+        )
+        blocks.append(block.name)
+        try:
+            block.buf[: len(pixels)] = pixels
+        finally:
+            block.close()
+        return (
+            "image",
+            result.mode,
+            result.size,
+            block.name,
+            len(pixels),
+            dict(result.info),
+        )
+    if isinstance(result, dict):
+        return ("tiers", {key: _pack(value, blocks) for key, value in result.items()})
+    return ("value", result)
+
+
+def _block_names(payload: Any) -> list[str]:
+    if payload[0] == "image":
+        return [payload[3]]
+    if payload[0] == "tiers":
+        return [name for value in payload[1].values() for name in _block_names(value)]
+    return []
+
+
+def _release_blocks(names: list[str]) -> None:
+    # Blocks are untracked, so anything not unlinked here outlives the process.
+    for name in names:
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except FileNotFoundError:
+            continue
+        block.close()
+        block.unlink()
+
+
+def _unpack(payload: Any) -> Any:
+    kind = payload[0]
+    if kind == "image":
+        _, mode, size, block_name, nbytes, info = payload
+        block = shared_memory.SharedMemory(name=block_name, track=False)
+        try:
+            with block.buf[:nbytes] as pixels:
+                image = Image.frombytes(mode, size, pixels)
+        finally:
+            block.close()
+        image.info.update(info)
+        return image
+    if kind == "tiers":
+        return {key: _unpack(value) for key, value in payload[1].items()}
+    return payload[1]
+
+
+def _restore(payload: Any) -> Any:
+    """Rebuild a worker result and unlink all of its blocks, even on failure."""
+    try:
+        return _unpack(payload)
+    finally:
+        _release_blocks(_block_names(payload))
+
+
+def _run_in_worker(
+    function: Callable[..., Any], args: tuple, kwargs: dict[str, Any]
+) -> bytes:
+    if "full_decode_gate" in kwargs:
+        kwargs = {**kwargs, "full_decode_gate": _worker_decode_gate}
+    blocks: list[str] = []
+    try:
+        # Pickled here so a result that cannot be sent back does not strand
+        # the blocks already written for it.
+        return pickle.dumps(
+            _pack(function(*args, **kwargs), blocks), pickle.HIGHEST_PROTOCOL
+        )
+    except BaseException:
+        _release_blocks(blocks)
+        raise
+
+
+class ProcessDecodeBackend:
+    """Run module-level decode functions in a lazily started process pool."""
+
+    def __init__(self, max_workers: int, high_memory_workers: int):
+        self._max_workers = max(1, max_workers)
+        # Spawn avoids forking a process that already runs Qt threads.
+        self._context = multiprocessing.get_context("spawn")
+        self._decode_gate = self._context.BoundedSemaphore(max(1, high_memory_workers))
+        self._executor: concurrent.futures.ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                logger.info(
+                    "Starting process decode backend with %d workers",
+                    self._max_workers,
+                )
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=self._context,
+                    initializer=_initialize_worker,
+                    initargs=(self._decode_gate,),
+                )
+            return self._executor
+
+    def run(self, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call ``function`` in a worker process and return its rebuilt result.
+
+        ``function`` must be importable by name. A ``full_decode_gate`` keyword
+        is replaced by the cross-process gate inside the worker.
+
+        Raises:
+            DecodeWorkerCrashed: A worker died. Every pending call on the pool
+                fails with it, so the result says nothing about this file.
+        """
+        if "full_decode_gate" in kwargs:
+            kwargs["full_decode_gate"] = None
+        executor = self._get_executor()
+        try:
+            pickled = executor.submit(_run_in_worker, function, args, kwargs).result()
+        except concurrent.futures.process.BrokenProcessPool as error:
+            # A decoder crashed its worker; restart the pool for later files.
+            logger.error(
+                "Process decode worker died while running %s",
+                getattr(function, "__qualname__", function),
+                exc_info=True,
+            )
+            with self._executor_lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise DecodeWorkerCrashed(str(error)) from error
+        return _restore(pickle.loads(pickled))
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
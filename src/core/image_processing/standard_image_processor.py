@@ -1,6 +1,19 @@
 from PIL import Image, ImageOps, UnidentifiedImageError
 import os
 import logging
+import threading
+
+from core.app_settings import EMBEDDED_THUMBNAIL_MIN_SIZE
+from core.image_processing.downscale import (
+    apply_orientation as transpose_upright,
+    decode_downscaled,
+    fit_size,
+    read_orientation,
+)
+from core.image_processing.embedded_thumbnail import (
+    open_embedded_thumbnail,
+    open_heif_thumbnail,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +35,54 @@ SUPPORTED_STANDARD_EXTENSIONS = {
     ".heic",
     ".heif",
 }
+# Extensions whose files may carry an EXIF, MPF or reduced-subfile preview
+EMBEDDED_THUMBNAIL_EXTENSIONS = {".jpg", ".jpeg", ".tif", ".tiff"}
+# Extensions whose containers may carry full-quality thumbnail items
+HEIF_EXTENSIONS = {".heic", ".heif"}
+
+DETAIL_LOG_INTERVAL = 250
+_embedded_thumbnail_log_lock = threading.Lock()
+_embedded_thumbnail_stats: dict[str, int] = {
+    "calls": 0,
+    "exif": 0,
+    "mpf": 0,
+    "tiff": 0,
+    "heif": 0,
+    "missed": 0,
+}
+
+
+def _record_embedded_thumbnail_stat(stat_key: str, latest_basename: str) -> None:
+    with _embedded_thumbnail_log_lock:
+        if stat_key not in _embedded_thumbnail_stats:
+            return
+        _embedded_thumbnail_stats[stat_key] += 1
+        total_calls = _embedded_thumbnail_stats["calls"]
+        # Log once the outcome of the call is known, so the hit rate is accurate.
+        should_log = stat_key != "calls" and (
+            total_calls == 1 or total_calls % DETAIL_LOG_INTERVAL == 0
+        )
+        stats_snapshot = dict(_embedded_thumbnail_stats)
+
+    if should_log:
+        hits = total_calls - stats_snapshot["missed"]
+        logger.debug(
+            "Embedded thumbnail summary after %d files: exif=%d, mpf=%d, tiff=%d, heif=%d, missed=%d, hit_rate=%.0f%% (latest: %s)",
+            total_calls,
+            stats_snapshot["exif"],
+            stats_snapshot["mpf"],
+            stats_snapshot["tiff"],
+            stats_snapshot["heif"],
+            stats_snapshot["missed"],
+            100.0 * hits / total_calls,
+            latest_basename,
+        )
+
+
+def embedded_thumbnail_stats() -> dict[str, int]:
+    """Return a snapshot of embedded-thumbnail lookups by source."""
+    with _embedded_thumbnail_log_lock:
+        return dict(_embedded_thumbnail_stats)
 
 
 class StandardImageProcessor:
@@ -44,22 +105,12 @@ class StandardImageProcessor:
         normalized_path = os.path.normpath(image_path)
         try:
             with Image.open(normalized_path) as img:
-                if apply_orientation:
-                    img = ImageOps.exif_transpose(img)  # Correct orientation
-
-                # Two-pass resampling: fast initial downsize, then high-quality final pass
-                # This is faster when images are much larger than the target size
-                if (
-                    img.width > thumbnail_max_size[0] * 2
-                    or img.height > thumbnail_max_size[1] * 2
-                ):
-                    intermediate_size = (
-                        thumbnail_max_size[0] * 2,
-                        thumbnail_max_size[1] * 2,
-                    )
-                    img.thumbnail(intermediate_size, Image.Resampling.BILINEAR)
-
-                img.thumbnail(thumbnail_max_size, Image.Resampling.LANCZOS)
+                # Reduced decode first; orientation is applied to the small result.
+                img = decode_downscaled(
+                    img,
+                    thumbnail_max_size,
+                    apply_exif_orientation=apply_orientation,
+                )
                 final_pil_img = img.convert(
                     "RGBA"
                 )  # RGBA required for Qt compatibility
@@ -83,6 +134,83 @@ class StandardImageProcessor:
             )
             return None
 
+    @staticmethod
+    def extract_embedded_thumbnail(
+        image_path: str,
+        thumbnail_max_size: tuple = THUMBNAIL_MAX_SIZE,
+        min_size: int = EMBEDDED_THUMBNAIL_MIN_SIZE,
+    ) -> Image.Image | None:
+        """
+        Returns the preview embedded in a JPEG or TIFF, oriented and fitted to
+        thumbnail_max_size, without decoding the main image. Returns None when
+        the file carries no preview whose long edge reaches min_size.
+        """
+        normalized_path = os.path.normpath(image_path)
+        basename = os.path.basename(normalized_path)
+        if (
+            os.path.splitext(normalized_path)[1].lower()
+            not in EMBEDDED_THUMBNAIL_EXTENSIONS
+        ):
+            return None
+        _record_embedded_thumbnail_stat("calls", basename)
+        try:
+            with Image.open(normalized_path) as img:
+                orientation = read_orientation(img)
+                found = open_embedded_thumbnail(img, min_size, thumbnail_max_size)
+        except Exception:
+            # Any failure here falls back to the regular decode, which logs it.
+            logger.debug(
+                f"Could not read embedded thumbnail: {basename}", exc_info=True
+            )
+            found = None
+        if found is None:
+            _record_embedded_thumbnail_stat("missed", basename)
+            return None
+
+        thumbnail, source, upright = found
+        _record_embedded_thumbnail_stat(source, basename)
+        if not upright:
+            thumbnail = transpose_upright(thumbnail, orientation)
+        thumbnail.thumbnail(thumbnail_max_size, Image.Resampling.LANCZOS)
+        return thumbnail.convert("RGBA")  # RGBA required for Qt compatibility
+
+    @staticmethod
+    def extract_heif_thumbnail(
+        image_path: str,
+        max_size: tuple = THUMBNAIL_MAX_SIZE,
+        apply_orientation: bool = True,
+    ) -> Image.Image | None:
+        """
+        Returns a HEIF/HEIC thumbnail item fitted to max_size when one is at
+        least as large as the fitted result, so the HEVC image is not decoded.
+        Returns None when the container has no thumbnail that big.
+        """
+        normalized_path = os.path.normpath(image_path)
+        basename = os.path.basename(normalized_path)
+        if os.path.splitext(normalized_path)[1].lower() not in HEIF_EXTENSIONS:
+            return None
+        _record_embedded_thumbnail_stat("calls", basename)
+        try:
+            with Image.open(normalized_path) as img:
+                orientation = read_orientation(img) if apply_orientation else 1
+                box = max_size if orientation < 5 else (max_size[1], max_size[0])
+                needed_long_edge = max(fit_size(img.size, box))
+                thumbnail = open_heif_thumbnail(img, needed_long_edge)
+        except Exception:
+            # Any failure here falls back to the regular decode, which logs it.
+            logger.debug(
+                f"Could not read HEIF thumbnail item: {basename}", exc_info=True
+            )
+            thumbnail = None
+        if thumbnail is None:
+            _record_embedded_thumbnail_stat("missed", basename)
+            return None
+
+        _record_embedded_thumbnail_stat("heif", basename)
+        thumbnail.thumbnail(box, Image.Resampling.LANCZOS)
+        thumbnail = transpose_upright(thumbnail, orientation)
+        return thumbnail.convert("RGBA")  # RGBA required for Qt compatibility
+
     @staticmethod
     def process_for_preview(
         image_path: str, preview_max_resolution: tuple = PRELOAD_MAX_RESOLUTION
@@ -93,21 +221,7 @@ class StandardImageProcessor:
         normalized_path = os.path.normpath(image_path)
         try:
             with Image.open(normalized_path) as img:
-                img = ImageOps.exif_transpose(img)  # Correct orientation
-
-                # Two-pass resampling: fast initial downsize, then high-quality final pass
-                # This is faster when images are much larger than the target size
-                if (
-                    img.width > preview_max_resolution[0] * 2
-                    or img.height > preview_max_resolution[1] * 2
-                ):
-                    intermediate_size = (
-                        preview_max_resolution[0] * 2,
-                        preview_max_resolution[1] * 2,
-                    )
-                    img.thumbnail(intermediate_size, Image.Resampling.BILINEAR)
-
-                img.thumbnail(preview_max_resolution, Image.Resampling.LANCZOS)
+                img = decode_downscaled(img, preview_max_resolution)
                 pil_img = img.convert("RGBA")  # RGBA required for Qt compatibility
                 return pil_img
         except UnidentifiedImageError:
@@ -129,6 +243,49 @@ class StandardImageProcessor:
             )
             return None
 
+    @staticmethod
+    def process_for_tiers(
+        image_path: str, tier_sizes: dict[str, tuple[int, int]]
+    ) -> dict[str, Image.Image] | None:
+        """
+        Decodes a standard image once and derives an RGBA image for every tier.
+        The source is reduced to the largest requested box; smaller tiers are
+        resampled from that buffer instead of opening the file again.
+        """
+        normalized_path = os.path.normpath(image_path)
+        decode_box = (
+            max(size[0] for size in tier_sizes.values()),
+            max(size[1] for size in tier_sizes.values()),
+        )
+        try:
+            with Image.open(normalized_path) as img:
+                base = decode_downscaled(img, decode_box).convert("RGBA")
+        except UnidentifiedImageError:
+            logger.error(
+                f"Pillow could not identify image for tiers: {os.path.basename(normalized_path)}",
+                exc_info=True,
+            )
+            return None
+        except FileNotFoundError:
+            logger.error(
+                f"File not found for tiers: {os.path.basename(normalized_path)}",
+                exc_info=True,
+            )
+            return None
+        except Exception as e:
+            logger.error(
+                f"Failed to process tiers for '{os.path.basename(normalized_path)}': {e}",
+                exc_info=True,
+            )
+            return None
+
+        tiers: dict[str, Image.Image] = {}
+        for tier, size in tier_sizes.items():
+            derived = base.copy()
+            derived.thumbnail(size, Image.Resampling.LANCZOS)
+            tiers[tier] = derived
+        return tiers
+
     @staticmethod
     def load_as_pil(
         image_path: str, target_mode: str = "RGB", apply_exif_transpose: bool = True
@@ -172,8 +329,7 @@ class StandardImageProcessor:
         normalized_path = os.path.normpath(image_path)
         try:
             with Image.open(normalized_path) as img:
-                img = ImageOps.exif_transpose(img)
-                img.thumbnail(target_size, Image.Resampling.LANCZOS)
+                img = decode_downscaled(img, target_size)
                 pil_img = img.convert("RGB")
                 return pil_img
         except UnidentifiedImageError:
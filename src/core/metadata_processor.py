@@ -293,9 +293,19 @@ class MetadataProcessor:
         cache_misses = 0
         video_count = 0
 
-        for image_path_input in image_paths:
-            resolved = MetadataProcessor._resolve_path_forms(image_path_input)
+        resolved_inputs = [
+            (image_path_input, MetadataProcessor._resolve_path_forms(image_path_input))
+            for image_path_input in image_paths
+        ]
+        # One cache read transaction for the batch; writes are flushed together below.
+        cached_metadata_by_key: dict[str, dict[str, Any]] = {}
+        pending_cache_writes: dict[str, dict[str, Any]] = {}
+        if exif_disk_cache:
+            cached_metadata_by_key = exif_disk_cache.get_many(
+                resolved[1] for _, resolved in resolved_inputs if resolved
+            )
 
+        for image_path_input, resolved in resolved_inputs:
             # Use NFC of original input as the key for the results dict if resolution fails,
             # for consistency if the caller expects a result for every input path.
             # If resolution succeeds, cache_key_path (which is NFC of operational) is used.
@@ -310,10 +320,8 @@ class MetadataProcessor:
                     "file_size": "Unknown",
                     "error": "File not found or inaccessible during path resolution",
                 }
-                if exif_disk_cache:
-                    exif_disk_cache.set(
-                        result_key_for_this_file, minimal_data
-                    )  # Cache "not found" state
+                # Cache "not found" state
+                pending_cache_writes[result_key_for_this_file] = minimal_data
                 results[result_key_for_this_file]["date"] = _parse_date_from_filename(
                     os.path.basename(result_key_for_this_file)
                 )
@@ -324,9 +332,7 @@ class MetadataProcessor:
             results[cache_key_path] = _init_result_dict()  # Use canonical key
             is_video_file = is_video_extension(operational_path)
 
-            cached_metadata: dict[str, Any] | None = None
-            if exif_disk_cache:
-                cached_metadata = exif_disk_cache.get(cache_key_path)
+            cached_metadata = cached_metadata_by_key.get(cache_key_path)
 
             if cached_metadata:
                 cache_hits += 1
@@ -344,8 +350,8 @@ class MetadataProcessor:
                         )
                     video_metadata["file_path"] = cache_key_path
                 results[cache_key_path]["raw_metadata"] = video_metadata
-                if exif_disk_cache:
-                    exif_disk_cache.set(cache_key_path, video_metadata)
+                if isinstance(video_metadata, dict):
+                    pending_cache_writes[cache_key_path] = video_metadata
             else:
                 cache_misses += 1
                 paths_for_pyexiv2_extraction.append(operational_path)
@@ -515,8 +521,7 @@ class MetadataProcessor:
                     )
                     if current_cache_key:
                         results[current_cache_key]["raw_metadata"] = metadata_dict
-                        if exif_disk_cache:
-                            exif_disk_cache.set(current_cache_key, metadata_dict)
+                        pending_cache_writes[current_cache_key] = metadata_dict
                     else:
                         logger.error(
                             f"Could not find cache key for operational path: {op_path_processed}",
@@ -528,6 +533,9 @@ class MetadataProcessor:
                         exc_info=True,
                     )
 
+        if exif_disk_cache and pending_cache_writes:
+            exif_disk_cache.set_many(pending_cache_writes)
+
         final_results_for_caller: dict[str, dict[str, Any]] = {}
         total_result_count = len(results)
         for idx, (cache_key, data_dict) in enumerate(results.items(), start=1):
@@ -13,6 +13,7 @@ from typing import Literal, TypedDict
 
 from compression import zstd
 
+from core.caching.fingerprint_registry import fingerprint_registry
 
 SIMILARITY_ARTIFACT_CACHE_VERSION = 1
 SIMILARITY_CLUSTERING_PIPELINE_VERSION = "regional-dbscan-v2"
@@ -70,11 +71,7 @@ def normalize_cluster_results(clusters: object) -> dict[str, int]:
 
 
 def fingerprint_path(path: str) -> FileFingerprint | None:
-    try:
-        stat_result = Path(path).stat()
-    except OSError:
-        return None
-    return int(stat_result.st_size), int(stat_result.st_mtime_ns)
+    return fingerprint_registry.get(path)
 
 
 def normalize_fingerprints(
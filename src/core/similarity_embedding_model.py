@@ -1,25 +1,44 @@
+import inspect
+import json
 import logging
+import os
 import time
 from dataclasses import dataclass
 from collections.abc import Iterable
+from pathlib import Path
 from typing import Any
 
 import numpy as np
 
 from core.app_settings import (
     DEFAULT_SIMILARITY_EMBEDDING_MODEL,
+    DEFAULT_SIMILARITY_INFERENCE_BACKEND,
+    DEFAULT_SIMILARITY_REGION_MODE,
+    SIMILARITY_INFERENCE_BACKENDS,
+    SIMILARITY_REGION_MODES,
     SUPPORTED_SIMILARITY_EMBEDDING_MODELS,
     get_huggingface_cache_dir,
     get_preferred_torch_device,
+    get_similarity_inference_backend,
+    get_similarity_region_mode,
 )
 from core.huggingface_progress import ProgressCallback, build_hf_tqdm_class
+from core.runtime_paths import resolve_user_cache_dir
 from core.similarity_utils import l2_normalize_rows
 
 logger = logging.getLogger(__name__)
 
 SIMILARITY_EMBEDDING_PIPELINE_VERSION = "dinov2-cls-v1"
 SIMILARITY_REGION_PIPELINE_VERSION = "dinov2-regions-v1"
+SIMILARITY_PATCH_REGION_PIPELINE_VERSION = "dinov2-patch-regions-v1"
 SIMILARITY_ENCODE_CHUNK_SIZE = 32
+# Bump when the exported graph changes so cached exports are rebuilt.
+SIMILARITY_ONNX_EXPORT_VERSION = "tokens-int8-v1"
+SIMILARITY_ONNX_OPSET = 17
+ONNX_INT8_BACKEND = "onnx-int8"
+PATCH_TOKEN_REGION_MODE = "patch-tokens"
+# DINOv2 checkpoints use 14-pixel patches; read from the config when available.
+DEFAULT_PATCH_SIZE = 14
 
 
 class SimilarityModelNotInstalledError(RuntimeError):
@@ -38,28 +57,39 @@ def sanitize_model_id(model_name: str) -> str:
 class SimilarityModelSpec:
     model_name: str
     pipeline_version: str = SIMILARITY_EMBEDDING_PIPELINE_VERSION
+    backend: str = DEFAULT_SIMILARITY_INFERENCE_BACKEND
+    region_mode: str = DEFAULT_SIMILARITY_REGION_MODE
+
+    @property
+    def _backend_suffix(self) -> str:
+        # Quantized embeddings differ slightly, so they are cached separately;
+        # torch keys stay as they were.
+        if self.backend == DEFAULT_SIMILARITY_INFERENCE_BACKEND:
+            return ""
+        return f"_{self.backend}"
 
     @property
     def cache_key(self) -> str:
-        return f"{self.pipeline_version}_{sanitize_model_id(self.model_name)}"
+        return (
+            f"{self.pipeline_version}_{sanitize_model_id(self.model_name)}"
+            f"{self._backend_suffix}"
+        )
 
     @property
     def region_cache_key(self) -> str:
-        return (
-            f"{SIMILARITY_REGION_PIPELINE_VERSION}_{sanitize_model_id(self.model_name)}"
+        # Pooled patch tokens are not interchangeable with encoded crops.
+        version = (
+            SIMILARITY_PATCH_REGION_PIPELINE_VERSION
+            if self.region_mode == PATCH_TOKEN_REGION_MODE
+            else SIMILARITY_REGION_PIPELINE_VERSION
         )
+        return f"{version}_{sanitize_model_id(self.model_name)}{self._backend_suffix}"
 
 
-def build_similarity_image_regions(image: object) -> list[object]:
-    """Build large overlapping regions for occlusion-resistant image matching."""
-    if not hasattr(image, "crop") or not hasattr(image, "size"):
-        return [image]
-
-    width, height = image.size
+def similarity_region_boxes(width: int, height: int) -> list[tuple[int, int, int, int]]:
+    """Return the pixel boxes of the large regions that follow the full frame."""
     if width <= 1 or height <= 1:
-        return [image]
-
-    regions = [image]
+        return []
 
     def _box(left: float, top: float, right: float, bottom: float):
         return (
@@ -76,11 +106,85 @@ def build_similarity_image_regions(image: object) -> list[object]:
         _box(0.00, 0.00, 1.00, 0.62),  # top
         _box(0.00, 0.38, 1.00, 1.00),  # bottom
     ]
-    for box in crop_boxes:
-        left, top, right, bottom = box
-        if right > left and bottom > top:
-            regions.append(image.crop(box))
-    return regions
+    return [
+        (left, top, right, bottom)
+        for left, top, right, bottom in crop_boxes
+        if right > left and bottom > top
+    ]
+
+
+def build_similarity_image_regions(image: object) -> list[object]:
+    """Build large overlapping regions for occlusion-resistant image matching."""
+    if not hasattr(image, "crop") or not hasattr(image, "size"):
+        return [image]
+
+    width, height = image.size
+    return [image, *(image.crop(box) for box in similarity_region_boxes(width, height))]
+
+
+def _processor_view(processor: Any, width: int, height: int) -> tuple[float, ...]:
+    """Map image pixels into the processor's output as ``x * sx - ox``.
+
+    Mirrors the Hugging Face resize (shortest edge or fixed size) and centre
+    crop, so a region box can be located on the patch grid.
+    """
+    size = getattr(processor, "size", None)
+    resized_width, resized_height = width, height
+    if getattr(processor, "do_resize", True) and isinstance(size, dict):
+        if "shortest_edge" in size:
+            short = int(size["shortest_edge"])
+            if width <= height:
+                resized_width, resized_height = short, int(short * height / width)
+            else:
+                resized_width, resized_height = int(short * width / height), short
+        elif "height" in size and "width" in size:
+            resized_width, resized_height = int(size["width"]), int(size["height"])
+    offset_x = offset_y = 0
+    if getattr(processor, "do_center_crop", False):
+        crop_height, crop_width = _processor_image_size(processor)
+        offset_x = (resized_width - crop_width) // 2
+        offset_y = (resized_height - crop_height) // 2
+    return resized_width / width, resized_height / height, offset_x, offset_y
+
+
+def similarity_region_patch_weights(
+    boxes: list[tuple[int, int, int, int]],
+    view: tuple[float, ...],
+    grid_shape: tuple[int, int],
+    patch_size: int,
+) -> np.ndarray:
+    """Return one row of patch weights per box, each summing to one.
+
+    A patch is weighted by the fraction of it the box covers once mapped
+    through ``view``. A box that misses the processed view entirely (the
+    centre crop can cut off the ends of a panorama) falls back to all
+    patches.
+    """
+    scale_x, scale_y, offset_x, offset_y = view
+    rows, columns = grid_shape
+    edges_x: np.ndarray = np.arange(columns, dtype=np.float32) * patch_size
+    edges_y: np.ndarray = np.arange(rows, dtype=np.float32) * patch_size
+    weights: np.ndarray = np.full(
+        (len(boxes), rows * columns), 1.0 / (rows * columns), np.float32
+    )
+    for index, (left, top, right, bottom) in enumerate(boxes):
+        overlap_x = np.clip(
+            np.minimum(right * scale_x - offset_x, edges_x + patch_size)
+            - np.maximum(left * scale_x - offset_x, edges_x),
+            0.0,
+            patch_size,
+        )
+        overlap_y = np.clip(
+            np.minimum(bottom * scale_y - offset_y, edges_y + patch_size)
+            - np.maximum(top * scale_y - offset_y, edges_y),
+            0.0,
+            patch_size,
+        )
+        area = np.outer(overlap_y, overlap_x).ravel()
+        total = float(area.sum())
+        if total > 0:
+            weights[index] = area / total
+    return weights
 
 
 def normalize_similarity_model_name(model_name: str | None) -> str:
@@ -89,6 +193,101 @@ def normalize_similarity_model_name(model_name: str | None) -> str:
     return DEFAULT_SIMILARITY_EMBEDDING_MODEL
 
 
+def normalize_similarity_inference_backend(backend: str | None) -> str:
+    if backend in SIMILARITY_INFERENCE_BACKENDS:
+        return str(backend)
+    return DEFAULT_SIMILARITY_INFERENCE_BACKEND
+
+
+def normalize_similarity_region_mode(region_mode: str | None) -> str:
+    if region_mode in SIMILARITY_REGION_MODES:
+        return str(region_mode)
+    return DEFAULT_SIMILARITY_REGION_MODE
+
+
+def similarity_onnx_export_path(model_name: str, snapshot_path: str) -> Path:
+    """Return where the INT8 export of a model snapshot is cached.
+
+    The snapshot directory name is the Hugging Face revision, so a new
+    revision gets a new export.
+    """
+    revision = os.path.basename(os.path.normpath(snapshot_path))[:12]
+    return Path(resolve_user_cache_dir("similarity-onnx")) / (
+        f"{sanitize_model_id(model_name)}_{revision}_"
+        f"{SIMILARITY_ONNX_EXPORT_VERSION}.onnx"
+    )
+
+
+def export_similarity_onnx_model(
+    snapshot_path: str, destination: Path, image_size: tuple[int, int]
+) -> None:
+    """Export a snapshot's token embeddings to ONNX with INT8 dynamic quantization.
+
+    Needs torch and transformers once; inference from the export needs only
+    onnxruntime. The file appears at ``destination`` only once complete.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel
+
+    class _TokenEmbeddings(torch.nn.Module):
+        def __init__(self, backbone):
+            super().__init__()
+            self.backbone = backbone
+
+        def forward(self, pixel_values):
+            return self.backbone(pixel_values=pixel_values).last_hidden_state
+
+    backbone = AutoModel.from_pretrained(snapshot_path, local_files_only=True)
+    backbone.eval()
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    float_path = destination.with_name(f"{destination.stem}.float.onnx")
+    temporary_path = destination.with_name(f"{destination.name}.tmp")
+    export_options: dict[str, Any] = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # The TorchScript exporter takes dynamic_axes and needs no onnxscript.
+        export_options["dynamo"] = False
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                _TokenEmbeddings(backbone),
+                (torch.zeros((1, 3, *image_size), dtype=torch.float32),),
+                str(float_path),
+                input_names=["pixel_values"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "pixel_values": {0: "batch"},
+                    "last_hidden_state": {0: "batch"},
+                },
+                opset_version=SIMILARITY_ONNX_OPSET,
+                **export_options,
+            )
+        quantize_dynamic(
+            str(float_path), str(temporary_path), weight_type=QuantType.QInt8
+        )
+        os.replace(temporary_path, destination)
+    finally:
+        float_path.unlink(missing_ok=True)
+        temporary_path.unlink(missing_ok=True)
+
+
+def _processor_image_size(processor: Any) -> tuple[int, int]:
+    crop_size = getattr(processor, "crop_size", None) or getattr(processor, "size", {})
+    if isinstance(crop_size, dict) and "height" in crop_size and "width" in crop_size:
+        return int(crop_size["height"]), int(crop_size["width"])
+    return 224, 224
+
+
+def _snapshot_patch_size(snapshot_path: str) -> int:
+    try:
+        with open(
+            os.path.join(snapshot_path, "config.json"), encoding="utf-8"
+        ) as config_file:
+            return int(json.load(config_file).get("patch_size", DEFAULT_PATCH_SIZE))
+    except OSError, ValueError, TypeError, AttributeError:
+        return DEFAULT_PATCH_SIZE
+
+
 def resolve_similarity_model_snapshot(
     model_name: str | None = None,
     *,
@@ -151,7 +350,15 @@ def is_similarity_model_installed(model_name: str | None = None) -> bool:
 
 
 class SimilarityEmbeddingModel:
-    """DINOv2 visual embedding model for image-to-image similarity."""
+    """DINOv2 visual embedding model for image-to-image similarity.
+
+    ``backend="onnx-int8"`` runs an INT8-quantized ONNX export of the model on
+    onnxruntime's CPU provider instead of torch. The export is built on first
+    load and cached. ``region_mode="patch-tokens"`` builds the regional
+    embeddings from one forward pass per image, pooling the patch tokens under
+    each region instead of encoding every crop. ``None`` uses the configured
+    backend and region mode.
+    """
 
     def __init__(
         self,
@@ -159,13 +366,25 @@ class SimilarityEmbeddingModel:
         *,
         allow_download: bool = False,
         progress_callback: ProgressCallback | None = None,
+        backend: str | None = None,
+        region_mode: str | None = None,
     ):
-        self.spec = SimilarityModelSpec(normalize_similarity_model_name(model_name))
+        if backend is None:
+            backend = get_similarity_inference_backend()
+        if region_mode is None:
+            region_mode = get_similarity_region_mode()
+        self.spec = SimilarityModelSpec(
+            normalize_similarity_model_name(model_name),
+            backend=normalize_similarity_inference_backend(backend),
+            region_mode=normalize_similarity_region_mode(region_mode),
+        )
         self.allow_download = allow_download
         self.progress_callback = progress_callback
         self.snapshot_path: str | None = None
         self.processor: Any | None = None
         self.model: Any | None = None
+        self.session: Any | None = None
+        self.patch_size = DEFAULT_PATCH_SIZE
         self.device = "cpu"
 
     @property
@@ -180,8 +399,25 @@ class SimilarityEmbeddingModel:
     def region_cache_key(self) -> str:
         return self.spec.region_cache_key
 
+    @property
+    def backend(self) -> str:
+        return self.spec.backend
+
+    @property
+    def region_mode(self) -> str:
+        return self.spec.region_mode
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.processor is not None and (
+            self.model is not None or self.session is not None
+        )
+
     def load(self) -> None:
-        if self.model is not None and self.processor is not None:
+        if self.is_loaded:
+            return
+        if self.backend == ONNX_INT8_BACKEND:
+            self._load_onnx()
             return
 
         try:
@@ -219,14 +455,63 @@ class SimilarityEmbeddingModel:
         model.eval()
         self.processor = processor
         self.model = model
+        self.patch_size = int(getattr(model.config, "patch_size", DEFAULT_PATCH_SIZE))
         logger.info(
             "Similarity model loaded in %.4fs", time.perf_counter() - load_start
         )
 
+    def _load_onnx(self) -> None:
+        try:
+            import onnxruntime as ort
+            from transformers import AutoImageProcessor
+        except ImportError as exc:
+            raise SimilarityModelDownloadError(
+                f"Missing dependency '{exc.name}'. Install PhotoSort dependencies "
+                "and try again."
+            ) from exc
+
+        load_start = time.perf_counter()
+        self.snapshot_path = resolve_similarity_model_snapshot(
+            self.model_name,
+            allow_download=self.allow_download,
+            progress_callback=self.progress_callback,
+        )
+        processor = AutoImageProcessor.from_pretrained(
+            self.snapshot_path,
+            local_files_only=True,
+        )
+        export_path = similarity_onnx_export_path(self.model_name, self.snapshot_path)
+        if not export_path.exists():
+            logger.info(
+                "Exporting similarity model '%s' to %s", self.model_name, export_path
+            )
+            if self.progress_callback:
+                self.progress_callback(-1, f"Optimizing {self.model_name} for CPU")
+            try:
+                export_similarity_onnx_model(
+                    self.snapshot_path, export_path, _processor_image_size(processor)
+                )
+            except Exception as exc:
+                raise SimilarityModelDownloadError(
+                    f"Could not export '{self.model_name}' to ONNX ({exc}). "
+                    "Switch the similarity backend to torch and try again."
+                ) from exc
+        self.session = ort.InferenceSession(
+            str(export_path), providers=["CPUExecutionProvider"]
+        )
+        self.device = "cpu"
+        self.processor = processor
+        self.patch_size = _snapshot_patch_size(self.snapshot_path)
+        logger.info(
+            "Similarity model loaded as INT8 ONNX from %s in %.4fs",
+            export_path,
+            time.perf_counter() - load_start,
+        )
+
     def encode(self, images: Iterable[object]) -> np.ndarray:
-        if self.model is None or self.processor is None:
+        if not self.is_loaded:
             self.load()
-        if self.model is None or self.processor is None:
+        if not self.is_loaded:
             raise RuntimeError("Similarity embedding model is not loaded.")
 
         batch_images: list[object] = list(images)
@@ -242,15 +527,19 @@ class SimilarityEmbeddingModel:
 
         Returns one global embedding per image and one regional embedding matrix per
         image. The first regional embedding is always the full image.
+        In patch-token mode the other rows pool the full image's patch tokens
+        under each region box; the global embedding is the same in both modes.
         """
-        if self.model is None or self.processor is None:
+        if not self.is_loaded:
             self.load()
-        if self.model is None or self.processor is None:
+        if not self.is_loaded:
             raise RuntimeError("Similarity embedding model is not loaded.")
 
         batch_images: list[object] = list(images)
         if not batch_images:
             return np.empty((0, 0), dtype=np.float32), []
+        if self.region_mode == PATCH_TOKEN_REGION_MODE:
+            return self._encode_patch_regions(batch_images)
 
         all_regions: list[object] = []
         region_counts: list[int] = []
@@ -272,10 +561,13 @@ class SimilarityEmbeddingModel:
         return np.asarray(global_embeddings, dtype=np.float32), regional_embeddings
 
     def _encode_loaded_images(self, images: list[object]) -> np.ndarray:
-        import torch
-
         if not images:
             return np.empty((0, 0), dtype=np.float32)
+        if self.session is not None and self.processor is not None:
+            return self._encode_with_session(images)
+
+        import torch
+
         if self.processor is None or self.model is None:
             raise RuntimeError("Similarity embedding model is not loaded.")
 
@@ -291,3 +583,74 @@ class SimilarityEmbeddingModel:
 
         embeddings_np = np.vstack(encoded_chunks)
         return l2_normalize_rows(embeddings_np)
+
+    def _encode_with_session(self, images: list[object]) -> np.ndarray:
+        encoded_chunks = []
+        for start in range(0, len(images), SIMILARITY_ENCODE_CHUNK_SIZE):
+            chunk = images[start : start + SIMILARITY_ENCODE_CHUNK_SIZE]
+            hidden_states, _pixel_shape = self._hidden_states(chunk)
+            encoded_chunks.append(hidden_states[:, 0, :])
+        return l2_normalize_rows(np.vstack(encoded_chunks))
+
+    def _hidden_states(
+        self, images: list[object]
+    ) -> tuple[np.ndarray, tuple[int, int]]:
+        """Run one chunk and return its ``last_hidden_state`` and pixel size."""
+        if self.processor is None:
+            raise RuntimeError("Similarity embedding model is not loaded.")
+        if self.session is not None:
+            inputs = self.processor(images=images, return_tensors="np")
+            pixel_values = np.asarray(inputs["pixel_values"], dtype=np.float32)
+            input_name = self.session.get_inputs()[0].name
+            (hidden_states,) = self.session.run(None, {input_name: pixel_values})
+            return np.asarray(hidden_states, dtype=np.float32), pixel_values.shape[-2:]
+
+        import torch
+
+        if self.model is None:
+            raise RuntimeError("Similarity embedding model is not loaded.")
+        inputs = self.processor(images=images, return_tensors="pt")
+        inputs = {key: value.to(self.device) for key, value in inputs.items()}
+        with torch.no_grad():
+            hidden_states = self.model(**inputs).last_hidden_state
+        pixel_shape = tuple(inputs["pixel_values"].shape[-2:])
+        return hidden_states.detach().cpu().numpy().astype(np.float32), pixel_shape
+
+    def _encode_patch_regions(
+        self, images: list[object]
+    ) -> tuple[np.ndarray, list[np.ndarray]]:
+        global_embeddings = []
+        regional_embeddings: list[np.ndarray] = []
+        for start in range(0, len(images), SIMILARITY_ENCODE_CHUNK_SIZE):
+            chunk = images[start : start + SIMILARITY_ENCODE_CHUNK_SIZE]
+            hidden_states, (pixel_height, pixel_width) = self._hidden_states(chunk)
+            grid_shape = (
+                pixel_height // self.patch_size,
+                pixel_width // self.patch_size,
+            )
+            # Patch tokens come last, after the CLS (and any register) tokens.
+            patch_tokens = hidden_states[:, -grid_shape[0] * grid_shape[1] :, :]
+            for image, tokens, cls_token in zip(
+                chunk, patch_tokens, hidden_states[:, 0, :], strict=True
+            ):
+                rows = [cls_token[np.newaxis, :]]
+                # Matches build_similarity_image_regions: only PIL-like
+                # images get regions beyond the full frame.
+                size: tuple[int, int] | None = (
+                    getattr(image, "size", None) if hasattr(image, "crop") else None
+                )
+                if size is not None:
+                    width, height = size
+                    boxes = similarity_region_boxes(width, height)
+                    if boxes:
+                        weights = similarity_region_patch_weights(
+                            boxes,
+                            _processor_view(self.processor, width, height),
+                            grid_shape,
+                            self.patch_size,
+                        )
+                        rows.append(weights @ tokens)
+                image_regions = l2_normalize_rows(np.vstack(rows))
+                regional_embeddings.append(image_regions)
+                global_embeddings.append(image_regions[0])
+        return np.asarray(global_embeddings, dtype=np.float32), regional_embeddings
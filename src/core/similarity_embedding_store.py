@@ -0,0 +1,657 @@
+"""Segmented, memory-mapped store of similarity artifacts.
+
+The artifact cache used to be one zstd pickle holding every file's vectors as
+Python float lists, so opening it and saving it after a run both cost
+O(library) time and memory. Here the vectors live in memory-mapped ``.npy``
+columns: ``global`` holds one float32 row per file and ``regional`` one
+float16 row per region, a file's regions stored contiguously. A SQLite index
+maps each path to its fingerprint, orientation, segment and rows, so a lookup
+reads only the requested files' rows.
+
+The columns form an append-only log of immutable segments. Each save writes
+its new artifacts to a fresh segment: the column files are written under a
+temporary name, synced and renamed, and only then does one SQLite transaction
+point the index at them. A crash before the commit leaves an unreferenced
+segment that the next open deletes; existing segments are never written
+again, so no crash can damage rows the index already points at. Reads merge
+the segments by fingerprint: the index names the newest segment of each path,
+and rows of replaced artifacts stay behind in older segments as dead rows.
+
+Once there are more than ``_MAX_SEGMENTS`` segments, or dead rows outnumber
+the live ones, a background thread merges segments into a new one holding
+only their live rows and swaps it in with a single transaction. The largest
+segment is left out unless it is mostly dead, so the merge normally costs the
+size of the recent saves rather than of the library.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from core.similarity_cache import (
+    FileFingerprint,
+    SimilarityArtifact,
+    SimilarityArtifactCacheFormatError,
+)
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_EMBEDDING_STORE_VERSION = 2
+GLOBAL_EMBEDDING_DTYPE = np.float32
+# Regional vectors only feed cosine distances; half precision halves the
+# largest column for an error far below the clustering eps.
+REGIONAL_EMBEDDING_DTYPE = np.float16
+
+_INDEX_FILE_NAME = "index.sqlite3"
+# Segments tolerated before the small ones are merged in the background.
+_MAX_SEGMENTS = 8
+# Dead rows below this never trigger a merge on their own.
+_MIN_COMPACTION_ROWS = 1024
+# Artifacts per appended segment, which bounds the staging arrays.
+_APPEND_CHUNK_SIZE = 4096
+# Rows gathered at a time while merging segments.
+_MERGE_CHUNK_ROWS = 32768
+# Paths per ``IN (...)`` lookup, below SQLite's host parameter limit.
+_LOOKUP_CHUNK_SIZE = 500
+
+_COLUMN_DTYPES = {
+    "global": GLOBAL_EMBEDDING_DTYPE,
+    "regional": REGIONAL_EMBEDDING_DTYPE,
+}
+
+SegmentColumns = dict[str, np.ndarray | None]
+
+_stores: dict[str, SimilarityEmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _region_indices(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Row numbers of every region of several files, in file order."""
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(
+        int(counts.sum()), dtype=np.int64
+    )
+
+
+def _sync_directory(directory: Path) -> None:
+    """Make renames inside ``directory`` durable where the OS allows it."""
+    if os.name != "posix":
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _write_column(
+    path: Path, dtype: np.dtype, shape: tuple[int, int], blocks: Iterable[np.ndarray]
+) -> None:
+    """Write ``blocks`` as one ``.npy`` file that appears only once complete."""
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    mapped = np.lib.format.open_memmap(
+        temporary_path, mode="w+", dtype=dtype, shape=shape
+    )
+    start = 0
+    for block in blocks:
+        mapped[start : start + len(block)] = block
+        start += len(block)
+    mapped.flush()
+    del mapped
+    with open(temporary_path, "rb+") as handle:
+        os.fsync(handle.fileno())
+    os.replace(temporary_path, path)
+
+
+def open_similarity_embedding_store(directory: Path) -> SimilarityEmbeddingStore:
+    """
+    Return the process-wide store for ``directory``, opening it on first use.
+    Two instances on one directory would allocate the same segments, so every
+    engine of the process shares one.
+    """
+    key = os.path.normcase(os.path.abspath(directory))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = SimilarityEmbeddingStore(Path(directory))
+            _stores[key] = store
+        return store
+
+
+def close_similarity_embedding_stores() -> None:
+    """Close every shared store, e.g. before the embedding cache is deleted."""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
+
+
+class SimilarityEmbeddingStore:
+    """Thread-safe ``path -> SimilarityArtifact`` store over segment columns."""
+
+    def __init__(self, directory: Path):
+        init_start_time = time.perf_counter()
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        # Serialises merges; held without ``_lock`` while merged rows are copied.
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: threading.Thread | None = None
+        # Bumped by clear() so a merge started before it is discarded.
+        self._epoch = 0
+        self._closed = False
+        self._segments: dict[int, SegmentColumns] = {}
+        self._connection = sqlite3.connect(
+            str(self._directory / _INDEX_FILE_NAME),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)"
+        )
+        self._meta = dict(self._connection.execute("SELECT name, value FROM meta"))
+        version = self._meta.get("version", SIMILARITY_EMBEDDING_STORE_VERSION)
+        if version != SIMILARITY_EMBEDDING_STORE_VERSION:
+            logger.warning(
+                "Similarity embedding store %s has an unsupported version; "
+                "starting it empty.",
+                self._directory,
+            )
+            self._connection.execute("DROP TABLE IF EXISTS artifacts")
+            self._connection.execute("DROP TABLE IF EXISTS segments")
+            self._reset_index()
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            "path TEXT PRIMARY KEY, file_size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, orientation TEXT NOT NULL, "
+            "segment INTEGER NOT NULL, global_row INTEGER NOT NULL, "
+            "region_row INTEGER NOT NULL, region_count INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS segments (id INTEGER PRIMARY KEY, "
+            "global_rows INTEGER NOT NULL, region_rows INTEGER NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS artifacts_segment ON artifacts (segment)"
+        )
+        if not self._meta:
+            self._write_meta(version=SIMILARITY_EMBEDDING_STORE_VERSION, next_segment=0)
+        try:
+            for segment, global_rows, region_rows in self._connection.execute(
+                "SELECT id, global_rows, region_rows FROM segments"
+            ).fetchall():
+                self._segments[segment] = self._open_segment(
+                    segment, global_rows, region_rows
+                )
+        except OSError, ValueError, SimilarityArtifactCacheFormatError:
+            logger.warning(
+                "Similarity embedding store %s is unreadable; starting it empty.",
+                self._directory,
+                exc_info=True,
+            )
+            self.clear()
+        self._remove_stale_files()
+        logger.debug(
+            "Similarity embedding store opened at %s with %d artifacts in "
+            "%d segments in %.4fs",
+            self._directory,
+            len(self),
+            len(self._segments),
+            time.perf_counter() - init_start_time,
+        )
+
+    def _segment_path(self, segment: int, column: str) -> Path:
+        return self._directory / f"segment-{segment:08d}-{column}.npy"
+
+    def _open_segment(
+        self, segment: int, global_rows: int, region_rows: int
+    ) -> SegmentColumns:
+        """Map a committed segment read-only, checking it against the index."""
+        columns: SegmentColumns = {}
+        for column, rows in (("global", global_rows), ("regional", region_rows)):
+            if not rows:
+                columns[column] = None
+                continue
+            path = self._segment_path(segment, column)
+            mapped = np.load(path, mmap_mode="r", allow_pickle=False)
+            if mapped.dtype != _COLUMN_DTYPES[column] or mapped.shape != (
+                rows,
+                self._meta.get("dimension"),
+            ):
+                raise SimilarityArtifactCacheFormatError(
+                    f"{path.name} has the wrong layout"
+                )
+            columns[column] = mapped
+        return columns
+
+    def _write_segment(
+        self, segment: int, columns: Mapping[str, tuple[int, Iterable[np.ndarray]]]
+    ) -> None:
+        """Write the ``(rows, blocks)`` of each non-empty column of a segment."""
+        for column, (rows, blocks) in columns.items():
+            if rows:
+                _write_column(
+                    self._segment_path(segment, column),
+                    _COLUMN_DTYPES[column],
+                    (rows, self._meta["dimension"]),
+                    blocks,
+                )
+        _sync_directory(self._directory)
+
+    def _delete_segment_files(self, segment: int) -> None:
+        for column in _COLUMN_DTYPES:
+            path = self._segment_path(segment, column)
+            for candidate in (path, path.with_name(f"{path.name}.tmp")):
+                try:
+                    candidate.unlink(missing_ok=True)
+                except OSError:
+                    # Still mapped elsewhere (Windows); the next open removes it.
+                    logger.debug("Could not delete %s yet.", candidate, exc_info=True)
+
+    def _remove_stale_files(self) -> None:
+        """Drop unreferenced segments: interrupted saves and merged sources."""
+        current = {
+            self._segment_path(segment, column).name
+            for segment in self._segments
+            for column in _COLUMN_DTYPES
+        }
+        for path in self._directory.glob("*.npy*"):
+            if path.name not in current:
+                path.unlink(missing_ok=True)
+
+    def _write_meta(self, **values: int) -> None:
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)", values.items()
+        )
+        self._meta.update(values)
+
+    def _reset_index(self) -> None:
+        self._connection.execute("DELETE FROM meta")
+        self._meta = {}
+        if self._connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'artifacts'"
+        ).fetchone():
+            self._connection.execute("DELETE FROM artifacts")
+            self._connection.execute("DELETE FROM segments")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._connection.execute("BEGIN")
+        try:
+            yield
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            self._meta = dict(self._connection.execute("SELECT name, value FROM meta"))
+            raise
+
+    def put_many(self, artifacts: Mapping[str, SimilarityArtifact]) -> None:
+        """
+        Append artifacts as new segments; existing segments are never written.
+        May start a background merge of the small segments afterwards.
+        """
+        items = list(artifacts.items())
+        for start in range(0, len(items), _APPEND_CHUNK_SIZE):
+            self._append_segment(items[start : start + _APPEND_CHUNK_SIZE])
+        if items:
+            self._schedule_compaction()
+
+    def _append_segment(self, items: list[tuple[str, SimilarityArtifact]]) -> None:
+        global_rows = np.asarray(
+            [artifact["embedding"] for _path, artifact in items],
+            dtype=GLOBAL_EMBEDDING_DTYPE,
+        )
+        dimension = global_rows.shape[1]
+        regions = [
+            np.asarray(artifact["regional_embeddings"], dtype=np.float32).reshape(
+                -1, dimension
+            )
+            for _path, artifact in items
+        ]
+        region_total = sum(len(region) for region in regions)
+        with self._lock:
+            stored_dimension = self._meta.get("dimension")
+            if stored_dimension is None:
+                self._write_meta(dimension=dimension)
+            elif stored_dimension != dimension:
+                raise SimilarityArtifactCacheFormatError(
+                    f"embedding dimension {dimension} does not match the "
+                    f"store's {stored_dimension}"
+                )
+            segment = self._meta["next_segment"]
+            index_rows = []
+            region_row = 0
+            for global_row, ((path, artifact), region) in enumerate(
+                zip(items, regions, strict=True)
+            ):
+                file_size, mtime_ns = artifact["fingerprint"]
+                index_rows.append(
+                    (
+                        path,
+                        int(file_size),
+                        int(mtime_ns),
+                        artifact["orientation"],
+                        segment,
+                        global_row,
+                        region_row,
+                        len(region),
+                    )
+                )
+                region_row += len(region)
+            try:
+                self._write_segment(
+                    segment,
+                    {
+                        "global": (len(items), [global_rows]),
+                        "regional": (region_total, regions),
+                    },
+                )
+                columns = self._open_segment(segment, len(items), region_total)
+                with self._transaction():
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO artifacts "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        index_rows,
+                    )
+                    self._connection.execute(
+                        "INSERT INTO segments VALUES (?, ?, ?)",
+                        (segment, len(items), region_total),
+                    )
+                    self._write_meta(next_segment=segment + 1)
+            except BaseException:
+                self._delete_segment_files(segment)
+                raise
+            self._segments[segment] = columns
+
+    def _select(self, paths: list[str], fields: str) -> Iterable[list[tuple]]:
+        for start in range(0, len(paths), _LOOKUP_CHUNK_SIZE):
+            chunk = paths[start : start + _LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            yield self._connection.execute(
+                f"SELECT {fields} FROM artifacts WHERE path IN ({placeholders})",
+                chunk,
+            ).fetchall()
+
+    def get_many(
+        self, fingerprints: Mapping[str, FileFingerprint]
+    ) -> dict[str, SimilarityArtifact]:
+        """
+        Return the artifacts of the given paths whose stored fingerprint
+        matches. Only those files' rows are read, segment by segment.
+        """
+        with self._lock:
+            matches = [
+                row
+                for rows in self._select(
+                    list(fingerprints),
+                    "path, file_size, mtime_ns, orientation, "
+                    "segment, global_row, region_row, region_count",
+                )
+                for row in rows
+                if (row[1], row[2]) == tuple(fingerprints[row[0]])
+            ]
+            if not matches:
+                return {}
+            segments, global_rows, starts, counts = (
+                np.fromiter(
+                    (row[field] for row in matches), dtype=np.int64, count=len(matches)
+                )
+                for field in (4, 5, 6, 7)
+            )
+            bounds = np.concatenate(([0], np.cumsum(counts)))
+            embeddings = np.empty(
+                (len(matches), self._meta["dimension"]), dtype=GLOBAL_EMBEDDING_DTYPE
+            )
+            regional = np.empty((int(bounds[-1]), embeddings.shape[1]), np.float32)
+            for segment in np.unique(segments):
+                columns = self._segments[int(segment)]
+                selected = np.flatnonzero(segments == segment)
+                embeddings[selected] = columns["global"][global_rows[selected]]
+                if columns["regional"] is not None:
+                    regional[_region_indices(bounds[selected], counts[selected])] = (
+                        columns["regional"][
+                            _region_indices(starts[selected], counts[selected])
+                        ]
+                    )
+        artifacts: dict[str, SimilarityArtifact] = {}
+        for index, row in enumerate(matches):
+            artifacts[row[0]] = {
+                "fingerprint": (row[1], row[2]),
+                "embedding": embeddings[index].tolist(),
+                "regional_embeddings": regional[
+                    bounds[index] : bounds[index + 1]
+                ].tolist(),
+                "orientation": row[3],
+            }
+        return artifacts
+
+    def _compaction_sources(self) -> list[int] | None:
+        """Pick the segments worth merging, or None while the log is tidy."""
+        live = dict(
+            self._connection.execute(
+                "SELECT segment, COUNT(*) FROM artifacts GROUP BY segment"
+            )
+        )
+        sizes = dict(self._connection.execute("SELECT id, global_rows FROM segments"))
+        live_total = sum(live.values())
+        dead_total = sum(sizes.values()) - live_total
+        if len(sizes) <= _MAX_SEGMENTS and not (
+            dead_total > live_total and dead_total >= _MIN_COMPACTION_ROWS
+        ):
+            return None
+        sources = sorted(sizes)
+        base = max(sources, key=lambda segment: live.get(segment, 0))
+        if 2 * live.get(base, 0) >= sizes[base]:
+            sources.remove(base)
+        if len(sources) < 2 and all(
+            live.get(segment, 0) == sizes[segment] for segment in sources
+        ):
+            return None
+        return sources
+
+    def _schedule_compaction(self) -> None:
+        with self._lock:
+            if self._closed or (
+                self._compaction_thread is not None
+                and self._compaction_thread.is_alive()
+            ):
+                return
+            sources = self._compaction_sources()
+            if sources is None:
+                return
+            self._compaction_thread = threading.Thread(
+                target=self._run_compaction,
+                args=(sources,),
+                name="SimilarityStoreCompaction",
+                daemon=True,
+            )
+            self._compaction_thread.start()
+
+    def _run_compaction(self, sources: list[int]) -> None:
+        try:
+            self._merge_segments(sources)
+        except Exception:
+            logger.warning(
+                "Merging similarity embedding segments in %s failed; keeping "
+                "the existing segments.",
+                self._directory,
+                exc_info=True,
+            )
+
+    def wait_for_compaction(self) -> None:
+        """Block until a background merge, if one is running, has finished."""
+        thread = self._compaction_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def compact(self) -> None:
+        """Merge every segment into one without dead rows, synchronously."""
+        self.wait_for_compaction()
+        with self._lock:
+            sources = sorted(self._segments)
+        if sources:
+            self._merge_segments(sources)
+
+    def _merge_segments(self, sources: list[int]) -> None:
+        with self._compaction_lock:
+            with self._lock:
+                if self._closed:
+                    return
+                sources = [segment for segment in sources if segment in self._segments]
+                if not sources:
+                    return
+                epoch = self._epoch
+                placeholders = ",".join("?" * len(sources))
+                rows = self._connection.execute(
+                    "SELECT path, segment, global_row, region_row, region_count "
+                    f"FROM artifacts WHERE segment IN ({placeholders}) "
+                    "ORDER BY segment, global_row",
+                    sources,
+                ).fetchall()
+                columns = {segment: self._segments[segment] for segment in sources}
+                target = self._meta["next_segment"]
+                # Reserved now so that saves during the merge use later ids.
+                self._write_meta(next_segment=target + 1)
+
+            # Source segments are immutable, so the copy runs without the lock.
+            segments, global_rows, starts, counts = (
+                np.asarray([row[field] for row in rows], dtype=np.int64)
+                for field in (1, 2, 3, 4)
+            )
+            new_starts = np.cumsum(counts) - counts
+            region_total = int(counts.sum())
+
+            def gather(column: str) -> Iterator[np.ndarray]:
+                for segment in sources:
+                    selected = np.flatnonzero(segments == segment)
+                    if column == "global":
+                        source_rows = global_rows[selected]
+                    else:
+                        source_rows = _region_indices(
+                            starts[selected], counts[selected]
+                        )
+                    for start in range(0, len(source_rows), _MERGE_CHUNK_ROWS):
+                        yield columns[segment][column][
+                            source_rows[start : start + _MERGE_CHUNK_ROWS]
+                        ]
+
+            try:
+                self._write_segment(
+                    target,
+                    {
+                        "global": (len(rows), gather("global")),
+                        "regional": (region_total, gather("regional")),
+                    },
+                )
+                merged = self._open_segment(target, len(rows), region_total)
+                columns.clear()
+                with self._lock:
+                    if self._closed or self._epoch != epoch:
+                        self._delete_segment_files(target)
+                        return
+                    self._swap_segments(
+                        sources,
+                        target,
+                        [
+                            (target, merged_row, int(new_starts[merged_row]), *key)
+                            for merged_row, key in enumerate(
+                                (row[0], row[1], row[2]) for row in rows
+                            )
+                        ],
+                        region_total,
+                    )
+                    if rows:
+                        self._segments[target] = merged
+                    for segment in sources:
+                        self._segments.pop(segment, None)
+                        self._delete_segment_files(segment)
+            except BaseException:
+                self._delete_segment_files(target)
+                raise
+        logger.info(
+            "Merged %d similarity embedding segments of %s into %d live rows.",
+            len(sources),
+            self._directory,
+            len(rows),
+        )
+
+    def _swap_segments(
+        self,
+        sources: list[int],
+        target: int,
+        moved_rows: list[tuple],
+        region_total: int,
+    ) -> None:
+        """Point the index at the merged segment and retire its sources."""
+        placeholders = ",".join("?" * len(sources))
+        with self._transaction():
+            # Paths saved again during the merge keep their newer segment.
+            self._connection.executemany(
+                "UPDATE artifacts SET segment = ?, global_row = ?, region_row = ? "
+                "WHERE path = ? AND segment = ? AND global_row = ?",
+                moved_rows,
+            )
+            self._connection.execute(
+                f"DELETE FROM segments WHERE id IN ({placeholders})", sources
+            )
+            if moved_rows:
+                self._connection.execute(
+                    "INSERT INTO segments VALUES (?, ?, ?)",
+                    (target, len(moved_rows), region_total),
+                )
+
+    def stats(self) -> dict[str, int]:
+        """Return live artifacts, segments, stored and dead rows, bytes on disk."""
+        with self._lock:
+            artifacts = len(self)
+            (rows,) = self._connection.execute(
+                "SELECT COALESCE(SUM(global_rows), 0) FROM segments"
+            ).fetchone()
+            return {
+                "artifacts": artifacts,
+                "segments": len(self._segments),
+                "rows": rows,
+                "dead_rows": rows - artifacts,
+                "bytes": sum(path.stat().st_size for path in self._directory.iterdir()),
+            }
+
+    def clear(self) -> None:
+        self.wait_for_compaction()
+        with self._lock:
+            self._epoch += 1
+            self._segments = {}
+            self._reset_index()
+            self._write_meta(version=SIMILARITY_EMBEDDING_STORE_VERSION, next_segment=0)
+            for path in self._directory.glob("*.npy*"):
+                path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        self.wait_for_compaction()
+        with self._lock:
+            self._segments = {}
+            try:
+                self._connection.close()
+            except sqlite3.Error:
+                logger.error("Error closing similarity embedding store.", exc_info=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM artifacts"
+            ).fetchone()
+            return count
@@ -14,13 +14,18 @@ from core.similarity_cache import (
     SimilarityArtifact,
     load_similarity_artifact_cache,
     normalize_fingerprints,
-    save_similarity_artifact_cache,
+)
+from core.similarity_embedding_store import (
+    SimilarityEmbeddingStore,
+    close_similarity_embedding_stores,
+    open_similarity_embedding_store,
 )
 from core.similarity_embedding_model import (
     SimilarityEmbeddingModel,
     SimilarityModelDownloadError,
     SimilarityModelNotInstalledError,
 )
+from core.similarity_prefetch import PrefetchStats, iter_prepared_batches
 from core.similarity_utils import (
     SimilarityAnalysisCancelled,
     build_regional_distance_matrix,
@@ -32,6 +37,10 @@ from core.similarity_utils import (
 from .app_settings import (
     DBSCAN_MIN_SAMPLES,
     DEFAULT_SIMILARITY_BATCH_SIZE,
+    SIMILARITY_DECODE_WORKERS_MAX,
+    SIMILARITY_PREFETCH_BATCHES,
+    SIMILARITY_PREFETCH_MAX_BYTES,
+    calculate_max_workers,
     get_similarity_clustering_eps,
     get_similarity_embedding_model_name,
 )  # Import from app_settings
@@ -86,6 +95,8 @@ class SimilarityEngine(QObject):
             progress_callback=self._handle_model_progress,
         )
         self._is_running = True
+        # Pickle written by earlier versions; migrated into the columnar
+        # store next to it on first use.
         self._cache_filename = (
             f"artifacts_{self.model.cache_key}_{self.model.region_cache_key}.pkl.zst"
         )
@@ -183,37 +194,73 @@ class SimilarityEngine(QObject):
             self.error.emit(error_msg)
         return False
 
-    def _load_cached_artifacts(self) -> dict[str, SimilarityArtifact]:
+    @property
+    def _store_dir(self) -> Path:
+        return self._cache_path.with_name(
+            self._cache_path.name.removesuffix(".pkl.zst")
+        )
+
+    def _open_artifact_store(self) -> SimilarityEmbeddingStore:
+        store = open_similarity_embedding_store(self._store_dir)
         if self._cache_path.exists():
-            try:
-                cache_load_start_time = time.perf_counter()
-                logger.info("Loading similarity artifact cache: %s", self._cache_path)
-                cache_data = load_similarity_artifact_cache(self._cache_path)
-                logger.info(
-                    "Loaded %d similarity artifacts from cache in %.4fs",
-                    len(cache_data),
-                    time.perf_counter() - cache_load_start_time,
-                )
-                return cache_data
-            except Exception as e:
-                logger.warning(
-                    "Failed to load similarity artifact cache '%s': %s. "
-                    "A new cache will be created.",
-                    self._cache_path,
-                    e,
-                )
-                self._cache_path.unlink(missing_ok=True)
+            self._migrate_legacy_artifacts(store)
+        return store
+
+    def _migrate_legacy_artifacts(self, store: SimilarityEmbeddingStore) -> None:
+        try:
+            migration_start_time = time.perf_counter()
+            logger.info("Migrating similarity artifact cache: %s", self._cache_path)
+            legacy_artifacts = load_similarity_artifact_cache(self._cache_path)
+            store.put_many(legacy_artifacts)
+            logger.info(
+                "Migrated %d similarity artifacts to %s in %.4fs",
+                len(legacy_artifacts),
+                self._store_dir,
+                time.perf_counter() - migration_start_time,
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to migrate similarity artifact cache '%s': %s. "
+                "Its artifacts will be regenerated.",
+                self._cache_path,
+                e,
+            )
+        self._cache_path.unlink(missing_ok=True)
+
+    def _load_cached_artifacts(
+        self, fingerprints: dict[str, FileFingerprint]
+    ) -> dict[str, SimilarityArtifact]:
+        """Return cached artifacts of the given files whose fingerprint matches."""
+        try:
+            cache_load_start_time = time.perf_counter()
+            cache_data = self._open_artifact_store().get_many(fingerprints)
+            logger.info(
+                "Loaded %d similarity artifacts from cache in %.4fs",
+                len(cache_data),
+                time.perf_counter() - cache_load_start_time,
+            )
+            return cache_data
+        except Exception as e:
+            logger.warning(
+                "Failed to load similarity artifact cache '%s': %s. "
+                "A new cache will be created.",
+                self._store_dir,
+                e,
+            )
+            with contextlib.suppress(Exception):
+                self._open_artifact_store().clear()
         return {}
 
     def _save_artifacts_to_cache(self, artifacts: dict[str, SimilarityArtifact]):
+        """Append new or changed artifacts; cached ones are not rewritten."""
         try:
             cache_save_start_time = time.perf_counter()
             logger.info(
                 "Saving %d similarity artifacts to cache: %s",
                 len(artifacts),
-                self._cache_path,
+                self._store_dir,
             )
-            save_similarity_artifact_cache(self._cache_path, artifacts)
+            self._open_artifact_store().put_many(artifacts)
             logger.info(
                 "Similarity artifacts saved in %.4fs",
                 time.perf_counter() - cache_save_start_time,
@@ -221,7 +268,7 @@ class SimilarityEngine(QObject):
         except Exception as e:
             logger.error(
                 "Failed to save similarity artifact cache '%s': %s",
-                self._cache_path,
+                self._store_dir,
                 e,
                 exc_info=True,
             )
@@ -252,13 +299,7 @@ class SimilarityEngine(QObject):
         logger.info(f"Starting embedding generation for {len(file_paths)} files.")
 
         current_fingerprints = normalize_fingerprints(file_paths, fingerprints)
-        all_artifacts = self._load_cached_artifacts()
-        valid_artifacts = {
-            path: artifact
-            for path, artifact in all_artifacts.items()
-            if path in current_fingerprints
-            and tuple(artifact.get("fingerprint", ())) == current_fingerprints[path]
-        }
+        valid_artifacts = self._load_cached_artifacts(current_fingerprints)
         files_to_process = [
             path
             for path in file_paths
@@ -283,52 +324,60 @@ class SimilarityEngine(QObject):
         batch_size = DEFAULT_SIMILARITY_BATCH_SIZE
         start_time = time.perf_counter()
 
-        for i in range(0, total_to_process, batch_size):
-            if not self._is_running:
-                logger.info("Embedding generation stopped.")
-                break
+        loaded_count = 0
+        batch_number = 0
+        batch_count = (total_to_process + batch_size - 1) // batch_size
+        prefetch_stats = PrefetchStats(
+            workers=calculate_max_workers(max_workers=SIMILARITY_DECODE_WORKERS_MAX)
+        )
 
-            batch_paths = files_to_process[i : i + batch_size]
-            batch_images = []
-            valid_paths_in_batch = []
+        def _load_analysis_image(path: str):
+            return self.image_pipeline.get_analysis_image(
+                path,
+                target_size=ANALYSIS_CACHE_RESOLUTION,
+            )
 
-            for batch_offset, path in enumerate(batch_paths, start=1):
-                img = self.image_pipeline.get_analysis_image(
-                    path,
-                    target_size=ANALYSIS_CACHE_RESOLUTION,
+        def _on_image_loaded(path: str, loaded: bool) -> None:
+            nonlocal loaded_count
+            loaded_count += 1
+            if not loaded:
+                logger.debug(
+                    f"Skipping '{os.path.basename(path)}': Could not load preview."
                 )
-                if img:
-                    logger.debug(
-                        f"Successfully got PIL image for '{os.path.basename(path)}' (Size: {img.size})"
-                    )
-                    batch_images.append(img)
-                    valid_paths_in_batch.append(path)
-                else:
-                    logger.debug(
-                        f"Skipping '{os.path.basename(path)}': Could not load preview."
-                    )
-                    # Ensure skipped files are still counted towards progress if they were in files_to_process
-                    # This is handled later by `processed_count += len(valid_paths_in_batch)` and how total_to_process is calculated.
-                    # If a file is skipped here, it won't be in valid_paths_in_batch.
-
-                loaded_count = min(i + batch_offset, total_to_process)
-                if total_to_process > 0:
-                    self.progress_update.emit(
-                        int((loaded_count / total_to_process) * 100),
-                        f"Preparing images ({loaded_count}/{total_to_process})",
-                    )
+            self.progress_update.emit(
+                int((loaded_count / total_to_process) * 100),
+                f"Preparing images ({loaded_count}/{total_to_process})",
+            )
+
+        # Later batches are decoded on worker threads while this thread
+        # encodes the current one.
+        for batch in iter_prepared_batches(
+            files_to_process,
+            _load_analysis_image,
+            batch_size=batch_size,
+            workers=prefetch_stats.workers,
+            max_batches=SIMILARITY_PREFETCH_BATCHES,
+            max_bytes=SIMILARITY_PREFETCH_MAX_BYTES,
+            should_continue=lambda: self._is_running,
+            on_loaded=_on_image_loaded,
+            stats=prefetch_stats,
+        ):
+            batch_number += 1
+            if not self._is_running:
+                logger.info("Embedding generation stopped.")
+                break
 
+            batch_images = batch.images
+            valid_paths_in_batch = batch.paths
             if not batch_images:
-                # This means all paths in the current batch_paths failed to load a preview.
+                # Every path of this batch failed to load a preview.
                 logger.warning(
-                    f"No valid previews loaded for batch starting at index {i}. Skipping batch."
+                    f"No valid previews loaded for batch {batch_number}. Skipping batch."
                 )
                 continue
 
             try:
-                logger.debug(
-                    f"Encoding batch {i // batch_size + 1}/{(total_to_process + batch_size - 1) // batch_size}..."
-                )
+                logger.debug(f"Encoding batch {batch_number}/{batch_count}...")
                 batch_embeds, batch_region_embeds = self.model.encode_with_regions(
                     batch_images
                 )
@@ -368,11 +417,23 @@ class SimilarityEngine(QObject):
                     valid_paths_in_batch
                 )  # Still count them for progress
 
+        if prefetch_stats.images:
+            utilisation = prefetch_stats.utilisation()
+            logger.info(
+                "Encoded %d images in %.2fs (%.1f images/s); decode workers %.0f%% "
+                "busy across %d, model %.0f%% busy, %.0f%% waiting for images.",
+                prefetch_stats.images,
+                prefetch_stats.wall_seconds,
+                utilisation["images_per_second"],
+                utilisation["decode"] * 100,
+                prefetch_stats.workers,
+                utilisation["encode"] * 100,
+                utilisation["starved"] * 100,
+            )
         logger.info("Finished processing new files.")
-        all_artifacts.update(new_artifacts)
         valid_artifacts.update(new_artifacts)
         if new_artifacts:
-            self._save_artifacts_to_cache(all_artifacts)
+            self._save_artifacts_to_cache(new_artifacts)
 
         final_embeddings_for_requested_files = {
             path: valid_artifacts[path]["embedding"]
@@ -801,6 +862,7 @@ class SimilarityEngine(QObject):
         app_cache_root = get_app_cache_root()
         embedding_cache_dir = os.path.join(app_cache_root, "embeddings")
         logger.info(f"Clearing embedding cache directory: {embedding_cache_dir}")
+        close_similarity_embedding_stores()
         if not os.path.isdir(embedding_cache_dir):
             logger.warning(
                 "Embedding cache directory not found: %s", embedding_cache_dir
@@ -0,0 +1,172 @@
+"""Decode-ahead batching for similarity embedding generation.
+
+Embedding generation used to load a batch of analysis images and only then
+encode it, so the model idled during decoding and decoding idled during
+inference. ``iter_prepared_batches`` loads images on a small thread pool
+while the caller encodes the previous batch. Batches come out in path
+order. At most ``max_batches`` batches of images are in flight, and no new
+load is started once the queued images (running loads counted at the average
+decoded size) hold ``max_bytes``, so a slow model cannot make the queue grow.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class PreparedBatch:
+    """Loaded images of one batch; ``attempted`` counts failed loads too."""
+
+    paths: list[str] = field(default_factory=list)
+    images: list[Any] = field(default_factory=list)
+    attempted: int = 0
+    nbytes: int = 0
+
+
+@dataclass(slots=True)
+class PrefetchStats:
+    """Busy time of each stage of one prefetching run."""
+
+    workers: int
+    images: int = 0
+    wall_seconds: float = 0.0
+    # Summed over the decode workers.
+    decode_seconds: float = 0.0
+    # Time the consumer spent on batches, i.e. encoding.
+    encode_seconds: float = 0.0
+    # Time the consumer waited for an image that was still loading.
+    starved_seconds: float = 0.0
+    peak_queued_bytes: int = 0
+
+    def utilisation(self) -> dict[str, float]:
+        wall = max(self.wall_seconds, 1e-9)
+        return {
+            "decode": self.decode_seconds / (wall * max(1, self.workers)),
+            "encode": self.encode_seconds / wall,
+            "starved": self.starved_seconds / wall,
+            "images_per_second": self.images / wall,
+        }
+
+
+def image_nbytes(image: Any) -> int:
+    """Approximate decoded size of a PIL image (or anything with ``nbytes``)."""
+    nbytes = getattr(image, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    try:
+        width, height = image.size
+        return width * height * len(image.getbands())
+    except AttributeError, TypeError, ValueError:
+        return 0
+
+
+def _timed_load(load: Callable[[str], Any], path: str) -> tuple[Any, float]:
+    started = time.perf_counter()
+    item = load(path)
+    return item, time.perf_counter() - started
+
+
+def iter_prepared_batches(
+    paths: Iterable[str],
+    load: Callable[[str], Any],
+    *,
+    batch_size: int,
+    workers: int,
+    max_batches: int,
+    max_bytes: int,
+    should_continue: Callable[[], bool] = lambda: True,
+    on_loaded: Callable[[str, bool], None] | None = None,
+    stats: PrefetchStats | None = None,
+) -> Iterator[PreparedBatch]:
+    """
+    Yield ``batch_size`` paths at a time with their ``load(path)`` results,
+    loading later batches on ``workers`` threads meanwhile. Paths whose load
+    returns None are left out of the batch. ``on_loaded(path, ok)`` runs on
+    the consumer thread as each image is taken off the queue. Exceptions of
+    ``load`` propagate to the consumer. Closing the generator cancels the
+    loads that have not started.
+    """
+    stats = stats if stats is not None else PrefetchStats(workers=workers)
+    started = time.perf_counter()
+    path_iterator = iter(paths)
+    pending: deque[tuple[str, concurrent.futures.Future]] = deque()
+    max_pending = max(1, max_batches) * max(1, batch_size)
+
+    # Decoded bytes and count of every load seen so far, for estimating the
+    # size of the loads still running.
+    observed = [0, 0]
+
+    def queued_bytes() -> int | None:
+        """Bytes of the queued loads, counting running ones at the average."""
+        done_bytes = done_count = running = 0
+        for _path, future in pending:
+            if future.done() and future.exception() is None:
+                done_bytes += image_nbytes(future.result()[0])
+                done_count += 1
+            else:
+                running += 1
+        seen_bytes = observed[0] + done_bytes
+        seen_count = observed[1] + done_count
+        if not seen_count:
+            return None
+        return done_bytes + running * seen_bytes // seen_count
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, workers), thread_name_prefix="similarity-decode"
+    ) as executor:
+
+        def submit_until_full() -> None:
+            while len(pending) < max_pending and should_continue():
+                queued = queued_bytes()
+                if queued is None:
+                    # Nothing decoded yet: only start what the pool can run.
+                    if len(pending) >= max(1, workers):
+                        return
+                else:
+                    stats.peak_queued_bytes = max(stats.peak_queued_bytes, queued)
+                    if queued >= max_bytes:
+                        return
+                path = next(path_iterator, None)
+                if path is None:
+                    return
+                pending.append((path, executor.submit(_timed_load, load, path)))
+
+        try:
+            submit_until_full()
+            while pending:
+                batch = PreparedBatch()
+                while pending and batch.attempted < batch_size:
+                    path, future = pending.popleft()
+                    wait_started = time.perf_counter()
+                    concurrent.futures.wait([future])
+                    stats.starved_seconds += time.perf_counter() - wait_started
+                    item, seconds = future.result()
+                    stats.decode_seconds += seconds
+                    batch.attempted += 1
+                    observed[0] += image_nbytes(item)
+                    observed[1] += 1
+                    if item is not None:
+                        batch.paths.append(path)
+                        batch.images.append(item)
+                        batch.nbytes += image_nbytes(item)
+                    if on_loaded is not None:
+                        on_loaded(path, item is not None)
+                    submit_until_full()
+                stats.images += len(batch.images)
+                consumer_started = time.perf_counter()
+                yield batch
+                stats.encode_seconds += time.perf_counter() - consumer_started
+                submit_until_full()
+        finally:
+            for _path, future in pending:
+                future.cancel()
+            stats.wall_seconds = time.perf_counter() - started
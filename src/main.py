@@ -517,4 +517,8 @@ def main():
 
 
 if __name__ == "__main__":
+    import multiprocessing
+
+    # Frozen builds re-enter here for process decode workers.
+    multiprocessing.freeze_support()
     main()
@@ -81,13 +81,21 @@ class AppController(QObject):
         # Import lazily to avoid cost outside of this maintenance task
         from core.caching.thumbnail_cache import ThumbnailCache
         from core.caching.preview_cache import PreviewCache
+        from core.caching.analysis_pixel_store import AnalysisPixelStore
+        from core.caching.content_digest_index import ContentDigestIndex
+        from core.caching.decode_failure_cache import DecodeFailureCache
+        from core.caching.thumbnail_pack import ThumbnailPackStore
         from core.caching.exif_cache import ExifCache
         from core.caching.rating_cache import RatingCache
         from core.caching.analysis_cache import AnalysisCache
 
         cache_classes = (
             ("thumbnail", ThumbnailCache),
+            ("thumbnail pack", ThumbnailPackStore),
             ("preview", PreviewCache),
+            ("analysis image", AnalysisPixelStore),
+            ("content digest", ContentDigestIndex),
+            ("decode failure", DecodeFailureCache),
             ("EXIF", ExifCache),
             ("rating", RatingCache),
         )
@@ -456,6 +464,10 @@ class AppController(QObject):
         self._pending_grouping_preview = None
         self._pending_exif_cache_capacity_warning = None
         self.app_state.current_folder_path = folder_path
+        cache_budget = getattr(self.main_window, "cache_budget", None)
+        if cache_budget is not None:
+            cache_budget.note_folder_opened(folder_path)
+            cache_budget.enforce_async(protect=[folder_path])
         self.app_state.skip_grouping_step_once = skip_grouping_step
         if record_as_source:
             self.app_state.grouping_source_root = folder_path
@@ -7,6 +7,7 @@ import os
 from core.caching.rating_cache import RatingCache
 from core.caching.exif_cache import ExifCache
 from core.caching.analysis_cache import AnalysisCache
+from core.caching.fingerprint_registry import fingerprint_registry
 from core.best_photo_finder.payloads import PickBestResults
 
 logger = logging.getLogger(__name__)
@@ -192,6 +193,9 @@ class AppState:
                 else:
                     record["file_size"] = stat_result.st_size
                     record["mtime_ns"] = stat_result.st_mtime_ns
+                    fingerprint_registry.record(
+                        path, stat_result.st_size, stat_result.st_mtime_ns
+                    )
 
         self.cluster_results.clear()
         if not preserve_review_results:
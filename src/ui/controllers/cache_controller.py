@@ -17,6 +17,7 @@ class CacheContext(Protocol):
 
     image_pipeline: Any
     app_state: Any
+    cache_budget: Any
     menu_manager: Any
     cluster_filter_combo: Any
     cluster_sort_combo: Any
@@ -41,12 +42,19 @@ class CacheController:
 
     def update_labels(self) -> None:
         ctx = self.context
-        thumbnail_bytes = ctx.image_pipeline.thumbnail_cache.volume()
+        thumbnail_bytes = (
+            ctx.image_pipeline.thumbnail_cache.volume()
+            + ctx.image_pipeline.thumbnail_packs.volume()
+        )
         ctx.thumb_cache_usage_label.setText(f"{thumbnail_bytes / (1024 * 1024):.2f} MB")
 
         configured_gb = get_preview_cache_size_gb()
         ctx.preview_cache_configured_limit_label.setText(f"{configured_gb:.2f} GB")
-        preview_bytes = ctx.image_pipeline.preview_cache.volume()
+        # Analysis-resolution images used to share the preview cache; count them there.
+        preview_bytes = (
+            ctx.image_pipeline.preview_cache.volume()
+            + ctx.image_pipeline.analysis_cache.volume()
+        )
         ctx.preview_cache_usage_label.setText(f"{preview_bytes / (1024 * 1024):.2f} MB")
 
         exif_cache = getattr(ctx.app_state, "exif_disk_cache", None)
@@ -80,6 +88,7 @@ class CacheController:
     def clear_thumbnail_cache(self) -> None:
         ctx = self.context
         ctx.image_pipeline.thumbnail_cache.clear()
+        ctx.image_pipeline.thumbnail_packs.clear()
         ctx.status_message("Thumbnail cache cleared.", 5000)
         self.update_labels()
         ctx._refresh_visible_items_icons()
@@ -87,6 +96,7 @@ class CacheController:
     def clear_preview_cache(self) -> None:
         ctx = self.context
         ctx.image_pipeline.preview_cache.clear()
+        ctx.image_pipeline.analysis_cache.clear()
         ctx.status_message("Preview cache cleared. Previews will regenerate.", 5000)
         self.update_labels()
         ctx._refresh_current_selection_preview()
@@ -111,6 +121,12 @@ class CacheController:
             self._reset_analysis_ui()
             self.update_labels()
 
+    def _reapply_budget_limits(self) -> None:
+        # Reinitialized caches start at their configured limit again.
+        cache_budget = getattr(self.context, "cache_budget", None)
+        if cache_budget is not None:
+            cache_budget.apply_limits()
+
     def _reset_analysis_ui(self) -> None:
         ctx = self.context
         ctx.group_by_similarity_mode = False
@@ -155,6 +171,7 @@ class CacheController:
         if new_size_gb != current_size_gb:
             set_preview_cache_size_gb(new_size_gb)
             ctx.image_pipeline.reinitialize_preview_cache_from_settings()
+            self._reapply_budget_limits()
             ctx.status_message(
                 f"Preview cache limit set to {new_size_gb:.2f} GB. "
                 "Cache reinitialized.",
@@ -194,6 +211,7 @@ class CacheController:
             if new_size_mb != current_size_mb:
                 set_exif_cache_size_mb(new_size_mb)
                 exif_cache.reinitialize_from_settings()
+                self._reapply_budget_limits()
                 ctx.status_message(
                     f"EXIF cache limit set to {new_size_mb / 1024:.2f} GB. "
                     "Cache reinitialized.",
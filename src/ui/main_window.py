@@ -52,6 +52,7 @@ from PyQt6.QtGui import (
 )
 import sys
 
+from core.caching.cache_budget import CacheBudgetManager
 from core.image_pipeline import ImagePipeline
 from ui.controllers.image_inspection_controller import (
     ImageInspectionController,
@@ -150,6 +151,17 @@ class MainWindow(QMainWindow):
 
         self.image_pipeline = ImagePipeline()
         self.app_state = AppState()
+        self.cache_budget = CacheBudgetManager()
+        for cache_name, cache in (
+            ("thumbnails", self.image_pipeline.thumbnail_cache),
+            ("thumbnail_packs", self.image_pipeline.thumbnail_packs),
+            ("previews", self.image_pipeline.preview_cache),
+            ("analysis_pixels", self.image_pipeline.analysis_cache),
+            ("exif", self.app_state.exif_disk_cache),
+            ("ratings", self.app_state.rating_disk_cache),
+        ):
+            self.cache_budget.register(cache_name, cache)
+        self.image_pipeline.start_hot_set_restore()
         self.worker_manager = WorkerManager(
             image_pipeline_instance=self.image_pipeline, parent=self
         )
@@ -2486,6 +2498,7 @@ class MainWindow(QMainWindow):
                 return
             self._shutdown_in_progress = False
             MetadataIO.shutdown_worker_thread(immediate=True, timeout=0.0)
+            self._shutdown_decode_backend()
             logger.info("Background workers stopped; application close can complete.")
             event.accept()
             return
@@ -2567,6 +2580,7 @@ class MainWindow(QMainWindow):
             time.perf_counter() - close_start,
         )
         self.preview_load_controller.shutdown()
+        self._save_image_hot_set()
         self.worker_manager.request_stop_all_workers()
         is_any_worker_active = getattr(
             self.worker_manager,
@@ -2581,8 +2595,33 @@ class MainWindow(QMainWindow):
             return
 
         MetadataIO.shutdown_worker_thread(immediate=True, timeout=0.0)
+        self._shutdown_decode_backend()
         event.accept()
 
+    def _shutdown_decode_backend(self) -> None:
+        """Stop decode worker processes once no worker can submit to them."""
+        shutdown = getattr(self.image_pipeline, "shutdown_decode_backend", None)
+        if shutdown is None:
+            return
+        try:
+            shutdown()
+        except Exception:
+            logger.warning("Failed to stop the decode backend on close.", exc_info=True)
+
+    def _save_image_hot_set(self) -> None:
+        """Record the in-memory image set so the next launch can warm it up."""
+        image_pipeline = self.image_pipeline
+        if not hasattr(image_pipeline, "save_hot_set"):
+            return
+        try:
+            image_pipeline.stop_hot_set_restore()
+            image_pipeline.save_hot_set(
+                folder=self.app_state.current_folder_path,
+                focused_path=self.app_state.focused_image_path,
+            )
+        except Exception:
+            logger.warning("Failed to save image hot set on close.", exc_info=True)
+
     def _finish_close_after_workers(self) -> None:
         """Retry closing through Qt's event loop once worker threads have exited."""
 
@@ -4749,8 +4788,7 @@ class MainWindow(QMainWindow):
             # changes, and no deleted review path may remain available to
             # request a stale preview.
             self._sync_workflow_results_after_file_mutation()
-            for path in deleted_paths:
-                self.image_pipeline.invalidate_path(path)
+            self.image_pipeline.invalidate_paths(deleted_paths)
             self.thumbnail_loader.invalidate_paths(deleted_paths)
             self._remove_model_paths_batch(deleted_paths)
             self.proxy_model.invalidate()
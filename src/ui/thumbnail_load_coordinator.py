@@ -10,6 +10,7 @@ from core.app_settings import (
     THUMBNAIL_PRELOAD_BATCH_SIZE,
     THUMBNAIL_PRELOAD_VISIBLE_MARGIN,
 )
+from core.image_pipeline import thumbnail_level_for
 
 THUMBNAIL_SCROLL_IDLE_MS = 75
 
@@ -58,9 +59,22 @@ class ViewportThumbnailLoader(QObject):
         if not self._all_paths:
             return
         self._session_id = uuid4().hex
+        self._sync_thumbnail_level()
         self.context.set_thumbnail_progress(0, len(self._all_paths), 0, False)
         self._start_folder_session()
 
+    def _sync_thumbnail_level(self) -> bool:
+        """Serve the smallest thumbnail level covering the active view's icons."""
+        image_pipeline = getattr(self.context, "image_pipeline", None)
+        view = self.context._get_active_file_view()
+        if image_pipeline is None or view is None:
+            return False
+        icon_size = view.iconSize()
+        level = thumbnail_level_for(
+            max(icon_size.width(), icon_size.height()), view.devicePixelRatioF()
+        )
+        return bool(image_pipeline.set_thumbnail_level(level))
+
     def _start_folder_session(self) -> None:
         """Start the current folder session once the previous worker has exited."""
 
@@ -79,6 +93,7 @@ class ViewportThumbnailLoader(QObject):
             self._session_id,
             self._all_paths,
             visible,
+            pack_folder=getattr(self.context.app_state, "current_folder_path", None),
         ):
             self._folder_start_timer.start()
 
@@ -199,6 +214,9 @@ class ViewportThumbnailLoader(QObject):
     def _load_visible_batch(self) -> None:
         if not self._session_id:
             return
+        if self._sync_thumbnail_level():
+            # Icons on screen came from the previous level; fetch the new one.
+            self._materialized_paths.clear()
         visible = [
             path
             for path in dict.fromkeys(self._visible_paths())
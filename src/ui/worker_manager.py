@@ -685,6 +685,7 @@ class WorkerManager(QObject):
             rating_cache=rating_cache,
             exif_cache=exif_cache,
             analysis_cache=analysis_cache,
+            image_pipeline=self.image_pipeline,
             folder_path=folder_path,
         )
         self.file_deletion_worker.moveToThread(self.file_deletion_thread)
@@ -990,8 +991,13 @@ class WorkerManager(QObject):
         session_id: str,
         image_paths: list[str],
         foreground_paths: list[str] | None = None,
+        pack_folder: str | None = None,
     ) -> bool:
-        """Start one prioritized thumbnail session for the active folder."""
+        """Start one prioritized thumbnail session for the active folder.
+
+        ``pack_folder`` names the folder whose thumbnail pack is loaded at the
+        start of the session and rewritten once it completes.
+        """
         from workers.thumbnail_preload_worker import ThumbnailPreloadWorker
 
         if self.thumbnail_preload_thread is not None:
@@ -1005,6 +1011,7 @@ class WorkerManager(QObject):
             foreground_paths=foreground_paths or [],
             should_pause_background=self.is_resource_intensive_analysis_running,
             materialize_background=True,
+            pack_folder=pack_folder,
         )
         self.thumbnail_preload_worker.moveToThread(self.thumbnail_preload_thread)
         self.thumbnail_preload_worker.session_batch_ready.connect(
@@ -32,6 +32,7 @@ class FileDeletionWorker(QObject):
         rating_cache=None,
         exif_cache=None,
         analysis_cache=None,
+        image_pipeline=None,
         folder_path: str | None = None,
         trash_operation: Callable[[str], tuple[bool, str]] | None = None,
     ) -> None:
@@ -44,6 +45,7 @@ class FileDeletionWorker(QObject):
         self.rating_cache = rating_cache
         self.exif_cache = exif_cache
         self.analysis_cache = analysis_cache
+        self.image_pipeline = image_pipeline
         self.folder_path = folder_path
         self.trash_operation = trash_operation or ImageFileOperations.move_to_trash
         self._should_stop = False
@@ -91,6 +93,16 @@ class FileDeletionWorker(QObject):
                         target,
                         exc_info=True,
                     )
+            if deleted_cache_paths and self.image_pipeline is not None:
+                try:
+                    delete_cached_paths(
+                        deleted_cache_paths, image_pipeline=self.image_pipeline
+                    )
+                except Exception:
+                    logger.warning(
+                        "Failed to invalidate image caches after deletion.",
+                        exc_info=True,
+                    )
             if (
                 deleted_cache_paths
                 and self.analysis_cache is not None
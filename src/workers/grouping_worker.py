@@ -169,6 +169,7 @@ class GroupingWorkflowWorker(QObject):
                 path_updates,
                 rating_cache=self.rating_cache,
                 exif_cache=self.exif_cache,
+                image_pipeline=self.image_pipeline,
             )
             if self.analysis_cache is not None:
                 self.analysis_cache.migrate_folder_paths(
@@ -8,6 +8,7 @@ from collections.abc import Callable, Iterable
 
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from core.app_settings import THUMBNAIL_CACHE_READ_BATCH_SIZE
 from core.image_pipeline import ImagePipeline
 
 logger = logging.getLogger(__name__)
@@ -31,6 +32,7 @@ class ThumbnailPreloadWorker(QObject):
         should_pause_background: Callable[[], bool] | None = None,
         materialize_background: bool = True,
         max_workers: int | None = None,
+        pack_folder: str | None = None,
     ):
         super().__init__()
         self.image_pipeline = image_pipeline
@@ -57,10 +59,17 @@ class ThumbnailPreloadWorker(QObject):
         self._refresh_only: set[str] = set()
         self._promote_on_complete: set[str] = set()
         self._pending = set(ordered)
+        # Visible paths painted from an embedded preview, awaiting a real decode.
+        self._upgrades: deque[str] = deque()
         self._inflight: set[str] = set()
+        # Paths already looked up by a batched cache read this session.
+        self._cache_checked: set[str] = set()
         self._total = len(ordered)
         self._attempted = 0
         self._failures = 0
+        # Folder whose thumbnail pack is read on start and rewritten when done.
+        self._pack_folder = pack_folder
+        self._pack_order = list(dict.fromkeys([*self._foreground, *ordered]))
 
     def stop(self):
         with self._wake:
@@ -77,6 +86,7 @@ class ThumbnailPreloadWorker(QObject):
                 elif path not in self._foreground_requested:
                     self._foreground.append(path)
                     self._foreground_requested.add(path)
+                    self._cache_checked.discard(path)
                     if path not in self._pending:
                         self._refresh_only.add(path)
             self._wake.notify_all()
@@ -108,6 +118,70 @@ class ThumbnailPreloadWorker(QObject):
                 paths.append(path)
         return paths
 
+    def _take_unchecked(self, queue: deque[str], limit: int) -> list[str]:
+        """Return queued paths that still need a batched cache lookup."""
+        paths: list[str] = []
+        checked_ahead = 0
+        with self._lock:
+            for path in queue:
+                if len(paths) >= limit:
+                    break
+                if path in self._inflight or (
+                    path not in self._pending and path not in self._refresh_only
+                ):
+                    continue
+                if path in self._cache_checked:
+                    # Stay at most one batch ahead of the decode queue.
+                    checked_ahead += 1
+                    if checked_ahead >= limit:
+                        break
+                    continue
+                self._cache_checked.add(path)
+                paths.append(path)
+        return paths
+
+    def _serve_cached(self, *, foreground: bool) -> None:
+        """Complete queued paths that are already cached with one batched read."""
+        queue = self._foreground if foreground else self._background
+        paths = self._take_unchecked(queue, THUMBNAIL_CACHE_READ_BATCH_SIZE)
+        if not paths:
+            return
+        try:
+            cached = self.image_pipeline.load_cached_thumbnails(
+                paths,
+                promote_to_memory=foreground or self._materialize_background,
+            )
+        except Exception:
+            logger.error("Batched thumbnail cache read failed", exc_info=True)
+            return
+        if not isinstance(cached, list):
+            return
+        with self._lock:
+            # Paths picked up by a decode meanwhile report through that decode.
+            cached = [path for path in cached if path not in self._inflight]
+        if cached:
+            self._record_results(cached, cached, foreground=foreground)
+
+    def _take_upgrades(self, limit: int = 4) -> list[str]:
+        paths: list[str] = []
+        with self._lock:
+            while self._upgrades and len(paths) < limit:
+                path = self._upgrades.popleft()
+                if path in self._inflight:
+                    continue
+                paths.append(path)
+        return paths
+
+    def _queue_upgrade(self, path: str) -> None:
+        try:
+            provisional = self.image_pipeline.is_provisional_thumbnail(path)
+        except Exception:
+            logger.error("Thumbnail state check failed for %s", path, exc_info=True)
+            return
+        if provisional:
+            with self._lock:
+                self._upgrades.append(path)
+
     def _record_results(
         self,
         paths: list[str],
@@ -160,16 +234,44 @@ class ThumbnailPreloadWorker(QObject):
                 False,
             )
 
-    def _ensure(self, path: str, promote_to_memory: bool) -> bool:
+    def _ensure(
+        self, path: str, promote_to_memory: bool, allow_embedded: bool = False
+    ) -> bool:
         try:
             return self.image_pipeline.ensure_thumbnail_cached(
                 path,
                 promote_to_memory=promote_to_memory,
+                allow_embedded=allow_embedded,
             )
         except Exception:
             logger.error("Thumbnail preparation failed for %s", path, exc_info=True)
             return False
 
+    def _load_pack(self) -> int:
+        """Serve packed thumbnails in one batch; return how many the pack lacks."""
+        try:
+            loaded, missing = self.image_pipeline.load_thumbnail_pack(
+                self._pack_folder, self._pack_order
+            )
+        except Exception:
+            logger.error("Thumbnail pack load failed", exc_info=True)
+            return self._total
+        if loaded:
+            self._record_results(loaded, loaded, foreground=True)
+        return missing
+
+    def _write_pack(self) -> None:
+        try:
+            written = self.image_pipeline.write_thumbnail_pack(
+                self._pack_folder,
+                self._pack_order,
+                should_cancel=lambda: not self._is_running,
+            )
+        except Exception:
+            logger.error("Thumbnail pack write failed", exc_info=True)
+            return
+        logger.info("Wrote thumbnail pack with %d entries", written)
+
     def run_session(self) -> None:
         """Run until the session queue is exhausted or cancellation is requested."""
         if not self.session_id:
@@ -184,16 +286,19 @@ class ThumbnailPreloadWorker(QObject):
             self._max_workers,
         )
         paused_emitted = False
+        pack_missing = self._load_pack() if self._pack_folder else 0
         try:
             with concurrent.futures.ThreadPoolExecutor(
                 max_workers=self._max_workers
             ) as executor:
                 futures: dict[concurrent.futures.Future[bool], tuple[str, bool]] = {}
+                upgrade_futures: dict[concurrent.futures.Future[bool], str] = {}
                 while self._is_running:
-                    available = self._max_workers - len(futures)
+                    self._serve_cached(foreground=True)
+                    available = self._max_workers - len(futures) - len(upgrade_futures)
                     foreground = self._take_foreground(available)
                     for path in foreground:
-                        future = executor.submit(self._ensure, path, True)
+                        future = executor.submit(self._ensure, path, True, True)
                         futures[future] = (path, True)
 
                     background_paused = self._should_pause_background()
@@ -207,7 +312,7 @@ class ThumbnailPreloadWorker(QObject):
                         )
                         paused_emitted = False
 
-                    available = self._max_workers - len(futures)
+                    available = self._max_workers - len(futures) - len(upgrade_futures)
                     if background_paused:
                         if not paused_emitted:
                             self.session_progress.emit(
@@ -232,7 +337,13 @@ class ThumbnailPreloadWorker(QObject):
                         was_foreground for _path, was_foreground in futures.values()
                     )
                     if available and not background_paused and not foreground_inflight:
-                        for path in self._take_background(available):
+                        self._serve_cached(foreground=False)
+                        # Replace visible embedded previews before warming the rest.
+                        upgrades = self._take_upgrades(available)
+                        for path in upgrades:
+                            future = executor.submit(self._ensure, path, True)
+                            upgrade_futures[future] = path
+                        for path in self._take_background(available - len(upgrades)):
                             future = executor.submit(
                                 self._ensure,
                                 path,
@@ -241,8 +352,8 @@ class ThumbnailPreloadWorker(QObject):
                             futures[future] = (path, False)
 
                     with self._lock:
-                        has_pending = bool(self._pending)
-                    if not futures:
+                        has_pending = bool(self._pending) or bool(self._upgrades)
+                    if not futures and not upgrade_futures:
                         if not has_pending:
                             break
                         with self._wake:
@@ -250,13 +361,20 @@ class ThumbnailPreloadWorker(QObject):
                         continue
 
                     done, _pending_futures = concurrent.futures.wait(
-                        futures,
+                        [*futures, *upgrade_futures],
                         timeout=0.1,
                         return_when=concurrent.futures.FIRST_COMPLETED,
                     )
                     for future in done:
+                        if future in upgrade_futures:
+                            path = upgrade_futures.pop(future)
+                            if future.result():
+                                self.session_batch_ready.emit(self.session_id, [path])
+                            continue
                         path, was_foreground = futures.pop(future)
                         success = future.result()
+                        if success and was_foreground:
+                            self._queue_upgrade(path)
                         self._record_results(
                             [path],
                             [path] if success else [],
@@ -284,3 +402,11 @@ class ThumbnailPreloadWorker(QObject):
                 self._attempted,
                 self._failures,
             )
+            # Files that failed stay out of the pack; rewrite only for new thumbnails.
+            if (
+                self._pack_folder
+                and self._is_running
+                and self._attempted == self._total
+                and pack_missing > self._failures
+            ):
+                self._write_pack()
@@ -4,6 +4,8 @@ import pyexiv2  # noqa: F401  # Must be imported first to avoid Windows crashes
 import sys
 import os
 
+import pytest
+
 os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 
 ROOT = os.path.dirname(os.path.abspath(__file__))
@@ -15,3 +17,23 @@ if PROJECT_ROOT not in sys.path:
 SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
 if SRC_ROOT not in sys.path:
     sys.path.insert(0, SRC_ROOT)
+
+
+@pytest.fixture
+def make_pipeline(tmp_path):
+    """Build ImagePipelines whose caches live under ``root`` (default ``tmp_path``).
+
+    Calling it again with the same root reopens the same caches, as a restart does.
+    """
+    from core.image_pipeline import ImagePipeline
+
+    def build(root=None, **kwargs) -> ImagePipeline:
+        root = tmp_path if root is None else root
+        return ImagePipeline(
+            thumbnail_cache_dir=str(root / "thumb"),
+            preview_cache_dir=str(root / "preview"),
+            analysis_cache_dir=str(root / "analysis"),
+            **kwargs,
+        )
+
+    return build
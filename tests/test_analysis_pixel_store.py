@@ -0,0 +1,67 @@
+import numpy as np
+from PIL import Image
+
+from core.caching.analysis_pixel_store import AnalysisPixelStore
+from core.image_pipeline import ANALYSIS_CACHE_RESOLUTION, ImagePipeline
+
+
+def _key(path: str, mtime_ns: int = 1) -> tuple:
+    return (path, "analysis", 2, 100, mtime_ns, (1024, 1024))
+
+
+def test_round_trip_is_bit_exact_and_reads_a_mapped_view(tmp_path):
+    store = AnalysisPixelStore(cache_dir=str(tmp_path / "pixels"))
+    pixels = np.random.default_rng(3).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+    store.set(_key("/photos/a.jpg"), Image.fromarray(pixels))
+
+    view = store.get_array(_key("/photos/a.jpg"))
+    image = store.get(_key("/photos/a.jpg"))
+
+    assert isinstance(view, np.memmap) and not view.flags.writeable
+    assert np.array_equal(view, pixels)
+    assert image.mode == "RGB" and np.array_equal(np.asarray(image), pixels)
+    assert store.get(_key("/photos/a.jpg", mtime_ns=2)) is None
+
+
+def test_budget_evicts_least_recently_used_and_survives_restart(tmp_path):
+    entry_bytes = 32 * 32 * 3 + 128
+    store = AnalysisPixelStore(
+        cache_dir=str(tmp_path / "pixels"), size_limit=2 * entry_bytes
+    )
+    for name in ("a", "b"):
+        store.set(_key(f"/photos/{name}.jpg"), Image.new("RGB", (32, 32), "red"))
+    assert store.get_array(_key("/photos/a.jpg")) is not None
+
+    store.set(_key("/photos/c.jpg"), Image.new("RGB", (32, 32), "blue"))
+
+    assert _key("/photos/a.jpg") in store
+    assert _key("/photos/b.jpg") not in store
+    assert store.volume() <= 2 * entry_bytes
+    reopened = AnalysisPixelStore(
+        cache_dir=str(tmp_path / "pixels"), size_limit=2 * entry_bytes
+    )
+    assert _key("/photos/c.jpg") in reopened
+    assert reopened.volume() == store.volume()
+
+    reopened.delete_all_for_path("/photos/c.jpg")
+    assert _key("/photos/c.jpg") not in reopened
+    assert reopened.get(_key("/photos/a.jpg")) is not None
+
+
+def test_analysis_images_are_stored_as_raw_pixels(tmp_path):
+    source = tmp_path / "photo.png"
+    Image.new("RGB", (1600, 1200), (10, 120, 200)).save(source)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+
+    analysis = pipeline.get_analysis_image(str(source), ANALYSIS_CACHE_RESOLUTION)
+
+    key = pipeline.analysis_cache_key(str(source), ANALYSIS_CACHE_RESOLUTION)
+    assert key not in pipeline.preview_cache
+    stored = pipeline.analysis_cache.get_array(key)
+    assert stored.shape == (768, 1024, 3)
+    assert np.array_equal(stored, np.asarray(analysis))
+    pipeline.invalidate_path(str(source))
+    assert key not in pipeline.analysis_cache
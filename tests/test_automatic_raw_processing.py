@@ -333,7 +333,7 @@ def test_get_cached_preview_qpixmap_uses_high_res_cache_without_generation(tmp_p
     cached_preview = Image.new("RGB", (1600, 1200), color="red")
 
     def cache_get(key):
-        if key[5] == (800, 600):
+        if key[5] != PRELOAD_MAX_RESOLUTION:
             return None
         return cached_preview
 
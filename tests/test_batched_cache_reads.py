@@ -0,0 +1,59 @@
+from PIL import Image
+
+from core.caching.exif_cache import ExifCache
+from core.caching.preview_cache import PreviewCache
+from core.caching.thumbnail_cache import ThumbnailCache
+
+
+def test_thumbnail_cache_get_many_returns_only_hits(tmp_path):
+    cache = ThumbnailCache(cache_dir=str(tmp_path / "thumb"))
+    red = ("/photos/red.jpg", True, 1, 2)
+    blue = ("/photos/blue.jpg", True, 3, 4)
+    cache.set_many(
+        [
+            (red, Image.new("RGB", (32, 24), "red")),
+            (blue, Image.new("RGB", (24, 32), "blue")),
+        ]
+    )
+
+    images = cache.get_many([red, ("/photos/missing.jpg", True, 5, 6), blue, red])
+
+    assert set(images) == {red, blue}
+    assert images[red].size == (32, 24)
+    assert images[blue].size == (24, 32)
+    assert cache.contains_many([red, ("/photos/missing.jpg", True, 5, 6)]) == {red}
+    cache.close()
+
+
+def test_preview_cache_set_many_keeps_path_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "core.caching.preview_cache.get_preview_cache_size_bytes",
+        lambda: 64 * 1024 * 1024,
+    )
+    cache = PreviewCache(cache_dir=str(tmp_path / "preview"))
+    small = ("/photos/a.jpg", (640, 480), True, 1, 2)
+    large = ("/photos/a.jpg", (1920, 1200), True, 1, 2)
+    cache.set_many(
+        [
+            (small, Image.new("RGB", (64, 48), "green")),
+            (large, Image.new("RGB", (96, 72), "green")),
+        ]
+    )
+
+    assert set(cache.get_many([small, large])) == {small, large}
+
+    cache.delete_all_for_path("/photos/a.jpg")
+
+    assert cache.get_many([small, large]) == {}
+    cache.close()
+
+
+def test_exif_cache_get_many_skips_misses_and_invalid_entries(tmp_path):
+    cache = ExifCache(cache_dir=str(tmp_path / "exif"))
+    cache.set_many({"/photos/a.jpg": {"Xmp.xmp.Rating": "3"}, "/photos/b.jpg": None})
+    cache._cache.set("/photos/c.jpg", "not metadata")
+
+    found = cache.get_many(["/photos/a.jpg", "/photos/b.jpg", "/photos/c.jpg"])
+
+    assert found == {"/photos/a.jpg": {"Xmp.xmp.Rating": "3"}}
+    cache.close()
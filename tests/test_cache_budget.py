@@ -0,0 +1,150 @@
+import os
+
+from PIL import Image
+
+from core.caching.cache_budget import CacheBudgetManager
+from core.caching.exif_cache import ExifCache
+from core.caching.thumbnail_cache import ThumbnailCache
+from core.image_pipeline import ImagePipeline
+
+DAY = 24 * 3600
+
+
+class _FolderCache:
+    """In-memory cache whose entries cost a fixed size per path."""
+
+    def __init__(self, paths, entry_bytes=100, share_bytes=1000):
+        self.entries = {path: entry_bytes for path in paths}
+        self.share_bytes = share_bytes
+        self.size_limit = None
+
+    def volume(self):
+        return sum(self.entries.values())
+
+    def cached_folders(self):
+        return {os.path.dirname(path) for path in self.entries}
+
+    def evict_folders(self, folders):
+        stale = [path for path in self.entries if os.path.dirname(path) in folders]
+        for path in stale:
+            del self.entries[path]
+        return len(stale)
+
+    def dataset_residency(self, paths):
+        unique = set(paths)
+        return sum(path in self.entries for path in unique), len(unique)
+
+    def get_current_size_limit_bytes(self):
+        return self.share_bytes
+
+    def set_size_limit(self, size_limit):
+        self.size_limit = size_limit
+
+
+def _paths(folder, count):
+    return [f"{folder}/IMG_{index}.jpg" for index in range(count)]
+
+
+def test_register_gives_each_cache_headroom_over_its_share(tmp_path):
+    manager = CacheBudgetManager(state_dir=str(tmp_path), headroom_factor=2.0)
+    cache = _FolderCache([], share_bytes=500)
+
+    manager.register("previews", cache)
+
+    assert cache.size_limit == 1000
+    assert manager.budget_bytes() == 500
+
+
+def test_coldest_folders_are_evicted_across_caches(tmp_path):
+    now = 100 * DAY
+    manager = CacheBudgetManager(state_dir=str(tmp_path), budget_bytes=1120)
+    previews = _FolderCache(_paths("/hot", 5) + _paths("/warm", 2))
+    exif = _FolderCache(_paths("/cold", 5) + _paths("/warm", 2) + _paths("/hot", 1))
+    manager.register("previews", previews)
+    manager.register("exif", exif)
+    for _ in range(5):
+        manager.note_folder_opened("/warm", now=now - 30 * DAY)
+    manager.note_folder_opened("/cold", now=now - 60 * DAY)
+    for folder in ("/a", "/b", "/hot"):
+        manager.note_folder_opened(folder, now=now)
+
+    freed = manager.enforce(now=now)
+
+    assert freed == 500
+    assert exif.cached_folders() == {"/warm", "/hot"}
+    assert previews.cached_folders() == {"/warm", "/hot"}
+    stats = {entry.name: entry for entry in manager.stats(_paths("/cold", 5))}
+    assert stats["exif"].evicted_entries == 5
+    assert stats["exif"].evicted_bytes == 500
+    assert stats["exif"].resident_entries == 0
+    assert stats["exif"].dataset_entries == 5
+    assert stats["previews"].evicted_entries == 0
+
+
+def test_protected_and_recent_folders_are_never_evicted(tmp_path):
+    manager = CacheBudgetManager(state_dir=str(tmp_path), budget_bytes=100)
+    cache = _FolderCache(_paths("/open", 3) + _paths("/untracked", 3))
+    manager.register("thumbnails", cache)
+
+    manager.enforce(protect=["/open"])
+
+    assert cache.cached_folders() == {"/open"}
+
+
+def test_folder_access_stats_survive_restart(tmp_path):
+    manager = CacheBudgetManager(state_dir=str(tmp_path), budget_bytes=100)
+    manager.note_folder_opened("/photos/trip", now=10.0)
+    manager.note_folder_opened("/photos/trip", now=10.0)
+
+    reopened = CacheBudgetManager(state_dir=str(tmp_path), budget_bytes=100)
+
+    assert reopened._score("/photos/trip", 10.0) == 2.0
+    assert reopened._score("/photos/other", 10.0) == 0.0
+
+
+def test_real_caches_evict_by_folder(tmp_path):
+    thumbnails = ThumbnailCache(cache_dir=str(tmp_path / "thumb"))
+    exif = ExifCache(cache_dir=str(tmp_path / "exif"))
+    for folder in ("/cold", "/hot"):
+        for path in _paths(folder, 2):
+            thumbnails.set((path, "thumbnail", 2, 1, 1, True), Image.new("RGB", (8, 8)))
+            exif.set(path, {"Exif.Image.Model": "Camera"})
+
+    assert thumbnails.cached_folders() == {"/cold", "/hot"}
+    assert exif.cached_folders() == {"/cold", "/hot"}
+    assert thumbnails.evict_folders(["/cold"]) == 2
+    assert exif.evict_folders(["/cold"]) == 2
+
+    assert thumbnails.cached_folders() == {"/hot"}
+    assert exif.cached_folders() == {"/hot"}
+    assert thumbnails.dataset_residency([*_paths("/hot", 2), "/cold/x.jpg"]) == (2, 3)
+
+
+def test_content_keyed_entries_are_evicted_with_their_folder(tmp_path):
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "cache" / "thumb"),
+        preview_cache_dir=str(tmp_path / "cache" / "preview"),
+        content_addressed_keys=True,
+    )
+    for folder, colour in (("cold", "navy"), ("hot", "orange")):
+        (tmp_path / folder).mkdir()
+        path = tmp_path / folder / "IMG_1.jpg"
+        Image.new("RGB", (320, 240), colour).save(path)
+        assert pipeline.ensure_thumbnail_cached(str(path))
+    hot, cold = str(tmp_path / "hot"), str(tmp_path / "cold")
+    thumbnails = pipeline.thumbnail_cache
+    assert all(
+        key[0].startswith("content:")
+        for key in pipeline.cache_key_index.tier_keys("thumbnail")
+    )
+    assert thumbnails.cached_folders() == {cold, hot}
+
+    manager = CacheBudgetManager(state_dir=str(tmp_path / "budget"), budget_bytes=1)
+    manager.register("thumbnails", thumbnails)
+    manager.enforce(protect=[hot])
+
+    assert thumbnails.cached_folders() == {hot}
+    cold_key = pipeline.thumbnail_cache_key(os.path.join(cold, "IMG_1.jpg"))
+    hot_key = pipeline.thumbnail_cache_key(os.path.join(hot, "IMG_1.jpg"))
+    assert thumbnails.get(cold_key) is None
+    assert thumbnails.get(hot_key) is not None
@@ -0,0 +1,149 @@
+from unittest.mock import Mock
+
+import diskcache
+from PIL import Image
+
+from core.caching.analysis_pixel_store import AnalysisPixelStore
+from core.caching.cache_key_index import CacheKeyIndex
+from core.caching.image_codec import encode_cached_image
+from core.caching.path_cache_ops import delete_cached_paths, migrate_cached_paths
+from core.caching.preview_cache import PreviewCache
+from core.caching.thumbnail_cache import ThumbnailCache
+from core.image_pipeline import ImagePipeline
+
+
+def _thumbnail_key(path: str, size: int = 256) -> tuple:
+    return (path, "thumbnail", 2, 100, 1, True, size)
+
+
+def test_index_returns_keys_per_identity_and_tier(tmp_path):
+    index = CacheKeyIndex(cache_dir=str(tmp_path / "index"))
+    index.add("thumbnail", [_thumbnail_key("/a.jpg"), _thumbnail_key("/a.jpg", 128)])
+    index.add("preview", [("/a.jpg", "preview", 2)])
+    index.add("thumbnail", [_thumbnail_key("/b.jpg")])
+
+    assert sorted(index.keys_for_paths("thumbnail", ["/a.jpg"])) == sorted(
+        [_thumbnail_key("/a.jpg"), _thumbnail_key("/a.jpg", 128)]
+    )
+    assert index.remove_paths("thumbnail", ["/a.jpg", "/missing.jpg"])
+    assert index.keys_for_paths("thumbnail", ["/a.jpg"]) == []
+    assert index.keys_for_paths("preview", ["/a.jpg"]) == [("/a.jpg", "preview", 2)]
+    assert index.tier_keys("thumbnail") == [_thumbnail_key("/b.jpg")]
+    index.close()
+
+
+def test_thumbnail_bulk_delete_only_touches_indexed_paths(tmp_path):
+    cache = ThumbnailCache(cache_dir=str(tmp_path / "thumb"))
+    for name in ("a", "b", "c"):
+        cache.set(_thumbnail_key(f"/photos/{name}.jpg"), Image.new("RGB", (8, 8)))
+
+    removed = cache.delete_all_for_paths(["/photos/a.jpg", "/photos/c.jpg"])
+
+    assert removed == 2
+    assert _thumbnail_key("/photos/a.jpg") not in cache
+    assert _thumbnail_key("/photos/b.jpg") in cache
+    assert _thumbnail_key("/photos/c.jpg") not in cache
+    cache.close()
+
+
+def test_entries_written_before_the_index_are_backfilled(tmp_path):
+    legacy = diskcache.Cache(directory=str(tmp_path / "preview"))
+    image = Image.new("RGB", (8, 8))
+    old_key = ("/photos/a.jpg", "preview", 2, 100, 1, (1920, 1080), True)
+    legacy.set(old_key, encode_cached_image(image, quality=88))
+    legacy.set("index_/photos/a.jpg", [old_key])
+    legacy.close()
+
+    cache = PreviewCache(cache_dir=str(tmp_path / "preview"))
+    assert old_key in cache
+
+    cache.delete_all_for_path("/photos/a.jpg")
+
+    assert old_key not in cache
+    assert "index_/photos/a.jpg" not in cache._cache
+    cache.close()
+
+
+def test_migration_rekeys_entries_across_tiers(tmp_path):
+    index = CacheKeyIndex(cache_dir=str(tmp_path / "index"))
+    thumbnails = ThumbnailCache(cache_dir=str(tmp_path / "thumb"), key_index=index)
+    analysis = AnalysisPixelStore(cache_dir=str(tmp_path / "pixels"), key_index=index)
+    analysis_key = ("/in/a.jpg", "analysis", 2, 100, 1, (1024, 1024))
+    thumbnails.set(_thumbnail_key("/in/a.jpg"), Image.new("RGB", (8, 8), "red"))
+    analysis.set(analysis_key, Image.new("RGB", (16, 16), "blue"))
+
+    pairs = [("/in/a.jpg", "/out/a.jpg")]
+    assert thumbnails.migrate_paths(pairs) == 1
+    assert analysis.migrate_paths(pairs) == 1
+
+    assert _thumbnail_key("/in/a.jpg") not in thumbnails
+    assert thumbnails.get(_thumbnail_key("/out/a.jpg")) is not None
+    assert analysis_key not in analysis
+    moved = analysis.get(("/out/a.jpg", *analysis_key[1:]))
+    assert moved is not None and moved.size == (16, 16)
+    assert index.keys_for_paths("thumbnail", ["/out/a.jpg"]) == [
+        _thumbnail_key("/out/a.jpg")
+    ]
+
+
+def test_pipeline_migration_keeps_thumbnails_of_renamed_files(tmp_path):
+    source = tmp_path / "IMG_0001.jpg"
+    Image.new("RGB", (800, 600), "teal").save(source)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+    assert pipeline.ensure_thumbnail_cached(str(source))
+    old_key = pipeline.thumbnail_cache_key(str(source), True)
+
+    renamed = tmp_path / "renamed.jpg"
+    source.rename(renamed)
+    pipeline.migrate_paths({str(source): str(renamed)})
+
+    assert old_key not in pipeline.thumbnail_cache
+    assert pipeline.thumbnail_cache_key(str(renamed), True) in pipeline.thumbnail_cache
+
+    pipeline.invalidate_paths([str(renamed)])
+    assert pipeline.thumbnail_cache_key(str(renamed), True) not in (
+        pipeline.thumbnail_cache
+    )
+
+
+def test_pipeline_migration_keeps_memory_cache_bytes_on_collisions(tmp_path):
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+    images = {
+        name: Image.new("RGB", (64 * (index + 1), 64), "teal")
+        for index, name in enumerate(("a", "b", "c", "d"))
+    }
+    for name, image in images.items():
+        pipeline._memory_set(_thumbnail_key(f"/in/{name}.jpg"), image)
+    bytes_before = pipeline._memory_cache_bytes
+
+    # a -> b -> c is a chained rename; d replaces c's old file at /in/c.jpg.
+    pipeline.migrate_paths(
+        [
+            ("/in/a.jpg", "/in/b.jpg"),
+            ("/in/b.jpg", "/in/c.jpg"),
+            ("/in/d.jpg", "/in/c.jpg"),
+        ]
+    )
+
+    held = {key[0]: image.size for key, image in pipeline._memory_cache.items()}
+    assert held == {"/in/b.jpg": (64, 64), "/in/c.jpg": (256, 64)}
+    assert pipeline._memory_cache_bytes == sum(
+        pipeline._image_memory_size(image) for image in pipeline._memory_cache.values()
+    )
+    assert pipeline._memory_cache_bytes < bytes_before
+
+
+def test_path_cache_ops_forward_batches_to_the_image_pipeline():
+    pipeline = Mock()
+
+    delete_cached_paths(["/a.jpg", "/a.jpg", "/b.jpg"], image_pipeline=pipeline)
+    migrate_cached_paths({"/a.jpg": "/c.jpg"}, image_pipeline=pipeline)
+
+    pipeline.invalidate_paths.assert_called_once_with(["/a.jpg", "/b.jpg"])
+    pipeline.migrate_paths.assert_called_once_with([("/a.jpg", "/c.jpg")])
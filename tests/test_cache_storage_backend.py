@@ -0,0 +1,104 @@
+import threading
+
+import pytest
+from PIL import Image
+
+from core.caching.preview_cache import PreviewCache
+from core.caching.storage_backend import open_cache_store
+
+
+@pytest.fixture(params=["diskcache", "lmdb"])
+def backend(request):
+    if request.param == "lmdb":
+        pytest.importorskip("lmdb")
+    return request.param
+
+
+def test_store_mapping_api_matches_across_backends(tmp_path, backend):
+    store = open_cache_store(str(tmp_path), backend=backend, size_limit=1 << 20)
+    key = ("/photos/a.jpg", "preview", 2, 10, 1, (640, 480), False)
+
+    store.set(key, b"payload")
+    store.set("/photos/a.jpg", {"Exif.Image.Model": "Camera"})
+
+    assert store.get(key) == b"payload"
+    assert store.get("/photos/a.jpg") == {"Exif.Image.Model": "Camera"}
+    assert key in store and len(store) == 2
+    assert set(store) == {key, "/photos/a.jpg"}
+    with store.transact():
+        assert store.pop(key, default=None) == b"payload"
+        store.set(("/photos/b.jpg",), b"other")
+    assert store.get(key, "missing") == "missing"
+    with pytest.raises(KeyError):
+        del store[key]
+    assert store.clear() == 2
+    assert len(store) == 0
+    store.close()
+
+
+def test_lmdb_store_evicts_least_recently_stored_and_survives_reopen(tmp_path):
+    pytest.importorskip("lmdb")
+    store = open_cache_store(str(tmp_path), backend="lmdb", size_limit=10_000)
+    for index in range(30):
+        store.set(("entry", index), bytes(1000))
+
+    assert store.volume() <= 10_000
+    assert ("entry", 0) not in store and ("entry", 29) in store
+    store.reset("size_limit", 3000)
+    assert len(store) == 2
+    store.close()
+
+    reopened = open_cache_store(str(tmp_path), backend="lmdb", size_limit=3000)
+    assert sorted(reopened) == [("entry", 28), ("entry", 29)]
+    reopened.close()
+
+
+def test_lmdb_transaction_rolls_back_and_threads_write_concurrently(tmp_path):
+    pytest.importorskip("lmdb")
+    store = open_cache_store(str(tmp_path), backend="lmdb", size_limit=1 << 24)
+    with pytest.raises(RuntimeError):
+        with store.transact():
+            store.set("rolled-back", b"x")
+            raise RuntimeError
+    assert "rolled-back" not in store
+
+    def write(worker):
+        for index in range(50):
+            with store.transact():
+                store.set((worker, index), bytes(100))
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(store) == 200
+    store.close()
+
+
+def test_preview_cache_runs_on_the_configured_backend(tmp_path, monkeypatch, backend):
+    monkeypatch.setattr(
+        "core.caching.storage_backend.get_cache_storage_backend",
+        lambda cache_name: backend,
+    )
+    cache = PreviewCache(cache_dir=str(tmp_path / "previews"))
+    key = ("/photos/a.jpg", "preview", 2, 10, 1, (64, 48), False)
+    cache.set(key, Image.new("RGB", (64, 48), "teal"))
+
+    assert cache.get(key).size == (64, 48)
+    assert cache.get_many([key])[key].size == (64, 48)
+    assert cache.delete_all_for_paths(["/photos/a.jpg"]) == 1
+    assert key not in cache
+    cache.close()
+
+
+def test_lmdb_stores_on_one_directory_share_the_environment(tmp_path):
+    pytest.importorskip("lmdb")
+    first = open_cache_store(str(tmp_path), backend="lmdb", size_limit=1 << 20)
+    second = open_cache_store(str(tmp_path), backend="lmdb", size_limit=1 << 20)
+
+    first.set("shared", b"value")
+    first.close()
+
+    assert second.get("shared") == b"value"
+    second.close()
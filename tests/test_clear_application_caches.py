@@ -20,7 +20,11 @@ def test_clear_application_caches_clears_every_cache(monkeypatch):
 
     for module_path, class_name in (
         ("core.caching.thumbnail_cache", "ThumbnailCache"),
+        ("core.caching.thumbnail_pack", "ThumbnailPackStore"),
         ("core.caching.preview_cache", "PreviewCache"),
+        ("core.caching.analysis_pixel_store", "AnalysisPixelStore"),
+        ("core.caching.content_digest_index", "ContentDigestIndex"),
+        ("core.caching.decode_failure_cache", "DecodeFailureCache"),
         ("core.caching.exif_cache", "ExifCache"),
         ("core.caching.rating_cache", "RatingCache"),
     ):
@@ -56,6 +60,15 @@ def test_clear_application_caches_clears_every_cache(monkeypatch):
     assert "analysis_clear_all" in calls
     assert "similarity_clear_embeddings" in calls
 
-    for cache_name in ("thumbnail", "preview", "exif", "rating"):
+    for cache_name in (
+        "thumbnail",
+        "thumbnailpackstore",
+        "preview",
+        "analysispixelstore",
+        "contentdigestindex",
+        "decodefailure",
+        "exif",
+        "rating",
+    ):
         assert f"{cache_name}_clear" in calls
         assert f"{cache_name}_close" in calls
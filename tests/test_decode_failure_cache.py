@@ -0,0 +1,216 @@
+import io
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from core.app_settings import DECODE_FAILURE_RETRY_SECONDS
+from core.caching.decode_failure_cache import DecodeFailureCache
+from core.caching.fingerprint_registry import fingerprint_registry
+from core.image_processing.process_decode_backend import (
+    DecodeWorkerCrashed,
+    ProcessDecodeBackend,
+)
+from core.image_processing.raw_image_processor import RawImageProcessor
+from core.image_processing.standard_image_processor import StandardImageProcessor
+
+
+@pytest.fixture
+def corrupt_folder(tmp_path):
+    """A shoot with one good photo and files no decoder can read."""
+    folder = tmp_path / "shoot"
+    folder.mkdir()
+    Image.new("RGB", (640, 480), "teal").save(folder / "good.jpg")
+    encoded = io.BytesIO()
+    Image.effect_noise((640, 480), 40).convert("RGB").save(encoded, "JPEG")
+    (folder / "truncated.jpg").write_bytes(encoded.getvalue()[:200])
+    (folder / "corrupt.heic").write_bytes(b"\x00\x00\x00\x18ftypheic" + os.urandom(512))
+    (folder / "unsupported.arw").write_bytes(b"II*\x00" + os.urandom(2048))
+    (folder / "empty.png").write_bytes(b"")
+    return folder
+
+
+def _count_calls(monkeypatch, owner, name: str) -> list[str]:
+    calls: list[str] = []
+    original = getattr(owner, name)
+
+    def counted(path, *args, **kwargs):
+        calls.append(path)
+        return original(path, *args, **kwargs)
+
+    counted.__qualname__ = original.__qualname__
+    monkeypatch.setattr(owner, name, staticmethod(counted))
+    return calls
+
+
+def test_failures_are_recorded_per_tier_and_not_retried(
+    tmp_path, corrupt_folder, make_pipeline
+):
+    pipeline = make_pipeline()
+    names = ("truncated.jpg", "corrupt.heic", "unsupported.arw", "empty.png")
+    for name in names:
+        path = str(corrupt_folder / name)
+        assert not pipeline.ensure_thumbnail_cached(path)
+        assert pipeline.get_preview_image(path) is None
+    assert pipeline.ensure_thumbnail_cached(str(corrupt_folder / "good.jpg"))
+
+    report = pipeline.broken_files(str(corrupt_folder))
+    assert {(os.path.basename(f.path), f.tier) for f in report} == {
+        (name, tier) for name in names for tier in ("thumbnail", "preview")
+    }
+    assert all("returned no image" in failure.reason for failure in report)
+    assert pipeline.broken_files(str(tmp_path / "elsewhere")) == []
+
+
+def test_failed_file_is_skipped_until_it_changes(
+    tmp_path, corrupt_folder, monkeypatch, make_pipeline
+):
+    thumbnail_calls = _count_calls(
+        monkeypatch, StandardImageProcessor, "process_for_thumbnail"
+    )
+    raw_calls = _count_calls(monkeypatch, RawImageProcessor, "process_raw_for_preview")
+    pipeline = make_pipeline()
+    jpeg = str(corrupt_folder / "truncated.jpg")
+    raw = str(corrupt_folder / "unsupported.arw")
+
+    for _ in range(4):
+        assert not pipeline.ensure_thumbnail_cached(jpeg)
+        assert pipeline.ensure_preview_cached(raw) is False
+    # The second failure in a row is the last attempt.
+    assert thumbnail_calls == [jpeg, jpeg]
+    assert raw_calls == [raw, raw]
+    assert pipeline.decode_failures.stats()["skipped"] == 4
+
+    # A restarted pipeline remembers the failures.
+    restarted = make_pipeline()
+    assert not restarted.ensure_thumbnail_cached(jpeg)
+    assert len(thumbnail_calls) == 2
+
+    # Repairing the file changes its fingerprint, so it decodes again.
+    Image.new("RGB", (320, 240), "orange").save(jpeg)
+    assert restarted.ensure_thumbnail_cached(jpeg)
+    assert len(thumbnail_calls) == 3
+
+
+def test_files_that_vanish_or_change_during_decode_are_not_recorded(
+    tmp_path, corrupt_folder, monkeypatch, make_pipeline
+):
+    pipeline = make_pipeline()
+    vanished = str(corrupt_folder / "truncated.jpg")
+    growing = str(corrupt_folder / "empty.png")
+    original = StandardImageProcessor.process_for_thumbnail
+
+    def decode_then_touch(path, *args, **kwargs):
+        result = original(path, *args, **kwargs)
+        if path == vanished:
+            os.remove(path)
+        else:
+            with open(path, "ab") as handle:
+                handle.write(b"more bytes")
+        return result
+
+    monkeypatch.setattr(
+        StandardImageProcessor,
+        "process_for_thumbnail",
+        staticmethod(decode_then_touch),
+    )
+    # The folder scan recorded the fingerprints from before the decode.
+    for path in (vanished, growing):
+        stat_result = os.stat(path)
+        fingerprint_registry.record(path, stat_result.st_size, stat_result.st_mtime_ns)
+    try:
+        assert not pipeline.ensure_thumbnail_cached(vanished)
+        assert not pipeline.ensure_thumbnail_cached(growing)
+    finally:
+        fingerprint_registry.invalidate(vanished, growing)
+
+    assert pipeline.broken_files() == []
+
+
+def test_transient_failures_and_worker_crashes_stay_retryable(
+    tmp_path, corrupt_folder, monkeypatch, make_pipeline
+):
+    good = str(corrupt_folder / "good.jpg")
+    original = StandardImageProcessor.process_for_thumbnail
+    calls: list[str] = []
+
+    def share_dropped_once(path, *args, **kwargs):
+        calls.append(path)
+        if len(calls) == 1:
+            return None  # The processor caught an OSError from a dropped share.
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(
+        StandardImageProcessor,
+        "process_for_thumbnail",
+        staticmethod(share_dropped_once),
+    )
+    pipeline = make_pipeline()
+    assert not pipeline.ensure_thumbnail_cached(good)
+    assert pipeline.ensure_thumbnail_cached(good)
+
+    crashing = make_pipeline(tmp_path / "crash", decode_backend="process")
+
+    def worker_died(function, *args, **kwargs):
+        raise DecodeWorkerCrashed("another file crashed the worker")
+
+    monkeypatch.setattr(crashing._process_decoder, "run", worker_died)
+    truncated = str(corrupt_folder / "truncated.jpg")
+    for _ in range(3):
+        assert not crashing.ensure_thumbnail_cached(truncated)
+    assert crashing.broken_files() == []
+
+
+def test_process_backend_reports_a_crashed_worker():
+    backend = ProcessDecodeBackend(max_workers=1, high_memory_workers=1)
+    try:
+        with pytest.raises(DecodeWorkerCrashed):
+            backend.run(os._exit, 1)
+        # The pool restarts for the next decode.
+        assert backend.run(os.getpid) != os.getpid()
+    finally:
+        backend.shutdown()
+
+
+def test_analysis_failures_skip_the_fanout_decode(
+    tmp_path, corrupt_folder, monkeypatch, make_pipeline
+):
+    tier_calls = _count_calls(monkeypatch, StandardImageProcessor, "process_for_tiers")
+    pipeline = make_pipeline()
+    path = str(corrupt_folder / "truncated.jpg")
+
+    for _ in range(3):
+        assert pipeline.get_analysis_image(path, (224, 224)) is None
+
+    assert tier_calls == [path, path]
+    assert {f.tier for f in pipeline.broken_files()} == {"analysis", "thumbnail"}
+
+
+def test_invalidation_and_new_fingerprints_clear_failures(tmp_path):
+    cache = DecodeFailureCache(cache_dir=str(tmp_path / "failures"))
+    failure = cache.record("/photos/a.arw", "preview", 100, 5, "decoder failed")
+    again = cache.record("/photos/a.arw", "preview", 100, 5, "decoder failed")
+
+    assert failure.attempts == 1 and again.attempts == 2
+    assert cache.is_failed("/photos/a.arw", "preview", 100, 5)
+    assert not cache.is_failed("/photos/a.arw", "preview", 100, 6)
+    assert not cache.is_failed("/photos/a.arw", "thumbnail", 100, 5)
+    assert cache.forget(["/photos/a.arw"]) == 1
+    assert cache.broken_files() == []
+    cache.close()
+
+
+def test_a_single_or_expired_failure_is_retried(tmp_path, monkeypatch):
+    cache = DecodeFailureCache(cache_dir=str(tmp_path / "failures"))
+    cache.record("/photos/a.arw", "preview", 100, 5, "decoder failed")
+    assert not cache.is_failed("/photos/a.arw", "preview", 100, 5)
+    cache.record("/photos/a.arw", "preview", 100, 5, "decoder failed")
+    assert cache.is_failed("/photos/a.arw", "preview", 100, 5)
+
+    later = time.time() + DECODE_FAILURE_RETRY_SECONDS + 1
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert not cache.is_failed("/photos/a.arw", "preview", 100, 5)
+    # An expired failure starts the count again.
+    assert cache.record("/photos/a.arw", "preview", 100, 5, "again").attempts == 1
+    cache.close()
@@ -0,0 +1,159 @@
+import io
+from unittest.mock import Mock, patch
+
+import piexif
+from PIL import Image
+from pillow_heif import register_heif_opener
+from PyQt6.QtWidgets import QApplication
+
+from core.image_pipeline import ImagePipeline
+from core.image_processing.standard_image_processor import (
+    StandardImageProcessor,
+    embedded_thumbnail_stats,
+)
+
+_app = QApplication.instance() or QApplication([])
+
+
+def _save_with_exif_thumbnail(path, orientation: int = 1) -> None:
+    embedded = io.BytesIO()
+    Image.new("RGB", (240, 160), "blue").save(embedded, "JPEG")
+    exif = piexif.dump(
+        {
+            "0th": {piexif.ImageIFD.Orientation: orientation},
+            "1st": {piexif.ImageIFD.JPEGInterchangeFormat: 0},
+            "thumbnail": embedded.getvalue(),
+        }
+    )
+    Image.new("RGB", (3000, 2000), "red").save(path, exif=exif)
+
+
+def test_exif_thumbnail_is_oriented_without_decoding_the_main_image(tmp_path):
+    source = tmp_path / "camera.jpg"
+    _save_with_exif_thumbnail(source, orientation=6)
+    before = embedded_thumbnail_stats()
+
+    thumbnail = StandardImageProcessor.extract_embedded_thumbnail(str(source))
+
+    assert thumbnail is not None and thumbnail.mode == "RGBA"
+    assert thumbnail.size == (160, 240)
+    red, _green, blue, _alpha = thumbnail.getpixel((80, 120))
+    assert blue > 200 and red < 50
+    after = embedded_thumbnail_stats()
+    assert after["calls"] == before["calls"] + 1
+    assert after["exif"] == before["exif"] + 1
+
+
+def test_small_or_missing_previews_fall_back_to_a_real_decode(tmp_path):
+    plain = tmp_path / "plain.jpg"
+    Image.new("RGB", (800, 600), "red").save(plain)
+    before = embedded_thumbnail_stats()
+
+    assert StandardImageProcessor.extract_embedded_thumbnail(str(plain)) is None
+    assert (
+        StandardImageProcessor.extract_embedded_thumbnail(str(plain), min_size=10_000)
+        is None
+    )
+    assert embedded_thumbnail_stats()["missed"] == before["missed"] + 2
+
+
+def test_tiff_reduced_resolution_subfile_is_used(tmp_path):
+    source = tmp_path / "scan.tif"
+    Image.new("RGB", (3000, 2000), "red").save(
+        source,
+        save_all=True,
+        append_images=[Image.new("RGB", (300, 200), "green")],
+        tiffinfo={254: 1},
+    )
+
+    thumbnail = StandardImageProcessor.extract_embedded_thumbnail(str(source))
+
+    assert thumbnail is not None
+    assert thumbnail.size == (256, 171)
+    assert thumbnail.getpixel((10, 10))[:3] == (0, 128, 0)
+
+
+def test_embedded_thumbnail_paints_first_and_is_upgraded_by_real_decode(tmp_path):
+    source = tmp_path / "camera.jpg"
+    _save_with_exif_thumbnail(source)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+    cache_key = pipeline.thumbnail_cache_key(str(source), True)
+
+    assert pipeline.ensure_thumbnail_cached(str(source), allow_embedded=True)
+    assert pipeline.is_provisional_thumbnail(str(source))
+    assert cache_key not in pipeline.thumbnail_cache
+    assert (
+        pipeline.get_cached_thumbnail_qpixmap(str(source), memory_only=True) is not None
+    )
+
+    assert pipeline.ensure_thumbnail_cached(str(source))
+
+    assert not pipeline.is_provisional_thumbnail(str(source))
+    assert cache_key in pipeline.thumbnail_cache
+    red, _green, blue, _alpha = pipeline._memory_get(cache_key).getpixel((10, 10))
+    assert red > 200 and blue < 50
+
+
+def test_embedded_preview_with_another_aspect_ratio_is_ignored(tmp_path):
+    source = tmp_path / "camera.jpg"
+    embedded = io.BytesIO()
+    # 4:3 letterboxed thumbnail of a 3:2 frame.
+    Image.new("RGB", (320, 240), "black").save(embedded, "JPEG")
+    exif = piexif.dump(
+        {
+            "1st": {piexif.ImageIFD.JPEGInterchangeFormat: 0},
+            "thumbnail": embedded.getvalue(),
+        }
+    )
+    Image.new("RGB", (3000, 2000), "red").save(source, exif=exif)
+
+    assert StandardImageProcessor.extract_embedded_thumbnail(str(source)) is None
+
+
+def test_embedded_request_promotes_a_thumbnail_cached_on_disk(tmp_path):
+    source = tmp_path / "camera.jpg"
+    _save_with_exif_thumbnail(source)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+    assert pipeline.ensure_thumbnail_cached(str(source), promote_to_memory=False)
+    assert pipeline.get_cached_thumbnail_qpixmap(str(source), memory_only=True) is None
+
+    assert pipeline.ensure_thumbnail_cached(str(source), allow_embedded=True)
+
+    assert not pipeline.is_provisional_thumbnail(str(source))
+    assert (
+        pipeline.get_cached_thumbnail_qpixmap(str(source), memory_only=True) is not None
+    )
+
+
+def test_heif_thumbnail_item_replaces_gated_hevc_decode(tmp_path):
+    register_heif_opener()
+    source = tmp_path / "phone.heic"
+    Image.new("RGB", (1200, 900), "blue").save(source, quality=30, thumbnails=[320])
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+    pipeline._high_memory_decode_gate = Mock(wraps=pipeline._high_memory_decode_gate)
+    before = embedded_thumbnail_stats()
+
+    with patch.object(
+        StandardImageProcessor,
+        "process_for_thumbnail",
+        side_effect=AssertionError("HEVC image must not be decoded"),
+    ):
+        assert pipeline.ensure_thumbnail_cached(str(source))
+
+    thumbnail = pipeline._memory_get(pipeline.thumbnail_cache_key(str(source), True))
+    assert thumbnail.size == (256, 192)
+    pipeline._high_memory_decode_gate.acquire.assert_not_called()
+    assert embedded_thumbnail_stats()["heif"] == before["heif"] + 1
+    # A preview-sized request is larger than the item, so it decodes the image.
+    assert (
+        StandardImageProcessor.extract_heif_thumbnail(str(source), (1024, 1024)) is None
+    )
@@ -0,0 +1,71 @@
+from PIL import Image
+
+from core.caching.encoded_memory_cache import EncodedMemoryCache
+from core.caching.preview_cache import PreviewCache
+from core.caching.thumbnail_cache import ThumbnailCache
+
+
+def _preview_key(path: str) -> tuple:
+    return (path, "preview", 2, 100, 1, (640, 480), False)
+
+
+def test_lru_evicts_least_recent_payloads_over_budget():
+    tier = EncodedMemoryCache(limit_bytes=250)
+    tier.put(("a", "preview"), b"a" * 100)
+    tier.put(("b", "preview"), b"b" * 100)
+    assert tier.get(("a", "preview")) == b"a" * 100
+
+    tier.put(("c", "preview"), b"c" * 100)
+    tier.put(("huge", "preview"), b"h" * 300)
+
+    assert ("b", "preview") not in tier
+    assert ("huge", "preview") not in tier
+    assert tier.get_many([("a", "preview"), ("b", "preview")]) == {
+        ("a", "preview"): b"a" * 100
+    }
+    assert tier.stats() == {
+        "entries": 2,
+        "bytes": 200,
+        "limit_bytes": 250,
+        "hits": 2,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_preview_cache_reads_through_memory_tier(tmp_path):
+    tier = EncodedMemoryCache()
+    cache = PreviewCache(cache_dir=str(tmp_path / "preview"), memory_tier=tier)
+    key = _preview_key("/photos/a.jpg")
+    cache.set(key, Image.new("RGB", (64, 48), "teal"))
+    cache._cache.pop(key)
+
+    image = cache.get(key)
+    assert image is not None and image.size == (64, 48)
+    assert key in cache.get_many([key])
+
+    cache.delete_all_for_paths(["/photos/a.jpg"])
+    assert key not in tier
+    cache.close()
+
+
+def test_disk_reads_fill_the_tier_and_clear_drops_only_its_tier(tmp_path):
+    tier = EncodedMemoryCache()
+    thumbnails = ThumbnailCache(cache_dir=str(tmp_path / "thumb"))
+    previews = PreviewCache(cache_dir=str(tmp_path / "preview"), memory_tier=tier)
+    thumbnail_key = ("/photos/a.jpg", "thumbnail", 2, 100, 1, True)
+    preview_key = _preview_key("/photos/a.jpg")
+    thumbnails.set(thumbnail_key, Image.new("RGB", (16, 16)))
+    previews.set(preview_key, Image.new("RGB", (64, 48)))
+    thumbnails.close()
+    tier.clear()
+
+    thumbnails = ThumbnailCache(cache_dir=str(tmp_path / "thumb"), memory_tier=tier)
+    assert thumbnails.get_many([thumbnail_key])
+    assert previews.get(preview_key) is not None
+    assert thumbnail_key in tier and preview_key in tier
+
+    previews.clear()
+    assert thumbnail_key in tier and preview_key not in tier
+    thumbnails.close()
+    previews.close()
@@ -0,0 +1,77 @@
+import os
+from unittest.mock import Mock, patch
+
+from PIL import Image
+
+from core.caching.fingerprint_registry import fingerprint_registry
+from core.file_scanner import FileScanner
+from core.image_file_ops import ImageFileOperations
+from core.image_pipeline import ImagePipeline
+from core.similarity_cache import fingerprint_path
+
+
+def test_scanned_files_resolve_cache_keys_without_stat(tmp_path):
+    source = tmp_path / "photo.jpg"
+    Image.new("RGB", (32, 24), "teal").save(source)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+    FileScanner(image_pipeline=Mock()).scan_directory(str(tmp_path))
+    expected = os.stat(source)
+
+    with patch("core.caching.fingerprint_registry.os.stat", side_effect=AssertionError):
+        thumbnail_key = pipeline.thumbnail_cache_key(str(source))
+        analysis_key = pipeline.analysis_cache_key(str(source), (64, 64))
+        fingerprint = fingerprint_path(str(source))
+
+    assert thumbnail_key[3:5] == (expected.st_size, expected.st_mtime_ns)
+    assert analysis_key[3:5] == thumbnail_key[3:5]
+    assert fingerprint == (expected.st_size, expected.st_mtime_ns)
+
+
+def test_cached_image_getters_skip_the_existence_stat_for_scanned_files(tmp_path):
+    source = tmp_path / "photo.jpg"
+    Image.new("RGB", (32, 24), "teal").save(source)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+    FileScanner(image_pipeline=Mock()).scan_directory(str(tmp_path))
+
+    with patch("core.caching.fingerprint_registry.os.stat", side_effect=AssertionError):
+        assert (
+            pipeline.get_cached_thumbnail_qpixmap(str(source), memory_only=True) is None
+        )
+        assert (
+            pipeline.get_cached_preview_qpixmap(str(source), (64, 64), memory_only=True)
+            is None
+        )
+        assert (
+            pipeline.get_cached_analysis_qpixmap(str(source), memory_only=True) is None
+        )
+
+    # Files the scanner never saw are still checked on disk.
+    missing = str(tmp_path / "elsewhere" / "gone.jpg")
+    assert pipeline.get_cached_thumbnail_qpixmap(missing, memory_only=True) is None
+
+
+def test_file_operations_and_invalidation_drop_recorded_fingerprints(tmp_path):
+    source = tmp_path / "before.jpg"
+    renamed = tmp_path / "after.jpg"
+    source.write_bytes(b"original")
+    fingerprint_registry.record(str(source), 1, 1)
+    fingerprint_registry.record(str(renamed), 2, 2)
+
+    assert ImageFileOperations.rename_image(str(source), str(renamed))[0]
+    assert fingerprint_path(str(source)) is None
+    assert fingerprint_path(str(renamed)) == (8, os.stat(renamed).st_mtime_ns)
+
+    fingerprint_registry.record(str(renamed), 3, 3)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+    pipeline.invalidate_path(str(renamed))
+
+    assert fingerprint_path(str(renamed)) == (8, os.stat(renamed).st_mtime_ns)
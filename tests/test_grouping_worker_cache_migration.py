@@ -32,6 +32,7 @@ def test_grouping_worker_migrates_disk_cache_paths_before_completion(monkeypatch
     rating_cache = object()
     exif_cache = object()
     analysis_cache = Mock()
+    image_pipeline = Mock()
     worker = GroupingWorkflowWorker(
         items=[],
         mode="current",
@@ -41,6 +42,7 @@ def test_grouping_worker_migrates_disk_cache_paths_before_completion(monkeypatch
         rating_cache=rating_cache,
         exif_cache=exif_cache,
         analysis_cache=analysis_cache,
+        image_pipeline=image_pipeline,
     )
     completed = Mock()
     worker.completed.connect(completed)
@@ -51,6 +53,7 @@ def test_grouping_worker_migrates_disk_cache_paths_before_completion(monkeypatch
         {"/source/a.jpg": "/output/a.jpg"},
         rating_cache=rating_cache,
         exif_cache=exif_cache,
+        image_pipeline=image_pipeline,
     )
     completed.assert_called_once_with(summary)
     analysis_cache.migrate_folder_paths.assert_called_once_with(
@@ -9,7 +9,12 @@ from PyQt6.QtWidgets import QApplication
 
 from core.caching.preview_cache import PreviewCache
 from core.caching.thumbnail_cache import ThumbnailCache
-from core.image_pipeline import CACHE_SCHEMA_VERSION, ImagePipeline
+from core.image_pipeline import (
+    ANALYSIS_CACHE_RESOLUTION,
+    CACHE_SCHEMA_VERSION,
+    PRELOAD_MAX_RESOLUTION,
+    ImagePipeline,
+)
 from core.image_processing.standard_image_processor import StandardImageProcessor
 from core.grouping import _run_ml_similarity_pipeline
 
@@ -162,6 +167,27 @@ def test_memory_cache_avoids_repeated_disk_decoding(tmp_path):
     cache.get.assert_called_once_with(key)
 
 
+def test_memory_hits_share_pixels_copy_on_write(tmp_path):
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+    key = ("/tmp/photo.jpg", "preview", CACHE_SCHEMA_VERSION)
+    pipeline._memory_set(key, Image.new("RGBA", (64, 48), "teal"))
+
+    first = pipeline._memory_get(key)
+    second = pipeline._memory_get(key)
+    first.paste((255, 0, 0, 255), (0, 0, 8, 8))
+    first.info["region"] = "crop"
+    second.thumbnail((16, 16))
+    third = pipeline._memory_get(key)
+
+    assert pipeline._memory_get(key).im is third.im
+    assert third.size == (64, 48)
+    assert third.getpixel((0, 0)) == (0, 128, 128, 255)
+    assert "region" not in third.info
+
+
 def test_concurrent_thumbnail_requests_generate_once(tmp_path):
     source = tmp_path / "source.jpg"
     source.write_bytes(b"placeholder")
@@ -189,6 +215,43 @@ def test_concurrent_thumbnail_requests_generate_once(tmp_path):
     processor.assert_called_once()
 
 
+def test_cached_thumbnails_load_from_disk_in_one_batched_read(tmp_path):
+    sources = []
+    for name in ("memory.jpg", "disk.jpg", "missing.jpg"):
+        source = tmp_path / name
+        source.write_bytes(b"placeholder")
+        sources.append(str(source))
+    memory, disk, missing = sources
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+    pipeline._memory_set(
+        pipeline.thumbnail_cache_key(memory, True), Image.new("RGB", (8, 8))
+    )
+    pipeline.thumbnail_cache.set(
+        pipeline.thumbnail_cache_key(disk, True), Image.new("RGB", (8, 8))
+    )
+
+    with patch.object(
+        pipeline.thumbnail_cache,
+        "get_many",
+        wraps=pipeline.thumbnail_cache.get_many,
+    ) as get_many:
+        assert pipeline.load_cached_thumbnails(sources, promote_to_memory=False) == [
+            memory,
+            disk,
+        ]
+        get_many.assert_not_called()
+        assert pipeline._memory_get(pipeline.thumbnail_cache_key(disk, True)) is None
+
+        assert pipeline.load_cached_thumbnails(sources) == [memory, disk]
+
+    get_many.assert_called_once()
+    assert pipeline._memory_get(pipeline.thumbnail_cache_key(disk, True)) is not None
+    assert pipeline._memory_get(pipeline.thumbnail_cache_key(missing, True)) is None
+
+
 def test_high_memory_thumbnail_formats_obey_dynamic_decode_limit(tmp_path):
     sources = []
     for index in range(4):
@@ -223,6 +286,83 @@ def test_high_memory_thumbnail_formats_obey_dynamic_decode_limit(tmp_path):
     assert max_active == 2
 
 
+def test_cold_file_fans_out_all_tiers_from_one_decode(tmp_path):
+    source = tmp_path / "cold.jpg"
+    Image.new("RGB", (3000, 2000), "teal").save(source)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+    )
+
+    with (
+        patch(
+            "core.image_pipeline.StandardImageProcessor.process_for_tiers",
+            wraps=StandardImageProcessor.process_for_tiers,
+        ) as fan_out,
+        patch(
+            "core.image_pipeline.StandardImageProcessor.process_for_preview"
+        ) as preview_decode,
+        patch(
+            "core.image_pipeline.StandardImageProcessor.process_for_thumbnail"
+        ) as thumbnail_decode,
+    ):
+        assert pipeline.ensure_tiers_cached(str(source))
+        assert pipeline.ensure_tiers_cached(str(source))
+        analysis = pipeline.get_analysis_image(str(source), (512, 512))
+        thumbnail = pipeline._get_pil_thumbnail(str(source))
+
+    fan_out.assert_called_once()
+    preview_decode.assert_not_called()
+    thumbnail_decode.assert_not_called()
+    preview_key = pipeline.preview_cache_key(str(source), PRELOAD_MAX_RESOLUTION)
+    analysis_key = pipeline.analysis_cache_key(str(source), ANALYSIS_CACHE_RESOLUTION)
+    assert pipeline.preview_cache.get(preview_key).size == (1800, 1200)
+    assert pipeline.analysis_cache.get(analysis_key).size == (1024, 683)
+    assert analysis is not None and analysis.size == (512, 342)
+    assert thumbnail is not None and thumbnail.size == (256, 171)
+    assert pipeline.fanout_stats() == {
+        "calls": 2,
+        "tier_hits": 3,
+        "tier_misses": 3,
+        "decodes": 1,
+        "decodes_saved": 2,
+    }
+
+
+def test_content_addressed_keys_survive_moves_without_redecoding(tmp_path):
+    source = tmp_path / "before" / "IMG_0001.jpg"
+    source.parent.mkdir()
+    Image.new("RGB", (1200, 800), "olive").save(source)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+        content_addressed_keys=True,
+    )
+    assert pipeline.ensure_thumbnail_cached(str(source))
+    first_key = pipeline.thumbnail_cache_key(str(source), True)
+
+    moved = tmp_path / "group_1" / "IMG_0001.jpg"
+    moved.parent.mkdir()
+    os.replace(source, moved)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+        content_addressed_keys=True,
+    )
+    with patch(
+        "core.image_pipeline.StandardImageProcessor.process_for_thumbnail"
+    ) as thumbnail_decode:
+        thumbnail = pipeline._get_pil_thumbnail(str(moved))
+
+    thumbnail_decode.assert_not_called()
+    assert thumbnail is not None and thumbnail.size == (256, 171)
+    assert pipeline.thumbnail_cache_key(str(moved), True) == first_key
+    assert first_key[0].startswith("content:")
+
+    pipeline.invalidate_path(str(moved))
+    assert first_key not in pipeline.thumbnail_cache
+
+
 def test_similarity_grouping_reuses_the_shared_pipeline():
     shared_pipeline = Mock()
     engine = Mock()
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.caching import image_codec
+from core.caching.image_codec import (
+    CACHE_CODEC_PROFILES,
+    decode_cached_image,
+    encode_cached_image,
+)
+
+
+def _photo() -> Image.Image:
+    y_axis, x_axis = np.mgrid[0:120, 0:160]
+    pixels = np.stack([x_axis * 1.5, y_axis * 2, np.full_like(x_axis, 90)], axis=-1)
+    return Image.fromarray(pixels.astype(np.uint8), "RGB")
+
+
+@pytest.mark.parametrize("profile", CACHE_CODEC_PROFILES)
+def test_every_profile_round_trips_with_a_versioned_marker(profile):
+    image = _photo()
+
+    payload = encode_cached_image(image, quality=85, profile=profile)
+    decoded = decode_cached_image(payload)
+
+    assert payload[:4] in {b"PSJ1", b"PSW1", b"PSZ1", b"PSD1"}
+    assert decoded.size == image.size and decoded.mode == "RGB"
+    difference = np.abs(
+        np.asarray(decoded, dtype=np.int16) - np.asarray(image, dtype=np.int16)
+    )
+    if profile == "raw_zstd":
+        assert difference.max() == 0
+    else:
+        assert difference.mean() < 3
+
+
+def test_raw_profile_keeps_transparency_and_decodes_without_zstd(monkeypatch):
+    image = Image.new("RGBA", (32, 16), (200, 10, 10, 255))
+    image.putpixel((0, 0), (0, 0, 0, 0))
+    zstd_payload = encode_cached_image(image, quality=85, profile="raw_zstd")
+
+    monkeypatch.setattr(image_codec, "zstd", None)
+    zlib_payload = encode_cached_image(image, quality=85, profile="raw_zstd")
+
+    assert zlib_payload[:4] == b"PSD1"
+    assert decode_cached_image(zlib_payload).tobytes() == image.tobytes()
+    if zstd_payload[:4] == b"PSZ1":
+        # Entries written with zstd become misses, not errors, without it.
+        assert decode_cached_image(zstd_payload) is None
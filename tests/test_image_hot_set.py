@@ -0,0 +1,59 @@
+from PIL import Image
+
+from core.caching.hot_set import HotSet, load_hot_set, save_hot_set
+from core.image_pipeline import preview_level_for
+
+
+def test_hot_set_round_trip_puts_focused_image_first(tmp_path):
+    path = str(tmp_path / "hot_set" / "hot_set.pickle")
+    first = ("/photos/a.jpg", "preview", 2, 1, 1, (1920, 1200))
+    second = ("/photos/b.jpg", "preview", 2, 1, 1, (1920, 1200))
+    focused = ("/photos/b.jpg", "thumbnail", 2, 1, 1, True)
+    hot_set = HotSet(
+        entries=[(first, 10), (second, 20), (focused, 5)],
+        folder="/photos",
+        focused_path="/photos/b.jpg",
+    )
+
+    assert save_hot_set(path, hot_set)
+    loaded = load_hot_set(path)
+
+    assert loaded.folder == "/photos"
+    assert loaded.entries == hot_set.entries
+    assert loaded.restore_batches(1) == [[second, focused], [first]]
+    assert load_hot_set(str(tmp_path / "missing.pickle")) is None
+
+
+def test_restored_previews_are_memory_hits_after_restart(tmp_path, make_pipeline):
+    sources = []
+    for index in range(3):
+        source = tmp_path / f"IMG_{index}.jpg"
+        Image.new("RGB", (800, 600), (index * 60, 90, 120)).save(source)
+        sources.append(str(source))
+    pipeline = make_pipeline()
+    for source in sources:
+        assert pipeline.get_preview_image(source, (400, 400)) is not None
+    assert pipeline.save_hot_set(folder=str(tmp_path), focused_path=sources[0]) == 3
+
+    reopened = make_pipeline()
+    assert reopened.restore_hot_set() == 3
+
+    for source in sources:
+        key = reopened.preview_cache_key(source, preview_level_for((400, 400)))
+        assert key in reopened._memory_cache
+
+
+def test_restore_never_evicts_session_images(tmp_path, make_pipeline):
+    source = tmp_path / "IMG_0.jpg"
+    Image.new("RGB", (800, 600), "teal").save(source)
+    pipeline = make_pipeline()
+    assert pipeline.get_preview_image(str(source), (400, 400)) is not None
+    pipeline.save_hot_set()
+
+    reopened = make_pipeline()
+    session_key = ("/session.jpg", "preview", 2, 1, 1, (400, 400))
+    reopened._memory_cache_limit_bytes = 400 * 300 * 3 + 10
+    reopened._memory_set(session_key, Image.new("RGB", (400, 300)))
+
+    assert reopened.restore_hot_set() == 0
+    assert list(reopened._memory_cache) == [session_key]
@@ -69,6 +69,8 @@ def test_close_without_grouping_edits_skips_expensive_action_preview():
         app_state=SimpleNamespace(get_marked_files=lambda: []),
         preview_load_controller=preview_controller,
         _close_after_grouping_save=False,
+        _save_image_hot_set=Mock(),
+        _shutdown_decode_backend=Mock(),
     )
     event = _DummyEvent()
 
@@ -77,6 +79,7 @@ def test_close_without_grouping_edits_skips_expensive_action_preview():
     pending_actions.assert_not_called()
     preview_controller.shutdown.assert_called_once()
     worker_manager.request_stop_all_workers.assert_called_once()
+    window._shutdown_decode_backend.assert_called_once_with()
     assert event.accepted
 
 
@@ -102,6 +105,7 @@ def test_close_requests_worker_stop_without_waiting(monkeypatch):
         _close_after_grouping_save=False,
         _shutdown_in_progress=False,
         _finish_close_after_workers=Mock(),
+        _save_image_hot_set=Mock(),
     )
     event = _DummyEvent()
     monkeypatch.setattr(
@@ -112,6 +116,7 @@ def test_close_requests_worker_stop_without_waiting(monkeypatch):
     MainWindow.closeEvent(window, event)
 
     worker_manager.request_stop_all_workers.assert_called_once_with()
+    window._save_image_hot_set.assert_called_once_with()
     assert event.ignored
     assert not event.accepted
     assert window._shutdown_in_progress is True
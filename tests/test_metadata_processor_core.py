@@ -78,6 +78,7 @@ class TestMetadataProcessor:
         # Configure cache mocks to return None (cache miss) by default
         self.rating_cache.get.return_value = None
         self.exif_cache.get.return_value = None
+        self.exif_cache.get_many.return_value = {}
 
     def test_batch_display_metadata_basic(self):
         """Test basic batch metadata extraction."""
@@ -220,17 +221,25 @@ class TestMetadataProcessor:
             exif_disk_cache=self.exif_cache,
         )
 
-        # Verify cache.set was called for each image
-        assert self.exif_cache.set.call_count == len(self.sample_images)
+        # Verify one batched write covered every image
+        self.exif_cache.set_many.assert_called_once()
+        (written,) = self.exif_cache.set_many.call_args.args
+        assert len(written) == len(self.sample_images)
 
         # Configure cache to return data (simulate cache hit)
-        def cache_side_effect(path):
-            norm_path = os.path.normpath(path)
-            if norm_path in results1:
-                return {"file_path": norm_path, "cached": True}
-            return None
+        requested_keys = []
 
-        self.exif_cache.get.side_effect = cache_side_effect
+        def cache_side_effect(paths):
+            found = {}
+            for path in paths:
+                requested_keys.append(path)
+                norm_path = os.path.normpath(path)
+                if norm_path in results1:
+                    found[path] = {"file_path": norm_path, "cached": True}
+            return found
+
+        self.exif_cache.get_many.side_effect = cache_side_effect
+        self.exif_cache.set_many.reset_mock()
 
         # Second call - should use cache
         MetadataProcessor.get_batch_display_metadata(
@@ -239,8 +248,10 @@ class TestMetadataProcessor:
             exif_disk_cache=self.exif_cache,
         )
 
-        # Verify cache.get was called
-        assert self.exif_cache.get.call_count >= len(self.sample_images)
+        # Verify one batched read covered every image and nothing was rewritten
+        assert self.exif_cache.get_many.call_count == 2
+        assert len(requested_keys) >= len(self.sample_images)
+        self.exif_cache.set_many.assert_not_called()
 
     def test_parallel_processing(self):
         """Test that parallel processing works with multiple images."""
@@ -10,7 +10,7 @@ def test_batch_display_metadata_skips_pyexiv2_for_video(tmp_path):
     video_path.write_bytes(b"video")
 
     exif_cache = Mock()
-    exif_cache.get.return_value = None
+    exif_cache.get_many.return_value = {}
 
     with patch(
         "src.core.metadata_processor.PyExiv2Operations.get_comprehensive_metadata"
@@ -27,8 +27,9 @@ def test_batch_display_metadata_skips_pyexiv2_for_video(tmp_path):
     assert results[key]["date"] is not None
     mock_pyexiv2.assert_not_called()
 
-    exif_cache.set.assert_called_once()
-    cache_key, payload = exif_cache.set.call_args.args
-    assert cache_key == key
+    exif_cache.set_many.assert_called_once()
+    (written,) = exif_cache.set_many.call_args.args
+    assert list(written) == [key]
+    payload = written[key]
     assert payload.get("media_type") == "video"
     assert payload.get("file_path") == key
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+from PIL import Image
+
+from core.caching.image_codec import decode_cached_image
+from core.image_pipeline import (
+    PREVIEW_LEVELS,
+    PRELOAD_MAX_RESOLUTION,
+    ImagePipeline,
+    StandardImageProcessor,
+    preview_level_for,
+)
+
+
+def _stored_resolutions(pipeline: ImagePipeline) -> set[tuple[int, int]]:
+    return {key[5] for key in pipeline.preview_cache._cache}
+
+
+def test_display_sizes_map_to_the_smallest_covering_level():
+    assert PREVIEW_LEVELS == ((1920, 1200), (960, 600), (480, 300))
+    assert preview_level_for(None) == PRELOAD_MAX_RESOLUTION
+    assert preview_level_for((400, 300)) == (480, 300)
+    assert preview_level_for((400, 400)) == (960, 600)
+    assert preview_level_for((1920, 1200)) == (1920, 1200)
+    assert preview_level_for((2560, 2560)) == (1920, 1200)
+
+
+def test_window_resizes_reuse_the_chain_instead_of_new_entries(tmp_path, make_pipeline):
+    source = tmp_path / "IMG_0001.jpg"
+    Image.effect_noise((3000, 2000), 60).convert("RGB").save(source, quality=90)
+    pipeline = make_pipeline()
+    decode = StandardImageProcessor.process_for_preview
+
+    with patch.object(
+        StandardImageProcessor, "process_for_preview", side_effect=decode
+    ) as process_preview:
+        for display_size in ((2560, 2560), (1700, 1000), (900, 560), (420, 280)):
+            image = pipeline.get_preview_image(str(source), display_size)
+            assert image.width <= display_size[0]
+            assert image.height <= display_size[1]
+
+    process_preview.assert_called_once()
+    assert _stored_resolutions(pipeline) == set(PREVIEW_LEVELS)
+    level_key = pipeline.preview_cache_key(str(source), (480, 300))
+    assert decode_cached_image(pipeline.preview_cache._cache[level_key]).size == (
+        450,
+        300,
+    )
+    stats = pipeline.preview_chain_stats()
+    assert stats["levels_derived"] == 2
+    assert stats["display_entries_avoided"] == 4
+    assert stats["display_bytes_avoided"] > 0
+
+    # Repeating a size neither writes nor counts it again.
+    pipeline.get_preview_image(str(source), (900, 560))
+    assert pipeline.preview_chain_stats()["display_entries_avoided"] == 4
+    assert len(_stored_resolutions(pipeline)) == len(PREVIEW_LEVELS)
+
+
+def test_smaller_levels_derive_from_a_prefetched_preview(tmp_path, make_pipeline):
+    source = tmp_path / "IMG_0002.jpg"
+    Image.new("RGB", (1200, 1800), "teal").save(source)
+    pipeline = make_pipeline()
+    assert pipeline.ensure_preview_cached(str(source))
+
+    with patch.object(
+        pipeline,
+        "_generate_pil_preview_for_display",
+        side_effect=AssertionError("a cached level must be reduced, not decoded"),
+    ):
+        image = pipeline.get_preview_image(str(source), (480, 300))
+
+    assert image.size == (200, 300)
+    assert pipeline.preview_cache_key(str(source), (480, 300)) in pipeline.preview_cache
+    assert (
+        pipeline.preview_cache_key(str(source), (960, 600))
+        not in pipeline.preview_cache
+    )
@@ -0,0 +1,128 @@
+import pickle
+from multiprocessing import shared_memory
+
+import pytest
+from PIL import Image
+
+from core.image_pipeline import ImagePipeline, THUMBNAIL_MAX_SIZE
+from core.image_processing import process_decode_backend
+from core.image_processing.process_decode_backend import ProcessDecodeBackend
+from core.image_processing.standard_image_processor import StandardImageProcessor
+
+
+def test_process_backend_returns_rebuilt_tier_images(tmp_path):
+    source = tmp_path / "photo.jpg"
+    Image.new("RGB", (1200, 800), "teal").save(source)
+    backend = ProcessDecodeBackend(max_workers=1, high_memory_workers=1)
+
+    try:
+        tiers = backend.run(
+            StandardImageProcessor.process_for_tiers,
+            str(source),
+            {"preview": (600, 600), "thumbnail": (100, 100)},
+        )
+        missing = backend.run(
+            StandardImageProcessor.process_for_preview, str(tmp_path / "gone.jpg")
+        )
+    finally:
+        backend.shutdown()
+
+    assert tiers["preview"].size == (600, 400)
+    assert tiers["thumbnail"].size == (100, 67)
+    assert tiers["thumbnail"].mode == "RGBA"
+    assert missing is None
+
+
+def test_process_backend_keeps_image_info(tmp_path):
+    source = tmp_path / "photo.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new("RGB", (640, 480), "navy").save(
+        source, exif=exif, icc_profile=b"fake-icc-profile"
+    )
+    backend = ProcessDecodeBackend(max_workers=1, high_memory_workers=1)
+
+    try:
+        preview = backend.run(StandardImageProcessor.process_for_preview, str(source))
+    finally:
+        backend.shutdown()
+
+    in_process = StandardImageProcessor.process_for_preview(str(source))
+    assert preview.info["icc_profile"] == b"fake-icc-profile"
+    assert preview.info == in_process.info
+    assert preview.tobytes() == in_process.tobytes()
+
+
+def test_pipeline_process_backend_writes_through_shared_caches(tmp_path):
+    source = tmp_path / "photo.png"
+    Image.new("RGB", (900, 600), "orange").save(source)
+    pipeline = ImagePipeline(
+        thumbnail_cache_dir=str(tmp_path / "thumb"),
+        preview_cache_dir=str(tmp_path / "preview"),
+        decode_backend="process",
+    )
+
+    try:
+        thumbnail = pipeline._get_pil_thumbnail(str(source))
+    finally:
+        pipeline.shutdown_decode_backend()
+
+    key = pipeline.thumbnail_cache_key(str(source))
+    assert thumbnail is not None and thumbnail.size == (256, 171)
+    assert max(pipeline.thumbnail_cache.get(key).size) == THUMBNAIL_MAX_SIZE[0]
+
+
+def _record_blocks(monkeypatch) -> list[str]:
+    created: list[str] = []
+
+    class RecordingSharedMemory(shared_memory.SharedMemory):
+        def __init__(self, name=None, create=False, size=0, **kwargs):
+            super().__init__(name=name, create=create, size=size, **kwargs)
+            if create:
+                created.append(self.name)
+
+    monkeypatch.setattr(
+        process_decode_backend.shared_memory, "SharedMemory", RecordingSharedMemory
+    )
+    return created
+
+
+def _assert_released(names: list[str]) -> None:
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name, track=False)
+
+
+def test_failed_results_do_not_leave_shared_memory_behind(monkeypatch):
+    created = _record_blocks(monkeypatch)
+    unpicklable = Image.new("RGB", (32, 32))
+    unpicklable.info["callback"] = lambda: None
+
+    def tiers():
+        return {"preview": Image.new("RGB", (64, 64)), "thumbnail": unpicklable}
+
+    with pytest.raises((pickle.PicklingError, AttributeError)):
+        process_decode_backend._run_in_worker(tiers, (), {})
+    assert len(created) == 2
+    _assert_released(created)
+
+    created.clear()
+    payload = pickle.loads(
+        process_decode_backend._run_in_worker(
+            lambda: {
+                "preview": Image.new("L", (64, 64)),
+                "thumbnail": Image.new("L", (8, 8)),
+            },
+            (),
+            {},
+        )
+    )
+
+    def out_of_memory(*args):
+        raise MemoryError
+
+    monkeypatch.setattr(Image, "frombytes", out_of_memory)
+    with pytest.raises(MemoryError):
+        process_decode_backend._restore(payload)
+    assert len(created) == 2
+    _assert_released(created)
@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from core.image_processing.downscale import decode_downscaled
+from core.image_processing.standard_image_processor import StandardImageProcessor
+
+
+def _save_with_orientation(path, image: Image.Image, orientation: int) -> None:
+    exif = Image.Exif()
+    exif[274] = orientation
+    image.save(path, exif=exif.tobytes())
+
+
+def test_large_jpeg_is_decoded_with_dct_scaling(tmp_path):
+    source = tmp_path / "camera.jpg"
+    Image.new("RGB", (4096, 3072), "teal").save(source, quality=90)
+
+    with Image.open(source) as image:
+        result = decode_downscaled(image, (256, 256))
+        scale = image.decoderconfig[0]
+
+    assert scale == 8
+    assert result.size == (256, 192)
+
+
+@pytest.mark.parametrize("suffix", [".jpg", ".tif", ".png"])
+def test_thumbnail_applies_exif_orientation_after_reduction(tmp_path, suffix):
+    source = tmp_path / f"rotated{suffix}"
+    _save_with_orientation(source, Image.new("RGB", (1200, 600), "teal"), 6)
+
+    thumbnail = StandardImageProcessor.process_for_thumbnail(str(source), (256, 256))
+    unrotated = StandardImageProcessor.process_for_thumbnail(
+        str(source), (256, 256), apply_orientation=False
+    )
+
+    assert thumbnail is not None and thumbnail.mode == "RGBA"
+    assert thumbnail.size == (128, 256)
+    assert thumbnail.getexif().get(274) is None
+    if suffix != ".tif":  # Pillow's TIFF decoder always applies orientation.
+        assert unrotated is not None and unrotated.size == (256, 128)
+
+
+def test_lossless_formats_are_pre_shrunk_with_integer_reduction(tmp_path):
+    source = tmp_path / "scan.png"
+    Image.new("RGB", (2400, 1600), "teal").save(source)
+
+    with patch.object(
+        Image.Image, "reduce", autospec=True, side_effect=Image.Image.reduce
+    ) as reduce:
+        preview = StandardImageProcessor.process_for_preview(str(source), (300, 300))
+
+    assert preview is not None and preview.size == (300, 200)
+    assert reduce.call_args.args[1] == 4
+
+
+def test_palette_images_are_reduced_without_mode_errors(tmp_path):
+    source = tmp_path / "palette.png"
+    Image.new("RGB", (1600, 800), "red").convert("P").save(source)
+
+    thumbnail = StandardImageProcessor.process_for_thumbnail(str(source), (100, 100))
+
+    assert thumbnail is not None
+    assert thumbnail.size == (100, 50)
+    assert thumbnail.getpixel((50, 25))[:3] == (255, 0, 0)
@@ -10,6 +10,7 @@ from core.similarity_cache import (
     load_similarity_artifact_cache,
     save_similarity_artifact_cache,
 )
+from core.similarity_embedding_store import open_similarity_embedding_store
 from core.similarity_engine import SimilarityEngine
 
 
@@ -102,6 +103,9 @@ def test_warm_artifact_run_skips_model_decode_and_clustering(tmp_path):
     engine.cluster_embeddings.assert_not_called()
     assert emitted_embeddings == [{"photo.jpg": [1.0, 0.0]}]
     assert emitted_regions == [{"photo.jpg": [[1.0, 0.0]] * 6}]
+    # The legacy pickle was migrated into the columnar store.
+    assert not cache_path.exists()
+    assert len(open_similarity_embedding_store(tmp_path / "artifacts")) == 1
 
 
 def test_changed_fingerprint_reencodes_only_changed_artifact(tmp_path):
@@ -137,6 +141,9 @@ def test_changed_fingerprint_reencodes_only_changed_artifact(tmp_path):
     engine._load_model.assert_called_once_with()
     pipeline.get_analysis_image.assert_called_once()
     assert pipeline.get_analysis_image.call_args.args[0] == "changed.jpg"
-    saved = load_similarity_artifact_cache(cache_path)
-    assert tuple(saved["changed.jpg"]["fingerprint"]) == (30, 41)
+    saved = open_similarity_embedding_store(tmp_path / "artifacts").get_many(
+        {"unchanged.jpg": (10, 20), "changed.jpg": (30, 41)}
+    )
+    assert saved["changed.jpg"]["fingerprint"] == (30, 41)
     assert saved["changed.jpg"]["orientation"] == "portrait"
+    assert saved["unchanged.jpg"] == _artifact((10, 20))
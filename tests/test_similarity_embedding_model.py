@@ -7,8 +7,12 @@ import pytest
 from core.similarity_embedding_model import (
     SimilarityEmbeddingModel,
     SimilarityModelNotInstalledError,
+    _processor_view,
     build_similarity_image_regions,
     resolve_similarity_model_snapshot,
+    similarity_onnx_export_path,
+    similarity_region_boxes,
+    similarity_region_patch_weights,
 )
 
 
@@ -107,6 +111,17 @@ def test_embedding_cache_key_changes_with_model_name():
     assert "dinov2-regions-v1" in small.region_cache_key
 
 
+def test_onnx_backend_caches_embeddings_separately():
+    torch_model = SimilarityEmbeddingModel("facebook/dinov2-small", backend="torch")
+    onnx_model = SimilarityEmbeddingModel("facebook/dinov2-small", backend="onnx-int8")
+    unknown = SimilarityEmbeddingModel("facebook/dinov2-small", backend="tensorrt")
+
+    assert torch_model.cache_key == "dinov2-cls-v1_facebook_dinov2-small"
+    assert onnx_model.cache_key == "dinov2-cls-v1_facebook_dinov2-small_onnx-int8"
+    assert onnx_model.region_cache_key.endswith("_onnx-int8")
+    assert unknown.backend == "torch"
+
+
 def test_encode_returns_normalized_cls_embeddings():
     torch = pytest.importorskip("torch")
 
@@ -171,3 +186,256 @@ def test_encode_with_regions_returns_global_and_regional_embeddings():
     assert np.allclose(global_embeddings[0], regional_embeddings[0][0])
     assert np.allclose(global_embeddings[1], regional_embeddings[1][0])
     assert np.allclose(np.linalg.norm(global_embeddings, axis=1), [1.0, 1.0])
+
+
+class _FakeNumpyProcessor:
+    crop_size = {"height": 224, "width": 224}
+
+    def __call__(self, images, return_tensors):
+        assert return_tensors == "np"
+        return {"pixel_values": np.zeros((len(images), 3, 224, 224), np.float32)}
+
+
+class _FakeSession:
+    def __init__(self):
+        self.batches = []
+
+    def get_inputs(self):
+        return [types.SimpleNamespace(name="pixel_values")]
+
+    def run(self, _outputs, feeds):
+        count, _channels, height, width = feeds["pixel_values"].shape
+        self.batches.append(count)
+        # CLS token, then one token per 14-pixel patch holding its grid position.
+        rows, columns = np.mgrid[0 : height // 14, 0 : width // 14]
+        patches = np.stack(
+            [np.ones(rows.size), columns.ravel() / 15, rows.ravel() / 15], axis=1
+        )
+        tokens = np.zeros((count, 1 + rows.size, 3), dtype=np.float32)
+        tokens[:, 0, 0] = np.arange(1, count + 1)
+        tokens[:, 0, 1] = 1.0
+        tokens[:, 1:] = patches
+        return [tokens]
+
+
+def test_onnx_session_encodes_regions_without_torch():
+    Image = pytest.importorskip("PIL.Image")
+    model = SimilarityEmbeddingModel("facebook/dinov2-small", backend="onnx-int8")
+    model.processor = _FakeNumpyProcessor()
+    model.session = _FakeSession()
+
+    global_embeddings, regional_embeddings = model.encode_with_regions(
+        [Image.new("RGB", (100, 80)) for _ in range(6)]
+    )
+
+    assert model.session.batches == [32, 4]
+    assert global_embeddings.shape == (6, 3)
+    assert [regions.shape for regions in regional_embeddings] == [(6, 3)] * 6
+    assert np.allclose(np.linalg.norm(global_embeddings, axis=1), 1.0)
+
+
+def test_patch_token_regions_are_cached_separately():
+    crops = SimilarityEmbeddingModel("facebook/dinov2-small", region_mode="crops")
+    patches = SimilarityEmbeddingModel(
+        "facebook/dinov2-small", region_mode="patch-tokens"
+    )
+
+    assert patches.cache_key == crops.cache_key
+    assert patches.region_cache_key.startswith("dinov2-patch-regions-v1_")
+    assert patches.region_cache_key != crops.region_cache_key
+
+
+def test_region_patch_weights_follow_the_crop_boxes():
+    # A 2:1 image resized to 448x224 and centre-cropped to 224x224.
+    processor = types.SimpleNamespace(
+        size={"shortest_edge": 224},
+        do_center_crop=True,
+        crop_size={"height": 224, "width": 224},
+    )
+    view = _processor_view(processor, 896, 448)
+    boxes = [(0, 0, 896, 448), *similarity_region_boxes(896, 448), (0, 0, 50, 448)]
+    weights = similarity_region_patch_weights(boxes, view, (16, 16), 14)
+    grids = weights.reshape(len(boxes), 16, 16)
+
+    assert view == (0.5, 0.5, 112, 0)
+    assert np.allclose(weights.sum(axis=1), 1.0)
+    assert np.allclose(weights[0], 1 / 256)
+    full, center, left, right, top, bottom, outside = grids
+    assert not left[:, 12:].any() and not right[:, :4].any()
+    assert np.allclose(left, right[:, ::-1])
+    assert np.allclose(top, bottom[::-1, :])
+    assert not center[0].any() and center[1:-1, 0].all()
+    # The box lies in the part the centre crop cut away.
+    assert np.allclose(outside, full)
+
+
+def test_patch_token_mode_encodes_each_image_once():
+    Image = pytest.importorskip("PIL.Image")
+    model = SimilarityEmbeddingModel(
+        "facebook/dinov2-small", backend="onnx-int8", region_mode="patch-tokens"
+    )
+    model.processor = _FakeNumpyProcessor()
+    model.session = _FakeSession()
+
+    global_embeddings, regional_embeddings = model.encode_with_regions(
+        [Image.new("RGB", (100, 80)) for _ in range(6)] + [object()]
+    )
+
+    assert model.session.batches == [7]
+    assert [regions.shape for regions in regional_embeddings] == [(6, 3)] * 6 + [(1, 3)]
+    assert np.allclose(global_embeddings, [rows[0] for rows in regional_embeddings])
+    _full, _center, left, right, top, bottom = regional_embeddings[0]
+    # Token components encode patch column and row.
+    assert left[1] < right[1] and top[2] < bottom[2]
+    assert np.allclose(np.linalg.norm(regional_embeddings[0], axis=1), 1.0)
+
+
+def test_onnx_export_is_built_once_and_reused(monkeypatch, tmp_path):
+    snapshot_path = tmp_path / "snapshots" / "0123456789abcdef"
+    sessions = []
+    exports = []
+
+    def fake_export(snapshot, destination, image_size):
+        exports.append((snapshot, image_size))
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_bytes(b"onnx")
+
+    monkeypatch.setitem(
+        sys.modules,
+        "onnxruntime",
+        types.SimpleNamespace(
+            InferenceSession=lambda path, providers: (
+                sessions.append((path, providers)) or _FakeSession()
+            )
+        ),
+    )
+    monkeypatch.setitem(
+        sys.modules,
+        "transformers",
+        types.SimpleNamespace(
+            AutoImageProcessor=types.SimpleNamespace(
+                from_pretrained=lambda *_args, **_kwargs: _FakeNumpyProcessor()
+            )
+        ),
+    )
+    monkeypatch.setattr(
+        "core.similarity_embedding_model.resolve_similarity_model_snapshot",
+        lambda *_args, **_kwargs: str(snapshot_path),
+    )
+    monkeypatch.setattr(
+        "core.similarity_embedding_model.resolve_user_cache_dir",
+        lambda name: str(tmp_path / "cache" / name),
+    )
+    monkeypatch.setattr(
+        "core.similarity_embedding_model.export_similarity_onnx_model", fake_export
+    )
+
+    for _run in range(2):
+        model = SimilarityEmbeddingModel("facebook/dinov2-small", backend="onnx-int8")
+        model.load()
+        assert model.is_loaded and model.model is None
+
+    export_path = similarity_onnx_export_path(
+        "facebook/dinov2-small", str(snapshot_path)
+    )
+    assert export_path.name == "facebook_dinov2-small_0123456789ab_tokens-int8-v1.onnx"
+    assert exports == [(str(snapshot_path), (224, 224))]
+    assert sessions == [(str(export_path), ["CPUExecutionProvider"])] * 2
+
+
+def test_int8_onnx_embeddings_agree_with_torch(monkeypatch, tmp_path):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    pytest.importorskip("onnxruntime.quantization")
+    Image = pytest.importorskip("PIL.Image")
+
+    # A small randomly initialised DINOv2 stands in for the downloaded weights.
+    snapshot_path = tmp_path / "snapshot"
+    torch.manual_seed(0)
+    config = transformers.Dinov2Config(
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        intermediate_size=128,
+        image_size=224,
+        patch_size=14,
+    )
+    transformers.Dinov2Model(config).save_pretrained(snapshot_path)
+    transformers.BitImageProcessor(
+        size={"shortest_edge": 256},
+        crop_size={"height": 224, "width": 224},
+        do_center_crop=True,
+        image_mean=[0.485, 0.456, 0.406],
+        image_std=[0.229, 0.224, 0.225],
+    ).save_pretrained(snapshot_path)
+    monkeypatch.setattr(
+        "core.similarity_embedding_model.resolve_similarity_model_snapshot",
+        lambda *_args, **_kwargs: str(snapshot_path),
+    )
+    monkeypatch.setattr(
+        "core.similarity_embedding_model.resolve_user_cache_dir",
+        lambda name: str(tmp_path / "cache" / name),
+    )
+    monkeypatch.setenv("PHOTOSORT_TORCH_DEVICE", "cpu")
+    rng = np.random.default_rng(0)
+    images = [
+        Image.fromarray(rng.integers(0, 255, (180 + 20 * i, 240, 3), dtype=np.uint8))
+        for i in range(4)
+    ]
+
+    reference = SimilarityEmbeddingModel(backend="torch")
+    quantized = SimilarityEmbeddingModel(backend="onnx-int8")
+    torch_global, torch_regions = reference.encode_with_regions(images)
+    onnx_global, onnx_regions = quantized.encode_with_regions(images)
+
+    assert onnx_global.shape == torch_global.shape
+    cosine = np.sum(onnx_global * torch_global, axis=1)
+    assert cosine.min() > 0.98
+    for torch_rows, onnx_rows in zip(torch_regions, onnx_regions):
+        assert np.sum(torch_rows * onnx_rows, axis=1).min() > 0.98
+
+
+def test_patch_token_regions_share_the_crop_mode_global_embedding(
+    monkeypatch, tmp_path
+):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    Image = pytest.importorskip("PIL.Image")
+
+    snapshot_path = tmp_path / "snapshot"
+    torch.manual_seed(0)
+    config = transformers.Dinov2Config(
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        intermediate_size=128,
+        image_size=224,
+        patch_size=14,
+    )
+    transformers.Dinov2Model(config).save_pretrained(snapshot_path)
+    transformers.BitImageProcessor(
+        size={"shortest_edge": 256},
+        crop_size={"height": 224, "width": 224},
+        do_center_crop=True,
+    ).save_pretrained(snapshot_path)
+    monkeypatch.setattr(
+        "core.similarity_embedding_model.resolve_similarity_model_snapshot",
+        lambda *_args, **_kwargs: str(snapshot_path),
+    )
+    monkeypatch.setenv("PHOTOSORT_TORCH_DEVICE", "cpu")
+    rng = np.random.default_rng(0)
+    images = [
+        Image.fromarray(rng.integers(0, 255, (180 + 40 * i, 240, 3), dtype=np.uint8))
+        for i in range(3)
+    ]
+
+    crops = SimilarityEmbeddingModel(backend="torch", region_mode="crops")
+    patches = SimilarityEmbeddingModel(backend="torch", region_mode="patch-tokens")
+    crop_global, crop_regions = crops.encode_with_regions(images)
+    patch_global, patch_regions = patches.encode_with_regions(images)
+
+    assert patches.patch_size == 14
+    assert np.allclose(patch_global, crop_global, atol=1e-5)
+    assert [rows.shape for rows in patch_regions] == [
+        rows.shape for rows in crop_regions
+    ]
@@ -0,0 +1,160 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core.similarity_cache import SimilarityArtifactCacheFormatError
+from core.similarity_embedding_store import SimilarityEmbeddingStore
+
+
+def _artifact(seed: int, fingerprint=(10, 20), regions: int = 6):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(regions, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return {
+        "fingerprint": fingerprint,
+        "embedding": vectors[0].tolist(),
+        "regional_embeddings": vectors.tolist(),
+        "orientation": "portrait" if seed % 2 else "landscape",
+    }
+
+
+def test_append_and_lookup_read_only_requested_rows(tmp_path):
+    store = SimilarityEmbeddingStore(tmp_path / "store")
+    artifacts = {f"photo-{i}.jpg": _artifact(i, (i, 1), 1 + i % 6) for i in range(40)}
+    store.put_many(artifacts)
+
+    found = store.get_many({"photo-3.jpg": (3, 1), "photo-7.jpg": (7, 2), "x": (1, 1)})
+
+    assert set(found) == {"photo-3.jpg"}
+    restored = found["photo-3.jpg"]
+    assert restored["fingerprint"] == (3, 1)
+    assert restored["orientation"] == "portrait"
+    assert restored["embedding"] == artifacts["photo-3.jpg"]["embedding"]
+    np.testing.assert_allclose(
+        restored["regional_embeddings"],
+        artifacts["photo-3.jpg"]["regional_embeddings"],
+        atol=1e-3,
+    )
+    assert len(restored["regional_embeddings"]) == 4
+    assert store.stats()["rows"] == 40
+    store.close()
+
+    reopened = SimilarityEmbeddingStore(tmp_path / "store")
+    assert len(reopened) == 40
+    assert set(reopened.get_many({"photo-39.jpg": (39, 1)})) == {"photo-39.jpg"}
+    reopened.close()
+
+
+def test_failed_index_commit_keeps_the_previous_state(tmp_path, monkeypatch):
+    store = SimilarityEmbeddingStore(tmp_path / "store")
+    store.put_many({"kept.jpg": _artifact(1)})
+
+    def fail_commit(**_values):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "_write_meta", fail_commit)
+    with pytest.raises(OSError):
+        store.put_many({"lost.jpg": _artifact(2), "kept.jpg": _artifact(3, (1, 1))})
+    monkeypatch.undo()
+    assert sorted(p.name for p in (tmp_path / "store").glob("*.npy*")) == [
+        "segment-00000000-global.npy",
+        "segment-00000000-regional.npy",
+    ]
+    store.close()
+
+    reopened = SimilarityEmbeddingStore(tmp_path / "store")
+    assert reopened.get_many({"lost.jpg": (10, 20), "kept.jpg": (1, 1)}) == {}
+    assert (
+        reopened.get_many({"kept.jpg": (10, 20)})["kept.jpg"]["embedding"]
+        == (_artifact(1)["embedding"])
+    )
+    reopened.put_many({"next.jpg": _artifact(4)})
+    assert reopened.stats()["segments"] == 2
+    reopened.close()
+
+
+def test_small_segments_are_merged_in_the_background(tmp_path):
+    store = SimilarityEmbeddingStore(tmp_path / "store")
+    store.put_many({f"photo-{i}.jpg": _artifact(i) for i in range(3)})
+    for version in range(1, 9):
+        store.put_many({"photo-0.jpg": _artifact(version, (10, 20 + version))})
+    store.wait_for_compaction()
+
+    # The base segment keeps its one dead row; the eight saves became one row.
+    assert store.stats() | {"bytes": 0} == {
+        "artifacts": 3,
+        "segments": 2,
+        "rows": 4,
+        "dead_rows": 1,
+        "bytes": 0,
+    }
+    found = store.get_many({"photo-0.jpg": (10, 28), "photo-2.jpg": (10, 20)})
+    assert found["photo-0.jpg"]["embedding"] == _artifact(8)["embedding"]
+    assert found["photo-2.jpg"]["embedding"] == _artifact(2)["embedding"]
+    store.compact()
+    assert store.stats()["segments"] == 1
+    assert store.stats()["dead_rows"] == 0
+    assert len(list((tmp_path / "store").glob("*.npy*"))) == 2
+    with pytest.raises(SimilarityArtifactCacheFormatError):
+        store.put_many({"wide.jpg": {**_artifact(5), "embedding": [1.0] * 16}})
+    store.close()
+
+
+_CRASHING_WRITER = textwrap.dedent(
+    """
+    import os, sys
+    import core.similarity_embedding_store as module
+    from test_similarity_embedding_store import _artifact
+
+    store = module.SimilarityEmbeddingStore(sys.argv[1])
+    store.put_many({"a.jpg": _artifact(1), "b.jpg": _artifact(2)})
+    store.put_many({"c.jpg": _artifact(3)})
+    store.put_many({"a.jpg": _artifact(4, (4, 4))})
+    crash = lambda *_args, **_kwargs: os._exit(9)
+    if sys.argv[2] == "append":
+        # The new segment is complete on disk but not yet in the index.
+        module._sync_directory = crash
+        store.put_many({"d.jpg": _artifact(5), "b.jpg": _artifact(6, (6, 6))})
+    else:
+        module.SimilarityEmbeddingStore._swap_segments = crash
+        store.compact()
+    """
+)
+
+
+@pytest.mark.parametrize("crash_point", ["append", "merge"])
+def test_killed_writer_leaves_the_committed_segments_intact(tmp_path, crash_point):
+    tests_dir = Path(__file__).resolve().parent
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join(
+        [str(tests_dir.parent / "src"), str(tests_dir)]
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", _CRASHING_WRITER, str(tmp_path / "store"), crash_point],
+        env=environment,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert completed.returncode == 9, completed.stderr
+
+    store = SimilarityEmbeddingStore(tmp_path / "store")
+    found = store.get_many(
+        {"a.jpg": (4, 4), "b.jpg": (10, 20), "c.jpg": (10, 20), "d.jpg": (10, 20)}
+    )
+    assert set(found) == {"a.jpg", "b.jpg", "c.jpg"}
+    assert found["a.jpg"]["embedding"] == _artifact(4)["embedding"]
+    assert found["b.jpg"]["embedding"] == _artifact(2)["embedding"]
+    # The interrupted segment was removed; the three committed ones remain.
+    assert store.stats()["segments"] == 3
+    assert len(list((tmp_path / "store").glob("*.npy*"))) == 6
+
+    store.put_many({"d.jpg": _artifact(5)})
+    store.compact()
+    assert len(store.get_many({"d.jpg": (10, 20), "c.jpg": (10, 20)})) == 2
+    store.close()
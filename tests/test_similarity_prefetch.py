@@ -0,0 +1,99 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from core.similarity_prefetch import PrefetchStats, iter_prepared_batches
+
+
+def test_batches_keep_path_order_and_skip_failed_loads():
+    def load(path):
+        time.sleep(0.001 * (hash(path) % 3))
+        return None if path.endswith("3") else np.zeros(4, dtype=np.uint8)
+
+    loaded = []
+    stats = PrefetchStats(workers=3)
+    batches = list(
+        iter_prepared_batches(
+            [f"p{i}" for i in range(10)],
+            load,
+            batch_size=4,
+            workers=3,
+            max_batches=2,
+            max_bytes=1 << 20,
+            on_loaded=lambda path, ok: loaded.append((path, ok)),
+            stats=stats,
+        )
+    )
+
+    assert [batch.paths for batch in batches] == [
+        ["p0", "p1", "p2"],
+        ["p4", "p5", "p6", "p7"],
+        ["p8", "p9"],
+    ]
+    assert [batch.attempted for batch in batches] == [4, 4, 2]
+    assert batches[1].nbytes == 16
+    assert loaded == [(f"p{i}", i != 3) for i in range(10)]
+    assert stats.images == 9
+    assert stats.wall_seconds > 0
+
+
+def test_loads_ahead_are_bounded_by_batches_and_bytes():
+    started = []
+    lock = threading.Lock()
+
+    def load(path):
+        with lock:
+            started.append(path)
+        return np.zeros(100, dtype=np.uint8)
+
+    batches = iter_prepared_batches(
+        [f"p{i}" for i in range(50)],
+        load,
+        batch_size=2,
+        workers=2,
+        max_batches=3,
+        max_bytes=1 << 20,
+    )
+    next(batches)
+    time.sleep(0.05)
+    # The first batch was taken; at most three more batches are queued.
+    assert len(started) <= 2 + 6
+    batches.close()
+
+    started.clear()
+    stats = PrefetchStats(workers=1)
+    batches = iter_prepared_batches(
+        [f"p{i}" for i in range(50)],
+        load,
+        batch_size=2,
+        workers=1,
+        max_batches=10,
+        max_bytes=250,
+        stats=stats,
+    )
+    next(batches)
+    time.sleep(0.05)
+    assert len(started) < 8
+    assert stats.peak_queued_bytes <= 250 + 100
+    batches.close()
+
+
+def test_load_errors_reach_the_consumer_and_stop_the_pool():
+    def load(path):
+        if path == "bad":
+            raise OSError("unreadable")
+        return np.zeros(1)
+
+    with pytest.raises(OSError):
+        list(
+            iter_prepared_batches(
+                ["ok", "bad", "later"],
+                load,
+                batch_size=1,
+                workers=2,
+                max_batches=1,
+                max_bytes=1 << 20,
+            )
+        )
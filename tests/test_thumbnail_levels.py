@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+from PIL import Image
+
+from core.image_pipeline import thumbnail_level_for
+from core.image_processing.standard_image_processor import StandardImageProcessor
+
+
+def _source(tmp_path) -> str:
+    source = tmp_path / "IMG_0001.jpg"
+    Image.new("RGB", (1200, 800), "teal").save(source)
+    return str(source)
+
+
+def test_level_is_the_smallest_covering_icon_size_times_pixel_ratio():
+    assert thumbnail_level_for(16) == 128
+    assert thumbnail_level_for(96) == 128
+    assert thumbnail_level_for(96, 2.0) == 256
+    assert thumbnail_level_for(128, 1.5) == 256
+    assert thumbnail_level_for(200, 2.0) == 512
+    assert thumbnail_level_for(1000) == 512
+
+
+def test_one_decode_fills_smaller_levels_and_keeps_only_the_shown_one_in_memory(
+    tmp_path, make_pipeline
+):
+    pipeline = make_pipeline()
+    source = _source(tmp_path)
+    pipeline.set_thumbnail_level(128)
+
+    with patch(
+        "core.image_pipeline.StandardImageProcessor.process_for_thumbnail",
+        wraps=StandardImageProcessor.process_for_thumbnail,
+    ) as processor:
+        small = pipeline._get_pil_thumbnail(source)
+        small_key = pipeline.thumbnail_cache_key(source, level=128)
+        default_key = pipeline.thumbnail_cache_key(source, level=256)
+        assert small_key in pipeline._memory_cache
+        assert default_key not in pipeline._memory_cache
+        assert pipeline.set_thumbnail_level(256)
+        default = pipeline._get_pil_thumbnail(source)
+
+    assert processor.call_count == 1
+    assert max(small.size) == 128 and max(default.size) == 256
+    assert len(small_key) == len(default_key) + 1
+    assert small_key in pipeline.thumbnail_cache
+    assert default_key in pipeline.thumbnail_cache
+    assert (
+        pipeline.thumbnail_cache_key(source, level=512) not in pipeline.thumbnail_cache
+    )
+
+
+def test_smaller_level_is_reduced_from_a_cached_larger_one(tmp_path, make_pipeline):
+    pipeline = make_pipeline()
+    source = _source(tmp_path)
+    pipeline.thumbnail_cache.set(
+        pipeline.thumbnail_cache_key(source, level=512),
+        Image.new("RGB", (512, 341), "orange"),
+    )
+    pipeline.set_thumbnail_level(128)
+
+    with patch(
+        "core.image_pipeline.StandardImageProcessor.process_for_thumbnail"
+    ) as processor:
+        small = pipeline._get_pil_thumbnail(source)
+
+    processor.assert_not_called()
+    assert small.size == (128, 85)
+    assert abs(small.convert("RGB").getpixel((64, 40))[0] - 255) <= 2
+    assert pipeline.thumbnail_cache_key(source, level=128) in pipeline.thumbnail_cache
+
+
+def test_fanout_decode_stores_the_grid_level(tmp_path, make_pipeline):
+    pipeline = make_pipeline()
+    source = _source(tmp_path)
+    pipeline.set_thumbnail_level(128)
+
+    assert pipeline.ensure_tiers_cached(source)
+
+    assert pipeline.load_cached_thumbnails([source]) == [source]
+    assert pipeline.thumbnail_cache_key(source, level=256) in pipeline.thumbnail_cache
@@ -1,6 +1,8 @@
 from types import SimpleNamespace
 from unittest.mock import Mock
 
+from PyQt6.QtCore import QSize
+
 from ui.thumbnail_load_coordinator import ViewportThumbnailLoader
 
 
@@ -182,3 +184,25 @@ def test_foreground_result_is_applied_even_if_viewport_changes_before_callback()
     context.grouping_step_widget.refresh_cached_thumbnails.assert_called_once_with(
         ["requested-image.jpg"]
     )
+
+
+def test_visible_batch_selects_thumbnail_level_for_icon_size_and_pixel_ratio():
+    context = _context(item_count=1)
+    view = Mock()
+    view.iconSize.return_value = QSize(96, 96)
+    view.devicePixelRatioF.return_value = 2.0
+    context._get_active_file_view.return_value = view
+    context.image_pipeline.set_thumbnail_level.return_value = True
+    loader = ViewportThumbnailLoader(context)
+    loader._session_id = "folder-session"
+    loader._all_paths = ["image-0.jpg"]
+    loader._all_path_set = {"image-0.jpg"}
+    loader._materialized_paths = {"image-0.jpg"}
+    loader._visible_paths = Mock(return_value=["image-0.jpg"])
+
+    loader._load_visible_batch()
+
+    context.image_pipeline.set_thumbnail_level.assert_called_once_with(256)
+    context.worker_manager.prioritize_thumbnail_paths.assert_called_once_with(
+        "folder-session", ["image-0.jpg"]
+    )
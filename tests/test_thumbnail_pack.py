@@ -0,0 +1,65 @@
+from PIL import Image
+
+from core.caching.thumbnail_pack import ThumbnailPackStore
+
+
+def _key(name: str, mtime_ns: int = 1) -> tuple:
+    return (f"/photos/{name}", "thumbnail", 2, 100, mtime_ns, False, True)
+
+
+def test_pack_round_trips_thumbnails_and_counts_missing_keys(tmp_path):
+    store = ThumbnailPackStore(cache_dir=str(tmp_path))
+    entries = [
+        (_key("a.jpg"), Image.new("RGB", (256, 171), "teal")),
+        (_key("b.png"), Image.new("RGBA", (128, 256), (10, 20, 30, 40))),
+    ]
+
+    assert store.write("/photos", entries) == 2
+    found, missing = store.read(
+        "/photos", [_key("b.png"), _key("a.jpg"), _key("c.jpg")]
+    )
+
+    assert list(found) == [_key("b.png"), _key("a.jpg")]
+    assert found[_key("a.jpg")].getpixel((5, 5)) == (0, 128, 128)
+    assert found[_key("b.png")].mode == "RGBA"
+    assert found[_key("b.png")].getpixel((0, 0)) == (10, 20, 30, 40)
+    assert missing == 1
+    assert store.volume() > 0
+
+
+def test_changed_fingerprint_misses_and_budget_limits_copies(tmp_path):
+    store = ThumbnailPackStore(cache_dir=str(tmp_path))
+    image = Image.new("RGB", (100, 100), "white")
+    store.write("/photos", [(_key("a.jpg"), image), (_key("b.jpg"), image)])
+
+    found, missing = store.read(
+        "/photos",
+        [_key("a.jpg", mtime_ns=2), _key("b.jpg"), _key("a.jpg")],
+        max_bytes=100 * 100 * 3,
+    )
+
+    assert list(found) == [_key("b.jpg")]
+    assert missing == 1
+
+
+def test_cancelled_write_keeps_previous_pack(tmp_path):
+    store = ThumbnailPackStore(cache_dir=str(tmp_path))
+    image = Image.new("L", (64, 64), 200)
+    store.write("/photos", [(_key("a.jpg"), image)])
+
+    assert store.write("/photos", [(_key("b.jpg"), image)], lambda: True) == 0
+    found, _missing = store.read("/photos", [_key("a.jpg")])
+
+    assert list(found) == [_key("a.jpg")]
+    assert not [path for path in tmp_path.iterdir() if path.suffix == ".tmp"]
+
+
+def test_budget_evicts_least_recently_used_packs(tmp_path):
+    image = Image.new("RGB", (100, 100), "white")
+    store = ThumbnailPackStore(cache_dir=str(tmp_path), size_limit=50_000)
+
+    store.write("/first", [(_key("a.jpg"), image)])
+    store.write("/second", [(_key("a.jpg"), image)])
+
+    assert store.read("/first", [_key("a.jpg")])[0] == {}
+    assert len(store.read("/second", [_key("a.jpg")])[0]) == 1
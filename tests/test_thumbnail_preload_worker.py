@@ -36,9 +36,10 @@ class TestThumbnailPreloadWorker:
 
     def test_session_processes_foreground_first_and_materializes_background(self):
         pipeline = Mock()
+        pipeline.is_provisional_thumbnail.return_value = False
         calls = []
         pipeline.ensure_thumbnail_cached.side_effect = (
-            lambda path, *, promote_to_memory: (
+            lambda path, *, promote_to_memory, **_kwargs: (
                 calls.append((path, promote_to_memory)) or True
             )
         )
@@ -67,7 +68,7 @@ class TestThumbnailPreloadWorker:
         calls = []
         initial_background_count = 0
 
-        def ensure(path, *, promote_to_memory):
+        def ensure(path, *, promote_to_memory, **_kwargs):
             nonlocal initial_background_count
             with state_lock:
                 calls.append((path, promote_to_memory))
@@ -131,7 +132,7 @@ class TestThumbnailPreloadWorker:
         active = 0
         max_active = 0
 
-        def ensure(_path, *, promote_to_memory):
+        def ensure(_path, *, promote_to_memory, **_kwargs):
             nonlocal active, max_active
             assert promote_to_memory is True
             with state_lock:
@@ -183,6 +184,7 @@ class TestThumbnailPreloadWorker:
     def test_foreground_work_runs_while_background_is_paused(self):
         pipeline = Mock()
         pipeline.ensure_thumbnail_cached.return_value = True
+        pipeline.is_provisional_thumbnail.return_value = False
         worker = ThumbnailPreloadWorker(
             pipeline,
             session_id="folder",
@@ -201,5 +203,115 @@ class TestThumbnailPreloadWorker:
         thread.join(timeout=2)
 
         pipeline.ensure_thumbnail_cached.assert_called_with(
-            "visible", promote_to_memory=True
+            "visible", promote_to_memory=True, allow_embedded=True
         )
+
+    def test_embedded_first_paint_is_upgraded_after_foreground_work(self):
+        pipeline = Mock()
+        calls = []
+        pipeline.ensure_thumbnail_cached.side_effect = (
+            lambda path, *, promote_to_memory, allow_embedded=False: (
+                calls.append((path, allow_embedded)) or True
+            )
+        )
+        pipeline.is_provisional_thumbnail.side_effect = lambda path: (
+            path == "visible.jpg"
+        )
+        worker = ThumbnailPreloadWorker(
+            pipeline,
+            session_id="folder",
+            all_paths=["visible.jpg", "other.jpg"],
+            foreground_paths=["visible.jpg"],
+            materialize_background=False,
+            max_workers=1,
+        )
+        ready_batches = []
+        worker.session_batch_ready.connect(
+            lambda _session, paths: ready_batches.append(list(paths))
+        )
+
+        worker.run_session()
+
+        assert calls[0] == ("visible.jpg", True)
+        assert calls[1] == ("visible.jpg", False)
+        assert ready_batches == [["visible.jpg"], ["visible.jpg"]]
+        assert worker._attempted == 2
+
+    def test_packed_thumbnails_paint_in_one_batch_and_pack_is_rewritten(self):
+        pipeline = Mock()
+        pipeline.is_provisional_thumbnail.return_value = False
+        pipeline.ensure_thumbnail_cached.return_value = True
+        pipeline.load_thumbnail_pack.return_value = (["a.jpg", "b.jpg"], 1)
+        pipeline.write_thumbnail_pack.return_value = 3
+        worker = ThumbnailPreloadWorker(
+            pipeline,
+            session_id="folder",
+            all_paths=["a.jpg", "b.jpg", "new.jpg"],
+            foreground_paths=["b.jpg"],
+            pack_folder="/photos",
+            max_workers=1,
+        )
+        ready_batches = []
+        worker.session_batch_ready.connect(
+            lambda _session, paths: ready_batches.append(list(paths))
+        )
+
+        worker.run_session()
+
+        pipeline.load_thumbnail_pack.assert_called_once_with(
+            "/photos", ["b.jpg", "a.jpg", "new.jpg"]
+        )
+        assert ready_batches[0] == ["a.jpg", "b.jpg"]
+        pipeline.ensure_thumbnail_cached.assert_called_once_with(
+            "new.jpg", promote_to_memory=True, allow_embedded=False
+        )
+        pipeline.write_thumbnail_pack.assert_called_once()
+        assert worker._attempted == 3
+
+    def test_current_pack_is_not_rewritten(self):
+        pipeline = Mock()
+        pipeline.load_thumbnail_pack.return_value = (["a.jpg"], 0)
+        worker = ThumbnailPreloadWorker(
+            pipeline,
+            session_id="folder",
+            all_paths=["a.jpg"],
+            pack_folder="/photos",
+        )
+
+        worker.run_session()
+
+        pipeline.ensure_thumbnail_cached.assert_not_called()
+        pipeline.write_thumbnail_pack.assert_not_called()
+
+    def test_session_completes_cached_paths_from_one_batched_read(self):
+        pipeline = Mock()
+        pipeline.is_provisional_thumbnail.return_value = False
+        pipeline.ensure_thumbnail_cached.return_value = True
+        batches = []
+
+        def load_cached(paths, *, promote_to_memory):
+            batches.append((list(paths), promote_to_memory))
+            return [path for path in paths if path.startswith("cached")]
+
+        pipeline.load_cached_thumbnails.side_effect = load_cached
+        worker = ThumbnailPreloadWorker(
+            pipeline,
+            session_id="folder",
+            all_paths=["cached-1", "miss", "cached-2", "visible"],
+            foreground_paths=["visible"],
+        )
+        ready = []
+        worker.session_batch_ready.connect(lambda _session, paths: ready.extend(paths))
+
+        worker.run_session()
+
+        assert batches == [
+            (["visible"], True),
+            (["cached-1", "miss", "cached-2"], True),
+        ]
+        decoded = {
+            call.args[0] for call in pipeline.ensure_thumbnail_cached.call_args_list
+        }
+        assert decoded == {"visible", "miss"}
+        assert set(ready) == {"cached-1", "cached-2", "miss", "visible"}
+        assert worker._attempted == 4
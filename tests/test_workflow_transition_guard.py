@@ -292,7 +292,7 @@ def test_deletion_completion_clears_easy_delete_before_file_model_mutation():
         },
         app_state=state,
         _sync_workflow_results_after_file_mutation=sync_workflows,
-        image_pipeline=SimpleNamespace(invalidate_path=Mock()),
+        image_pipeline=SimpleNamespace(invalidate_paths=Mock()),
         thumbnail_loader=SimpleNamespace(invalidate_paths=Mock()),
         _remove_model_paths_batch=remove_model_paths,
         proxy_model=SimpleNamespace(invalidate=Mock()),
@@ -360,7 +360,7 @@ def test_failed_deletion_does_not_reset_workflow_review_state():
         },
         app_state=state,
         _sync_workflow_results_after_file_mutation=sync_workflows,
-        image_pipeline=SimpleNamespace(invalidate_path=Mock()),
+        image_pipeline=SimpleNamespace(invalidate_paths=Mock()),
         thumbnail_loader=SimpleNamespace(invalidate_paths=Mock()),
         _remove_model_paths_batch=Mock(),
         proxy_model=SimpleNamespace(invalidate=Mock()),